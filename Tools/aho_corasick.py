@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+AHO-CORASICK MULTI-PATTERN MATCHER
+==================================
+
+Word and phrase bonuses in one linear pass instead of one substring
+search per dictionary entry.
+
+- All patterns are compiled once into a dense goto table with failure
+  transitions folded in (delta[state, symbol] -> state), so scanning a
+  text is one table lookup per symbol.
+- Every state carries the total weight and the ids of all patterns that
+  end there (including shorter patterns reached through failure links).
+- Two scoring modes:
+    count     every occurrence adds its weight      (text.count semantics)
+    presence  every distinct pattern adds it once   ('word in text' semantics)
+  Like str.count, count mode does not let a pattern overlap itself
+  ("THATHAT" holds one THAT). Only patterns with a border (a prefix that
+  is also a suffix) can do that, so only they track their last match.
+- Batch mode advances a whole (batch, n) candidate matrix one column at a
+  time, so the cost is O(n) numpy operations regardless of batch size.
+
+Patterns can be rune-index sequences (29 symbols, via text_to_key) or Latin
+letter strings (A-Z plus one separator symbol) for the older string scorers.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from master_dictionary import ALPHABET_SIZE, text_to_key
+
+# Latin alphabet: A-Z -> 0..25, anything else -> separator 26
+LATIN_SYMBOLS = 27
+_LATIN_TABLE = bytes(ord(chr(b)) - 65 if 65 <= b <= 90 else 26 for b in range(256))
+
+def encode_latin(text: str) -> bytes:
+    """Latin text as symbol codes (iterating the result yields ints)."""
+    return text.upper().encode('ascii', 'replace').translate(_LATIN_TABLE)
+
+# =============================================================================
+# AUTOMATON
+# =============================================================================
+
+@dataclass
+class PatternAutomaton:
+    """Dense Aho-Corasick automaton. State 0 is the root."""
+    delta: np.ndarray                       # (states, symbols) int32
+    fail: np.ndarray                        # (states,) int32 failure link
+    levels: List[np.ndarray]                # non-root states grouped by depth
+    terminal: np.ndarray                    # (patterns,) state each pattern ends in
+    weights: np.ndarray                     # (patterns,) float64
+    names: List[str]
+    lengths: np.ndarray                     # (patterns,) symbols per pattern
+    out_weight: np.ndarray                  # (states,) weight of the borderless patterns ending here
+    out_patterns: List[Tuple[int, ...]]     # state -> pattern ids ending here
+    out_bordered: List[Tuple[int, ...]]     # state -> ids of patterns ending here that can overlap themselves
+    bordered: np.ndarray                    # (states, k) bool, column j: bordered pattern j ends here
+    bordered_ids: np.ndarray                # (k,) pattern id of each column of `bordered`
+    _table: Optional[list] = field(default=None, init=False, repr=False)
+
+    @property
+    def states(self) -> int:
+        return len(self.delta)
+
+    @property
+    def table(self) -> list:
+        """delta as nested lists for the single-text Python path."""
+        if self._table is None:
+            self._table = self.delta.tolist()
+        return self._table
+
+    def _symbols(self, text) -> Sequence[int]:
+        if isinstance(text, str):
+            return encode_latin(text)
+        if isinstance(text, np.ndarray):
+            return text.tolist()
+        return text
+
+    # -------------------------------------------------------------------------
+    # Single text
+    # -------------------------------------------------------------------------
+
+    def scan(self, text) -> Iterator[Tuple[int, int]]:
+        """Yield (end position, pattern id) for every match."""
+        table, outs, s = self.table, self.out_patterns, 0
+        for i, c in enumerate(self._symbols(text)):
+            s = table[s][c]
+            for pid in outs[s]:
+                yield i + 1, pid
+
+    def occurrences(self, text) -> Iterator[Tuple[int, int]]:
+        """scan() without a pattern overlapping its own previous match (str.count)."""
+        last: Dict[int, int] = {}
+        for end, pid in self.scan(text):
+            if end - self.lengths[pid] >= last.get(pid, 0):
+                last[pid] = end
+                yield end, pid
+
+    def count_score(self, text) -> float:
+        """Total weight over all non-overlapping occurrences of each pattern."""
+        table, w, bordered, s, total = self.table, self.out_weight, self.out_bordered, 0, 0.0
+        last: Dict[int, int] = {}
+        for i, c in enumerate(self._symbols(text)):
+            s = table[s][c]
+            total += w[s]
+            for pid in bordered[s]:
+                if i + 1 - self.lengths[pid] >= last.get(pid, 0):
+                    last[pid] = i + 1
+                    total += self.weights[pid]
+        return float(total)
+
+    def presence_score(self, text) -> float:
+        """Total weight of the distinct patterns that occur at least once."""
+        table, s = self.table, 0
+        visited = set()
+        for c in self._symbols(text):
+            s = table[s][c]
+            visited.add(s)
+        found = set()
+        for s in visited:
+            found.update(self.out_patterns[s])
+        return float(sum(self.weights[pid] for pid in found))
+
+    def matches(self, text) -> Dict[str, int]:
+        """Pattern name -> occurrence count."""
+        counts: Dict[str, int] = {}
+        for _, pid in self.occurrences(text):
+            counts[self.names[pid]] = counts.get(self.names[pid], 0) + 1
+        return counts
+
+    # -------------------------------------------------------------------------
+    # Batch
+    # -------------------------------------------------------------------------
+
+    def count_scores(self, plaintexts: np.ndarray) -> np.ndarray:
+        """count_score for every row of a (batch, n) symbol matrix."""
+        pt = np.asarray(plaintexts, dtype=np.intp)
+        if pt.ndim == 1:
+            pt = pt[None, :]
+        state = np.zeros(len(pt), dtype=np.intp)
+        total = np.zeros(len(pt), dtype=np.float64)
+        lengths = self.lengths[self.bordered_ids]
+        weights = self.weights[self.bordered_ids]
+        last = np.zeros((len(pt), len(self.bordered_ids)), dtype=np.intp)
+        for i in range(pt.shape[1]):
+            state = self.delta[state, pt[:, i]]
+            total += self.out_weight[state]
+            if len(weights):
+                hit = self.bordered[state] & (i + 1 - lengths >= last)
+                total += hit @ weights
+                last[hit] = i + 1
+        return total
+
+    def presence_scores(self, plaintexts: np.ndarray, chunk: int = 4096) -> np.ndarray:
+        """presence_score for every row of a (batch, n) symbol matrix.
+
+        Visited states are marked per row, then pushed down the failure
+        links one depth level at a time (deepest first), which marks every
+        pattern whose end state was reached directly or as a suffix.
+        """
+        pt = np.asarray(plaintexts, dtype=np.intp)
+        if pt.ndim == 1:
+            pt = pt[None, :]
+        out = np.zeros(len(pt), dtype=np.float64)
+        for lo in range(0, len(pt), chunk):
+            block = pt[lo:lo + chunk]
+            cols = np.arange(len(block))
+            seen = np.zeros((self.states, len(block)), dtype=bool)
+            state = np.zeros(len(block), dtype=np.intp)
+            for i in range(block.shape[1]):
+                state = self.delta[state, block[:, i]]
+                seen[state, cols] = True
+            for level in reversed(self.levels):
+                np.logical_or.at(seen, self.fail[level], seen[level])
+            out[lo:lo + len(block)] = self.weights @ seen[self.terminal]
+        return out
+
+# =============================================================================
+# CONSTRUCTION
+# =============================================================================
+
+def build_automaton(patterns: Sequence[Sequence[int]], weights: Sequence[float],
+                    names: Optional[Sequence[str]] = None,
+                    alphabet_size: int = ALPHABET_SIZE) -> PatternAutomaton:
+    """Compile symbol sequences with weights. Duplicate sequences add their weights."""
+    names = list(names) if names is not None else [str(list(p)) for p in patterns]
+    goto: List[List[int]] = [[-1] * alphabet_size]
+    depth = [0]
+    pattern_id: Dict[Tuple[int, ...], int] = {}
+    pat_weights: List[float] = []
+    pat_names: List[str] = []
+    terminal: List[int] = []
+    pat_keys: List[Tuple[int, ...]] = []
+
+    for seq, weight, name in zip(patterns, weights, names):
+        key = tuple(int(c) for c in seq)
+        if not key:
+            continue
+        if key in pattern_id:
+            pat_weights[pattern_id[key]] += float(weight)
+            continue
+        node = 0
+        for c in key:
+            nxt = goto[node][c]
+            if nxt < 0:
+                nxt = len(goto)
+                goto[node][c] = nxt
+                goto.append([-1] * alphabet_size)
+                depth.append(depth[node] + 1)
+            node = nxt
+        pattern_id[key] = len(terminal)
+        pat_weights.append(float(weight))
+        pat_names.append(name)
+        terminal.append(node)
+        pat_keys.append(key)
+
+    # Breadth-first failure links, folding failures into the goto table
+    n_states = len(goto)
+    fail = [0] * n_states
+    order: List[int] = []
+    queue = deque()
+    for c in range(alphabet_size):
+        s = goto[0][c]
+        if s < 0:
+            goto[0][c] = 0
+        else:
+            queue.append(s)
+    while queue:
+        s = queue.popleft()
+        order.append(s)
+        for c in range(alphabet_size):
+            t = goto[s][c]
+            if t < 0:
+                goto[s][c] = goto[fail[s]][c]
+            else:
+                fail[t] = goto[fail[s]][c]
+                queue.append(t)
+
+    own: List[List[int]] = [[] for _ in range(n_states)]
+    for pid, node in enumerate(terminal):
+        own[node].append(pid)
+    out_patterns: List[Tuple[int, ...]] = [()] * n_states
+    for s in order:
+        out_patterns[s] = tuple(own[s]) + out_patterns[fail[s]]
+
+    # Patterns with a border can overlap themselves; count mode tracks those one by one
+    w = np.array(pat_weights, dtype=np.float64)
+    has_border = [any(k[:b] == k[-b:] for b in range(1, len(k))) for k in pat_keys]
+    free = [tuple(pid for pid in p if not has_border[pid]) for p in out_patterns]
+    out_bordered = [tuple(pid for pid in p if has_border[pid]) for p in out_patterns]
+    out_weight = np.array([w[list(p)].sum() if p else 0.0 for p in free], dtype=np.float64)
+    bordered_ids = np.flatnonzero(has_border).astype(np.intp)
+    column = {pid: j for j, pid in enumerate(bordered_ids.tolist())}
+    bordered = np.zeros((n_states, len(bordered_ids)), dtype=bool)
+    for s, pids in enumerate(out_bordered):
+        for pid in pids:
+            bordered[s, column[pid]] = True
+    depth_arr = np.array(depth, dtype=np.int32)
+    levels = [np.flatnonzero(depth_arr == d) for d in range(1, int(depth_arr.max()) + 1)]
+
+    return PatternAutomaton(
+        delta=np.array(goto, dtype=np.int32),
+        fail=np.array(fail, dtype=np.int32),
+        levels=levels,
+        terminal=np.array(terminal, dtype=np.intp),
+        weights=w,
+        names=pat_names,
+        lengths=np.array([len(k) for k in pat_keys], dtype=np.intp),
+        out_weight=out_weight,
+        out_patterns=out_patterns,
+        out_bordered=out_bordered,
+        bordered=bordered,
+        bordered_ids=bordered_ids,
+    )
+
+def rune_automaton(weighted_words: Dict[str, float]) -> PatternAutomaton:
+    """Automaton over rune indices from Latin words/phrases (spaces ignored)."""
+    words = list(weighted_words)
+    keys = [text_to_key(w.replace(' ', '')) for w in words]
+    return build_automaton(keys, [weighted_words[w] for w in words], words, ALPHABET_SIZE)
+
+def latin_automaton(weighted_words: Dict[str, float]) -> PatternAutomaton:
+    """Automaton over Latin letters for scorers that work on strings (spaces ignored)."""
+    words = list(weighted_words)
+    keys = [encode_latin(w.replace(' ', '')) for w in words]
+    return build_automaton(keys, [weighted_words[w] for w in words], words, LATIN_SYMBOLS)
+
+def main():
+    parser = argparse.ArgumentParser(description="Aho-Corasick word matcher on rune indices")
+    parser.add_argument("text", nargs='?', default="WITHINTHEDEEPWEBTHEREEXISTSAPAGE",
+                        help="Latin text to scan")
+    parser.add_argument("--page", type=int, default=None, help="Scan a page's raw runes")
+    args = parser.parse_args()
+
+    from master_dictionary import COMMON_ENGLISH_WORDS, load_page_indices
+    automaton = rune_automaton({w: len(w) for w in COMMON_ENGLISH_WORDS if len(w) >= 3})
+    print(f"[AC] {len(automaton.names)} patterns, {automaton.states} states")
+
+    idx = load_page_indices(args.page) if args.page is not None else text_to_key(args.text)
+    print(f"Matches: {automaton.matches(idx)}")
+    print(f"Count score: {automaton.count_score(idx):.1f}  "
+          f"Presence score: {automaton.presence_score(idx):.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,7 @@ from brute_force_solver import (
     vigenere_decrypt_np, autokey_decrypt_np, phi_prime_decrypt_np,
     score_combined, indices_to_text,
 )
+from results_db import ResultRecord, ResultsDB, json_report, write_reports
 
 # Try to import GPU modules
 try:
@@ -71,6 +72,9 @@ SHORT_PAGES = []
 # Priority pages (known to have partial solutions or high interest)
 PRIORITY_PAGES = [17, 18, 19, 20, 71]
 
+# Result dictionary of each solving method -> cipher name in the results database
+METHOD_CIPHERS = {'caesar': 'CAESAR', 'vigenere': 'VIGENERE', 'autokey': 'AUTOKEY', 'phi_prime': 'RUNNING_KEY'}
+
 # =============================================================================
 # BATCH ATTACK RESULTS
 # =============================================================================
@@ -111,122 +115,30 @@ class BatchResults:
         all_candidates.sort(key=lambda x: x.get('score', 0), reverse=True)
         return all_candidates[:top_n]
     
-    def to_markdown(self, output_path: str):
-        """Export results to markdown format."""
-        lines = [
-            "# BATCH ATTACK RESULTS",
-            "",
-            f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"**Duration:** {self.end_time - self.start_time:.2f} seconds",
-            f"**Pages Processed:** {len(self.results)}",
-            f"**Errors:** {len(self.errors)}",
-            "",
-            "---",
-            "",
-        ]
-        
-        # Summary table
-        lines.extend([
-            "## Summary",
-            "",
-            "| Page | Top Score | Top Key | Top Method | Preview |",
-            "|------|-----------|---------|------------|---------|",
-        ])
-        
-        for page_num in sorted(self.results.keys()):
-            top_candidates = self.get_top_candidates(page_num, 1)
-            if top_candidates:
-                top = top_candidates[0]
-                preview = top.get('text', '')[:40].replace('|', '\\|')
-                lines.append(
-                    f"| {page_num:02d} | {top.get('score', 0):.2f} | "
-                    f"`{top.get('key', 'N/A')[:20]}` | {top.get('method', 'N/A')} | "
-                    f"{preview}... |"
-                )
-            else:
-                lines.append(f"| {page_num:02d} | - | - | - | No results |")
+    def save(self, output_path: str, json_path: Optional[str] = None):
+        """Record the hits in the results database and write the Markdown / JSON views."""
+        pages = sorted(set(self.results) | set(self.errors))
+        with ResultsDB() as db:
+            run_id = db.start_run('batch_attack', {'pages': pages, 'errors': self.errors})
+            with db.writer(run_id) as writer:
+                for page_num, result in self.results.items():
+                    for method, method_results in result.items():
+                        if method in ['metadata', 'error']:
+                            continue
+                        writer.extend(ResultRecord(page_num, r['score'], METHOD_CIPHERS.get(method, method.upper()),
+                                                   r['key'], r['mode'], plaintext=r['text'], key=r['key_values'])
+                                      for r in method_results)
+            db.finish_run(run_id, self.end_time - self.start_time)
+            md, js = write_reports(db, run_id, Path(output_path), "BATCH ATTACK RESULTS",
+                                   {'Pages Processed': len(self.results), 'Errors': len(self.errors)})
+            if json_path:
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(json_report(db, run_id), f, indent=2)
         
-        lines.extend(["", "---", ""])
-        
-        # Detailed results per page
-        lines.append("## Detailed Results")
-        lines.append("")
-        
-        for page_num in sorted(self.results.keys()):
-            lines.append(f"### Page {page_num:02d}")
-            lines.append("")
-            
-            if page_num in self.errors:
-                lines.append(f"**ERROR:** {self.errors[page_num]}")
-                lines.append("")
-                continue
-            
-            top_candidates = self.get_top_candidates(page_num, 10)
-            
-            if not top_candidates:
-                lines.append("*No valid results found.*")
-                lines.append("")
-                continue
-            
-            lines.append("| Rank | Score | Method | Key | Text Preview |")
-            lines.append("|------|-------|--------|-----|--------------|")
-            
-            for i, candidate in enumerate(top_candidates, 1):
-                key = candidate.get('key', 'N/A')[:25]
-                text = candidate.get('text', '')[:50].replace('|', '\\|').replace('\n', ' ')
-                lines.append(
-                    f"| {i} | {candidate.get('score', 0):.2f} | "
-                    f"{candidate.get('method', 'N/A')} | `{key}` | {text}... |"
-                )
-            
-            lines.append("")
-            
-            # Show best full text
-            if top_candidates:
-                best = top_candidates[0]
-                lines.extend([
-                    "**Best Decryption Attempt:**",
-                    "```",
-                    best.get('text', 'N/A')[:500],
-                    "```",
-                    "",
-                ])
-        
-        # Error summary
-        if self.errors:
-            lines.extend([
-                "---",
-                "",
-                "## Errors",
-                "",
-            ])
-            for page_num, error in sorted(self.errors.items()):
-                lines.append(f"- **Page {page_num:02d}:** {error}")
-            lines.append("")
-        
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-        
-        print(f"[INFO] Results saved to {output_path}")
-    
-    def to_json(self, output_path: str):
-        """Export results to JSON format."""
-        output = {
-            'metadata': {
-                'date': datetime.now().isoformat(),
-                'duration_seconds': self.end_time - self.start_time,
-                'pages_processed': len(self.results),
-                'errors': len(self.errors),
-            },
-            'results': self.results,
-            'errors': self.errors,
-        }
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2)
-        
-        print(f"[INFO] JSON results saved to {output_path}")
+        print(f"[INFO] run {run_id} -> {db.path}")
+        print(f"[INFO] Results saved to {md} and {js}")
+        for page_num, error in sorted(self.errors.items()):
+            print(f"[ERROR] Page {page_num:02d}: {error}")
 
 # =============================================================================
 # BATCH PROCESSOR
@@ -268,8 +180,8 @@ class BatchProcessor:
             # Convert to JSON-serializable format
             for method, method_results in page_results.items():
                 result[method] = [
-                    {'score': float(score), 'key': key, 'mode': mode, 'text': text}
-                    for score, key, mode, text in method_results[:20]  # Top 20 per method
+                    {'score': float(score), 'key': key_name, 'mode': mode, 'text': text, 'key_values': key}
+                    for score, key_name, mode, text, key in method_results[:20]  # Top 20 per method
                 ]
             
             result['metadata']['status'] = 'success'
@@ -398,7 +310,7 @@ def main():
     )
     parser.add_argument(
         "--json", type=str, default=None,
-        help="Optional JSON output file"
+        help="Optional extra copy of the JSON view (one is always written next to --output)"
     )
     parser.add_argument(
         "--workers", type=int, default=max(1, mp.cpu_count() - 1),
@@ -448,11 +360,7 @@ def main():
     
     # Save results
     output_path = LP_DIR / args.output
-    results.to_markdown(str(output_path))
-    
-    if args.json:
-        json_path = LP_DIR / args.json
-        results.to_json(str(json_path))
+    results.save(str(output_path), str(LP_DIR / args.json) if args.json else None)
     
     print(f"\n[DONE] Results saved to {output_path}")
 
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+MICRO-BENCHMARK SUITE
+=====================
+
+Times the building blocks every attack is made of, on fixed pages with
+fixed seeds, so a change can be checked for speed as well as results:
+
+    python bench_suite.py run                   # all groups, appended to the history
+    python bench_suite.py run --group scorers --quick
+    python bench_suite.py compare               # last run vs the one before it
+    python bench_suite.py compare --base baseline --threshold 0.05
+    python bench_suite.py history
+
+Groups:
+- kernels   every cipher in CIPHER_REGISTRY decrypting page 20 (runes/s)
+- scorers   score_plaintext, score_combined, score_english (runes/s)
+- stats     IoC and the period profile of page 20
+- search    hill-climb candidate evaluations per second
+- batch     Vigenère key-shard throughput on one core, and the whole
+            parallel_attack batch on pages 20, 2 and 56 (keys/s)
+
+Each case is calibrated to run for about `min_time` per round; the best
+and the median of `repeat` rounds are recorded (garbage collection off),
+and a case only counts as changed when both moved past the threshold.
+Runs go to .cache/bench_history.jsonl together with the commit, host and
+a digest of the inputs. `compare` flags every case that got slower than
+the threshold and exits non-zero when there are any, so it can gate a
+change; on shared or throttled machines raise --threshold or --min-time.
+Cases whose module cannot load here (no GPU for master_cipher) are
+reported as skipped.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import contextlib
+import gc
+import hashlib
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from master_dictionary import CACHE_DIR, load_page_indices
+
+HISTORY_FILE = CACHE_DIR / "bench_history.jsonl"
+BENCH_PAGES = (20, 2, 56)       # The first page is the input of the per-page cases
+SEED = 3301
+DEFAULT_THRESHOLD = 0.10        # Slower by more than 10% is a regression
+
+# =============================================================================
+# CASES
+# =============================================================================
+
+@dataclass
+class Case:
+    """One timed callable and how much work a call does."""
+    name: str
+    fn: Callable[[], Any]
+    items: int
+    unit: str
+    heavy: bool = False         # Left out of --quick runs and timed once per round
+
+@dataclass
+class BenchInputs:
+    """Fixed inputs shared by every case."""
+    pages: Dict[int, np.ndarray]
+    key: np.ndarray             # Seeded 13-rune key
+    running_text: np.ndarray    # Seeded 4000-rune running key
+
+    @property
+    def page(self) -> np.ndarray:
+        return self.pages[BENCH_PAGES[0]]
+
+    def digest(self) -> str:
+        h = hashlib.sha256()
+        for p in BENCH_PAGES:
+            h.update(self.pages[p].tobytes())
+        h.update(self.key.tobytes())
+        h.update(self.running_text.tobytes())
+        return h.hexdigest()[:16]
+
+def bench_inputs() -> BenchInputs:
+    rng = np.random.default_rng(SEED)
+    pages = {p: np.array(load_page_indices(p), dtype=np.int64) for p in BENCH_PAGES}
+    missing = [p for p, runes in pages.items() if len(runes) == 0]
+    if missing:
+        raise FileNotFoundError(f"benchmark pages missing: {missing}")
+    return BenchInputs(pages, rng.integers(0, 29, 13), rng.integers(0, 29, 4000))
+
+GROUPS: Dict[str, Callable[[BenchInputs], Iterator[Case]]] = {}
+
+def group(name: str):
+    def register(fn: Callable[[BenchInputs], Iterator[Case]]):
+        GROUPS[name] = fn
+        return fn
+    return register
+
+# Parameters each registry cipher is benchmarked with (first mode of the cipher)
+KERNEL_PARAMS: Dict[str, Callable[[BenchInputs], Any]] = {
+    'SUBSTITUTION': lambda b: b.key,
+    'CAESAR': lambda b: 7,
+    'ATBASH': lambda b: None,
+    'AFFINE': lambda b: (5, 3),
+    'HILL': lambda b: np.array([[3, 2], [5, 7]]),
+    'RAILFENCE': lambda b: 3,
+    'AUTOKEY': lambda b: b.key,
+    'COLUMNAR': lambda b: [2, 0, 3, 1, 4],
+    'PORTA': lambda b: b.key,
+    'GRONSFELD': lambda b: [3, 1, 4, 1, 5],
+    'BIFID': lambda b: 5,
+    'SKIP': lambda b: 3,
+    'PROGRESSIVE': lambda b: b.key,
+    'INTERRUPTED': lambda b: b.key,
+    'RUNNING_KEY': lambda b: b.running_text,
+}
+
+@group('kernels')
+def kernel_cases(b: BenchInputs) -> Iterator[Case]:
+    from cipher_registry import CIPHER_REGISTRY
+    for name, cipher in CIPHER_REGISTRY.items():
+        if name not in KERNEL_PARAMS:
+            print(f"[SKIP] kernel.{name}: no benchmark parameters")
+            continue
+        params, mode = KERNEL_PARAMS[name](b), cipher.get_modes()[0]
+        yield Case(f"kernel.{name}", lambda c=cipher, p=params, m=mode: c.decrypt(b.page, p, m),
+                   len(b.page), 'runes')
+
+@group('scorers')
+def scorer_cases(b: BenchInputs) -> Iterator[Case]:
+    import brute_force_solver
+    import liber_primus_solver
+    yield Case("scorer.score_combined", lambda: brute_force_solver.score_combined(b.page), len(b.page), 'runes')
+    text = liber_primus_solver.indices_to_text(b.page.tolist())
+    yield Case("scorer.score_english", lambda: liber_primus_solver.score_english(text), len(b.page), 'runes')
+    try:
+        master_cipher = import_master_cipher()
+    except ImportError as e:
+        print(f"[SKIP] scorer.score_plaintext: {e}")
+        return
+    text = master_cipher.indices_to_text(b.page)
+    yield Case("scorer.score_plaintext", lambda: master_cipher.score_plaintext(text), len(b.page), 'runes')
+
+@group('stats')
+def stats_cases(b: BenchInputs) -> Iterator[Case]:
+    import brute_force_solver
+    import liber_primus_solver
+    runes = b.page.tolist()
+    yield Case("stats.ioc", lambda: brute_force_solver.score_index_of_coincidence(b.page), len(b.page), 'runes')
+    yield Case("stats.coset_ioc_71", lambda: liber_primus_solver.compute_ioc(runes, 71), len(b.page), 'runes')
+    yield Case("stats.period_profile_150",
+               lambda: liber_primus_solver.find_key_length_candidates(runes, max_length=150), 150, 'periods')
+
+@group('search')
+def search_cases(b: BenchInputs) -> Iterator[Case]:
+    import liber_primus_solver
+    runes, start = b.pages[BENCH_PAGES[0]].tolist(), b.key[:7].tolist()
+
+    # Count the candidate keys one climb scores (deterministic for fixed inputs)
+    score, calls = liber_primus_solver.score_english, [0]
+    def counting(text):
+        calls[0] += 1
+        return score(text)
+    liber_primus_solver.score_english = counting
+    try:
+        liber_primus_solver.hill_climb_optimize(runes, start, max_iterations=25)
+    finally:
+        liber_primus_solver.score_english = score
+    yield Case("search.hill_climb", lambda: liber_primus_solver.hill_climb_optimize(runes, start, max_iterations=25),
+               calls[0], 'evals')
+
+@group('batch')
+def batch_cases(b: BenchInputs) -> Iterator[Case]:
+    import parallel_attack
+    from key_canon import plan_keys
+    plan = plan_keys(parallel_attack.generate_all_keys(), ['SUB', 'ADD', 'SUB_REV'])
+    shard = plan.shard(0, min(len(plan), 2000))
+    cipher = b.page.astype(np.int32)
+    yield Case("batch.key_shard", lambda: parallel_attack.try_key_shard((shard, cipher)), len(shard), 'keys')
+
+    class BenchSolver(parallel_attack.AggressiveSolver):
+        def load_cipher(self, page_num: int) -> np.ndarray:
+            return b.pages[page_num].astype(np.int32)
+    solver = BenchSolver(os.cpu_count())
+    yield Case("batch.solve_pages", lambda: solver.solve_pages(list(BENCH_PAGES)),
+               len(plan) * len(BENCH_PAGES), 'keys', heavy=True)
+
+def import_master_cipher():
+    """master_cipher exits at import without CUDA unless MASTER_CIPHER_CPU is set."""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            import master_cipher
+    except SystemExit:
+        raise ImportError("master_cipher needs a GPU (set MASTER_CIPHER_CPU=1)")
+    return master_cipher
+
+# =============================================================================
+# TIMING
+# =============================================================================
+
+def measure(case: Case, min_time: float, repeat: int) -> Dict[str, Any]:
+    """Median and best seconds per call over `repeat` calibrated rounds (throughput from the median)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        case.fn()                                           # Warm-up and calibration
+        first = time.perf_counter() - start
+        loops = 1 if case.heavy else max(1, math.ceil(min_time / max(first, 1e-9)))
+        rounds = []
+        gc.collect()
+        gc.disable()                                        # As timeit does: no collector pauses
+        try:
+            for _ in range(1 if case.heavy else repeat):
+                start = time.perf_counter()
+                for _ in range(loops):
+                    case.fn()
+                rounds.append((time.perf_counter() - start) / loops)
+        finally:
+            gc.enable()
+    median = statistics.median(rounds)
+    return {'seconds': median, 'best': min(rounds), 'loops': loops, 'rounds': len(rounds),
+            'items': case.items, 'unit': case.unit, 'rate': case.items / max(median, 1e-12)}
+
+def _rate(value: float, unit: str) -> str:
+    for scale, suffix in ((1e9, 'G'), (1e6, 'M'), (1e3, 'k')):
+        if value >= scale:
+            return f"{value / scale:.2f}{suffix} {unit}/s"
+    return f"{value:.1f} {unit}/s"
+
+def _seconds(value: float) -> str:
+    for scale, suffix in ((1.0, 's'), (1e-3, 'ms'), (1e-6, 'us')):
+        if value >= scale:
+            return f"{value / scale:.2f} {suffix}"
+    return f"{value * 1e9:.0f} ns"
+
+def run_suite(groups: List[str], name_filter: str = '', quick: bool = False,
+              min_time: float = 0.2, repeat: int = 5) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str], str]:
+    """(case -> timing, case or group -> skip reason, input digest)."""
+    inputs = bench_inputs()
+    results, skipped = {}, {}
+    for group_name in groups:
+        # Set-up chatter (imports, key generation) stays out of the table; skips are kept
+        log = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(log):
+                cases = list(GROUPS[group_name](inputs))
+        except ImportError as e:
+            cases = []
+            print(f"[SKIP] {group_name}: {e}", file=log)
+        for line in log.getvalue().splitlines():
+            if line.startswith("[SKIP] "):
+                name, _, reason = line[7:].partition(": ")
+                skipped[name] = reason
+                print(f"  {line}")
+        for case in cases:
+            if name_filter not in case.name:
+                continue
+            if quick and case.heavy:
+                skipped[case.name] = "heavy (--quick)"
+                continue
+            results[case.name] = r = measure(case, min_time, repeat)
+            print(f"  {case.name:<28} {_seconds(r['seconds']):>10}  {_rate(r['rate'], r['unit']):>20}")
+    return results, skipped, inputs.digest()
+
+# =============================================================================
+# HISTORY
+# =============================================================================
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=Path(__file__).parent, timeout=10)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, cwd=Path(__file__).parent, timeout=10).stdout.strip()
+        return out.stdout.strip() + ('+dirty' if dirty else '') if out.returncode == 0 else ''
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+def append_history(record: Dict[str, Any], path: Path = HISTORY_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+def load_history(path: Path = HISTORY_FILE) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_run(history: List[Dict[str, Any]], ref: str) -> Dict[str, Any]:
+    """A run by label, commit prefix or index (negative counts from the newest)."""
+    try:
+        return history[int(ref)]
+    except ValueError:
+        pass
+    except IndexError:
+        raise KeyError(f"no run #{ref} ({len(history)} in history)")
+    for run in reversed(history):
+        if run.get('label') == ref or run.get('commit', '').startswith(ref):
+            return run
+    raise KeyError(f"no run labelled or at commit {ref!r}")
+
+def compare_runs(base: Dict[str, Any], head: Dict[str, Any],
+                 threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, Optional[float], Optional[float], str]]:
+    """(case, base best seconds, head best seconds, status); status is REGRESSION, faster, ok, new or gone.
+
+    A change has to show in both the best and the median round, so one
+    lucky or unlucky batch of rounds on a busy machine is not a finding.
+    """
+    rows = []
+    for name in sorted(set(base['results']) | set(head['results'])):
+        b, h = base['results'].get(name), head['results'].get(name)
+        if b is None or h is None:
+            rows.append((name, b and b['best'], h and h['best'], 'new' if b is None else 'gone'))
+            continue
+        ratios = [h[k] / max(b[k], 1e-12) for k in ('best', 'seconds')]
+        status = ('REGRESSION' if min(ratios) > 1 + threshold else
+                  'faster' if max(ratios) < 1 - threshold else 'ok')
+        rows.append((name, b['best'], h['best'], status))
+    return rows
+
+def describe_run(run: Dict[str, Any]) -> str:
+    label = f" '{run['label']}'" if run.get('label') else ''
+    return f"{run['time'][:19]} {run.get('commit') or '?'}{label} on {run['host']}"
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def cmd_run(args) -> int:
+    groups = args.group or list(GROUPS)
+    print(f"[BENCH] groups {', '.join(groups)} on pages {BENCH_PAGES}, seed {SEED}")
+    results, skipped, digest = run_suite(groups, args.filter, args.quick, args.min_time, args.repeat)
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'), 'label': args.label, 'commit': git_commit(),
+        'host': platform.node(), 'python': platform.python_version(), 'numpy': np.__version__,
+        'cpus': os.cpu_count(), 'inputs': digest, 'quick': args.quick, 'results': results, 'skipped': skipped,
+    }
+    if args.no_save:
+        return 0
+    history = load_history(args.history)
+    append_history(record, args.history)
+    print(f"[BENCH] saved {len(results)} cases to {args.history}")
+    # Against the latest run that timed any of these cases (e.g. the same --group)
+    base = next((run for run in reversed(history) if set(run['results']) & set(results)), None)
+    if base is not None:
+        return report_comparison(base, record, args.threshold, partial=True)
+    return 0
+
+def report_comparison(base: Dict[str, Any], head: Dict[str, Any], threshold: float,
+                      partial: bool = False) -> int:
+    """Print the comparison; 1 when anything regressed. `partial` hides cases head did not run."""
+    print(f"\n[COMPARE] base {describe_run(base)}")
+    print(f"[COMPARE] head {describe_run(head)}")
+    for key in ('host', 'inputs', 'quick'):
+        if base.get(key) != head.get(key):
+            print(f"[WARNING] runs differ in {key}: {base.get(key)} vs {head.get(key)}")
+    rows = [r for r in compare_runs(base, head, threshold) if not (partial and r[3] == 'gone')]
+    for name, b, h, status in rows:
+        change = f"{100 * (h / b - 1):+6.1f}%" if b and h else ''
+        print(f"  {name:<28} {_seconds(b) if b else '-':>10} -> {_seconds(h) if h else '-':>10} {change:>8}  {status}")
+    regressions = [r for r in rows if r[3] == 'REGRESSION']
+    print(f"[COMPARE] {len(regressions)} regression(s) beyond {100 * threshold:.0f}%")
+    return 1 if regressions else 0
+
+def cmd_compare(args) -> int:
+    history = load_history(args.history)
+    if len(history) < 2 and (args.base is None or args.head is None):
+        print(f"[COMPARE] need two runs in {args.history}, have {len(history)}")
+        return 2
+    try:
+        base = find_run(history, args.base if args.base is not None else '-2')
+        head = find_run(history, args.head if args.head is not None else '-1')
+    except KeyError as e:
+        print(f"[COMPARE] {e.args[0]}")
+        return 2
+    return report_comparison(base, head, args.threshold)
+
+def cmd_history(args) -> int:
+    for i, run in enumerate(load_history(args.history)):
+        print(f"  #{i:<3} {describe_run(run)}: {len(run['results'])} cases{' (quick)' if run.get('quick') else ''}")
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for kernels, scorers and search loops")
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help="History file (JSON lines)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and append them to the history")
+    run.add_argument("--group", action="append", choices=list(GROUPS), help="Group to run (repeatable)")
+    run.add_argument("--filter", type=str, default='', help="Only cases whose name contains this")
+    run.add_argument("--quick", action="store_true", help="Short rounds, no heavy end-to-end cases")
+    run.add_argument("--label", type=str, default='', help="Name to compare against later (e.g. baseline)")
+    run.add_argument("--min-time", type=float, default=None, help="Seconds per round (default 0.2, quick 0.05)")
+    run.add_argument("--repeat", type=int, default=None, help="Rounds per case (default 5, quick 3)")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run.add_argument("--no-save", action="store_true", help="Print only, leave the history alone")
+
+    compare = sub.add_parser("compare", help="Flag cases that got slower between two runs")
+    compare.add_argument("--base", type=str, default=None, help="Label, commit or index (default -2)")
+    compare.add_argument("--head", type=str, default=None, help="Label, commit or index (default -1)")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="Relative slowdown that counts as a regression")
+
+    sub.add_parser("history", help="List recorded runs")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        args.min_time = args.min_time or (0.05 if args.quick else 0.2)
+        args.repeat = args.repeat or (3 if args.quick else 5)
+        return cmd_run(args)
+    if args.command == "compare":
+        return cmd_compare(args)
+    return cmd_history(args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
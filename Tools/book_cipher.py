@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+BOOK-CIPHER ENGINE
+==================
+
+Treats an integer stream as positions in a source text and decodes it
+against every stored corpus (corpus_store, the book included) and every
+indexing scheme in one batched pass:
+
+    word              n           -> first rune of word n
+    letter            n           -> rune n
+    line/word         (l, w)      -> first rune of word w of line l
+    sentence/word     (s, w)      -> first rune of word w of sentence s
+    page/line/word    (p, l, w)   -> first rune of word w of line l of page p
+
+each 0- and 1-based. Tuples are read from consecutive numbers of the
+stream. For reference texts a paragraph stands in for a page.
+
+The positional indexes (first rune of every word, unit start / length
+tables, lines per page) are built once per corpus from the store's offset
+tables, so a hypothesis is a handful of array lookups instead of a
+re-split of the source. Positions that fall outside the source decode to
+a gap; outputs are ranked by rune bigram score over the decoded runes,
+with the fraction of valid positions (coverage) reported alongside.
+
+Typical streams: rune prime values, word prime sums, page numbers.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corpus_store import Corpus, default_store
+from master_dictionary import INDEX_TO_LATIN, load_page_indices
+from prime_values import default_prime_values, prime_values
+from rune_ngrams import default_model
+
+GAP = -1                    # Decoded position outside the source
+
+# scheme -> units addressed by consecutive numbers (outermost first)
+SCHEMES: Dict[str, Tuple[str, ...]] = {
+    'word': ('word',),
+    'letter': ('letter',),
+    'line/word': ('line', 'word'),
+    'sentence/word': ('sentence', 'word'),
+    'page/line/word': ('page', 'line', 'word'),
+}
+BASES = (0, 1)
+
+@dataclass
+class BookHit:
+    """One decoded (stream, corpus, scheme, base) candidate."""
+    score: float            # Mean bigram log-probability over decoded pairs
+    coverage: float         # Fraction of positions inside the source
+    stream: str
+    corpus: str
+    scheme: str
+    base: int
+    runes: np.ndarray       # Decoded runes (GAP where out of range)
+
+    @property
+    def latin(self) -> str:
+        return ''.join(INDEX_TO_LATIN[int(r)] if r >= 0 else '_' for r in self.runes)
+
+# =============================================================================
+# POSITIONAL INDEX
+# =============================================================================
+
+class BookIndex:
+    """Lookup tables of one corpus for every indexing scheme."""
+
+    def __init__(self, corpus: Corpus):
+        self.name = corpus.name
+        self.runes = np.asarray(corpus.runes, dtype=np.int16)
+        offsets = np.asarray(corpus.word_offsets, dtype=np.int64)
+        self.word_len = np.diff(offsets)
+        self.word_first = np.full(len(self.word_len), GAP, dtype=np.int16)
+        nonempty = self.word_len > 0
+        self.word_first[nonempty] = self.runes[offsets[:-1][nonempty]]
+
+        n_words = len(self.word_len)
+        page_unit = 'page' if corpus.page_starts is not None else 'paragraph'
+        # unit -> (first word, words) per unit
+        self.units: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for unit, source in (('line', 'line'), ('sentence', 'sentence'), ('page', page_unit)):
+            starts = np.asarray(corpus.starts(source), dtype=np.int64)
+            self.units[unit] = (starts, np.diff(np.append(starts, n_words)))
+        # Lines of each page: first line index and line count
+        line_starts = self.units['line'][0]
+        page_starts = self.units['page'][0]
+        first_line = np.searchsorted(line_starts, page_starts)
+        self.page_lines = (first_line, np.diff(np.append(first_line, len(line_starts))))
+
+    @staticmethod
+    def _child(parent: np.ndarray, i: np.ndarray, table: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        """Global index of child i of each parent (-1 when either is out of range)."""
+        first, count = table
+        if len(first) == 0:
+            return np.full(len(parent), -1, dtype=np.int64)
+        ok = (parent >= 0) & (parent < len(first))
+        p = np.where(ok, parent, 0)
+        ok &= (i >= 0) & (i < count[p])
+        return np.where(ok, first[p] + i, -1)
+
+    def decode(self, numbers: np.ndarray, scheme: str, base: int = 0) -> np.ndarray:
+        """Decoded runes (int16, GAP outside the source) for one scheme."""
+        units = SCHEMES[scheme]
+        arity = len(units)
+        usable = len(numbers) // arity * arity
+        pos = np.asarray(numbers[:usable], dtype=np.int64).reshape(-1, arity) - base
+        if units == ('letter',):
+            idx, table = pos[:, 0], self.runes
+        else:
+            idx, table = pos[:, 0], self.word_first
+            if units == ('page', 'line', 'word'):
+                idx = self._child(idx, pos[:, 1], self.page_lines)
+                idx = self._child(idx, pos[:, 2], self.units['line'])
+            elif arity == 2:
+                idx = self._child(idx, pos[:, 1], self.units[units[0]])
+        ok = (idx >= 0) & (idx < len(table))
+        out = np.full(len(idx), GAP, dtype=np.int16)
+        out[ok] = table[idx[ok]]
+        return out
+
+@lru_cache(maxsize=1)
+def default_indexes() -> Dict[str, BookIndex]:
+    """A positional index for every corpus the store can provide."""
+    store = default_store()
+    indexes = {}
+    for name in store.names():
+        try:
+            indexes[name] = BookIndex(store.get(name))
+        except (KeyError, OSError, ValueError):
+            continue
+    return indexes
+
+# =============================================================================
+# DECODING
+# =============================================================================
+
+def score_decoded(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(mean bigram score over valid pairs, coverage) per row of a GAP-padded matrix."""
+    model = default_model()
+    valid = rows >= 0
+    coverage = valid.mean(axis=1) if rows.shape[1] else np.zeros(len(rows))
+    if rows.shape[1] < 2:
+        return np.full(len(rows), -np.inf), coverage
+    a, b = np.where(valid, rows, 0)[:, :-1], np.where(valid, rows, 0)[:, 1:]
+    pair_ok = valid[:, :-1] & valid[:, 1:]
+    pairs = pair_ok.sum(axis=1)
+    total = np.where(pair_ok, model.bigram[a, b], 0.0).sum(axis=1)
+    return np.where(pairs > 0, total / np.maximum(pairs, 1), -np.inf), coverage
+
+def decode_all(streams: Dict[str, Sequence[int]], indexes: Optional[Dict[str, BookIndex]] = None,
+               schemes: Sequence[str] = tuple(SCHEMES), bases: Sequence[int] = BASES,
+               min_coverage: float = 0.5) -> List[BookHit]:
+    """Every stream x corpus x scheme x base, decoded and ranked."""
+    indexes = default_indexes() if indexes is None else indexes
+    hits: List[BookHit] = []
+    for stream_name, values in streams.items():
+        numbers = np.asarray(values, dtype=np.int64)
+        for scheme in schemes:
+            labels, rows = [], []
+            for corpus, index in indexes.items():
+                for base in bases:
+                    labels.append((corpus, base))
+                    rows.append(index.decode(numbers, scheme, base))
+            if not rows or len(rows[0]) == 0:
+                continue
+            matrix = np.stack(rows)
+            scores, coverage = score_decoded(matrix)
+            for (corpus, base), row, s, c in zip(labels, matrix, scores, coverage):
+                if c >= min_coverage:
+                    hits.append(BookHit(float(s), float(c), stream_name, corpus, scheme, base, row))
+    hits.sort(key=lambda h: -h.score)
+    return hits
+
+def page_streams(page: int) -> Dict[str, np.ndarray]:
+    """Integer streams a page's runes could stand for."""
+    runes = np.asarray(load_page_indices(page), dtype=np.int64)
+    streams = {'INDICES': runes, 'PRIME_VALUES': prime_values(runes)}
+    pv = default_prime_values()
+    try:
+        mask = pv.page_mask('word', [page])
+        streams['WORD_SUMS'] = pv.sums('word')[mask]
+        streams['WORD_LENGTHS'] = np.diff(pv.spans('word')[mask], axis=1)[:, 0]
+    except KeyError:
+        pass
+    return streams
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched book-cipher decoding against every corpus")
+    parser.add_argument("--page", type=int, default=None, help="Decode the streams of a page")
+    parser.add_argument("--numbers", type=int, nargs='+', default=None, help="Decode a custom stream")
+    parser.add_argument("--schemes", nargs='+', default=list(SCHEMES), choices=list(SCHEMES))
+    parser.add_argument("--min-coverage", type=float, default=0.5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    streams: Dict[str, Sequence[int]] = {}
+    if args.numbers:
+        streams['CUSTOM'] = args.numbers
+    if args.page is not None:
+        streams.update({f"P{args.page:02d}_{k}": v for k, v in page_streams(args.page).items()})
+    if not streams:
+        parser.error("give --page and/or --numbers")
+
+    indexes = default_indexes()
+    hits = decode_all(streams, indexes, args.schemes, min_coverage=args.min_coverage)
+    print(f"[BOOK] {len(streams)} streams x {len(indexes)} corpora x {len(args.schemes)} schemes "
+          f"x {len(BASES)} bases -> {len(hits)} candidates")
+    for h in hits[:args.top]:
+        print(f"  {h.score:7.3f} cov {h.coverage:4.2f}  {h.stream:<20s} {h.corpus:<16s} "
+              f"{h.scheme:<15s} base {h.base}  {h.latin[:50]}")
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@ Features:
 - All offset variations (0-28)
 - Forward/backward/reversed operations
 - Multiple scoring methods: trigrams, quadgrams, word matching, IoC
+- Run metrics (--metrics, --profile): per-phase timers, keys/s and ETA
+- Scoring cascade: a bigram prefix test rejects noise before full
+  n-gram scoring, and segmentation only scores each shard's best few
 
 Author: Wulfic
 Date: January 2026
@@ -27,7 +30,7 @@ from typing import List, Tuple, Dict, Optional, Callable, Any
 from pathlib import Path
 from dataclasses import dataclass
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from functools import partial
+from functools import lru_cache, partial
 import multiprocessing as mp
 
 # Try to import CuPy for GPU acceleration
@@ -44,7 +47,7 @@ import numpy as np
 # Import master dictionary
 from master_dictionary import (
     ALPHABET_SIZE, RUNE_TO_INDEX, INDEX_TO_RUNE, INDEX_TO_LATIN,
-    PRIMES, PRIME_TOTIENTS_MOD_29, PRIMES_MOD_29,
+    PRIME_TOTIENTS_MOD_29, PRIMES_MOD_29,
     FIBONACCI_MOD_29, LUCAS_MOD_29,
     ALL_KEYS, KNOWN_KEYS, CICADA_TERM_KEYS, SELF_RELIANCE_WORD_KEYS,
     TRIGRAMS, BIGRAMS, QUADGRAMS, COMMON_ENGLISH_WORDS,
@@ -52,6 +55,15 @@ from master_dictionary import (
     generate_lucas_key, reverse_key, shift_key, invert_key,
     PRIME_KEY_LENGTHS, OFFSETS,
 )
+from aho_corasick import PatternAutomaton, rune_automaton
+from eval_cache import EvalCache, context_seed, plan_hashes
+from key_canon import KeyPlan, caesar_form, plan_keys
+from key_space import (
+    CompositeSpace, KeySpace, ListSpace, SequenceSpace, transform_product,
+)
+from trie_segmenter import segmentation_score
+from metrics import add_arguments as add_metrics_arguments, configure_from_args, get_metrics
+from score_cascade import DEFAULT_FRR, DEFAULT_PREFIX, REJECTED, Cascade, calibrated_cascade
 
 # =============================================================================
 # CONFIGURATION
@@ -74,7 +86,11 @@ class Config:
     
     # Scoring
     min_score_threshold: float = 0.0
+    score_weights: Tuple[float, ...] = (1.0, 1.0, 0.5, 0.3, 0.0)  # tri, quad, words, IoC, segmentation
     top_results: int = 100
+    use_cache: bool = True  # Skip (page, key, mode) evaluations scored in earlier runs
+    cascade_frr: Optional[float] = DEFAULT_FRR  # Prefix-test false-reject target (None: score everything)
+    cascade_prefix: int = DEFAULT_PREFIX
     
     # Output
     verbose: bool = True
@@ -195,17 +211,28 @@ def score_text_quadgrams(indices: np.ndarray) -> float:
     
     return score / max(1, len(text) - 3)
 
-def score_text_words(indices: np.ndarray, min_word_len: int = 3) -> float:
-    """Score text by counting known English words found."""
-    text = indices_to_text(indices)
-    score = 0.0
-    
-    # Check for common words
+LATIN_LENGTHS = np.array([len(INDEX_TO_LATIN[i]) for i in range(ALPHABET_SIZE)])
+
+@lru_cache(maxsize=4)
+def word_automaton(min_word_len: int = 3) -> PatternAutomaton:
+    """Aho-Corasick automaton over COMMON_ENGLISH_WORDS (built once per process)."""
+    words: Dict[str, float] = {}
     for word in COMMON_ENGLISH_WORDS:
-        if len(word) >= min_word_len and word in text:
-            score += len(word) * 2  # Longer words score more
-    
-    return score / max(1, len(text))
+        if len(word) >= min_word_len:
+            words[word] = words.get(word, 0.0) + len(word) * 2  # Longer words score more
+    return rune_automaton(words)
+
+def score_text_words(indices: np.ndarray, min_word_len: int = 3) -> float:
+    """Score text by the known English words found (one automaton pass)."""
+    idx = np.asarray(indices, dtype=np.intp)
+    score = word_automaton(min_word_len).presence_score(idx)
+    return score / max(1, int(LATIN_LENGTHS[idx].sum()))
+
+def score_words_batch(plaintexts: np.ndarray, min_word_len: int = 3) -> np.ndarray:
+    """score_text_words for every row of a (batch, n) candidate matrix."""
+    pt = np.asarray(plaintexts, dtype=np.intp)
+    scores = word_automaton(min_word_len).presence_scores(pt)
+    return scores / np.maximum(1, LATIN_LENGTHS[pt].sum(axis=-1))
 
 def score_index_of_coincidence(indices: np.ndarray) -> float:
     """Calculate Index of Coincidence."""
@@ -217,80 +244,64 @@ def score_index_of_coincidence(indices: np.ndarray) -> float:
     ioc = np.sum(freq * (freq - 1)) / (n * (n - 1))
     return ioc
 
-def score_combined(indices: np.ndarray, weights: Tuple[float, float, float, float] = (1.0, 1.0, 0.5, 0.3)) -> float:
-    """Combined scoring using multiple methods."""
+# Part of every evaluation cache key: bump when score_combined changes
+SCORER_VERSION = 'brute_force.score_combined/1'
+
+# Per-rune Viterbi segmentation score of random runes
+SEGMENT_NOISE_FLOOR = -9.0
+
+def score_text_segmentation(indices: np.ndarray) -> float:
+    """Score by trie/Viterbi word segmentation (per-rune log-prob above noise)."""
+    return float(segmentation_score(np.asarray(indices)[None, :])[0]) - SEGMENT_NOISE_FLOOR
+
+def score_combined(indices: np.ndarray, weights: Tuple[float, ...] = (1.0, 1.0, 0.5, 0.3)) -> float:
+    """Combined scoring using multiple methods.
+
+    An optional fifth weight adds the word-segmentation feature.
+    """
     tri_score = score_text_trigrams(indices) * weights[0]
     quad_score = score_text_quadgrams(indices) * weights[1]
     word_score = score_text_words(indices) * weights[2]
     ioc_score = (score_index_of_coincidence(indices) - 0.0345) * 100 * weights[3]  # Boost above random
     
-    return tri_score + quad_score + word_score + max(0, ioc_score)
+    total = tri_score + quad_score + word_score + max(0, ioc_score)
+    if len(weights) > 4 and weights[4]:
+        total += max(0.0, score_text_segmentation(indices)) * weights[4]
+    return total
 
 # =============================================================================
 # KEY GENERATOR
 # =============================================================================
 
-def generate_all_keys(config: Config) -> List[Tuple[str, np.ndarray]]:
-    """Generate all keys to try."""
-    keys = []
-    
-    # 1. Known keys from dictionary
-    for name, key in ALL_KEYS.items():
-        if key and config.min_key_length <= len(key) <= config.max_key_length:
-            keys.append((f"DICT:{name}", np.array(key, dtype=np.int32)))
-    
-    # 2. Prime sequence keys
-    for length in PRIME_KEY_LENGTHS:
-        if config.min_key_length <= length <= config.max_key_length:
-            for start_idx in range(min(50, len(PRIMES) - length)):
-                key = np.array([PRIMES_MOD_29[start_idx + i] for i in range(length)], dtype=np.int32)
-                keys.append((f"PRIME_SEQ:len{length}_start{start_idx}", key))
-    
-    # 3. φ(prime) sequence keys
-    for length in PRIME_KEY_LENGTHS:
-        if config.min_key_length <= length <= config.max_key_length:
-            for start_idx in range(min(50, len(PRIME_TOTIENTS_MOD_29) - length)):
-                key = np.array([PRIME_TOTIENTS_MOD_29[start_idx + i] for i in range(length)], dtype=np.int32)
-                keys.append((f"PHI_PRIME:len{length}_start{start_idx}", key))
-    
-    # 4. Fibonacci keys
-    for length in range(config.min_key_length, min(50, config.max_key_length)):
-        for start_idx in range(min(20, len(FIBONACCI_MOD_29) - length)):
-            key = np.array([FIBONACCI_MOD_29[start_idx + i] for i in range(length)], dtype=np.int32)
-            keys.append((f"FIB:len{length}_start{start_idx}", key))
-    
-    # 5. Lucas keys
-    for length in range(config.min_key_length, min(50, config.max_key_length)):
-        for start_idx in range(min(20, len(LUCAS_MOD_29) - length)):
-            key = np.array([LUCAS_MOD_29[start_idx + i] for i in range(length)], dtype=np.int32)
-            keys.append((f"LUCAS:len{length}_start{start_idx}", key))
-    
-    # 6. Add offset variations if requested
-    if config.try_all_offsets:
-        base_keys = keys.copy()
-        for name, key in base_keys:
-            if not name.startswith("DICT:"):  # Don't add offsets to dict words (too many)
-                continue
-            for offset in range(1, ALPHABET_SIZE):  # Skip 0 (already included)
-                shifted_key = (key + offset) % ALPHABET_SIZE
-                keys.append((f"{name}+offset{offset}", shifted_key))
-    
-    # 7. Add reversed keys if requested
-    if config.try_reversed:
-        base_keys = keys.copy()
-        for name, key in base_keys:
-            if "REV" not in name:  # Avoid double-reversing
-                keys.append((f"{name}_REV", key[::-1].copy()))
-    
-    # 8. Add inverted keys if requested
-    if config.try_inverted:
-        base_keys = keys.copy()
-        for name, key in base_keys:
-            if "INV" not in name:
-                inverted = (ALPHABET_SIZE - key) % ALPHABET_SIZE
-                keys.append((f"{name}_INV", inverted))
-    
-    return keys
+def generate_all_keys(config: Config) -> KeySpace:
+    """Describe all keys to try (generated lazily, shard by shard)."""
+    lengths = range(config.min_key_length, config.max_key_length + 1)
+    variants = dict(reverse=config.try_reversed, negate=config.try_inverted)
+    
+    # Offset variations only for dictionary keys (the sequences cover offsets by start index)
+    dict_transforms = transform_product(
+        shifts=range(ALPHABET_SIZE) if config.try_all_offsets else (0,), **variants)
+    seq_transforms = transform_product(**variants)
+    prime_lengths = [l for l in PRIME_KEY_LENGTHS if l in lengths]
+    short_lengths = range(config.min_key_length, min(50, config.max_key_length))
+    
+    return CompositeSpace([
+        # 1. Known keys from dictionary
+        ListSpace([(f"DICT:{name}", key) for name, key in ALL_KEYS.items()
+                   if key and len(key) in lengths], dict_transforms),
+        # 2. Prime sequence keys
+        SequenceSpace("PRIME_SEQ", PRIMES_MOD_29, prime_lengths, range(50), seq_transforms,
+                      template="{label}:len{length}_start{offset}"),
+        # 3. φ(prime) sequence keys
+        SequenceSpace("PHI_PRIME", PRIME_TOTIENTS_MOD_29, prime_lengths, range(50), seq_transforms,
+                      template="{label}:len{length}_start{offset}"),
+        # 4. Fibonacci keys
+        SequenceSpace("FIB", FIBONACCI_MOD_29, short_lengths, range(20), seq_transforms,
+                      template="{label}:len{length}_start{offset}"),
+        # 5. Lucas keys
+        SequenceSpace("LUCAS", LUCAS_MOD_29, short_lengths, range(20), seq_transforms,
+                      template="{label}:len{length}_start{offset}"),
+    ])
 
 # =============================================================================
 # CIPHER MODES TO TRY
@@ -306,9 +317,9 @@ CIPHER_MODES = [
 # PARALLEL WORKER FUNCTION
 # =============================================================================
 
-def worker_try_key(args: Tuple[str, np.ndarray, np.ndarray, str]) -> Tuple[str, str, float, str]:
+def worker_try_key(args: Tuple[str, np.ndarray, np.ndarray, str, Tuple[float, ...]]) -> Tuple[str, str, float, str]:
     """Worker function to try a single key with a cipher mode."""
-    key_name, key, cipher, mode_name = args
+    key_name, key, cipher, mode_name, weights = args
     
     # Apply cipher mode
     if mode_name == "SUB":
@@ -324,25 +335,79 @@ def worker_try_key(args: Tuple[str, np.ndarray, np.ndarray, str]) -> Tuple[str,
         return (key_name, mode_name, 0.0, "")
     
     # Score the result
-    score = score_combined(plaintext)
+    score = score_combined(plaintext, weights)
     text = indices_to_text(plaintext)
     
     return (key_name, mode_name, score, text)
 
-def worker_try_caesar(args: Tuple[int, np.ndarray]) -> Tuple[int, float, str]:
+def worker_try_key_shard(args: Tuple[KeyPlan, np.ndarray, Tuple[float, ...], float, int, Optional[Cascade]]
+                         ) -> Tuple[List[Tuple[float, str, str, str, List[int]]], np.ndarray]:
+    """Worker function: generate one shard's keys and try each with its canonical modes.
+
+    With a cascade, candidates failing its prefix test score REJECTED and
+    the segmentation weight is only applied to the shard's top survivors;
+    min_score applies to the final score. Returns the shard's top results
+    and the score of every task in plan order, for the evaluation cache:
+    NaN for survivors that never got their segmentation term.
+    """
+    plan, cipher, weights, min_score, top_n, cascade = args
+    mode_fns = dict(CIPHER_MODES)
+    metrics = get_metrics()
+    segment = weights[4] if cascade is not None and len(weights) > 4 else 0.0
+    full = weights[:4] if segment else weights
+    
+    results = []
+    scores = np.full(len(plan), REJECTED)
+    with metrics.phase('vigenere'):
+        for mode_name, ext, names in plan.by_mode(len(cipher)):
+            with metrics.phase('vigenere/decrypt'):
+                plaintexts = mode_fns[mode_name](cipher[None, :], ext.astype(np.int32))
+            positions = np.flatnonzero(plan.mode_idx == plan.modes.index(mode_name))
+            rows = np.flatnonzero(cascade.passes(plaintexts)) if cascade is not None else range(len(plaintexts))
+            metrics.count('rejected', len(plaintexts) - len(rows))
+            with metrics.phase('vigenere/score'):
+                for row in rows:
+                    score = score_combined(plaintexts[row], full)
+                    scores[positions[row]] = np.nan if segment else score
+                    results.append((score, names[row], mode_name, plaintexts[row], positions[row]))
+    metrics.count('keys', len(plan))
+    
+    results.sort(reverse=True, key=lambda x: x[0])
+    results = results[:top_n]
+    if segment:
+        with metrics.phase('vigenere/segment'):
+            for i, (score, name, mode, pt, position) in enumerate(results):
+                scores[position] = score + max(0.0, score_text_segmentation(pt)) * segment
+                results[i] = (scores[position], name, mode, pt, position)
+        results.sort(reverse=True, key=lambda x: x[0])
+    return [(score, name, mode, indices_to_text(pt), plan.keys.key(int(plan.key_idx[position])).tolist())
+            for score, name, mode, pt, position in results if score >= min_score], scores
+
+def worker_try_caesar(args: Tuple[int, np.ndarray, Tuple[float, ...]]) -> Tuple[int, float, str]:
     """Worker for Caesar shift."""
-    shift, cipher = args
-    plaintext = (cipher - shift) % ALPHABET_SIZE
-    score = score_combined(plaintext)
-    text = indices_to_text(plaintext)
+    shift, cipher, weights = args
+    metrics = get_metrics()
+    with metrics.phase('caesar'):
+        plaintext = (cipher - shift) % ALPHABET_SIZE
+        score = score_combined(plaintext, weights)
+        text = indices_to_text(plaintext)
+    metrics.count('keys')
     return (shift, score, text)
 
-def worker_try_autokey(args: Tuple[str, np.ndarray, np.ndarray]) -> Tuple[str, float, str]:
-    """Worker for autokey cipher."""
-    key_name, key, cipher = args
-    plaintext = autokey_decrypt_np(cipher, key)
-    score = score_combined(plaintext)
-    text = indices_to_text(plaintext)
+def worker_try_autokey(args: Tuple[str, np.ndarray, np.ndarray, Tuple[float, ...], Optional[Cascade]]
+                       ) -> Tuple[str, float, str]:
+    """Worker for autokey cipher (REJECTED and no text when the prefix test fails)."""
+    key_name, key, cipher, weights, cascade = args
+    metrics = get_metrics()
+    with metrics.phase('autokey'):
+        plaintext = autokey_decrypt_np(cipher, key)
+        if cascade is not None and not cascade.passes(plaintext)[0]:
+            score, text = REJECTED, ''
+            metrics.count('rejected')
+        else:
+            score = score_combined(plaintext, weights)
+            text = indices_to_text(plaintext)
+    metrics.count('keys')
     return (key_name, score, text)
 
 # =============================================================================
@@ -354,7 +419,61 @@ class BruteForceSolver:
     
     def __init__(self, config: Config = None):
         self.config = config or Config()
-        self.results: List[Tuple[float, str, str, str]] = []  # (score, key_name, mode, text)
+        self.results: List[Tuple[float, str, str, str, List[int]]] = []  # (score, key_name, mode, text, key)
+        self.plan: Optional[KeyPlan] = None
+        self._cache: Optional[EvalCache] = None
+    
+    @property
+    def cache(self) -> EvalCache:
+        if self._cache is None:
+            self._cache = EvalCache()
+        return self._cache
+    
+    @property
+    def cascade(self) -> Optional[Cascade]:
+        """The calibrated prefix test, or None when the cascade is off."""
+        if self.config.cascade_frr is None:
+            return None
+        return calibrated_cascade(self.config.cascade_prefix, self.config.cascade_frr)
+    
+    def cached_split(self, plan: KeyPlan, cipher: np.ndarray
+                     ) -> Tuple[KeyPlan, Optional[np.ndarray], List[Tuple[float, str, str, str, List[int]]]]:
+        """Split a plan into (tasks still to evaluate, their cache hashes, best cached results).
+
+        Cached results only carry a score, so the few good enough to report
+        are decrypted again for their text.
+        """
+        if not self.config.use_cache or len(plan) == 0:
+            return plan, None, []
+        cascade = self.cascade
+        scorer = f"{SCORER_VERSION}:{self.config.score_weights}:{cascade.signature() if cascade else ''}"
+        hashes = plan_hashes(plan, len(cipher), [context_seed(cipher, mode, '', scorer) for mode in plan.modes])
+        known, scores = self.cache.lookup(hashes)
+        todo = KeyPlan(plan.keys, plan.modes, plan.key_idx[~known], plan.mode_idx[~known], int((~known).sum()))
+        
+        best = np.flatnonzero(known & (scores >= self.config.min_score_threshold))
+        best = best[np.argsort(-scores[best], kind='stable')[:self.config.top_results]]
+        mode_fns = dict(CIPHER_MODES)
+        cached = []
+        for task in best:
+            k, mode = int(plan.key_idx[task]), plan.modes[plan.mode_idx[task]]
+            ext = np.resize(plan.keys.key(k), len(cipher)).astype(np.int32)
+            cached.append((float(scores[task]), plan.keys.name(k), mode, indices_to_text(mode_fns[mode](cipher, ext)),
+                           plan.keys.key(k).tolist()))
+        
+        if self.config.verbose:
+            print(f"[CACHE] {int(known.sum())}/{len(plan)} evaluations cached from earlier runs")
+        return todo, hashes[~known], cached
+    
+    def plan_vigenere(self, keys: KeySpace) -> KeyPlan:
+        """Canonical (key, mode) tasks: equivalent pairs and plain Caesar shifts
+        (already covered by phase 1) are pruned before dispatch."""
+        if self.plan is None or self.plan.keys is not keys:
+            caesar = {caesar_form(t): f"CAESAR/SHIFT_{t}" for t in range(ALPHABET_SIZE)}
+            self.plan = plan_keys(keys, [mode for mode, _ in CIPHER_MODES], covered=caesar)
+            if self.config.verbose:
+                print(f"[CANON] {self.plan.summary()}")
+        return self.plan
         
     def load_cipher(self, page_num: int) -> np.ndarray:
         """Load cipher text from a page."""
@@ -377,63 +496,84 @@ class BruteForceSolver:
         indices = [RUNE_TO_INDEX[c] for c in runes if c in RUNE_TO_INDEX]
         return np.array(indices, dtype=np.int32)
     
-    def solve_vigenere_parallel(self, cipher: np.ndarray, keys: List[Tuple[str, np.ndarray]]) -> List[Tuple[float, str, str, str]]:
-        """Solve using parallel Vigenère attack."""
-        results = []
+    def solve_vigenere_parallel(self, cipher: np.ndarray, keys: KeySpace) -> List[Tuple[float, str, str, str, List[int]]]:
+        """Solve using parallel Vigenère attack (each worker generates its own key shard)."""
+        full = self.plan_vigenere(keys)
+        plan, hashes, results = self.cached_split(full, cipher)
+        metrics = get_metrics()
+        metrics.plan(len(full), 'keys')
+        metrics.advance(len(full) - len(plan))          # Cached evaluations
         
-        # Prepare all tasks
-        tasks = []
-        for key_name, key in keys:
-            for mode_name, _ in CIPHER_MODES:
-                tasks.append((key_name, key, cipher, mode_name))
+        # Several shards per worker keeps the pool balanced
+        shards = plan.shards(self.config.num_workers * 4) if len(plan) else []
+        tasks = [(plan.shard(lo, hi), cipher, self.config.score_weights,
+                  self.config.min_score_threshold, self.config.top_results, self.cascade) for lo, hi in shards]
         
         if self.config.verbose:
-            print(f"[INFO] Running {len(tasks)} Vigenère combinations with {self.config.num_workers} workers...")
+            print(f"[INFO] Running {len(plan)} Vigenère combinations "
+                  f"in {len(tasks)} shards with {self.config.num_workers} workers...")
         
         # Run in parallel
         with ProcessPoolExecutor(max_workers=self.config.num_workers) as executor:
-            futures = [executor.submit(worker_try_key, task) for task in tasks]
+            futures = {executor.submit(worker_try_key_shard, task): bounds for task, bounds in zip(tasks, shards)}
             
             for i, future in enumerate(as_completed(futures)):
                 try:
-                    key_name, mode_name, score, text = future.result()
-                    if score >= self.config.min_score_threshold:
-                        results.append((score, key_name, mode_name, text))
+                    top, scores = future.result()
+                    results.extend(top)
+                    if hashes is not None:
+                        lo, hi = futures[future]
+                        final = ~np.isnan(scores)       # Survivors left without segmentation are not cached
+                        self.cache.store(hashes[lo:hi][final], scores[final])
                 except Exception as e:
                     if self.config.verbose:
                         print(f"[ERROR] Task failed: {e}")
+                lo, hi = futures[future]
+                metrics.advance(hi - lo)
+                metrics.gauge('queue', len(tasks) - i - 1)
+                metrics.tick()
                 
                 # Progress update
-                if self.config.verbose and (i + 1) % 10000 == 0:
-                    print(f"[PROGRESS] {i + 1}/{len(tasks)} completed...")
+                if self.config.verbose:
+                    print(f"[PROGRESS] {i + 1}/{len(tasks)} shards completed...")
+        
+        if hashes is not None:
+            self.cache.flush()
         
         # Sort by score descending
         results.sort(reverse=True, key=lambda x: x[0])
         return results[:self.config.top_results]
     
-    def solve_caesar_parallel(self, cipher: np.ndarray) -> List[Tuple[float, str, str, str]]:
+    def solve_caesar_parallel(self, cipher: np.ndarray) -> List[Tuple[float, str, str, str, List[int]]]:
         """Try all Caesar shifts."""
         results = []
         
-        tasks = [(shift, cipher) for shift in range(ALPHABET_SIZE)]
+        tasks = [(shift, cipher, self.config.score_weights) for shift in range(ALPHABET_SIZE)]
+        metrics = get_metrics()
+        metrics.plan(len(tasks), 'keys')
         
         with ProcessPoolExecutor(max_workers=self.config.num_workers) as executor:
             futures = [executor.submit(worker_try_caesar, task) for task in tasks]
             
             for future in as_completed(futures):
                 shift, score, text = future.result()
-                results.append((score, f"CAESAR_SHIFT_{shift}", "SUB", text))
+                results.append((score, f"CAESAR_SHIFT_{shift}", "SUB", text, [shift]))
+                metrics.advance()
+                metrics.tick()
         
         results.sort(reverse=True, key=lambda x: x[0])
         return results[:self.config.top_results]
     
-    def solve_autokey_parallel(self, cipher: np.ndarray, keys: List[Tuple[str, np.ndarray]]) -> List[Tuple[float, str, str, str]]:
+    def solve_autokey_parallel(self, cipher: np.ndarray, keys: KeySpace) -> List[Tuple[float, str, str, str, List[int]]]:
         """Try autokey cipher with various seed keys."""
         results = []
         
         # Only use shorter keys for autokey (seed)
         short_keys = [(n, k) for n, k in keys if len(k) <= 20]
-        tasks = [(key_name, key, cipher) for key_name, key in short_keys]
+        seeds = dict(short_keys)
+        tasks = [(key_name, key, cipher, self.config.score_weights, self.cascade) for key_name, key in short_keys]
+        metrics = get_metrics()
+        metrics.plan(len(tasks), 'keys')
         
         if self.config.verbose:
             print(f"[INFO] Running {len(tasks)} autokey combinations...")
@@ -441,83 +581,126 @@ class BruteForceSolver:
         with ProcessPoolExecutor(max_workers=self.config.num_workers) as executor:
             futures = [executor.submit(worker_try_autokey, task) for task in tasks]
             
-            for future in as_completed(futures):
+            for i, future in enumerate(as_completed(futures)):
                 key_name, score, text = future.result()
-                results.append((score, key_name, "AUTOKEY", text))
+                if score != REJECTED:
+                    results.append((score, key_name, "AUTOKEY", text, seeds[key_name].tolist()))
+                metrics.advance()
+                metrics.gauge('queue', len(tasks) - i - 1)
+                metrics.tick()
         
         results.sort(reverse=True, key=lambda x: x[0])
         return results[:self.config.top_results]
     
-    def solve_phi_prime(self, cipher: np.ndarray, max_start_idx: int = 100) -> List[Tuple[float, str, str, str]]:
+    def solve_phi_prime(self, cipher: np.ndarray, max_start_idx: int = 100) -> List[Tuple[float, str, str, str, List[int]]]:
         """Try φ(prime) sequences with various starting indices."""
         results = []
+        f_positions = min(len(cipher), 100)
+        cascade = self.cascade
+        metrics = get_metrics()
+        metrics.plan(max_start_idx * (1 + f_positions), 'keys')
         
         for start_idx in range(max_start_idx):
-            # Try without literal F handling
-            plaintext = phi_prime_decrypt_np(cipher, start_idx)
-            score = score_combined(plaintext)
-            text = indices_to_text(plaintext)
-            results.append((score, f"PHI_PRIME_START_{start_idx}", "PHI", text))
-            
-            # Try with each position as potential literal F
-            for f_pos in range(min(len(cipher), 100)):
-                plaintext = phi_prime_decrypt_np(cipher, start_idx, [f_pos])
-                score = score_combined(plaintext)
-                if score > self.config.min_score_threshold:
-                    text = indices_to_text(plaintext)
-                    results.append((score, f"PHI_PRIME_START_{start_idx}_LITF_{f_pos}", "PHI_LITF", text))
+            with metrics.phase('phi_prime'):
+                # Try without literal F handling
+                plaintext = phi_prime_decrypt_np(cipher, start_idx)
+                score = score_combined(plaintext, self.config.score_weights)
+                text = indices_to_text(plaintext)
+                results.append((score, f"PHI_PRIME_START_{start_idx}", "PHI", text,
+                                ((cipher - plaintext) % ALPHABET_SIZE).tolist()))
+                
+                # Try with each position as potential literal F (prefix-tested first)
+                for f_pos in range(f_positions):
+                    plaintext = phi_prime_decrypt_np(cipher, start_idx, [f_pos])
+                    if cascade is not None and not cascade.passes(plaintext)[0]:
+                        continue
+                    score = score_combined(plaintext, self.config.score_weights)
+                    if score > self.config.min_score_threshold:
+                        text = indices_to_text(plaintext)
+                        # Effective keystream: literal F positions keep their cipher rune
+                        results.append((score, f"PHI_PRIME_START_{start_idx}_LITF_{f_pos}", "PHI_LITF", text,
+                                        ((cipher - plaintext) % ALPHABET_SIZE).tolist()))
+            metrics.count('keys', 1 + f_positions)
+            metrics.advance(1 + f_positions)
         
         results.sort(reverse=True, key=lambda x: x[0])
         return results[:self.config.top_results]
     
-    def solve_gpu_batch(self, cipher: np.ndarray, keys: List[Tuple[str, np.ndarray]]) -> List[Tuple[float, str, str, str]]:
+    def solve_gpu_batch(self, cipher: np.ndarray, keys: KeySpace) -> List[Tuple[float, str, str, str, List[int]]]:
         """GPU-accelerated batch solving."""
         if not GPU_AVAILABLE:
             print("[WARNING] GPU not available, falling back to CPU")
             return self.solve_vigenere_parallel(cipher, keys)
         
-        results = []
-        cipher_gpu = cp.array(cipher, dtype=cp.int32)
+        cipher_gpu = cp.array(cipher, dtype=cp.int32)[None, :]
         
+        full = self.plan_vigenere(keys)
+        plan, hashes, results = self.cached_split(full, cipher)
+        cascade = self.cascade
+        metrics = get_metrics()
+        metrics.plan(len(full), 'keys')
+        metrics.advance(len(full) - len(plan))          # Cached evaluations
         batch_size = self.config.batch_size
-        total_batches = (len(keys) + batch_size - 1) // batch_size
+        
+        def decrypt(mode_name: str, c: cp.ndarray, k: cp.ndarray) -> cp.ndarray:
+            if mode_name == "SUB":
+                return (c - k) % ALPHABET_SIZE
+            if mode_name == "ADD":
+                return (c + k) % ALPHABET_SIZE
+            return (k - c) % ALPHABET_SIZE
+        
+        total_batches = (len(plan) + batch_size - 1) // batch_size
         
         if self.config.verbose:
-            print(f"[INFO] Running GPU batch processing: {len(keys)} keys in {total_batches} batches...")
+            print(f"[INFO] Running GPU batch processing: {len(plan)} key/mode pairs in {total_batches} batches...")
         
         for batch_idx in range(total_batches):
             start = batch_idx * batch_size
-            end = min(start + batch_size, len(keys))
-            batch_keys = keys[start:end]
+            end = min(start + batch_size, len(plan))
             
-            for key_name, key in batch_keys:
-                key_gpu = cp.array(key, dtype=cp.int32)
-                
-                for mode_name, _ in CIPHER_MODES:
-                    key_repeated = cp.tile(key_gpu, (len(cipher_gpu) // len(key_gpu) + 1))[:len(cipher_gpu)]
-                    
-                    if mode_name == "SUB":
-                        plaintext_gpu = (cipher_gpu - key_repeated) % ALPHABET_SIZE
-                    elif mode_name == "ADD":
-                        plaintext_gpu = (cipher_gpu + key_repeated) % ALPHABET_SIZE
-                    else:
-                        plaintext_gpu = (key_repeated - cipher_gpu) % ALPHABET_SIZE
+            # Only this batch's keys exist in memory, as one packed matrix per mode
+            shard = plan.shard(start, end)
+            scores = np.full(len(shard), REJECTED)
+            with metrics.phase('vigenere'):
+                for mode_name, ext, names in shard.by_mode(cipher_gpu.shape[1]):
+                    positions = np.flatnonzero(shard.mode_idx == shard.modes.index(mode_name))
+                    with metrics.phase('vigenere/decrypt'):
+                        key_repeated = cp.array(ext, dtype=cp.int32)
+                        rows = np.arange(len(key_repeated))
+                        if cascade is not None:
+                            # Only rows whose first runes pass the prefix test are decrypted in full
+                            k = cascade.prefix
+                            head = cp.asnumpy(decrypt(mode_name, cipher_gpu[:, :k], key_repeated[:, :k]))
+                            rows = np.flatnonzero(cascade.passes(head))
+                            key_repeated = key_repeated[cp.asarray(rows)]
+                            metrics.count('rejected', len(ext) - len(rows))
+                        plaintexts = cp.asnumpy(decrypt(mode_name, cipher_gpu, key_repeated))
                     
                     # Move to CPU for scoring
-                    plaintext = cp.asnumpy(plaintext_gpu)
-                    score = score_combined(plaintext)
-                    
-                    if score >= self.config.min_score_threshold:
-                        text = indices_to_text(plaintext)
-                        results.append((score, key_name, mode_name, text))
+                    with metrics.phase('vigenere/score'):
+                        for row, plaintext in zip(rows, plaintexts):
+                            score = score_combined(plaintext, self.config.score_weights)
+                            scores[positions[row]] = score
+                            
+                            if score >= self.config.min_score_threshold:
+                                text = indices_to_text(plaintext)
+                                key = shard.keys.key(int(shard.key_idx[positions[row]])).tolist()
+                                results.append((score, names[row], mode_name, text, key))
+            if hashes is not None:
+                self.cache.store(hashes[start:end], scores)
+            metrics.count('keys', end - start)
+            metrics.advance(end - start)
+            metrics.gauge('queue', total_batches - batch_idx - 1)
             
             if self.config.verbose and (batch_idx + 1) % 10 == 0:
                 print(f"[PROGRESS] Batch {batch_idx + 1}/{total_batches} completed...")
         
+        if hashes is not None:
+            self.cache.flush()
         results.sort(reverse=True, key=lambda x: x[0])
         return results[:self.config.top_results]
     
-    def solve_all(self, cipher: np.ndarray) -> Dict[str, List[Tuple[float, str, str, str]]]:
+    def solve_all(self, cipher: np.ndarray) -> Dict[str, List[Tuple[float, str, str, str, List[int]]]]:
         """Run all solving methods and combine results."""
         all_results = {}
         
@@ -553,7 +736,7 @@ class BruteForceSolver:
         
         return all_results
     
-    def print_results(self, results: Dict[str, List[Tuple[float, str, str, str]]], top_n: int = 10):
+    def print_results(self, results: Dict[str, List[Tuple[float, str, str, str, List[int]]]], top_n: int = 10):
         """Print top results from each method."""
         print("\n" + "=" * 80)
         print("BRUTE FORCE RESULTS")
@@ -564,20 +747,25 @@ class BruteForceSolver:
             print(f"METHOD: {method.upper()}")
             print(f"{'=' * 40}")
             
-            for i, (score, key_name, mode, text) in enumerate(method_results[:top_n]):
+            for i, (score, key_name, mode, text, _) in enumerate(method_results[:top_n]):
                 print(f"\n[{i+1}] Score: {score:.2f}")
                 print(f"    Key: {key_name}")
                 print(f"    Mode: {mode}")
+                if method == 'vigenere' and self.plan is not None and self.plan.aliases_of(key_name, mode):
+                    print(f"    Equivalent: {len(self.plan.aliases_of(key_name, mode))} other key/mode pairs")
                 print(f"    Text: {text[:100]}..." if len(text) > 100 else f"    Text: {text}")
     
-    def save_results(self, results: Dict[str, List[Tuple[float, str, str, str]]], filepath: str):
+    def save_results(self, results: Dict[str, List[Tuple[float, str, str, str, List[int]]]], filepath: str):
         """Save results to JSON file."""
         output = {}
         for method, method_results in results.items():
             output[method] = [
-                {"score": score, "key": key_name, "mode": mode, "text": text}
-                for score, key_name, mode, text in method_results
+                {"score": score, "key": key_name, "mode": mode, "text": text, "key_values": key}
+                for score, key_name, mode, text, key in method_results
             ]
+            if method == 'vigenere' and self.plan is not None:
+                for entry in output[method]:
+                    entry["aliases"] = self.plan.aliases_of(entry["key"], entry["mode"])
         
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(output, f, indent=2)
@@ -599,8 +787,18 @@ def main():
     parser.add_argument("--min-key-len", type=int, default=1, help="Minimum key length")
     parser.add_argument("--max-key-len", type=int, default=100, help="Maximum key length")
     parser.add_argument("--quick", action="store_true", help="Quick mode: fewer key variations")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-evaluate everything instead of reusing cached scores")
+    parser.add_argument("--segment-weight", type=float, default=0.0,
+                        help="Weight of the word-segmentation (coverage) score feature")
+    parser.add_argument("--cascade-frr", type=float, default=DEFAULT_FRR,
+                        help="False-reject rate the prefix test is calibrated to on known solutions")
+    parser.add_argument("--no-cascade", action="store_true",
+                        help="Fully score every candidate instead of prefix-testing it first")
+    add_metrics_arguments(parser)
     
     args = parser.parse_args()
+    configure_from_args('brute_force', args)
     
     # Configure
     config = Config(
@@ -613,6 +811,9 @@ def main():
         try_reversed=not args.quick,
         try_inverted=not args.quick,
         output_file=args.output,
+        use_cache=not args.no_cache,
+        cascade_frr=None if args.no_cascade else args.cascade_frr,
+        score_weights=(1.0, 1.0, 0.5, 0.3, args.segment_weight),
     )
     
     print("=" * 60)
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+CIPHER REGISTRY
+===============
+
+CPU reference implementations of every cipher the attack tools chain
+together, keyed by name in CIPHER_REGISTRY. Importing this module needs
+no GPU, so experiment specs, workers and tests can use the same ciphers
+master_cipher dispatches.
+
+    CIPHER_REGISTRY['PORTA'].decrypt(cipher, key, 'PORTA')
+    apply_chain(cipher, [('ATBASH', None, 'MIRROR'), ('SUBSTITUTION', key, 'SUB')])
+
+Chains are lists of (cipher name, key/params, mode) steps; REVERSE is
+accepted as a step that reverses the stream.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from master_dictionary import ALPHABET_SIZE
+from math_sequences import primes_upto, sequence
+
+MOD = ALPHABET_SIZE
+
+FIBONACCI = sequence('FIBONACCI', 500).tolist()
+TOTIENTS = sequence('TOTIENTS', 1000, mod=None).tolist()
+PRIME_SET = set(primes_upto(10000)[:500].tolist())     # Reset points of the interrupted key
+
+# =============================================================================
+# CIPHER BASE CLASS - PLUGIN ARCHITECTURE
+# =============================================================================
+
+@dataclass
+class CipherResult:
+    """Result from a cipher operation."""
+    plaintext: str
+    score: float
+    cipher_name: str
+    key_name: str
+    mode: str
+    details: Dict = field(default_factory=dict)
+    key: Optional[List[int]] = None                 # Key values, when the key is a rune sequence
+
+class BaseCipher(ABC):
+    """Abstract base class for all cipher types."""
+    
+    name: str = "BaseCipher"
+    
+    @abstractmethod
+    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'SUB') -> np.ndarray:
+        """Decrypt ciphertext with given key."""
+        pass
+    
+    @abstractmethod
+    def get_modes(self) -> List[str]:
+        """Return list of supported modes."""
+        pass
+
+class SubstitutionCipher(BaseCipher):
+    """Vigenère-style substitution cipher."""
+    
+    name = "SUBSTITUTION"
+    
+    def get_modes(self) -> List[str]:
+        return ['SUB', 'ADD', 'SUB_REV', 'ADD_REV', 'BEAUFORT', 'XOR']
+    
+    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'SUB') -> np.ndarray:
+        n = len(ciphertext)
+        key_len = len(key)
+        extended_key = np.array([key[i % key_len] for i in range(n)])
+        
+        if mode == 'SUB':
+            return (ciphertext - extended_key) % MOD
+        elif mode == 'ADD':
+            return (ciphertext + extended_key) % MOD
+        elif mode == 'SUB_REV':
+            return (extended_key - ciphertext) % MOD
+        elif mode == 'ADD_REV':
+            return (MOD - ciphertext - extended_key) % MOD
+        elif mode == 'BEAUFORT':
+            return (extended_key - ciphertext) % MOD
+        elif mode == 'XOR':
+            return ciphertext ^ extended_key
+        else:
+            return (ciphertext - extended_key) % MOD
+
+class CaesarCipher(BaseCipher):
+    """Simple shift cipher."""
+    
+    name = "CAESAR"
+    
+    def get_modes(self) -> List[str]:
+        return ['SHIFT']
+    
+    def decrypt(self, ciphertext: np.ndarray, shift: int, mode: str = 'SHIFT') -> np.ndarray:
+        return (ciphertext - shift) % MOD
+
+class AtbashCipher(BaseCipher):
+    """Atbash mirror cipher."""
+    
+    name = "ATBASH"
+    
+    def get_modes(self) -> List[str]:
+        return ['MIRROR']
+    
+    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray = None, mode: str = 'MIRROR') -> np.ndarray:
+        return (MOD - 1 - ciphertext) % MOD
+
+class AffineCipher(BaseCipher):
+    """Affine cipher: ax + b mod 29."""
+    
+    name = "AFFINE"
+    
+    def get_modes(self) -> List[str]:
+        return ['AFFINE']
+    
+    def decrypt(self, ciphertext: np.ndarray, params: Tuple[int, int], mode: str = 'AFFINE') -> np.ndarray:
+        a, b = params
+        # Find modular inverse of a
+        a_inv = pow(a, -1, MOD) if math.gcd(a, MOD) == 1 else None
+        if a_inv is None:
+            return ciphertext  # Invalid, return unchanged
+        return (a_inv * (ciphertext - b)) % MOD
+
+class HillCipher(BaseCipher):
+    """Hill cipher with 2x2 matrix."""
+    
+    name = "HILL"
+    
+    def get_modes(self) -> List[str]:
+        return ['2x2']
+    
+    def decrypt(self, ciphertext: np.ndarray, matrix: np.ndarray, mode: str = '2x2') -> np.ndarray:
+        # Pad to even length
+        if len(ciphertext) % 2 != 0:
+            ciphertext = np.append(ciphertext, [0])
+        
+        # Matrix inverse mod 29
+        det = int((matrix[0,0] * matrix[1,1] - matrix[0,1] * matrix[1,0]) % MOD)
+        if math.gcd(det, MOD) != 1:
+            return ciphertext[:len(ciphertext)]  # Invalid matrix
+        
+        det_inv = pow(det, -1, MOD)
+        inv_matrix = np.array([
+            [matrix[1,1], -matrix[0,1]],
+            [-matrix[1,0], matrix[0,0]]
+        ]) * det_inv % MOD
+        
+        # Decrypt in pairs
+        result = []
+        for i in range(0, len(ciphertext), 2):
+            pair = np.array([ciphertext[i], ciphertext[i+1]])
+            decrypted_pair = inv_matrix @ pair % MOD
+            result.extend(decrypted_pair.astype(int))
+        
+        return np.array(result[:len(ciphertext)])
+
+class RailFenceCipher(BaseCipher):
+    """Rail fence transposition cipher."""
+    
+    name = "RAILFENCE"
+    
+    def get_modes(self) -> List[str]:
+        return ['RAILS']
+    
+    def decrypt(self, ciphertext: np.ndarray, rails: int, mode: str = 'RAILS') -> np.ndarray:
+        n = len(ciphertext)
+        if rails < 2 or rails >= n:
+            return ciphertext
+        
+        # Build pattern
+        fence = [[None] * n for _ in range(rails)]
+        rail = 0
+        direction = 1
+        for i in range(n):
+            fence[rail][i] = True
+            rail += direction
+            if rail == 0 or rail == rails - 1:
+                direction = -direction
+        
+        # Fill in values
+        idx = 0
+        for r in range(rails):
+            for c in range(n):
+                if fence[r][c]:
+                    fence[r][c] = int(ciphertext[idx])
+                    idx += 1
+        
+        # Read off
+        result = []
+        rail = 0
+        direction = 1
+        for i in range(n):
+            result.append(fence[rail][i])
+            rail += direction
+            if rail == 0 or rail == rails - 1:
+                direction = -direction
+        
+        return np.array(result)
+
+class AutokeyCipher(BaseCipher):
+    """Autokey cipher using plaintext as key extension."""
+    
+    name = "AUTOKEY"
+    
+    def get_modes(self) -> List[str]:
+        return ['PLAINTEXT', 'CIPHERTEXT']
+    
+    def decrypt(self, ciphertext: np.ndarray, primer: np.ndarray, mode: str = 'PLAINTEXT') -> np.ndarray:
+        result = []
+        key = list(primer)
+        
+        for i, c in enumerate(ciphertext):
+            if i < len(key):
+                k = key[i]
+            else:
+                if mode == 'PLAINTEXT':
+                    k = result[i - len(primer)]
+                else:  # CIPHERTEXT
+                    k = ciphertext[i - len(primer)]
+            
+            p = (c - k) % MOD
+            result.append(p)
+        
+        return np.array(result)
+
+class ColumnarCipher(BaseCipher):
+    """Columnar transposition cipher."""
+    
+    name = "COLUMNAR"
+    
+    def get_modes(self) -> List[str]:
+        return ['COLUMNAR']
+    
+    def decrypt(self, ciphertext: np.ndarray, key_order: List[int], mode: str = 'COLUMNAR') -> np.ndarray:
+        n = len(ciphertext)
+        cols = len(key_order)
+        rows = math.ceil(n / cols)
+        
+        # Calculate column lengths
+        full_cols = n % cols if n % cols != 0 else cols
+        col_lens = [rows if i < full_cols else rows - 1 for i in range(cols)]
+        
+        # Reorder columns
+        sorted_order = sorted(range(cols), key=lambda x: key_order[x])
+        
+        # Read off
+        grid = []
+        pos = 0
+        for col_idx in sorted_order:
+            col_len = col_lens[col_idx]
+            grid.append(list(ciphertext[pos:pos + col_len]))
+            pos += col_len
+        
+        # Unsort
+        unsorted_grid = [None] * cols
+        for i, col_idx in enumerate(sorted_order):
+            unsorted_grid[col_idx] = grid[i]
+        
+        # Read row by row
+        result = []
+        for row in range(rows):
+            for col in range(cols):
+                if row < len(unsorted_grid[col]):
+                    result.append(unsorted_grid[col][row])
+        
+        return np.array(result[:n])
+
+class PortaCipher(BaseCipher):
+    """Porta cipher - reciprocal cipher with 13 alphabets."""
+    
+    name = "PORTA"
+    
+    def get_modes(self) -> List[str]:
+        return ['PORTA']
+    
+    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'PORTA') -> np.ndarray:
+        """Porta is reciprocal - encrypt = decrypt."""
+        result = []
+        key_len = len(key)
+        half = MOD // 2  # 14 for mod 29
+        
+        for i, c in enumerate(ciphertext):
+            k = key[i % key_len]
+            tableau_row = k // 2  # Which of 14 tableaux to use
+            
+            if c < half:
+                # First half: shift by tableau + half
+                p = (c + tableau_row + half) % MOD
+            else:
+                # Second half: shift back
+                p = (c - tableau_row - half) % MOD
+            result.append(p)
+        
+        return np.array(result)
+
+class GronsfeldCipher(BaseCipher):
+    """Gronsfeld cipher - Vigenère variant using only digits 0-9."""
+    
+    name = "GRONSFELD"
+    
+    def get_modes(self) -> List[str]:
+        return ['SUB', 'ADD']
+    
+    def decrypt(self, ciphertext: np.ndarray, digits: List[int], mode: str = 'SUB') -> np.ndarray:
+        """Decrypt using digit key (each digit 0-9)."""
+        result = []
+        key_len = len(digits)
+        
+        for i, c in enumerate(ciphertext):
+            d = digits[i % key_len] % 10  # Ensure 0-9
+            if mode == 'SUB':
+                p = (c - d) % MOD
+            else:
+                p = (c + d) % MOD
+            result.append(p)
+        
+        return np.array(result)
+
+class BifidCipher(BaseCipher):
+    """Bifid cipher using Polybius square fractionation."""
+    
+    name = "BIFID"
+    
+    def get_modes(self) -> List[str]:
+        return ['PERIOD_5', 'PERIOD_7', 'PERIOD_11', 'FULL']
+    
+    def decrypt(self, ciphertext: np.ndarray, period: int = 5, mode: str = 'PERIOD_5') -> np.ndarray:
+        """Decrypt Bifid cipher."""
+        n = len(ciphertext)
+        
+        # Use a 6x5 grid for 29 chars (close approximation)
+        grid_size = 6  # 6x5 = 30 positions
+        
+        # Extract period from mode
+        if mode == 'FULL':
+            period = n
+        elif mode.startswith('PERIOD_'):
+            period = int(mode.split('_')[1])
+        
+        result = []
+        
+        # Process in periods
+        for start in range(0, n, period):
+            block = ciphertext[start:start + period]
+            block_len = len(block)
+            
+            # Convert to row/col coordinates
+            rows = [int(c) // grid_size for c in block]
+            cols = [int(c) % grid_size for c in block]
+            
+            # Interleave (reverse of encryption)
+            combined = rows + cols
+            
+            # De-interleave
+            for i in range(block_len):
+                r = combined[i]
+                c = combined[i + block_len] if i + block_len < len(combined) else 0
+                p = (r * grid_size + c) % MOD
+                result.append(p)
+        
+        return np.array(result[:n])
+
+class SkipCipher(BaseCipher):
+    """Skip/Scytale cipher - read every nth character."""
+    
+    name = "SKIP"
+    
+    def get_modes(self) -> List[str]:
+        return ['SKIP']
+    
+    def decrypt(self, ciphertext: np.ndarray, skip: int, mode: str = 'SKIP') -> np.ndarray:
+        """Read every skip-th character."""
+        n = len(ciphertext)
+        if skip < 2 or skip >= n:
+            return ciphertext
+        
+        result = [0] * n
+        pos = 0
+        for i, c in enumerate(ciphertext):
+            result[(i * skip) % n] = c
+            
+        return np.array(result)
+
+class ProgressiveKeyCipher(BaseCipher):
+    """Progressive key cipher - key shifts with each position."""
+    
+    name = "PROGRESSIVE"
+    
+    def get_modes(self) -> List[str]:
+        return ['LINEAR', 'QUADRATIC', 'FIBONACCI']
+    
+    def decrypt(self, ciphertext: np.ndarray, base_key: np.ndarray, mode: str = 'LINEAR') -> np.ndarray:
+        """Decrypt with progressively shifting key."""
+        result = []
+        key_len = len(base_key)
+        
+        for i, c in enumerate(ciphertext):
+            base_k = base_key[i % key_len]
+            
+            if mode == 'LINEAR':
+                k = (base_k + i) % MOD
+            elif mode == 'QUADRATIC':
+                k = (base_k + i * i) % MOD
+            elif mode == 'FIBONACCI':
+                fib_shift = FIBONACCI[min(i, len(FIBONACCI) - 1)] if FIBONACCI else i
+                k = (base_k + fib_shift) % MOD
+            else:
+                k = base_k
+            
+            p = (c - k) % MOD
+            result.append(p)
+        
+        return np.array(result)
+
+class InterruptedKeyCipher(BaseCipher):
+    """Interrupted key cipher - key resets at certain positions."""
+    
+    name = "INTERRUPTED"
+    
+    def get_modes(self) -> List[str]:
+        return ['PRIME_RESET', 'TOTIENT_RESET']
+    
+    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'PRIME_RESET') -> np.ndarray:
+        """Decrypt with key that resets at special positions."""
+        result = []
+        key_len = len(key)
+        key_pos = 0
+        
+        for i, c in enumerate(ciphertext):
+            # Check if we should reset key position
+            if mode == 'PRIME_RESET' and i in PRIME_SET:
+                key_pos = 0
+            elif mode == 'TOTIENT_RESET' and i < len(TOTIENTS) and TOTIENTS[i] == i - 1:
+                key_pos = 0  # Reset at primes (φ(p) = p-1)
+            
+            k = key[key_pos % key_len]
+            p = (c - k) % MOD
+            result.append(p)
+            key_pos += 1
+        
+        return np.array(result)
+
+class RunningKeyCipher(BaseCipher):
+    """Running key cipher using text as key."""
+    
+    name = "RUNNING_KEY"
+    
+    def get_modes(self) -> List[str]:
+        return ['SUB', 'ADD']
+    
+    def decrypt(self, ciphertext: np.ndarray, running_text: np.ndarray, mode: str = 'SUB') -> np.ndarray:
+        """Decrypt using running key text."""
+        result = []
+        key_len = len(running_text)
+        
+        for i, c in enumerate(ciphertext):
+            k = running_text[i % key_len]
+            if mode == 'SUB':
+                p = (c - k) % MOD
+            else:
+                p = (c + k) % MOD
+            result.append(p)
+        
+        return np.array(result)
+
+# =============================================================================
+# CIPHER REGISTRY
+# =============================================================================
+
+CIPHER_REGISTRY: Dict[str, BaseCipher] = {
+    'SUBSTITUTION': SubstitutionCipher(),
+    'CAESAR': CaesarCipher(),
+    'ATBASH': AtbashCipher(),
+    'AFFINE': AffineCipher(),
+    'HILL': HillCipher(),
+    'RAILFENCE': RailFenceCipher(),
+    'AUTOKEY': AutokeyCipher(),
+    'COLUMNAR': ColumnarCipher(),
+    'PORTA': PortaCipher(),
+    'GRONSFELD': GronsfeldCipher(),
+    'BIFID': BifidCipher(),
+    'SKIP': SkipCipher(),
+    'PROGRESSIVE': ProgressiveKeyCipher(),
+    'INTERRUPTED': InterruptedKeyCipher(),
+    'RUNNING_KEY': RunningKeyCipher(),
+}
+
+# =============================================================================
+# MULTI-LAYER CIPHER CHAINS
+# =============================================================================
+
+@dataclass
+class CipherChain:
+    """Represents a chain of ciphers to apply in sequence."""
+    name: str
+    steps: List[Tuple[str, Any, str]]  # (cipher_name, key/params, mode)
+
+def apply_chain(ciphertext: np.ndarray, steps: Sequence[Tuple[str, Any, str]]) -> np.ndarray:
+    """Run the chain's steps in order on one stream."""
+    current = np.asarray(ciphertext, dtype=np.int64)
+    for cipher_name, params, mode in steps:
+        if cipher_name == 'REVERSE':
+            current = current[::-1]
+        elif cipher_name in CIPHER_REGISTRY:
+            current = np.asarray(CIPHER_REGISTRY[cipher_name].decrypt(current, params, mode), dtype=np.int64)
+        else:
+            raise KeyError(f"unknown cipher {cipher_name}")
+    return current
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+COLUMN-ADJACENCY COLUMNAR TRANSPOSITION SOLVER
+==============================================
+
+Solves column permutations of grid pages (Page 20's 28x29 grid, or any
+page / width) without re-decrypting and re-scoring the whole page per move.
+
+The grid is read once and turned into an adjacency model:
+- pair[k, a, b]   bigram log-likelihood of column a sitting in output slot k
+                  immediately left of column b (summed over all rows)
+- triple[a, b, c] trigram log-likelihood of columns a, b, c in a row
+
+When no key is applied after the transposition, pair does not depend on
+the slot and collapses to a single W x W matrix, so the problem is a
+maximum-weight Hamiltonian path. When a positional key is applied to the
+permuted stream (as in attack_p20_hillclimb), pair keeps one W x W matrix
+per slot. Either way a column swap touches at most six pair terms, so the
+annealer evaluates a swap in O(1) and a segment move in O(segment).
+
+Solvers:
+- exact_path_dp()  Held-Karp DP, exact for small widths (<= 16)
+- greedy_path()    best nearest-neighbour path over all start columns
+- anneal()         simulated annealing over swaps, segment reversals (2-opt)
+                   and segment relocations (or-opt)
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from master_dictionary import (
+    ALPHABET_SIZE, INDEX_TO_LATIN, load_page_indices, text_to_key,
+)
+from rune_ngrams import NgramModel, default_model
+
+# Widths above this skip the W^3 trigram tensor
+MAX_TRIGRAM_WIDTH = 64
+
+# Widths up to this are solved exactly by default
+MAX_EXACT_WIDTH = 16
+
+# =============================================================================
+# GRID
+# =============================================================================
+
+def build_grid(indices: Sequence[int], width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Chop a stream into rows of `width`. Returns (grid, valid_mask).
+
+    A ragged final row is padded with 0 and masked out.
+    """
+    idx = np.asarray(indices, dtype=np.intp)
+    rows = math.ceil(len(idx) / width)
+    grid = np.zeros(rows * width, dtype=np.intp)
+    grid[:len(idx)] = idx
+    mask = np.zeros(rows * width, dtype=bool)
+    mask[:len(idx)] = True
+    return grid.reshape(rows, width), mask.reshape(rows, width)
+
+def read_permuted(grid: np.ndarray, mask: np.ndarray, perm: Sequence[int]) -> np.ndarray:
+    """Read the grid row by row with columns in `perm` order."""
+    perm = np.asarray(perm, dtype=np.intp)
+    return grid[:, perm][mask[:, perm]]
+
+# =============================================================================
+# ADJACENCY MODEL
+# =============================================================================
+
+@dataclass
+class ColumnAdjacency:
+    """Precomputed column adjacency scores for one grid."""
+    width: int
+    pair: np.ndarray                       # (W, W) or (W-1, W, W) per slot
+    triple: Optional[np.ndarray] = None    # (W, W, W)
+    trigram_weight: float = 1.0
+
+    @property
+    def positional(self) -> bool:
+        return self.pair.ndim == 3
+
+    def pair_score(self, slot: int, a: int, b: int) -> float:
+        if self.positional:
+            return self.pair[slot, a, b]
+        return self.pair[a, b]
+
+    def path_score(self, perm: Sequence[int]) -> float:
+        """Total score of a full column order."""
+        p = np.asarray(perm, dtype=np.intp)
+        if self.positional:
+            score = float(self.pair[np.arange(self.width - 1), p[:-1], p[1:]].sum())
+        else:
+            score = float(self.pair[p[:-1], p[1:]].sum())
+        if self.triple is not None:
+            score += self.trigram_weight * float(self.triple[p[:-2], p[1:-1], p[2:]].sum())
+        return score
+
+    def _local(self, p: List[int], slots: Sequence[int]) -> float:
+        """Score of the pair/triple terms that start at the given slots."""
+        w = self.width
+        total = 0.0
+        for k in slots:
+            if 0 <= k < w - 1:
+                total += self.pair_score(k, p[k], p[k + 1])
+            if self.triple is not None and 0 <= k < w - 2:
+                total += self.trigram_weight * self.triple[p[k], p[k + 1], p[k + 2]]
+        return total
+
+    def swap_delta(self, p: List[int], i: int, j: int) -> float:
+        """Score change from swapping slots i and j (p is left unchanged)."""
+        if i == j:
+            return 0.0
+        span = 2 if self.triple is not None else 1
+        slots = sorted({s for c in (i, j) for s in range(c - span, c + 1)})
+        before = self._local(p, slots)
+        p[i], p[j] = p[j], p[i]
+        after = self._local(p, slots)
+        p[i], p[j] = p[j], p[i]
+        return after - before
+
+    def move_delta(self, p: List[int], q: List[int], lo: int, hi: int) -> float:
+        """Score change from p to q, which differ only in slots lo..hi."""
+        span = 2 if self.triple is not None else 1
+        slots = range(lo - span, hi + 1)
+        return self._local(q, slots) - self._local(p, slots)
+
+def build_adjacency(grid: np.ndarray, mask: np.ndarray,
+                    model: Optional[NgramModel] = None,
+                    slot_key: Optional[Sequence[int]] = None,
+                    trigram_weight: float = 0.0) -> ColumnAdjacency:
+    """Build the adjacency model for a grid.
+
+    slot_key: key applied to the *permuted* stream (plaintext = cell - key
+    at output position r*W + k). Leave None when the grid is already
+    decrypted or the key was applied before the transposition.
+    trigram_weight: weight of the W^3 trigram tensor (0 disables it).
+    """
+    model = model or default_model()
+    rows, w = grid.shape
+    valid = mask.astype(np.float32)
+
+    if slot_key is None:
+        # pair[a, b] = sum_r bigram[grid[r, a], grid[r, b]]
+        bi = model.bigram[grid[:, :, None], grid[:, None, :]]
+        both = valid[:, :, None] * valid[:, None, :]
+        pair = (bi * both).sum(axis=0)
+        np.fill_diagonal(pair, -np.inf)
+    else:
+        key = np.resize(np.asarray(slot_key, dtype=np.intp), rows * w).reshape(rows, w)
+        # dec[r, col, slot]: value of column `col` when it lands in `slot`
+        dec = (grid[:, :, None] - key[:, None, :]) % ALPHABET_SIZE
+        pair = np.empty((w - 1, w, w), dtype=np.float32)
+        for k in range(w - 1):
+            bi = model.bigram[dec[:, :, k][:, :, None], dec[:, :, k + 1][:, None, :]]
+            both = valid[:, :, None] * valid[:, None, :]
+            pair[k] = (bi * both).sum(axis=0)
+            np.fill_diagonal(pair[k], -np.inf)
+
+    triple = None
+    if trigram_weight and slot_key is None and w <= MAX_TRIGRAM_WIDTH:
+        triple = np.zeros((w, w, w), dtype=np.float32)
+        for r in range(rows):
+            g, v = grid[r], valid[r]
+            tri = model.trigram[g[:, None, None], g[None, :, None], g[None, None, :]]
+            triple += tri * (v[:, None, None] * v[None, :, None] * v[None, None, :])
+
+    return ColumnAdjacency(width=w, pair=pair.astype(np.float32), triple=triple,
+                           trigram_weight=trigram_weight)
+
+# =============================================================================
+# SOLVERS
+# =============================================================================
+
+def exact_path_dp(adj: ColumnAdjacency) -> Tuple[List[int], float]:
+    """Held-Karp maximum-weight Hamiltonian path (slot-independent bigrams only)."""
+    if adj.positional:
+        raise ValueError("exact_path_dp needs a slot-independent adjacency matrix")
+    w = adj.width
+    if w > 20:
+        raise ValueError(f"width {w} is too large for the exact DP")
+    pair = adj.pair.astype(np.float64)
+    full = 1 << w
+
+    # best[mask, j]: best path visiting `mask` and ending in column j
+    best = np.full((full, w), -np.inf)
+    parent = np.full((full, w), -1, dtype=np.int16)
+    for j in range(w):
+        best[1 << j, j] = 0.0
+
+    for mask in range(1, full):
+        row = best[mask]
+        if not np.isfinite(row).any():
+            continue
+        cand = row[:, None] + pair                  # (from, to)
+        vals = cand.max(axis=0)
+        frms = cand.argmax(axis=0)
+        for j in range(w):
+            if mask & (1 << j):
+                continue
+            nxt = mask | (1 << j)
+            if vals[j] > best[nxt, j]:
+                best[nxt, j] = vals[j]
+                parent[nxt, j] = frms[j]
+
+    last = int(np.argmax(best[full - 1]))
+    score = float(best[full - 1, last])
+    path, mask = [last], full - 1
+    while parent[mask, path[-1]] >= 0:
+        prev = int(parent[mask, path[-1]])
+        mask ^= 1 << path[-1]
+        path.append(prev)
+    return path[::-1], score
+
+def greedy_path(adj: ColumnAdjacency) -> Tuple[List[int], float]:
+    """Best nearest-neighbour path over every starting column."""
+    w = adj.width
+    best_path, best_score = list(range(w)), -np.inf
+    for start in range(w):
+        path, used = [start], {start}
+        for k in range(w - 1):
+            row = adj.pair[k] if adj.positional else adj.pair
+            order = np.argsort(-row[path[-1]])
+            nxt = next(int(c) for c in order if int(c) not in used)
+            path.append(nxt)
+            used.add(nxt)
+        score = adj.path_score(path)
+        if score > best_score:
+            best_path, best_score = path, score
+    return best_path, best_score
+
+def _segment_move(perm: List[int], rng: random.Random) -> Tuple[List[int], int, int]:
+    """A random 2-opt reversal or or-opt relocation: (new order, first and last changed slot)."""
+    w = len(perm)
+    i, j = sorted(rng.sample(range(w), 2))
+    if rng.random() < 0.5:
+        return perm[:i] + perm[i:j + 1][::-1] + perm[j + 1:], i, j
+    segment, rest = perm[i:j + 1], perm[:i] + perm[j + 1:]
+    k = rng.randrange(len(rest) + 1)
+    return rest[:k] + segment + rest[k:], min(i, k), max(j, k + len(segment) - 1)
+
+def anneal(adj: ColumnAdjacency, iterations: int = 200000,
+           start: Optional[Sequence[int]] = None, t0: Optional[float] = None,
+           t_end_ratio: float = 1e-3, seed: int = 3301) -> Tuple[List[int], float]:
+    """Simulated annealing over column swaps and segment moves.
+
+    Swaps alone cannot repair a misplaced run of columns (greedy leaves
+    those behind), so a third of the moves reverse a segment and a third
+    relocate one.
+    """
+    rng = random.Random(seed)
+    w = adj.width
+    perm = list(start) if start is not None else list(range(w))
+    score = adj.path_score(perm)
+    best_perm, best_score = perm[:], score
+
+    if t0 is None:
+        # Scale the start temperature to the typical move size
+        samples = [abs(adj.swap_delta(perm, *rng.sample(range(w), 2))) for _ in range(200)]
+        finite = [s for s in samples if math.isfinite(s)]
+        t0 = (sum(finite) / len(finite)) if finite else 1.0
+    t0 = max(t0, 1e-9)
+    decay = t_end_ratio ** (1.0 / max(1, iterations))
+    temp = t0
+
+    for _ in range(iterations):
+        if rng.random() < 1 / 3:
+            i, j = rng.sample(range(w), 2)
+            delta = adj.swap_delta(perm, i, j)
+            moved = None
+        else:
+            moved, lo, hi = _segment_move(perm, rng)
+            delta = adj.move_delta(perm, moved, lo, hi)
+        if delta >= 0 or rng.random() < math.exp(delta / temp):
+            if moved is None:
+                perm[i], perm[j] = perm[j], perm[i]
+            else:
+                perm = moved
+            score += delta
+            if score > best_score:
+                best_perm, best_score = perm[:], score
+        temp *= decay
+
+    return best_perm, adj.path_score(best_perm)
+
+def solve_permutation(adj: ColumnAdjacency, iterations: int = 200000,
+                      restarts: int = 4, seed: int = 3301) -> Tuple[List[int], float]:
+    """Exact DP for small slot-independent widths, otherwise greedy + annealing."""
+    if not adj.positional and adj.triple is None and adj.width <= MAX_EXACT_WIDTH:
+        return exact_path_dp(adj)
+
+    best_perm, best_score = greedy_path(adj)
+    for r in range(restarts):
+        start = best_perm if r == 0 else random.Random(seed + r).sample(range(adj.width), adj.width)
+        perm, score = anneal(adj, iterations, start=start, seed=seed + r)
+        if score > best_score:
+            best_perm, best_score = perm, score
+    return best_perm, best_score
+
+# =============================================================================
+# PAGE ATTACK
+# =============================================================================
+
+def solve_grid_page(page_num: int, width: int, key: Optional[Sequence[int]] = None,
+                    key_before_transposition: bool = False, trigram_weight: float = 0.0,
+                    iterations: int = 200000, restarts: int = 4) -> Tuple[List[int], float, np.ndarray]:
+    """Find the best column order for a page read as a `width`-wide grid.
+
+    Returns (permutation, score, plaintext indices).
+    """
+    indices = np.array(load_page_indices(page_num), dtype=np.intp)
+    if key is not None and key_before_transposition:
+        k = np.resize(np.asarray(key, dtype=np.intp), len(indices))
+        indices = (indices - k) % ALPHABET_SIZE
+
+    grid, mask = build_grid(indices, width)
+    slot_key = key if (key is not None and not key_before_transposition) else None
+    adj = build_adjacency(grid, mask, slot_key=slot_key, trigram_weight=trigram_weight)
+    perm, score = solve_permutation(adj, iterations=iterations, restarts=restarts)
+
+    plain = read_permuted(grid, mask, perm)
+    if slot_key is not None:
+        k = np.resize(np.asarray(slot_key, dtype=np.intp), grid.size).reshape(grid.shape)
+        plain = (plain - k[mask[:, perm]]) % ALPHABET_SIZE
+    return perm, score, plain
+
+def main():
+    parser = argparse.ArgumentParser(description="Column-adjacency columnar transposition solver")
+    parser.add_argument("--page", type=int, default=20, help="Page number")
+    parser.add_argument("--width", type=int, default=29, help="Grid width (columns)")
+    parser.add_argument("--key", type=str, default=None, help="Optional key text (Latin)")
+    parser.add_argument("--key-first", action="store_true",
+                        help="Key was applied before the transposition")
+    parser.add_argument("--trigram", type=float, default=0.0, help="Trigram tensor weight")
+    parser.add_argument("--iterations", type=int, default=200000, help="Annealing iterations")
+    parser.add_argument("--restarts", type=int, default=4, help="Annealing restarts")
+    args = parser.parse_args()
+
+    key = text_to_key(args.key) if args.key else None
+    perm, score, plain = solve_grid_page(args.page, args.width, key, args.key_first,
+                                         args.trigram, args.iterations, args.restarts)
+
+    print("=" * 60)
+    print(f"PAGE {args.page:02d} - COLUMN ADJACENCY SOLVER (width {args.width})")
+    print("=" * 60)
+    print(f"Score: {score:.1f}")
+    print(f"Permutation: {perm}")
+    text = ''.join(INDEX_TO_LATIN[int(i)] for i in plain)
+    for i in range(0, min(400, len(text)), 80):
+        print(f"  {text[i:i+80]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+PACKED MULTI-CORPUS KEY-TEXT STORE
+==================================
+
+Every reference text transliterated once, with one tokenizer, into
+memory-mapped uint8 rune arrays shared by all running-key and book-cipher
+attacks.
+
+Tokenizer (per word, longest match first, never across word boundaries):
+- Old English letters are transliterated (thorn and eth -> TH, ash -> AE,
+  ethel -> OE), other Unicode is normalised (accents dropped) and upper-cased
+- Digraphs read as one rune (policy dependent): TH EO NG OE AE IA/IO EA
+- Letters without a rune are substituted (policy dependent): K/Q -> C,
+  V -> U, Z -> S
+
+Policies:
+    canonical        all digraphs, K/Q->C, V->U, Z->S
+    common_digraphs  only TH NG EA IA/IO as digraphs, same substitutions
+    letters          no digraphs (TH -> T H), same substitutions
+    strict           all digraphs except IO, K->C, Q/V/Z dropped (text_to_key letters)
+
+The Liber Primus transcripts are stored the same way as the book
+'liber_primus' (policy 'runes': already runes, no tokenizer), with an
+extra page table:
+
+    book = load_book()
+    book.segment('page', 0), book.page_numbers, book.segment('line', 7)
+
+Each stored corpus has word, sentence, paragraph and line offset tables
+and provenance (source, sha256, policy, counts, time added) in
+.cache/corpora/manifest.json. Texts are re-tokenized only when their
+source changes (re-hashed only when its mtime or size changes), and new
+texts can be added at any time:
+
+    store = default_store()
+    corpus = store.get('self_reliance')           # built on first use
+    corpus.runes[:50], corpus.word(10), corpus.sentence(3)
+    store.add('my_text', path='notes.txt', policy='letters')
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from master_dictionary import (
+    CACHE_DIR, CORPUS_FILES, INDEX_TO_LATIN, LATIN_TO_INDEX, PAGES_DIR, RUNE_TO_INDEX,
+    available_pages, load_page_runes,
+)
+
+CORPUS_DIR = CACHE_DIR / "corpora"
+STORE_VERSION = 2           # Bump when the tokenizer or file layout changes
+
+TOOLS_DIR = Path(__file__).parent
+
+# Reference texts the store can build on demand (name -> file)
+DEFAULT_SOURCES: Dict[str, Path] = {
+    **CORPUS_FILES,
+    'emerson_excerpt': TOOLS_DIR / "emerson_self_reliance.txt",
+    'key_search': TOOLS_DIR / "key_search_corpus.txt",
+    'liber_primus': PAGES_DIR,
+}
+
+BOOK_NAME = 'liber_primus'
+RUNE_POLICY = 'runes'       # Source is a rune transcript directory
+PAGE_MARK = '\f#'          # Page header in the concatenated book text
+
+UNITS = ('word', 'sentence', 'paragraph', 'line')
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+DIGRAPH_RUNES = {
+    'TH': LATIN_TO_INDEX['TH'], 'EO': LATIN_TO_INDEX['EO'], 'NG': LATIN_TO_INDEX['NG'],
+    'OE': LATIN_TO_INDEX['OE'], 'AE': LATIN_TO_INDEX['AE'], 'IA': LATIN_TO_INDEX['IA'],
+    'IO': LATIN_TO_INDEX['IA'], 'EA': LATIN_TO_INDEX['EA'],
+}
+
+@dataclass(frozen=True)
+class TokenPolicy:
+    """How Latin letters become runes."""
+    name: str
+    digraphs: Tuple[str, ...]                   # Letter pairs read as one rune
+    substitutions: Tuple[Tuple[str, str], ...]  # Letter -> letter ('' drops it)
+
+_STANDARD_SUBS = (('K', 'C'), ('Q', 'C'), ('V', 'U'), ('Z', 'S'))
+
+POLICIES: Dict[str, TokenPolicy] = {
+    'canonical': TokenPolicy('canonical', ('TH', 'EO', 'NG', 'OE', 'AE', 'IA', 'IO', 'EA'), _STANDARD_SUBS),
+    'common_digraphs': TokenPolicy('common_digraphs', ('TH', 'NG', 'EA', 'IA', 'IO'), _STANDARD_SUBS),
+    'letters': TokenPolicy('letters', (), _STANDARD_SUBS),
+    'strict': TokenPolicy('strict', ('TH', 'EO', 'NG', 'OE', 'AE', 'IA', 'EA'),
+                          (('K', 'C'), ('Q', ''), ('V', ''), ('Z', ''))),
+}
+
+_WORD_RE = re.compile(r"[A-Z]+(?:['’][A-Z]+)*")
+
+# Letters NFKD leaves alone (Deor is spelt with them)
+_OLD_ENGLISH = str.maketrans({'Þ': 'TH', 'þ': 'th', 'Ð': 'TH', 'ð': 'th',
+                              'Æ': 'AE', 'æ': 'ae', 'Œ': 'OE', 'œ': 'oe'})
+
+def normalize_text(text: str) -> str:
+    """Upper-case ASCII letters: Old English letters transliterated, accents dropped."""
+    decomposed = unicodedata.normalize('NFKD', text.translate(_OLD_ENGLISH))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).upper()
+
+def _policy(policy) -> TokenPolicy:
+    return POLICIES[policy] if isinstance(policy, str) else policy
+
+@lru_cache(maxsize=None)
+def _word_runes(word: str, policy: TokenPolicy) -> bytes:
+    subs = dict(policy.substitutions)
+    letters = ''.join(subs.get(c, c) for c in word if c.isalpha())
+    out = bytearray()
+    i = 0
+    while i < len(letters):
+        pair = letters[i:i + 2]
+        if len(pair) == 2 and pair in policy.digraphs:
+            out.append(DIGRAPH_RUNES[pair])
+            i += 2
+            continue
+        idx = LATIN_TO_INDEX.get(letters[i])
+        if idx is not None:
+            out.append(idx)
+        i += 1
+    return bytes(out)
+
+def split_words(text: str) -> List[Tuple[int, str]]:
+    """(char offset, word) for every word of normalised text."""
+    return [(m.start(), m.group()) for m in _WORD_RE.finditer(text)]
+
+def tokenize(text: str, policy='canonical') -> np.ndarray:
+    """Text -> uint8 rune indices under a policy."""
+    pol = _policy(policy)
+    return np.frombuffer(b''.join(_word_runes(w, pol) for _, w in split_words(normalize_text(text))),
+                         dtype=np.uint8).copy()
+
+def self_check():
+    """Raise AssertionError if the tokenizer mangles a known Old English sample."""
+    words = [w for _, w in split_words(normalize_text('þæt wræces'))]
+    assert words == ['THAET', 'WRAECES'], words
+    runes = ''.join(INDEX_TO_LATIN[int(r)] for r in tokenize('þæt wræces'))
+    assert runes == 'THAETWRAECES', runes
+
+def _boundaries(text: str, starts: np.ndarray, pattern: str) -> np.ndarray:
+    """Word indices where a new unit (sentence / paragraph / line) begins."""
+    marks = np.array([m.end() for m in re.finditer(pattern, text)], dtype=np.int64)
+    unit_of_word = np.searchsorted(marks, starts, side='right')
+    if len(unit_of_word) == 0:
+        return np.zeros(0, dtype=np.int32)
+    return np.flatnonzero(np.diff(unit_of_word, prepend=-1)).astype(np.int32)
+
+_RUNE_WORD_RE = re.compile('[' + ''.join(RUNE_TO_INDEX) + ']+')
+_RUNE_BYTES = str.maketrans({r: chr(i) for r, i in RUNE_TO_INDEX.items()})
+
+def read_source(path: Path) -> str:
+    """Source text; a directory of page transcripts becomes one book text."""
+    path = Path(path)
+    if not path.is_dir():
+        return path.read_bytes().decode('utf-8', errors='ignore')
+    if path != PAGES_DIR:
+        raise ValueError(f"Only the page directory {PAGES_DIR} can be read as a book")
+    return ''.join(f"{PAGE_MARK}{page}\n{load_page_runes(page)}\n" for page in available_pages())
+
+def source_stamp(path: Path) -> List[int]:
+    """[newest mtime_ns, total bytes, files] of a source (the book: every page transcript)."""
+    path = Path(path)
+    files = sorted(path.glob('page_*/runes.txt')) if path.is_dir() else [path]
+    stats = [f.stat() for f in files]
+    return [max((st.st_mtime_ns for st in stats), default=0), sum(st.st_size for st in stats), len(stats)]
+
+def build_rune_tables(text: str) -> Dict[str, np.ndarray]:
+    """Rune stream and offset tables for a book text (see read_source).
+
+    Words are runs of runes (any other character separates them), '.' ends
+    a sentence, and every page is one paragraph as well as a page.
+    """
+    words = [(m.start(), m.group()) for m in _RUNE_WORD_RE.finditer(text)]
+    starts = np.array([s for s, _ in words], dtype=np.int64)
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum([len(w) for _, w in words], out=offsets[1:])
+    runes = ''.join(w for _, w in words).translate(_RUNE_BYTES).encode('latin-1')
+
+    marks = [(m.end(), int(m.group(1))) for m in re.finditer(re.escape(PAGE_MARK) + r'(\d+)', text)]
+    mark_ends = np.array([e for e, _ in marks], dtype=np.int64)
+    page_of_word = np.searchsorted(mark_ends, starts, side='right') - 1
+    page_starts = np.flatnonzero(np.diff(page_of_word, prepend=-1)).astype(np.int32)
+    numbers = np.array([n for _, n in marks], dtype=np.int32)
+    return {
+        'runes': np.frombuffer(runes, dtype=np.uint8),
+        'word_offsets': offsets,
+        'sentence_starts': _boundaries(text, starts, r'\.+|' + re.escape(PAGE_MARK)),
+        'paragraph_starts': page_starts,
+        'line_starts': _boundaries(text, starts, r'\n'),
+        'page_starts': page_starts,
+        'page_numbers': numbers[page_of_word[page_starts]] if len(page_starts) else numbers[:0],
+    }
+
+def build_tables(text: str, policy='canonical') -> Dict[str, np.ndarray]:
+    """Rune stream and offset tables for one text."""
+    pol = _policy(policy)
+    norm = normalize_text(text)
+    words = split_words(norm)
+    pieces = [_word_runes(w, pol) for _, w in words]
+    starts = np.array([s for s, _ in words], dtype=np.int64)
+    offsets = np.zeros(len(pieces) + 1, dtype=np.int64)
+    np.cumsum([len(p) for p in pieces], out=offsets[1:])
+    return {
+        'runes': np.frombuffer(b''.join(pieces), dtype=np.uint8),
+        'word_offsets': offsets,
+        'sentence_starts': _boundaries(norm, starts, r'[.!?]+'),
+        'paragraph_starts': _boundaries(norm, starts, r'\n[ \t]*\n\s*'),
+        'line_starts': _boundaries(norm, starts, r'\n'),
+    }
+
+# =============================================================================
+# STORED CORPORA
+# =============================================================================
+
+@dataclass
+class Corpus:
+    """One transliterated text with its offset tables."""
+    name: str
+    policy: str
+    runes: np.ndarray                   # uint8, memory-mapped
+    word_offsets: np.ndarray            # (words + 1,) rune offsets
+    sentence_starts: np.ndarray         # word index where each sentence starts
+    paragraph_starts: np.ndarray
+    line_starts: np.ndarray
+    provenance: Dict
+    page_starts: Optional[np.ndarray] = None     # Book only: word index of each page
+    page_numbers: Optional[np.ndarray] = None    # Book only: page number of each page
+
+    def __len__(self) -> int:
+        return len(self.runes)
+
+    @property
+    def latin(self) -> str:
+        return ''.join(INDEX_TO_LATIN[int(r)] for r in self.runes)
+
+    def starts(self, unit: str) -> np.ndarray:
+        if unit == 'word':
+            return np.arange(len(self.word_offsets) - 1, dtype=np.int32)
+        return getattr(self, f"{unit}_starts")
+
+    def count(self, unit: str) -> int:
+        return len(self.starts(unit))
+
+    def word_range(self, unit: str, i: int) -> Tuple[int, int]:
+        """Word indices [lo, hi) of the i-th unit."""
+        starts = self.starts(unit)
+        hi = int(starts[i + 1]) if i + 1 < len(starts) else len(self.word_offsets) - 1
+        return int(starts[i]), hi
+
+    def span(self, unit: str, i: int) -> Tuple[int, int]:
+        """Rune offsets [lo, hi) of the i-th unit."""
+        lo, hi = self.word_range(unit, i)
+        return int(self.word_offsets[lo]), int(self.word_offsets[hi])
+
+    def spans(self, unit: str) -> np.ndarray:
+        """(units, 2) rune offsets [lo, hi) of every unit at once."""
+        starts = np.asarray(self.starts(unit), dtype=np.int64)
+        ends = np.append(starts[1:], len(self.word_offsets) - 1)
+        return np.stack([self.word_offsets[starts], self.word_offsets[ends]], axis=1)
+
+    def segment(self, unit: str, i: int) -> np.ndarray:
+        lo, hi = self.span(unit, i)
+        return self.runes[lo:hi]
+
+    def word(self, i: int) -> np.ndarray:
+        return self.segment('word', i)
+
+    def sentence(self, i: int) -> np.ndarray:
+        return self.segment('sentence', i)
+
+    def paragraph(self, i: int) -> np.ndarray:
+        return self.segment('paragraph', i)
+
+    def page(self, number: int) -> np.ndarray:
+        """Runes of a page by its page number (book only)."""
+        return self.segment('page', self.page_index(number))
+
+    def page_index(self, number: int) -> int:
+        if self.page_numbers is None:
+            raise KeyError(f"{self.name} has no pages")
+        hits = np.flatnonzero(self.page_numbers == number)
+        if len(hits) == 0:
+            raise KeyError(f"page {number} not in {self.name}")
+        return int(hits[0])
+
+class CorpusStore:
+    """Directory of packed corpora plus a JSON manifest."""
+
+    def __init__(self, root: Path = CORPUS_DIR, sources: Optional[Dict[str, Path]] = None):
+        self.root = Path(root)
+        self.sources = dict(DEFAULT_SOURCES if sources is None else sources)
+        self.manifest_path = self.root / "manifest.json"
+        self.manifest = self._read_manifest()
+        self._open: Dict[str, Corpus] = {}
+
+    def _read_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            try:
+                data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+                if data.get('version') == STORE_VERSION:
+                    return data
+            except (OSError, ValueError):
+                pass
+        return {'version': STORE_VERSION, 'corpora': {}}
+
+    def _write_manifest(self):
+        tmp = self.manifest_path.with_name(f"manifest.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.manifest_path)
+
+    @staticmethod
+    def _key(name: str, policy: str) -> str:
+        return f"{name}.{policy}"
+
+    def names(self) -> List[str]:
+        stored = {entry['name'] for entry in self.manifest['corpora'].values()}
+        return sorted(stored | set(self.sources))
+
+    def entries(self) -> Dict[str, Dict]:
+        return dict(self.manifest['corpora'])
+
+    def add(self, name: str, text: Optional[str] = None, path: Optional[Path] = None,
+            policy: str = 'canonical', force: bool = False) -> Corpus:
+        """Transliterate and store a text (skipped if an identical source is stored)."""
+        stamp = None
+        if text is None:
+            path = Path(path) if path is not None else self.sources[name]
+            stamp = source_stamp(path)
+            text = read_source(path)
+        sha = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        key = self._key(name, policy)
+        entry = self.manifest['corpora'].get(key)
+        if not force and entry and entry['sha256'] == sha and (self.root / f"{key}.u8").exists():
+            if stamp is not None and entry.get('stamp') != stamp:
+                entry['stamp'] = stamp      # Touched but unchanged
+                self._write_manifest()
+            return self._load(key)
+
+        tables = build_rune_tables(text) if policy == RUNE_POLICY else build_tables(text, policy)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Write beside the target and rename, so readers never memmap a half-written file
+        tmp_runes = self.root / f"{key}.{os.getpid()}.tmp.u8"
+        tmp_tables = self.root / f"{key}.{os.getpid()}.tmp.npz"
+        tables['runes'].tofile(tmp_runes)
+        np.savez(tmp_tables, **{k: v for k, v in tables.items() if k != 'runes'})
+        os.replace(tmp_runes, self.root / f"{key}.u8")
+        os.replace(tmp_tables, self.root / f"{key}.npz")
+        self.manifest['corpora'][key] = {
+            'name': name,
+            'policy': policy,
+            'source': str(path) if path is not None else '<text>',
+            'sha256': sha,
+            'stamp': stamp,
+            'chars': len(text),
+            'runes': int(len(tables['runes'])),
+            'words': int(len(tables['word_offsets']) - 1),
+            'sentences': int(len(tables['sentence_starts'])),
+            'paragraphs': int(len(tables['paragraph_starts'])),
+            'lines': int(len(tables['line_starts'])),
+            'pages': int(len(tables.get('page_starts', ()))),
+            'added': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._write_manifest()
+        self._open.pop(key, None)
+        return self._load(key)
+
+    def get(self, name: str, policy: str = 'canonical') -> Corpus:
+        """A stored corpus, (re)built from its registered source if missing or stale.
+
+        The source is only re-read and re-hashed when its mtime or size
+        changed. Transcript directories (the book) are always stored with
+        RUNE_POLICY.
+        """
+        source = self.sources.get(name)
+        if source is not None and source.is_dir():
+            policy = RUNE_POLICY
+        key = self._key(name, policy)
+        if source is not None and source.exists():
+            entry = self.manifest['corpora'].get(key)
+            if entry and entry.get('stamp') == source_stamp(source) and (self.root / f"{key}.u8").exists():
+                return self._load(key)
+            return self.add(name, path=source, policy=policy)
+        if key in self.manifest['corpora']:
+            return self._load(key)
+        raise KeyError(f"No corpus {name!r} with policy {policy!r}")
+
+    def _load(self, key: str) -> Corpus:
+        if key not in self._open:
+            entry = self.manifest['corpora'][key]
+            runes_path = self.root / f"{key}.u8"
+            runes = np.memmap(runes_path, dtype=np.uint8, mode='r') if entry['runes'] else \
+                np.zeros(0, dtype=np.uint8)
+            with np.load(self.root / f"{key}.npz") as t:
+                pages = {k: t[k] for k in ('page_starts', 'page_numbers') if k in t.files}
+                self._open[key] = Corpus(entry['name'], entry['policy'], runes, t['word_offsets'],
+                                         t['sentence_starts'], t['paragraph_starts'], t['line_starts'],
+                                         entry, **pages)
+        return self._open[key]
+
+@lru_cache(maxsize=1)
+def default_store() -> CorpusStore:
+    return CorpusStore()
+
+def load_corpus(name: str, policy: str = 'canonical') -> Corpus:
+    """Shortcut for default_store().get(name, policy)."""
+    return default_store().get(name, policy)
+
+def load_book() -> Corpus:
+    """Every page transcript as one packed rune corpus with a page table."""
+    return load_corpus(BOOK_NAME, RUNE_POLICY)
+
+def main():
+    parser = argparse.ArgumentParser(description="Packed reference-text store")
+    parser.add_argument("--add", nargs=2, metavar=('NAME', 'PATH'), help="Add a text file")
+    parser.add_argument("--policy", default='canonical', choices=sorted(POLICIES))
+    parser.add_argument("--show", type=str, default=None, help="Print the start of a corpus")
+    parser.add_argument("--check", action="store_true", help="Check the tokenizer on an Old English sample")
+    args = parser.parse_args()
+
+    if args.check:
+        self_check()
+        print("[OK] tokenize('þæt wræces') -> THAET WRAECES")
+
+    store = default_store()
+    if args.add:
+        store.add(args.add[0], path=Path(args.add[1]), policy=args.policy)
+    for name in store.names():
+        try:
+            c = store.get(name, args.policy)
+        except (KeyError, OSError):
+            print(f"  {name:<16s} (source missing)")
+            continue
+        p = c.provenance
+        print(f"  {name:<16s} {p['runes']:>7d} runes {p['words']:>6d} words {p['sentences']:>5d} sentences "
+              f"{p['paragraphs']:>4d} paragraphs  {p['sha256'][:10]}  {p['source']}")
+    if args.show:
+        c = store.get(args.show, args.policy)
+        print(c.latin[:200])
+
+if __name__ == "__main__":
+    main()
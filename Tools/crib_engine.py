@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+CRIB-DRAGGING MATRIX ENGINE
+===========================
+
+Slides every crib across every position of every page under every key
+mode in one vectorised pass per (page, crib length), and recognises the
+implied keystream fragments automatically instead of printing them.
+
+For cipher window C and crib P the implied key is (see word_pattern_index):
+    SUB       p = c - k   ->  k = c - p
+    ADD       p = c + k   ->  k = p - c
+    BEAUFORT  p = k - c   ->  k = p + c
+
+Each fragment is checked against:
+- known key sources   every stream in keystream_index (math sequences,
+                      corpora, solved plaintexts, ciphertexts), directly
+                      or under an unknown constant shift
+- short periods       k[i] == k[i + p] across the whole fragment
+- progressions        constant first difference (affine in position)
+- English keystream   rune bigram log-likelihood (running key / autokey)
+
+Every hit carries a log10 significance (how unlikely the structure is for
+a random fragment of that length), so hits from different checks rank on
+one scale. It is corrected for the number of fragments tested (cribs x
+positions x modes over all pages), so a threshold of 3 leaves about one
+chance hit per thousand runs. A fragment found in the key sources at
+several places is one hit listing its locations.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from keystream_index import KeystreamIndex, default_index
+from master_dictionary import (
+    ALPHABET_SIZE, INDEX_TO_LATIN, available_pages, load_page_indices, text_to_key,
+)
+from rune_ngrams import default_model
+from word_pattern_index import implied_key
+
+MODES = ('SUB', 'ADD', 'BEAUFORT')
+SEED_RUNES = 4          # Shortest crib checked (keystream index k-gram size)
+LOG10_ALPHABET = math.log10(ALPHABET_SIZE)
+MAX_LOCATIONS = 3       # Source locations spelt out in a hit's detail
+
+DEFAULT_CRIBS = [
+    "A KOAN", "AN INSTRUCTION", "SOME WISDOM", "WELCOME", "A WARNING",
+    "THE LOSS OF DIVINITY", "BELIEVE NOTHING", "THE PRIMES ARE SACRED",
+    "CIRCUMFERENCE", "CONSUMPTION", "PRESERVATION", "ADHERENCE", "DIVINITY",
+    "EMERGENCE", "INSTAR", "PARABLE", "PILGRIM", "WITHIN THE DEEP WEB",
+    "TOTIENT FUNCTION", "PATH TO THE DEOR", "MOST THINGS", "WE HAVE",
+]
+
+@dataclass
+class CribHit:
+    """One recognised key fragment."""
+    significance: float     # log10 odds against chance
+    page: int
+    position: int           # Rune offset of the crib on the page
+    crib: str
+    mode: str               # Modes implying this key, '/'-joined
+    kind: str               # SOURCE / SHIFTED_SOURCE / PERIOD / PROGRESSION / ENGLISH
+    detail: str
+    key: Tuple[int, ...]
+
+    @property
+    def key_latin(self) -> str:
+        return ''.join(INDEX_TO_LATIN[k] for k in self.key)
+
+# =============================================================================
+# STRUCTURE CHECKS
+# =============================================================================
+
+def period_matches(keys: np.ndarray, max_period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Smallest period p with k[i] == k[i + p] over the whole row, and its
+    number of confirming equalities (0 / 0 when no period fits)."""
+    rows, length = keys.shape
+    best_p = np.zeros(rows, dtype=np.int32)
+    for p in range(min(max_period, length - 1), 0, -1):
+        fits = (keys[:, :-p] == keys[:, p:]).all(axis=1)
+        best_p[fits] = p
+    confirmations = np.where(best_p > 0, length - best_p, 0)
+    return best_p, confirmations
+
+def english_llr(keys: np.ndarray) -> np.ndarray:
+    """log10 likelihood ratio of the fragment as English vs uniform runes."""
+    model = default_model()
+    k = keys.astype(np.intp)
+    ll = model.bigram[k[:, :-1], k[:, 1:]].sum(axis=1) + model.unigram[k[:, 0]]
+    return (ll + keys.shape[1] * math.log(ALPHABET_SIZE)) / math.log(10)
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+def fragment_tests(lengths: Sequence[int], cribs: Dict[int, List[Tuple[str, np.ndarray]]],
+                   modes: Sequence[str]) -> int:
+    """Fragments a drag tests: cribs x positions x modes over pages of these rune lengths."""
+    return sum(len(group) * (n - length + 1) * len(modes)
+               for n in lengths for length, group in cribs.items() if SEED_RUNES <= length <= n)
+
+def drag_page(cipher: np.ndarray, cribs: Dict[int, List[Tuple[str, np.ndarray]]],
+              page: int, modes: Sequence[str], index: KeystreamIndex,
+              min_significance: float, max_period: int, shifted: bool = True,
+              tests: Optional[int] = None) -> List[CribHit]:
+    """All hits for one page; cribs are pre-grouped by rune length.
+
+    `tests` is the number of fragments the whole run tests (this page's
+    alone by default); log10 of it is taken off every significance.
+    """
+    hits: List[CribHit] = []
+    n = len(cipher)
+    penalty = math.log10(max(1, tests if tests is not None else fragment_tests([n], cribs, modes)))
+    for length, group in cribs.items():
+        if length > n or length < SEED_RUNES:
+            continue
+        windows = np.lib.stride_tricks.sliding_window_view(cipher, length)    # (P, L)
+        plains = np.stack([p for _, p in group])                              # (C, L)
+        positions = len(windows)
+        for mode in modes:
+            keys = implied_key(windows[None, :, :], plains[:, None, :], mode).reshape(-1, length)
+            crib_of = np.repeat(np.arange(len(group)), positions)
+            pos_of = np.tile(np.arange(positions), len(group))
+
+            def hit(r, sig, kind, detail):
+                return CribHit(sig, page, int(pos_of[r]), group[crib_of[r]][0], mode, kind, detail,
+                               tuple(int(x) for x in keys[r]))
+
+            def emit(rows, kind, detail_fn, sig_fn):
+                for r in rows:
+                    sig = sig_fn(r) - penalty
+                    if sig >= min_significance:
+                        hits.append(hit(r, sig, kind, detail_fn(r)))
+
+            # Known sources, directly and under a constant shift: one hit per fragment
+            source_sig = length * LOG10_ALPHABET - math.log10(index.total_runes) - penalty
+            found: Dict[int, Tuple[float, str, List[str]]] = {}
+            for kind, invariant, sig in (('SOURCE', False, source_sig),
+                                         ('SHIFTED_SOURCE', True, source_sig - LOG10_ALPHABET)):
+                if sig < min_significance or (invariant and not shifted) or length <= index.k:
+                    continue
+                rows, pos, shifts = index.search_batch(keys, shift_invariant=invariant)
+                for r, p, sh in zip(rows, pos, shifts):
+                    if invariant and sh == 0:
+                        continue
+                    name, offset = index.locate(int(p))
+                    best = found.setdefault(int(r), (sig, kind, []))
+                    best[2].append(f"{name}@{offset}" + (f"+{sh}" if invariant else ""))
+            for r, (sig, kind, locations) in found.items():
+                detail = ', '.join(locations[:MAX_LOCATIONS])
+                if len(locations) > MAX_LOCATIONS:
+                    detail += f" (+{len(locations) - MAX_LOCATIONS} more)"
+                hits.append(hit(r, sig, kind, detail))
+
+            # Short periods (1 = Caesar) and arithmetic progressions
+            period, conf = period_matches(keys, max_period)
+            emit(np.flatnonzero(conf > 0), 'PERIOD', lambda r: f"period {period[r]}",
+                 lambda r: conf[r] * LOG10_ALPHABET - math.log10(max_period))
+            diffs = (keys[:, 1:].astype(np.int16) - keys[:, :-1]) % ALPHABET_SIZE
+            step, dconf = period_matches(diffs, 1)
+            emit(np.flatnonzero((dconf > 0) & (diffs[:, 0] != 0)), 'PROGRESSION',
+                 lambda r: f"step {diffs[r, 0]}", lambda r: dconf[r] * LOG10_ALPHABET)
+
+            # Keystream that itself reads as English (running key / autokey)
+            llr = english_llr(keys)
+            emit(np.flatnonzero(llr >= min_significance + penalty), 'ENGLISH',
+                 lambda r: f"llr {llr[r]:.1f}", lambda r: float(llr[r]))
+
+    # The same fragment implied under several modes (a zero key is SUB and ADD) is one hit
+    merged: Dict[Tuple[int, str, str, Tuple[int, ...]], CribHit] = {}
+    for h in hits:
+        seen = merged.setdefault((h.position, h.crib, h.kind, h.key), h)
+        if seen is not h:
+            seen.mode += '/' + h.mode
+    return list(merged.values())
+
+def crib_drag(pages: Sequence[int], cribs: Sequence[str] = DEFAULT_CRIBS,
+              modes: Sequence[str] = MODES, index: Optional[KeystreamIndex] = None,
+              min_significance: float = 3.0, max_period: int = 8,
+              shifted: bool = True) -> List[CribHit]:
+    """Ranked hits for every crib x position x page x mode."""
+    index = index or default_index()
+    grouped: Dict[int, List[Tuple[str, np.ndarray]]] = {}
+    for crib in cribs:
+        key = np.asarray(text_to_key(crib.replace(' ', '')), dtype=np.int16)
+        grouped.setdefault(len(key), []).append((crib, key))
+
+    ciphers = {page: np.asarray(load_page_indices(page), dtype=np.int16) for page in pages}
+    tests = fragment_tests([len(c) for c in ciphers.values()], grouped, modes)
+    hits: List[CribHit] = []
+    for page, cipher in ciphers.items():
+        hits.extend(drag_page(cipher, grouped, page, modes, index, min_significance, max_period, shifted,
+                              tests))
+    hits.sort(key=lambda h: -h.significance)
+    return hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorised crib dragging with keystream recognition")
+    parser.add_argument("--pages", type=int, nargs='+', default=None, help="Pages (default: all)")
+    parser.add_argument("--cribs", type=str, nargs='+', default=None, help="Latin cribs")
+    parser.add_argument("--modes", type=str, nargs='+', default=list(MODES), choices=MODES)
+    parser.add_argument("--min-significance", type=float, default=3.0, help="log10 odds threshold")
+    parser.add_argument("--max-period", type=int, default=8)
+    parser.add_argument("--no-shift", action="store_true", help="Skip shifted source matches")
+    parser.add_argument("--top", type=int, default=30)
+    args = parser.parse_args()
+
+    pages = args.pages if args.pages is not None else available_pages()
+    hits = crib_drag(pages, args.cribs or DEFAULT_CRIBS, args.modes,
+                     min_significance=args.min_significance, max_period=args.max_period,
+                     shifted=not args.no_shift)
+    print(f"[CRIB] {len(hits)} hits over {len(pages)} pages")
+    for h in hits[:args.top]:
+        print(f"  {h.significance:6.1f}  p{h.page:02d}@{h.position:<4d} {h.mode:<8s} "
+              f"{h.crib:<22s} {h.kind:<11s} {h.detail:<24s} {h.key_latin}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+EVALUATION CACHE
+================
+
+Content-addressed scores of every (page content, key, mode, chain, scorer)
+evaluation, kept across runs so a rerun only scores what is new.
+
+An evaluation is addressed by a 64-bit hash:
+
+    seed = context_seed(cipher, mode, chain, scorer)   # sha256 of the context
+    h    = stream_hashes(seed, keystreams)             # one hash per key row
+
+The cipher is hashed by content, so a renamed or reloaded page hits the
+same entries, and so do two key names with identical values. Keyless
+evaluations (a fixed chain on a page) use the context seed itself. The
+scorer string carries the engine's scorer version: bumping it orphans the
+old entries, which then age out.
+
+Records are (hash, score, last use) rows in SQLite. Before dispatch an
+engine asks for a whole batch at once:
+
+    with EvalCache() as cache:
+        known, scores = cache.lookup(hashes)       # Bloom filter, then table
+        ... evaluate hashes[~known] only ...
+        cache.store(hashes[~known], new_scores)
+
+The Bloom filter (~10 bits per entry, 7 probes) answers most misses
+without touching the table; the candidates it lets through are joined
+against the table in one query. The table is capped at `max_entries`;
+past the cap the least recently used rows are evicted down to 90% and the
+filter is rebuilt. Filter misses caused by concurrent writers or a crash
+before save only cost a re-evaluation, never a wrong score.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from key_space import extend_keys
+from master_dictionary import CACHE_DIR
+
+EVAL_CACHE_DB = CACHE_DIR / "evaluations.sqlite"
+DEFAULT_MAX_ENTRIES = 5_000_000
+EVICT_TO = 0.9              # Fraction of the cap kept after eviction
+BLOOM_BITS_PER_ENTRY = 10
+BLOOM_PROBES = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evals (
+    h       INTEGER PRIMARY KEY,
+    score   REAL NOT NULL,
+    used    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evals_used ON evals (used);
+CREATE TABLE IF NOT EXISTS meta (
+    name    TEXT PRIMARY KEY,
+    value   INTEGER NOT NULL
+);
+"""
+
+# =============================================================================
+# HASHING
+# =============================================================================
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+def _mix(z: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (wrapping uint64 arithmetic)."""
+    z = (z ^ (z >> np.uint64(30))) * _M1
+    z = (z ^ (z >> np.uint64(27))) * _M2
+    return z ^ (z >> np.uint64(31))
+
+def context_seed(cipher: Sequence[int], mode: str = '', chain: str = '', scorer: str = '') -> int:
+    """64-bit hash of everything but the key: page content, mode, chain, scorer."""
+    h = hashlib.sha256(np.asarray(cipher, dtype=np.int64).tobytes())
+    for part in (mode, chain, scorer):
+        h.update(b'\0' + part.encode())
+    return int.from_bytes(h.digest()[:8], 'little')
+
+def stream_hashes(seeds, rows: np.ndarray) -> np.ndarray:
+    """One uint64 hash per (seed, key row) of an (m, n) keystream matrix.
+
+    `seeds` is a context seed or one seed per row. Rows of values below 256
+    are hashed 8 columns per step.
+    """
+    rows = np.asarray(rows)
+    m, n = rows.shape
+    with np.errstate(over='ignore'):
+        h = _mix(np.broadcast_to(np.asarray(seeds, dtype=np.uint64), (m,)) ^ np.uint64(n))
+        if rows.size and rows.min() >= 0 and rows.max() < 256:
+            width = -(-n // 8) * 8
+            padded = np.zeros((m, width), dtype=np.uint8)
+            padded[:, :n] = rows
+            words = padded.view('<u8').astype(np.uint64)
+        else:
+            words = rows.astype(np.int64).view(np.uint64)
+        for col in range(words.shape[1]):
+            h = _mix(h ^ words[:, col])
+    return h
+
+def plan_hashes(plan, n: int, seeds: Sequence[int], batch: int = 65536) -> np.ndarray:
+    """Hashes of every task of a KeyPlan, keys extended to n (seeds[m] per mode m)."""
+    seeds = np.asarray(seeds, dtype=np.uint64)
+    out = np.empty(len(plan), dtype=np.uint64)
+    for lo in range(0, len(plan), batch):
+        sub = plan.shard(lo, min(lo + batch, len(plan)))
+        packed, lengths = sub.keys.packed(0, len(sub.keys))
+        ext = extend_keys(packed[sub.key_idx], lengths[sub.key_idx], n)
+        out[lo:lo + len(sub)] = stream_hashes(seeds[sub.mode_idx], ext)
+    return out
+
+# =============================================================================
+# BLOOM FILTER
+# =============================================================================
+
+class BloomFilter:
+    """Bit array over uint64 hashes (double hashing from the two halves)."""
+
+    def __init__(self, bits: int, probes: int = BLOOM_PROBES):
+        self.bits = 1 << max(6, (bits - 1).bit_length())
+        self.probes = probes
+        self.words = np.zeros(self.bits // 64, dtype=np.uint64)
+
+    @classmethod
+    def for_entries(cls, entries: int) -> 'BloomFilter':
+        return cls(entries * BLOOM_BITS_PER_ENTRY)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h = np.asarray(hashes, dtype=np.uint64)
+        h1 = h & np.uint64(0xFFFFFFFF)
+        h2 = (h >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.probes, dtype=np.uint64)[:, None]
+        with np.errstate(over='ignore'):
+            return (h1[None, :] + i * h2[None, :]) & np.uint64(self.bits - 1)
+
+    def add(self, hashes: np.ndarray):
+        pos = self._positions(hashes).ravel()
+        np.bitwise_or.at(self.words, (pos >> np.uint64(6)).astype(np.intp),
+                         np.uint64(1) << (pos & np.uint64(63)))
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        pos = self._positions(hashes)
+        bits = self.words[(pos >> np.uint64(6)).astype(np.intp)] >> (pos & np.uint64(63))
+        return (bits & np.uint64(1)).astype(bool).all(axis=0)
+
+    def fill(self) -> float:
+        """Fraction of bits set."""
+        return float(np.unpackbits(self.words.view(np.uint8)).mean())
+
+    def save(self, path: Path, merge: bool = True):
+        """Atomic write; OR-merges a same-sized filter already on disk."""
+        if merge:
+            other = BloomFilter.load(path, self.bits)
+            if other is not None:
+                self.words |= other.words
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            np.save(f, self.words)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, bits: int) -> Optional['BloomFilter']:
+        """The saved filter, or None when missing or sized for another cap."""
+        bloom = cls(bits)
+        try:
+            words = np.load(path)
+        except (OSError, ValueError):
+            return None
+        if words.shape != bloom.words.shape:
+            return None
+        bloom.words = words.astype(np.uint64)
+        return bloom
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class EvalCache:
+    """Score store with a Bloom prefilter and LRU eviction (one per process)."""
+
+    def __init__(self, path: Path = EVAL_CACHE_DB, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 timeout: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.bloom_path = self.path.with_suffix('.bloom.npy')
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(str(self.path), timeout=timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS probe (h INTEGER PRIMARY KEY)")
+        with self.conn:
+            self.conn.execute("INSERT INTO meta VALUES ('clock', 1) "
+                              "ON CONFLICT(name) DO UPDATE SET value = value + 1")
+        self.clock = self.conn.execute("SELECT value FROM meta WHERE name = 'clock'").fetchone()[0]
+        bloom = BloomFilter.load(self.bloom_path, max_entries * BLOOM_BITS_PER_ENTRY)
+        self.bloom = bloom if bloom is not None else self._rebuild_bloom()
+        self.dirty = False
+        self.stats: Dict[str, int] = {'lookups': 0, 'bloom_passed': 0, 'hits': 0, 'stored': 0}
+
+    def _rebuild_bloom(self) -> BloomFilter:
+        bloom = BloomFilter.for_entries(self.max_entries)
+        cur = self.conn.execute("SELECT h FROM evals")
+        while True:
+            rows = cur.fetchmany(1 << 18)
+            if not rows:
+                break
+            bloom.add(np.array(rows, dtype=np.int64)[:, 0].view(np.uint64))
+        return bloom
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(known mask, cached scores; NaN where unknown) of a batch of hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        known = np.zeros(len(hashes), dtype=bool)
+        scores = np.full(len(hashes), np.nan)
+        self.stats['lookups'] += len(hashes)
+        if len(hashes) == 0:
+            return known, scores
+        candidates = np.flatnonzero(self.bloom.contains(hashes))
+        self.stats['bloom_passed'] += len(candidates)
+        if len(candidates) == 0:
+            return known, scores
+
+        signed = hashes[candidates].view(np.int64)
+        with self.conn:
+            self.conn.execute("DELETE FROM probe")
+            self.conn.executemany("INSERT OR IGNORE INTO probe VALUES (?)", ((int(h),) for h in signed))
+            found = self.conn.execute("SELECT e.h, e.score FROM probe p JOIN evals e ON e.h = p.h").fetchall()
+        if found:
+            # Own transaction: upgrading the read above to a write could not wait for other writers
+            with self.conn:
+                self.conn.execute("UPDATE evals SET used = ? WHERE h IN (SELECT h FROM probe)", (self.clock,))
+        if not found:
+            return known, scores
+        found_h = np.array([h for h, _ in found], dtype=np.int64)
+        found_s = np.array([s for _, s in found], dtype=np.float64)
+        order = np.argsort(found_h)
+        found_h, found_s = found_h[order], found_s[order]
+        at = np.minimum(np.searchsorted(found_h, signed), len(found_h) - 1)
+        hit = found_h[at] == signed
+        known[candidates[hit]] = True
+        scores[candidates[hit]] = found_s[at[hit]]
+        self.stats['hits'] += int(hit.sum())
+        return known, scores
+
+    def store(self, hashes: np.ndarray, scores: Sequence[float]):
+        """Record new evaluations (a repeated hash keeps the newest score)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        rows = zip(hashes.view(np.int64).tolist(), np.asarray(scores, dtype=np.float64).tolist())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO evals (h, score, used) VALUES (?, ?, ?) "
+                "ON CONFLICT(h) DO UPDATE SET score = excluded.score, used = excluded.used",
+                ((h, s, self.clock) for h, s in rows))
+        self.bloom.add(hashes)
+        self.stats['stored'] += len(hashes)
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM evals").fetchone()[0]
+
+    def evict(self, max_entries: Optional[int] = None) -> int:
+        """Drop least recently used rows down to EVICT_TO of the cap; returns rows removed."""
+        cap = self.max_entries if max_entries is None else max_entries
+        count = len(self)
+        if count <= cap:
+            return 0
+        excess = count - int(cap * EVICT_TO)
+        with self.conn:
+            self.conn.execute("DELETE FROM evals WHERE h IN "
+                              "(SELECT h FROM evals ORDER BY used LIMIT ?)", (excess,))
+        self.bloom = self._rebuild_bloom()
+        self.bloom.save(self.bloom_path, merge=False)
+        return excess
+
+    def flush(self):
+        """Evict past the cap and persist the Bloom filter."""
+        if not self.dirty:
+            return
+        if not self.evict():
+            self.bloom.save(self.bloom_path)
+        self.dirty = False
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['lookups']} lookups, {s['hits']} cached "
+                f"({s['lookups'] - s['bloom_passed']} ruled out by the filter), {s['stored']} stored")
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> 'EvalCache':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or trim the evaluation cache")
+    parser.add_argument("--db", type=Path, default=EVAL_CACHE_DB)
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Evict least recently used rows past this cap")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached evaluation")
+    args = parser.parse_args()
+
+    with EvalCache(args.db, args.max_entries) as cache:
+        if args.clear:
+            with cache.conn:
+                cache.conn.execute("DELETE FROM evals")
+            cache.bloom = BloomFilter.for_entries(cache.max_entries)
+            cache.bloom.save(cache.bloom_path, merge=False)
+            print("[CACHE] cleared")
+        removed = cache.evict()
+        if removed:
+            print(f"[CACHE] evicted {removed} least recently used evaluations")
+        print(f"[CACHE] {len(cache)} evaluations (cap {cache.max_entries}), run clock {cache.clock}, "
+              f"filter {100 * cache.bloom.fill():.1f}% full")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+DECLARATIVE EXPERIMENT RUNNER
+=============================
+
+An attack is declared as a search space instead of a hand-rolled script:
+
+    input streams  x  key sources  x  cipher / chain (CIPHER_REGISTRY)  x  scorer
+
+    {
+        "name": "p20_deor_words",
+        "streams": ["page:20", "page:20|prime_positions", "page:20|reverse"],
+        "keys": ["words:CICADA_TERMS|shifts", "corpus:deor:100:10"],
+        "ciphers": ["SUBSTITUTION/SUB", "SUBSTITUTION/ADD", "ATBASH+SUBSTITUTION/SUB"],
+        "scorer": "bigram",
+        "top": 20
+    }
+
+Grammar:
+    stream   page:N | pages:A-B | corpus:NAME   then |reverse |prime_positions
+             |composite_positions |first:N
+    keys     words:LIST (a master_dictionary word list in WORD_LISTS, or
+             W1,W2,... with at least one comma: W1, for a single word) | known
+             | caesar | sequence:NAME:LEN[:START-STOP[:STEP]] (math_sequences)
+             | corpus:NAME:LEN[:STEP] (running-key windows)   then |reverse
+             |negate |shifts
+    cipher   STEP+STEP+...,  STEP = NAME[:PARAM][/MODE]. A keyed cipher
+             (SUBSTITUTION, AUTOKEY, PORTA, ...) without a PARAM takes the
+             key; REVERSE reverses the stream.
+
+Planning shares work across every spec given in one job:
+- streams are built once and addressed by content, so "page:20" in ten
+  specs is one stream; fixed steps before the key step are applied once
+  per stream and the result is addressed by content again
+- a work unit is (stream, key source, key step, later steps, scorer);
+  identical units from different experiments run once and fan out
+- the affine modes of SUBSTITUTION (SUB, ADD, SUB_REV, ADD_REV, BEAUFORT)
+  requested anywhere for the same (stream, keys, later steps) form one
+  unit planned with key_canon.plan_keys, so equivalent key/mode pairs
+  decrypt once
+
+Units are sharded over their keys and run on a process pool. Affine
+shards decrypt as (keys, n) matrices and score in one call; other keyed
+ciphers go through CIPHER_REGISTRY key by key. A unit keeps its top hits
+per requested mode (a pruned task counts for every mode it stands in
+for), so what an experiment sees does not depend on which others share
+the unit. A finished unit is cached under .cache/experiments by its
+digest, which covers the key source's content and the scoring model, so
+re-running a family only computes the units that changed.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import master_dictionary
+from cipher_registry import CIPHER_REGISTRY, apply_chain
+from corpus_store import load_book, load_corpus
+from key_canon import MODE_FORMS, KeyPlan, plan_keys
+from key_space import KeySpace, ListSpace, SequenceSpace, transform_product
+from master_dictionary import (
+    ALPHABET_SIZE, CACHE_DIR, INDEX_TO_LATIN, KNOWN_KEYS, load_page_indices,
+)
+from math_sequences import prime_sieve, sequence
+from rune_ngrams import default_model
+
+EXPERIMENT_DIR = CACHE_DIR / "experiments"
+RUNNER_VERSION = 2              # Bump when unit results change meaning
+MOD = ALPHABET_SIZE
+
+# Ciphers whose (non-fixed) parameter is a key from a key source
+KEYED_CIPHERS = {'SUBSTITUTION', 'AUTOKEY', 'PORTA', 'GRONSFELD', 'PROGRESSIVE',
+                 'INTERRUPTED', 'RUNNING_KEY'}
+AFFINE_MODES = [m for m, form in MODE_FORMS.items() if form is not None]
+
+# master_dictionary word lists a "words:" key source can name
+WORD_LISTS = ('CICADA_TERMS', 'COMMON_ENGLISH_WORDS', 'SELF_RELIANCE_PHRASES')
+
+Step = Tuple[str, Any, str]
+
+@dataclass
+class ExperimentSpec:
+    """One declared search space."""
+    name: str
+    streams: List[str]
+    keys: List[str]
+    ciphers: List[str]
+    scorer: str = 'bigram'
+    top: int = 20
+
+@dataclass
+class Hit:
+    """One scored candidate."""
+    score: float
+    stream: str
+    key: str
+    cipher: str
+    preview: str
+
+@dataclass
+class ExperimentResult:
+    name: str
+    hits: List[Hit]
+    units: int                  # Work units the experiment needed
+    shared: int                 # ... of which another experiment also needed
+    cached: int                 # ... of which came from the cache
+
+# =============================================================================
+# SPEC PARSING
+# =============================================================================
+
+def _transformed_positions(runes: np.ndarray, keep_prime: bool) -> np.ndarray:
+    sieve = prime_sieve(max(len(runes), 2))[:len(runes)]
+    return runes[sieve if keep_prime else ~sieve]
+
+STREAM_TRANSFORMS: Dict[str, Callable[[np.ndarray, Optional[str]], np.ndarray]] = {
+    'reverse': lambda r, arg: r[::-1],
+    'prime_positions': lambda r, arg: _transformed_positions(r, True),
+    'composite_positions': lambda r, arg: _transformed_positions(r, False),
+    'first': lambda r, arg: r[:int(arg)],
+}
+
+def build_stream(spec: str) -> np.ndarray:
+    source, *transforms = spec.split('|')
+    kind, _, arg = source.partition(':')
+    if kind == 'page':
+        runes = np.asarray(load_page_indices(int(arg)), dtype=np.int64)
+    elif kind == 'pages':
+        lo, _, hi = arg.partition('-')
+        book = load_book()
+        runes = np.concatenate([book.page(p) for p in range(int(lo), int(hi) + 1)
+                                if p in set(book.page_numbers.tolist())]).astype(np.int64)
+    elif kind == 'corpus':
+        runes = np.asarray(load_corpus(arg).runes, dtype=np.int64)
+    else:
+        raise ValueError(f"unknown stream source {source!r}")
+    for t in transforms:
+        name, _, targ = t.partition(':')
+        if name not in STREAM_TRANSFORMS:
+            raise ValueError(f"unknown stream transform {t!r}")
+        runes = STREAM_TRANSFORMS[name](runes, targ or None)
+    return np.ascontiguousarray(runes)
+
+def _span(text: str, default: range) -> range:
+    if not text:
+        return default
+    parts = text.split(':')
+    lo, _, hi = parts[0].partition('-')
+    return range(int(lo), int(hi or lo) + 1, int(parts[1]) if len(parts) > 1 else 1)
+
+def build_keys(spec: str) -> KeySpace:
+    source, *mods = spec.split('|')
+    transforms = transform_product(shifts=range(MOD) if 'shifts' in mods else (0,),
+                                   reverse='reverse' in mods, negate='negate' in mods)
+    kind, _, arg = source.partition(':')
+    if kind == 'words':
+        if ',' in arg:
+            words = [w for w in arg.split(',') if w]
+        elif arg in WORD_LISTS:
+            words = list(getattr(master_dictionary, arg))
+        else:
+            raise ValueError(f"unknown word list {arg!r} in {spec!r}: expected one of "
+                             f"{', '.join(WORD_LISTS)} or comma-separated words")
+        return ListSpace.from_words('WORD_', dict.fromkeys(words), transforms)
+    if kind == 'known':
+        return ListSpace(list(KNOWN_KEYS.items()), transforms)
+    if kind == 'caesar':
+        return ListSpace([(f"CAESAR_{s}", [s]) for s in range(MOD)])
+    if kind == 'sequence':
+        name, length, *window = arg.split(':')
+        offsets = _span(':'.join(window), range(1))
+        values = sequence(name, max(offsets.stop, 1) + int(length))
+        return SequenceSpace(name, values, lengths=[int(length)], offsets=offsets, transforms=transforms)
+    if kind == 'corpus':
+        name, length, *step = arg.split(':')
+        runes = load_corpus(name).runes
+        offsets = range(0, len(runes), int(step[0]) if step else int(length))
+        return SequenceSpace(f"RUNNING_{name}", runes, lengths=[int(length)], offsets=offsets,
+                             transforms=transforms, template='{label}_{offset}')
+    raise ValueError(f"unknown key source {source!r}")
+
+def _param(text: str) -> Any:
+    values = [int(v) for v in text.split(',')]
+    return values[0] if len(values) == 1 else values
+
+def parse_cipher(spec: str) -> Tuple[List[Step], Optional[int]]:
+    """(steps, index of the key step or None). The key step's params are None."""
+    steps, key_step = [], None
+    for token in spec.split('+'):
+        body, _, mode = token.partition('/')
+        name, _, param = body.partition(':')
+        if name != 'REVERSE' and name not in CIPHER_REGISTRY:
+            raise ValueError(f"unknown cipher {name!r} in {spec!r}")
+        mode = mode or (CIPHER_REGISTRY[name].get_modes()[0] if name in CIPHER_REGISTRY else 'REVERSE')
+        if name in KEYED_CIPHERS and not param:
+            if key_step is not None:
+                raise ValueError(f"{spec!r} has more than one key step")
+            key_step = len(steps)
+            steps.append((name, None, mode))
+        else:
+            steps.append((name, _param(param) if param else None, mode))
+    return steps, key_step
+
+def load_specs(paths: Sequence[Path]) -> List[ExperimentSpec]:
+    """Specs from JSON files (one spec or a list of specs per file)."""
+    specs = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        specs += [ExperimentSpec(**d) for d in (data if isinstance(data, list) else [data])]
+    return specs
+
+# =============================================================================
+# SCORERS
+# =============================================================================
+
+def _ioc(rows: np.ndarray) -> np.ndarray:
+    n = rows.shape[1]
+    counts = np.zeros((len(rows), MOD), dtype=np.int64)
+    np.add.at(counts, (np.repeat(np.arange(len(rows)), n), rows.ravel()), 1)
+    return (counts * (counts - 1)).sum(axis=1) / max(n * (n - 1), 1)
+
+SCORERS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'bigram': lambda rows: default_model().score_matrix(rows, 2),
+    'trigram': lambda rows: default_model().score_matrix(rows, 3),
+    'ioc': _ioc,
+}
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+def _digest(*parts: Any) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode())
+        h.update(b'\x00')
+    return h.hexdigest()[:20]
+
+def _keys_digest(keys: Optional[KeySpace]) -> str:
+    """Content of a key source, so edited word lists or corpora invalidate cached units."""
+    if keys is None:
+        return '-'
+    if isinstance(keys, SequenceSpace):
+        return _digest(keys.label, keys.sequence, keys.lengths, keys.offsets, keys.template, keys.transforms)
+    if isinstance(keys, ListSpace):
+        return _digest([name for name, _ in keys.entries], [k.tobytes() for _, k in keys.entries],
+                       keys.transforms)
+    return _digest(*(keys.packed(lo, min(lo + 65536, len(keys))) for lo in range(0, len(keys), 65536)))
+
+def _scorer_digest(scorer: str) -> str:
+    """The tables a scorer reads (the n-gram model is trained from files that can change)."""
+    model = default_model()
+    return _digest(scorer, {'bigram': model.bigram, 'trigram': model.trigram}.get(scorer))
+
+@dataclass
+class WorkUnit:
+    """One deduplicated (stream, keys, key step, later steps, scorer) job."""
+    digest: str
+    stream: np.ndarray
+    stream_label: str
+    keys: Optional[KeySpace]
+    key_label: str
+    cipher: str                 # Key step name (modes below)
+    modes: List[str]
+    suffix: List[Step]
+    scorer: str
+    top: int
+    plan: Optional[KeyPlan] = field(default=None, repr=False)
+    users: Dict[str, List[str]] = field(default_factory=dict)     # experiment -> cipher labels
+    cover: Dict[Tuple[str, str], List[str]] = field(default_factory=dict, repr=False)  # task -> other modes
+
+    @property
+    def affine(self) -> bool:
+        return self.cipher == 'SUBSTITUTION' and all(m in AFFINE_MODES for m in self.modes)
+
+    def size(self) -> int:
+        if self.keys is None:
+            return 1
+        return len(self.plan) if self.plan is not None else len(self.keys) * len(self.modes)
+
+def plan_experiments(specs: Sequence[ExperimentSpec]) -> List[WorkUnit]:
+    """Expand every spec and merge identical work across them."""
+    streams: Dict[str, Tuple[str, np.ndarray]] = {}         # spec -> (digest, runes)
+    keys: Dict[str, KeySpace] = {}
+    units: Dict[Tuple, WorkUnit] = {}
+
+    for spec in specs:
+        for stream_spec in spec.streams:
+            if stream_spec not in streams:
+                runes = build_stream(stream_spec)
+                streams[stream_spec] = (_digest(runes), runes)
+            base_digest, runes = streams[stream_spec]
+            for cipher_spec in spec.ciphers:
+                steps, k = parse_cipher(cipher_spec)
+                prefix, suffix = (steps, []) if k is None else (steps[:k], steps[k + 1:])
+                prefixed = apply_chain(runes, prefix) if prefix else runes
+                stream_digest = _digest(prefixed) if prefix else base_digest
+                label = f"{stream_spec}" + (f" [{'+'.join(s[0] for s in prefix)}]" if prefix else "")
+                key_specs = [None] if k is None else spec.keys
+                for key_spec in key_specs:
+                    if key_spec is not None and key_spec not in keys:
+                        keys[key_spec] = build_keys(key_spec)
+                    cipher, mode = ('NONE', 'NONE') if k is None else steps[k][0::2]
+                    group = 'AFFINE' if cipher == 'SUBSTITUTION' and mode in AFFINE_MODES else mode
+                    ident = (stream_digest, key_spec, cipher, group, repr(suffix), spec.scorer)
+                    unit = units.get(ident)
+                    if unit is None:
+                        unit = WorkUnit('', prefixed, label, keys.get(key_spec), key_spec or '-', cipher,
+                                        [], suffix, spec.scorer, spec.top)
+                        units[ident] = unit
+                    if mode not in unit.modes:
+                        unit.modes.append(mode)
+                    unit.top = max(unit.top, spec.top)
+                    unit.users.setdefault(spec.name, []).append(cipher_spec)
+
+    scorers = {}
+    for ident, unit in units.items():
+        if unit.scorer not in scorers:
+            scorers[unit.scorer] = _scorer_digest(unit.scorer)
+        unit.digest = _digest(RUNNER_VERSION, ident, sorted(unit.modes), unit.top,
+                              _keys_digest(unit.keys), scorers[unit.scorer])
+        if unit.keys is not None and unit.affine:
+            unit.plan = plan_keys(unit.keys, unit.modes)
+            for (name, mode), others in unit.plan.aliases.items():
+                extra = sorted({o.rsplit('/', 1)[1] for o in others} - {mode})
+                if extra:
+                    unit.cover[(name, mode)] = extra
+    return list(units.values())
+
+# =============================================================================
+# EXECUTION
+# =============================================================================
+
+def _apply_suffix(rows: np.ndarray, suffix: Sequence[Step]) -> np.ndarray:
+    for name, params, mode in suffix:
+        if name == 'CAESAR':
+            rows = (rows - params) % MOD
+        elif name == 'ATBASH':
+            rows = (MOD - 1 - rows) % MOD
+        elif name == 'REVERSE':
+            rows = rows[:, ::-1]
+        else:
+            rows = np.stack([apply_chain(r, [(name, params, mode)]) for r in rows])
+    return rows
+
+def _top(scored: List[Tuple], unit: WorkUnit) -> List[Tuple]:
+    """The unit's top hits for each requested mode, best first.
+
+    A task also counts for the modes its pruned aliases were requested
+    under, so every experiment's own top-k survives whatever else shares
+    the unit.
+    """
+    best = {}
+    for mode in unit.modes:
+        covering = [t for t in scored if t[2] == mode or mode in unit.cover.get((t[1], t[2]), ())]
+        for t in heapq.nlargest(unit.top, covering, key=lambda t: t[0]):
+            best[(t[1], t[2])] = t
+    return sorted(best.values(), key=lambda t: -t[0])
+
+def _preview(scored: List[Tuple[float, str, str, np.ndarray]]) -> List[Tuple[float, str, str, str]]:
+    return [(s, key, mode, ''.join(INDEX_TO_LATIN[int(p)] for p in plain[:60])) for s, key, mode, plain in scored]
+
+def shard_unit(unit: WorkUnit, lo: int, hi: int) -> WorkUnit:
+    """The part of a unit one worker needs: keys/tasks lo..hi, no alias tables."""
+    if unit.keys is None:
+        return replace(unit, users={})
+    if unit.plan is not None:
+        return replace(unit, keys=None, plan=unit.plan.shard(lo, hi), users={})
+    return replace(unit, keys=unit.keys.shard(lo, hi), users={})
+
+def run_shard(unit: WorkUnit) -> List[Tuple[float, str, str, str]]:
+    """Top candidates of one shard (runs in a worker)."""
+    score = SCORERS[unit.scorer]
+    c = unit.stream.astype(np.int64)
+    scored = []
+    if unit.plan is not None:
+        for mode, keys, names in unit.plan.by_mode(len(c)):
+            a, sign = MODE_FORMS[mode]
+            rows = _apply_suffix((a * c[None, :] + sign * keys.astype(np.int64)) % MOD, unit.suffix)
+            scored += [(float(s), n, mode, r) for s, n, r in zip(score(rows), names, rows)]
+        return _preview(_top(scored, unit))
+    if unit.keys is None:
+        rows = _apply_suffix(c[None, :], unit.suffix)
+        return _preview([(float(score(rows)[0]), '-', 'NONE', rows[0])])
+    cipher = CIPHER_REGISTRY[unit.cipher]
+    for i in range(len(unit.keys)):
+        key = unit.keys.key(i).astype(np.int64)
+        for mode in unit.modes:
+            row = np.asarray(cipher.decrypt(c, key, mode), dtype=np.int64)[None, :] % MOD
+            row = _apply_suffix(row, unit.suffix)
+            scored.append((float(score(row)[0]), unit.keys.name(i), mode, row[0]))
+    return _preview(_top(scored, unit))
+
+def _cache_path(unit: WorkUnit) -> Path:
+    return EXPERIMENT_DIR / f"{unit.digest}.json"
+
+def _load_cached(unit: WorkUnit) -> Optional[List[Tuple[float, str, str, str]]]:
+    path = _cache_path(unit)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return [tuple(h) for h in json.load(f)]
+
+def _store(unit: WorkUnit, hits: List[Tuple[float, str, str, str]]):
+    EXPERIMENT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = _cache_path(unit).with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(hits, f)
+    os.replace(tmp, _cache_path(unit))
+
+def execute(units: Sequence[WorkUnit], workers: int = 1, shard_size: int = 2048,
+            use_cache: bool = True) -> Tuple[Dict[str, List[Tuple[float, str, str, str]]], set]:
+    """Run every unit (cached ones are loaded). Returns (digest -> top hits, cached digests)."""
+    results, pending = {}, []
+    for unit in units:
+        cached = _load_cached(unit) if use_cache else None
+        if cached is not None:
+            results[unit.digest] = cached
+        else:
+            pending.append(unit)
+    cached = set(results)
+
+    tasks = []
+    for unit in pending:
+        n = unit.size()
+        tasks += [shard_unit(unit, lo, min(lo + shard_size, n)) for lo in range(0, max(n, 1), shard_size)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(run_shard, tasks, chunksize=1))
+    else:
+        outputs = [run_shard(t) for t in tasks]
+
+    merged: Dict[str, List] = {u.digest: [] for u in pending}
+    for task, out in zip(tasks, outputs):
+        merged[task.digest] += out
+    for unit in pending:
+        results[unit.digest] = [tuple(h) for h in _top(merged[unit.digest], unit)]
+        if use_cache:
+            _store(unit, results[unit.digest])
+    return results, cached
+
+def _fan_out(unit: WorkUnit, hits, experiment: str) -> List[Hit]:
+    """Unit hits as seen by one experiment (only the modes it asked for,
+    pruned equivalents reported under a requested mode)."""
+    wanted = {}
+    for label in unit.users[experiment]:
+        steps, k = parse_cipher(label)
+        wanted[steps[k][2] if k is not None else 'NONE'] = label
+    out = []
+    for score, key, mode, preview in hits:
+        names = [(key, mode)]
+        if unit.plan is not None:
+            names += [tuple(a.rsplit('/', 1)) for a in unit.plan.aliases_of(key, mode)]
+        for name, m in names:
+            if m in wanted:
+                out.append(Hit(score, unit.stream_label, f"{unit.key_label}:{name}", wanted[m], preview))
+                break
+    return out
+
+def run_experiments(specs: Sequence[ExperimentSpec], workers: int = 1, shard_size: int = 2048,
+                    use_cache: bool = True) -> List[ExperimentResult]:
+    units = plan_experiments(specs)
+    results, cached = execute(units, workers, shard_size, use_cache)
+    out = []
+    for spec in specs:
+        mine = [u for u in units if spec.name in u.users]
+        hits = [h for u in mine for h in _fan_out(u, results[u.digest], spec.name)]
+        hits.sort(key=lambda h: -h.score)
+        out.append(ExperimentResult(spec.name, hits[:spec.top], len(mine),
+                                    sum(len(u.users) > 1 for u in mine),
+                                    sum(u.digest in cached for u in mine)))
+    return out
+
+def main():
+    parser = argparse.ArgumentParser(description="Run declarative attack specs as one deduplicated job")
+    parser.add_argument("specs", type=Path, nargs='+', help="JSON spec files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=2048, help="Keys per shard")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute cached units")
+    parser.add_argument("--plan-only", action="store_true", help="Show the deduplicated plan and stop")
+    parser.add_argument("--output", type=Path, default=None, help="Write all hits as JSON")
+    args = parser.parse_args()
+
+    specs = load_specs(args.specs)
+    units = plan_experiments(specs)
+    requested = sum(len(labels) for u in units for labels in u.users.values())
+    print(f"[RUN] {len(specs)} experiments -> {requested} requested units -> {len(units)} unique, "
+          f"{sum(u.size() for u in units):,} decryptions")
+    if args.plan_only:
+        for u in units:
+            print(f"  {u.digest[:8]} {u.stream_label:<28s} {u.key_label:<28s} {u.cipher}/{','.join(u.modes):<20s} "
+                  f"{u.size():>8,}  used by {', '.join(u.users)}")
+        return
+
+    start = time.time()
+    results = run_experiments(specs, args.workers, args.shard_size, not args.no_cache)
+    print(f"[RUN] done in {time.time() - start:.1f}s")
+    for r in results:
+        print(f"\n{r.name}: {r.units} units ({r.shared} shared, {r.cached} cached)")
+        for h in r.hits[:10]:
+            print(f"  {h.score:7.3f}  {h.stream:<24s} {h.cipher:<26s} {h.key:<32s} {h.preview[:40]}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({r.name: [asdict(h) for h in r.hits] for r in results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 
 import os
-import re
-import glob
+
+from results_db import ResultsDB
 
 # Configuration
 WORKSPACE_ROOT = r"c:\Users\tyler\Repos\Cicada3301\LiberPrimus"
 PAGES_DIR = os.path.join(WORKSPACE_ROOT, "pages")
-BATCH_RESULTS_PATH = os.path.join(WORKSPACE_ROOT, "BATCH_RESULTS.md")
 OUTPUT_DIR = os.path.join(WORKSPACE_ROOT, "runeglish_output")
 
+# Tool whose runs replaced BATCH_RESULTS.md; keys come from its latest run
+RESULTS_TOOL = 'batch_attack'
+
+# Stored modes whose key decrypts as plaintext = cipher - key (all decrypt_page applies)
+SUBTRACTIVE_MODES = ['SUB', 'SHIFT', 'PHI', 'PHI_SUB', 'PHI_LITF', 'RK_SUB']
+
 # Gematria Primus Mapping
 RUNE_MAP = {
     'ᚠ': 0,  'ᚢ': 1,  'ᚦ': 2,  'ᚩ': 3,  'ᚱ': 4,  'ᚳ': 5,  'ᚷ': 6,  'ᚹ': 7,
@@ -25,31 +30,6 @@ NUM_TO_TEXT = {
     24: 'A', 25: 'AE', 26: 'Y', 27: 'IA', 28: 'EA'
 }
 
-def parse_keys_from_batch_results(filepath):
-    keys = {} # page_num (int) -> key (list of ints)
-    current_page = None
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-        
-    for line in lines:
-        line = line.strip()
-        # ## Page 01
-        m_page = re.match(r'## Page (\d+)', line)
-        if m_page:
-            current_page = int(m_page.group(1))
-            continue
-            
-        # - **Key:** [8, 0, 10, ... ]
-        if line.startswith('- **Key:**'):
-            # Extract list content
-            content = line.split('[')[1].split(']')[0]
-            key_list = [int(x.strip()) for x in content.split(',')]
-            if current_page is not None:
-                keys[current_page] = key_list
-                
-    return keys
-
 def decrypt_page(page_num, key, runes_text):
     decrypted_text = ""
     key_len = len(key)
@@ -107,8 +87,10 @@ def main():
     if os.path.exists(VERIFIED_KEYS_PATH):
         keys = parse_keys_from_json(VERIFIED_KEYS_PATH)
     else:
-        print(f"Verified keys not found. Falling back to {BATCH_RESULTS_PATH}...")
-        keys = parse_keys_from_batch_results(BATCH_RESULTS_PATH)
+        print("Verified keys not found. Falling back to the results database...")
+        with ResultsDB() as db:
+            run_id = db.latest_run(RESULTS_TOOL)
+            keys = db.best_keys(modes=SUBTRACTIVE_MODES, run_id=run_id) if run_id is not None else {}
         
     print(f"Found keys for {len(keys)} pages.")
     
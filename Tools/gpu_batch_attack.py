@@ -20,16 +20,17 @@ Date: January 2026
 import os
 import sys
 import time
-import json
 import argparse
 from pathlib import Path
-from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
 import numpy as np
 
+from corpus_store import load_corpus, tokenize
+from results_db import ResultRecord, ResultsDB, write_reports
+
 # Force CuPy to use CUDA
 os.environ['CUDA_PATH'] = r'C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v12.6'
 
@@ -313,7 +314,7 @@ class DualGPUSolver:
         return np.array(indices, dtype=np.int32)
     
     def decrypt_batch_gpu(self, cipher_gpu: cp.ndarray, keys: List[Tuple[str, np.ndarray]], 
-                          mode: str = 'SUB') -> List[Tuple[float, str, str, str]]:
+                          mode: str = 'SUB') -> List[Tuple[float, str, str, str, List[int]]]:
         """
         Decrypt using batch of keys on GPU.
         Returns top candidates.
@@ -367,7 +368,8 @@ class DualGPUSolver:
                     plaintext = cp.asnumpy(plaintexts[idx])
                     detailed_score = score_detailed_cpu(plaintext)
                     text = indices_to_text(plaintext)
-                    results.append((detailed_score, batch_keys[idx][0], mode, text))
+                    results.append((detailed_score, batch_keys[idx][0], mode, text,
+                                    [int(k) for k in batch_keys[idx][1]]))
         
         return results
     
@@ -392,7 +394,7 @@ class DualGPUSolver:
             if self.verbose:
                 print(f"[GPU {gpu_id}] Done! {len(results)} total candidates")
     
-    def solve_page(self, page_num: int) -> List[Tuple[float, str, str, str]]:
+    def solve_page(self, page_num: int) -> List[Tuple[float, str, str, str, List[int]]]:
         """Solve a page using both GPUs in parallel."""
         if self.verbose:
             print(f"\n{'='*60}")
@@ -458,7 +460,7 @@ class DualGPUSolver:
             if score > 5:  # Only keep decent results
                 text = indices_to_text(plaintext)
                 with self.results_lock:
-                    self.all_results.append((score, f"PHI_SEQ_START_{start_idx}", "PHI", text))
+                    self.all_results.append((score, f"PHI_SEQ_START_{start_idx}", "PHI", text, key_seq.tolist()))
             
             # Also try ADD
             plaintext_add = (cipher + key_seq) % ALPHABET_SIZE
@@ -466,59 +468,29 @@ class DualGPUSolver:
             if score_add > 5:
                 text = indices_to_text(plaintext_add)
                 with self.results_lock:
-                    self.all_results.append((score_add, f"PHI_SEQ_START_{start_idx}_ADD", "PHI_ADD", text))
+                    self.all_results.append((score_add, f"PHI_SEQ_START_{start_idx}_ADD", "PHI_ADD", text,
+                                             key_seq.tolist()))
 
 # =============================================================================
 # RUNNING KEY ATTACK WITH SELF-RELIANCE
 # =============================================================================
 
-def load_self_reliance() -> str:
-    """Load Self-Reliance essay."""
-    paths = [
-        Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/Self-Reliance.txt"),
-        Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/Self-Reliance.txt"),
-    ]
-    
-    for path in paths:
-        if path.exists():
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
-    
-    return ""
+def load_self_reliance() -> Optional[np.ndarray]:
+    """Self-Reliance essay as rune indices (shared corpus store), None if missing."""
+    try:
+        return load_corpus('self_reliance').runes.astype(np.int32)
+    except (KeyError, OSError):
+        return None
 
 def text_to_indices(text: str) -> np.ndarray:
-    """Convert text to Gematria indices."""
-    indices = []
-    text = text.upper()
-    i = 0
-    while i < len(text):
-        found = False
-        # Check for digraphs first
-        if i + 1 < len(text):
-            digraph = text[i:i+2]
-            for idx, lat in INDEX_TO_LATIN.items():
-                if lat == digraph:
-                    indices.append(idx)
-                    i += 2
-                    found = True
-                    break
-        
-        if not found:
-            c = text[i]
-            for idx, lat in INDEX_TO_LATIN.items():
-                if lat == c or (len(lat) == 1 and lat == c):
-                    indices.append(idx)
-                    break
-            i += 1
-    
-    return np.array(indices, dtype=np.int32)
+    """Convert text to Gematria indices (shared corpus-store tokenizer)."""
+    return tokenize(text).astype(np.int32)
 
-def running_key_attack(cipher: np.ndarray, key_text: str, verbose: bool = True) -> List[Tuple[float, str, str, str]]:
+def running_key_attack(cipher: np.ndarray, key_indices: np.ndarray, verbose: bool = True) -> List[Tuple[float, str, str, str, List[int]]]:
     """
-    Try running key attack using a long text (like Self-Reliance).
+    Try running key attack using a long transliterated text (like Self-Reliance).
     Tests all possible starting positions in the key text.
     """
-    key_indices = text_to_indices(key_text)
     results = []
     
     cipher_len = len(cipher)
@@ -539,14 +511,14 @@ def running_key_attack(cipher: np.ndarray, key_text: str, verbose: bool = True)
         score = score_detailed_cpu(plaintext)
         if score > 10:
             text = indices_to_text(plaintext)
-            results.append((score, f"RUNNING_KEY_START_{start}", "RK_SUB", text))
+            results.append((score, f"RUNNING_KEY_START_{start}", "RK_SUB", text, key_segment.tolist()))
         
         # ADD mode
         plaintext_add = (cipher + key_segment) % ALPHABET_SIZE
         score_add = score_detailed_cpu(plaintext_add)
         if score_add > 10:
             text = indices_to_text(plaintext_add)
-            results.append((score_add, f"RUNNING_KEY_START_{start}_ADD", "RK_ADD", text))
+            results.append((score_add, f"RUNNING_KEY_START_{start}_ADD", "RK_ADD", text, key_segment.tolist()))
     
     results.sort(reverse=True, key=lambda x: x[0])
     return results[:50]
@@ -591,7 +563,7 @@ def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md")
             results = solver.solve_page(page_num)
             
             # Running key attack if we have Self-Reliance
-            if self_reliance:
+            if self_reliance is not None:
                 cipher = solver.load_cipher(page_num)
                 rk_results = running_key_attack(cipher, self_reliance, verbose=True)
                 results.extend(rk_results)
@@ -609,8 +581,7 @@ def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md")
     total_time = time.time() - start_time
     
     # Save results
-    save_results_markdown(all_page_results, output_path, total_time)
-    save_results_json(all_page_results, output_path.replace('.md', '.json'), total_time)
+    save_results(all_page_results, output_path, total_time)
     
     print("\n" + "=" * 70)
     print("BATCH ATTACK COMPLETE")
@@ -622,90 +593,21 @@ def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md")
     
     return all_page_results
 
-def save_results_markdown(results: Dict, output_path: str, total_time: float):
-    """Save results to markdown."""
-    lines = [
-        "# AGGRESSIVE GPU BATCH ATTACK RESULTS",
-        "",
-        f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"**Duration:** {total_time:.2f} seconds ({total_time/60:.2f} minutes)",
-        f"**Pages Analyzed:** {len(results)}",
-        "",
-        "---",
-        "",
-        "## Summary",
-        "",
-        "| Page | Top Score | Key | Mode | Preview |",
-        "|------|-----------|-----|------|---------|",
-    ]
-    
-    for page_num in sorted(results.keys()):
-        page_results = results[page_num]
-        if page_results:
-            top = page_results[0]
-            preview = top[3][:40].replace('|', '\\|').replace('\n', ' ')
-            lines.append(f"| {page_num:02d} | {top[0]:.1f} | `{top[1][:20]}` | {top[2]} | {preview}... |")
-        else:
-            lines.append(f"| {page_num:02d} | - | - | - | No results |")
-    
-    lines.extend(["", "---", "", "## Detailed Results", ""])
-    
-    for page_num in sorted(results.keys()):
-        page_results = results[page_num]
-        lines.append(f"### Page {page_num:02d}")
-        lines.append("")
-        
-        if not page_results:
-            lines.append("*No valid results found.*")
-            lines.append("")
-            continue
-        
-        lines.append("| Rank | Score | Key | Mode | Preview |")
-        lines.append("|------|-------|-----|------|---------|")
-        
-        for i, (score, key, mode, text) in enumerate(page_results[:10], 1):
-            preview = text[:50].replace('|', '\\|').replace('\n', ' ')
-            lines.append(f"| {i} | {score:.1f} | `{key[:25]}` | {mode} | {preview}... |")
-        
-        lines.append("")
-        
-        # Best decryption
-        if page_results:
-            best = page_results[0]
-            lines.extend([
-                "**Best Decryption:**",
-                "```",
-                best[3][:500],
-                "```",
-                "",
-            ])
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
-    
-    print(f"[SAVED] {output_path}")
-
-def save_results_json(results: Dict, output_path: str, total_time: float):
-    """Save results to JSON."""
-    output = {
-        'metadata': {
-            'date': datetime.now().isoformat(),
-            'duration_seconds': total_time,
-            'pages_analyzed': len(results),
-        },
-        'results': {
-            str(page): [
-                {'score': float(s), 'key': k, 'mode': m, 'text': t}
-                for s, k, m, t in page_results
-            ]
-            for page, page_results in results.items()
-        }
-    }
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2)
-    
-    print(f"[SAVED] {output_path}")
+def save_results(results: Dict, output_path: str, total_time: float):
+    """Record the hits in the results database and write the Markdown / JSON views."""
+    with ResultsDB() as db:
+        run_id = db.start_run('gpu_batch_attack', {'pages': sorted(results)})
+        with db.writer(run_id) as writer:
+            for page_num, page_results in results.items():
+                writer.extend(ResultRecord(page_num, score, 'VIGENERE', key_name, mode, plaintext=text, key=key)
+                              for score, key_name, mode, text, key in page_results)
+        db.finish_run(run_id, total_time)
+        md, js = write_reports(db, run_id, Path(output_path), "AGGRESSIVE GPU BATCH ATTACK RESULTS",
+                               {'Pages Analyzed': len(results)})
+    
+    print(f"[SAVED] run {run_id} -> {db.path}")
+    print(f"[SAVED] {md}")
+    print(f"[SAVED] {js}")
 
 # =============================================================================
 # MAIN
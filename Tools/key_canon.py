@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+KEY CANONICALIZATION AND EQUIVALENCE PRUNING
+============================================
+
+Many generated (key, mode) candidates provably decrypt to the same
+plaintext. Every additive mode, Caesar shift, Atbash and affine-only
+chain is one mod-29 affine map per position:
+
+    p[i] = a * c[i] + K[i mod L]        a in {+1, -1}
+
+    SUB        p = c - k        a = +1   K = -k
+    ADD        p = c + k        a = +1   K = +k
+    SUB_REV    p = k - c        a = -1   K = +k
+    BEAUFORT   p = k - c        a = -1   K = +k   (same formula as SUB_REV)
+    ADD_REV    p = -c - k       a = -1   K = -k
+    CAESAR t   p = c - t        a = +1   K = [-t]
+    ATBASH     p = 28 - c       a = -1   K = [28]
+
+The normal form is (a, K reduced to its minimal period), so e.g.
+    WORD_X_INV / SUB   == WORD_X / ADD
+    WORD_X+s / SUB     == CAESAR_s + VIG_X chain
+    CAESAR_t key / SUB == Caesar shift t
+    [5, 5, 5] / ADD    == [5] / ADD
+all share one form. XOR is not affine; its form is the minimal-period key.
+
+plan_keys() computes the forms of a whole key space x modes in packed
+batches, keeps the first candidate of every class and records the others
+as its aliases. With rotations=True keys that only differ in phase are
+also merged (valid only when every start phase is tried anyway).
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from math import gcd
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from key_space import KeySpace, extend_keys
+from master_dictionary import ALPHABET_SIZE
+
+ATBASH_CONSTANT = ALPHABET_SIZE - 1
+
+# mode -> (a, sign of key in K); None = not affine
+MODE_FORMS: Dict[str, Optional[Tuple[int, int]]] = {
+    'SUB': (1, -1),
+    'ADD': (1, 1),
+    'SUB_REV': (-1, 1),
+    'BEAUFORT': (-1, 1),
+    'ADD_REV': (-1, -1),
+    'XOR': None,
+}
+
+MAX_CHAIN_PERIOD = 10000    # Chains whose combined key is longer stay opaque
+
+# =============================================================================
+# NORMAL FORMS
+# =============================================================================
+
+@dataclass(frozen=True)
+class AffineForm:
+    """p[i] = a * c[i] + key[i mod len(key)] (mod 29), key at minimal period."""
+    a: int
+    key: Tuple[int, ...]
+
+    @property
+    def signature(self) -> bytes:
+        return bytes([0 if self.a == 1 else 1]) + bytes(self.key)
+
+def minimal_period(key: Sequence[int]) -> int:
+    """Smallest p dividing len(key) with key[i] == key[i + p]."""
+    n = len(key)
+    for p in range(1, n + 1):
+        if n % p == 0 and all(key[i] == key[i + p] for i in range(n - p)):
+            return p
+    return n
+
+def reduce_key(key: Sequence[int]) -> Tuple[int, ...]:
+    key = tuple(int(k) % ALPHABET_SIZE for k in key)
+    return key[:minimal_period(key)]
+
+def min_rotation(key: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Lexicographically smallest rotation (phase-free representative)."""
+    return min(key[i:] + key[:i] for i in range(max(1, len(key))))
+
+def affine_form(key: Sequence[int], mode: str) -> Optional[AffineForm]:
+    """Normal form of a repeating key under an additive mode (None for XOR etc.)."""
+    spec = MODE_FORMS.get(mode)
+    if spec is None or len(key) == 0:
+        return None
+    a, sign = spec
+    return AffineForm(a, reduce_key([sign * int(k) for k in key]))
+
+def caesar_form(shift: int) -> AffineForm:
+    return AffineForm(1, ((-shift) % ALPHABET_SIZE,))
+
+ATBASH_FORM = AffineForm(-1, (ATBASH_CONSTANT,))
+
+def chain_form(steps: Sequence[Tuple[str, Any, str]]) -> Optional[AffineForm]:
+    """Compose (cipher, params, mode) chain steps into one affine form.
+
+    Returns None as soon as a step is not position-wise affine (reversal,
+    transposition, Porta, ...), in which case the chain stays opaque.
+    """
+    a, K = 1, (0,)
+    for cipher_name, params, mode in steps:
+        if cipher_name == 'CAESAR':
+            K = tuple((k - params) % ALPHABET_SIZE for k in K)
+        elif cipher_name == 'ATBASH':
+            a, K = -a, tuple((ATBASH_CONSTANT - k) % ALPHABET_SIZE for k in K)
+        elif cipher_name == 'SUBSTITUTION' and mode in ('SUB', 'ADD') and len(params) > 0:
+            sign = -1 if mode == 'SUB' else 1
+            period = len(K) * len(params) // gcd(len(K), len(params))
+            if period > MAX_CHAIN_PERIOD:
+                return None
+            K = tuple((K[i % len(K)] + sign * int(params[i % len(params)])) % ALPHABET_SIZE
+                      for i in range(period))
+        else:
+            return None
+        K = reduce_key(K)
+    return AffineForm(a, K)
+
+# =============================================================================
+# DEDUPLICATED DISPATCH PLANS
+# =============================================================================
+
+@dataclass
+class KeyPlan:
+    """Unique (key, mode) tasks of a key space, sorted by key index."""
+    keys: KeySpace
+    modes: List[str]
+    key_idx: np.ndarray                             # (tasks,) int64
+    mode_idx: np.ndarray                            # (tasks,) int8
+    candidates: int                                 # (key, mode) pairs before pruning
+    aliases: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+    signatures: Dict[bytes, str] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.key_idx)
+
+    @property
+    def pruned(self) -> int:
+        return self.candidates - len(self)
+
+    def summary(self) -> str:
+        pct = 100.0 * self.pruned / max(1, self.candidates)
+        return f"{self.candidates} candidates -> {len(self)} unique ({self.pruned} equivalent, {pct:.1f}% pruned)"
+
+    def aliases_of(self, key_name: str, mode: str) -> List[str]:
+        return self.aliases.get((key_name, mode), [])
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        """Split the task list into at most `count` contiguous ranges."""
+        n = len(self)
+        count = max(1, min(count, n))
+        bounds = np.linspace(0, n, count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def shard(self, lo: int, hi: int) -> 'KeyPlan':
+        """Tasks lo..hi over a lazy view of just the keys they need (no alias tables)."""
+        k_idx = self.key_idx[lo:hi]
+        first = int(k_idx[0]) if len(k_idx) else 0
+        last = int(k_idx[-1]) + 1 if len(k_idx) else 0
+        return KeyPlan(self.keys.shard(first, last), self.modes, k_idx - first,
+                       self.mode_idx[lo:hi], hi - lo)
+
+    def by_mode(self, n: int) -> Iterator[Tuple[str, np.ndarray, List[str]]]:
+        """(mode, (m, n) extended keys, key names) for every mode with tasks."""
+        if len(self) == 0:
+            return
+        lo, hi = int(self.key_idx[0]), int(self.key_idx[-1]) + 1
+        packed, lengths = self.keys.packed(lo, hi)
+        names = self.keys.names(lo, hi)
+        for m, mode in enumerate(self.modes):
+            rows = self.key_idx[self.mode_idx == m] - lo
+            if len(rows):
+                yield mode, extend_keys(packed[rows], lengths[rows], n), [names[r] for r in rows]
+
+def _row_periods(block: np.ndarray) -> np.ndarray:
+    """Minimal period of every row of an (r, L) block."""
+    rows, length = block.shape
+    period = np.full(rows, length, dtype=np.int64)
+    open_rows = np.ones(rows, dtype=bool)
+    for p in range(1, length):
+        if length % p:
+            continue
+        fits = open_rows & (block[:, p:] == block[:, :-p]).all(axis=1)
+        period[fits] = p
+        open_rows &= ~fits
+        if not open_rows.any():
+            break
+    return period
+
+def _signatures(packed: np.ndarray, lengths: np.ndarray, mode: str, rotations: bool) -> List[bytes]:
+    """Normal-form signature of every packed key under one mode."""
+    spec = MODE_FORMS.get(mode)
+    if spec is None:
+        tag, K = 2, packed.astype(np.int16)
+    else:
+        a, sign = spec
+        tag, K = (0 if a == 1 else 1), (sign * packed.astype(np.int16)) % ALPHABET_SIZE
+    K = K.astype(np.uint8)
+    sigs: List[bytes] = [b''] * len(K)
+    for length in np.unique(lengths):
+        rows = np.flatnonzero(lengths == length)
+        block = K[rows, :length]
+        periods = _row_periods(block)
+        for r, row, p in zip(rows, block, periods):
+            key = tuple(row[:p].tolist())
+            if rotations:
+                key = min_rotation(key)
+            sigs[r] = bytes([tag]) + bytes(key)
+    return sigs
+
+def plan_keys(keys: KeySpace, modes: Sequence[str],
+              covered: Optional[Dict[AffineForm, str]] = None,
+              rotations: bool = False, batch: int = 65536) -> KeyPlan:
+    """Deduplicate keys x modes by normal form before dispatch.
+
+    `covered` maps forms already tried elsewhere (Caesar shifts, Atbash) to
+    their labels; candidates equal to them are dropped as aliases too.
+    """
+    modes = list(modes)
+    seen: Dict[bytes, str] = {}
+    if covered:
+        for form, label in covered.items():
+            seen.setdefault(form.signature, label)
+    key_idx, mode_idx = [], []
+    alias_lists: Dict[str, List[str]] = {}
+
+    for lo in range(0, len(keys), batch):
+        hi = min(lo + batch, len(keys))
+        packed, lengths = keys.packed(lo, hi)
+        names = keys.names(lo, hi)
+        per_mode = [_signatures(packed, lengths, mode, rotations) for mode in modes]
+        for r in range(hi - lo):
+            for m, mode in enumerate(modes):
+                sig, label = per_mode[m][r], f"{names[r]}/{mode}"
+                first = seen.get(sig)
+                if first is None:
+                    seen[sig] = label
+                    key_idx.append(lo + r)
+                    mode_idx.append(m)
+                else:
+                    alias_lists.setdefault(first, []).append(label)
+
+    aliases = {}
+    for label, others in alias_lists.items():
+        name, _, mode = label.rpartition('/')
+        aliases[(name, mode)] = others
+    return KeyPlan(keys, modes, np.array(key_idx, dtype=np.int64), np.array(mode_idx, dtype=np.int8),
+                   len(keys) * len(modes), aliases, seen)
+
+def single_layer_forms() -> Dict[AffineForm, str]:
+    """Forms of the standalone Caesar shifts and Atbash."""
+    forms = {caesar_form(t): f"CAESAR/SHIFT_{t}" for t in range(ALPHABET_SIZE)}
+    forms.setdefault(ATBASH_FORM, "ATBASH/MIRROR")
+    return forms
+
+def prune_chains(chains: Sequence[Any], plan: KeyPlan) -> Tuple[List[Any], Dict[str, str]]:
+    """Drop chains whose composed form equals an earlier chain or a planned
+    key (chains need .name and .steps). Returns (kept, chain name -> alias of)."""
+    kept, dropped = [], {}
+    for chain in chains:
+        form = chain_form(chain.steps)
+        if form is None:
+            kept.append(chain)
+            continue
+        first = plan.signatures.get(form.signature)
+        if first is None:
+            plan.signatures[form.signature] = chain.name
+            kept.append(chain)
+        else:
+            dropped[chain.name] = first
+    return kept, dropped
+
+def main():
+    parser = argparse.ArgumentParser(description="Count equivalent (key, mode) candidates")
+    parser.add_argument("--modes", nargs='+', default=['SUB', 'ADD', 'SUB_REV', 'ADD_REV', 'BEAUFORT', 'XOR'])
+    parser.add_argument("--rotations", action="store_true", help="Also merge keys differing only in phase")
+    parser.add_argument("--show", type=int, default=10, help="Alias groups to print")
+    args = parser.parse_args()
+
+    from key_space import CompositeSpace, ListSpace, SequenceSpace, transform_product
+    from master_dictionary import CICADA_TERMS, FIBONACCI_MOD_29, PRIMES_MOD_29
+    keys = CompositeSpace([
+        ListSpace([(f"CAESAR_{i}", [i]) for i in range(ALPHABET_SIZE)]),
+        ListSpace.from_words('WORD_', CICADA_TERMS, transform_product(shifts=range(29), reverse=True, negate=True)),
+        SequenceSpace('PRIMES', PRIMES_MOD_29, range(3, 30), range(0, 100)),
+        SequenceSpace('FIB', FIBONACCI_MOD_29, range(3, 30), range(0, 60)),
+    ])
+    plan = plan_keys(keys, args.modes, covered=single_layer_forms(), rotations=args.rotations)
+    print(f"[CANON] {plan.summary()}")
+    groups = sorted(plan.aliases.items(), key=lambda kv: -len(kv[1]))
+    for (name, mode), others in groups[:args.show]:
+        print(f"  {name}/{mode}: {len(others)} aliases, e.g. {', '.join(others[:3])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+LAZY KEY-SPACE DESCRIPTORS
+==========================
+
+Key spaces as sized, indexable descriptors instead of eagerly built
+dicts of Python lists.
+
+A descriptor only stores what the keys are made of (a base sequence,
+offsets, lengths, transforms, a word list, a random seed), so it is a few
+KB no matter how many keys it describes and is cheap to pickle into
+worker processes. Any key is reconstructed from its index on demand:
+
+    space = CompositeSpace([
+        SequenceSpace('PRIMES', PRIMES_MOD_29, lengths=[20, 50], offsets=range(0, 200, 10),
+                      transforms=transform_product(reverse=True)),
+        ListSpace.from_words('WORD_', ['DIVINITY', 'KOAN'], transform_product(shifts=[0, 7])),
+    ])
+    len(space)                      # number of keys
+    space.name(i), space.key(i)     # one key
+    for lo, hi in space.shards(8):  # index ranges for workers
+        keys, lengths = space.packed(lo, hi)   # (m, max_len) uint8 + (m,) lengths
+
+PackedSpace.from_space(space) materialises a space into flat arrays for
+sharing with workers through shared memory (see shared_data).
+
+Transforms (applied in this order):
+    shift s    k + s mod 29        suffix +s
+    reverse    k[::-1]             suffix _REV
+    negate     -k mod 29           suffix _INV
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from master_dictionary import ALPHABET_SIZE, text_to_key
+
+# =============================================================================
+# TRANSFORMS
+# =============================================================================
+
+@dataclass(frozen=True)
+class Transform:
+    """Shift, then reverse, then negate a key."""
+    shift: int = 0
+    reverse: bool = False
+    negate: bool = False
+
+    @property
+    def suffix(self) -> str:
+        return (f"+{self.shift}" if self.shift else "") + \
+               ("_REV" if self.reverse else "") + ("_INV" if self.negate else "")
+
+    def apply(self, keys: np.ndarray) -> np.ndarray:
+        """Apply to a (m, L) block of equal-length keys."""
+        out = keys.astype(np.int16)
+        if self.shift:
+            out = (out + self.shift) % ALPHABET_SIZE
+        if self.reverse:
+            out = out[:, ::-1]
+        if self.negate:
+            out = (-out) % ALPHABET_SIZE
+        return out.astype(np.uint8)
+
+IDENTITY = Transform()
+
+def transform_product(shifts: Iterable[int] = (0,), reverse: bool = False,
+                      negate: bool = False) -> List[Transform]:
+    """Every combination of the given shifts with/without reverse and negate."""
+    return [Transform(s, r, n) for s in shifts
+            for r in ((False, True) if reverse else (False,))
+            for n in ((False, True) if negate else (False,))]
+
+# =============================================================================
+# BASE CLASS
+# =============================================================================
+
+class KeySpace:
+    """Sized, indexable collection of (name, key) pairs generated on demand."""
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def name(self, i: int) -> str:
+        raise NotImplementedError
+
+    def key(self, i: int) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def max_length(self) -> int:
+        raise NotImplementedError
+
+    def names(self, lo: int = 0, hi: Optional[int] = None) -> List[str]:
+        hi = len(self) if hi is None else hi
+        return [self.name(i) for i in range(lo, hi)]
+
+    def packed(self, lo: int = 0, hi: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Keys lo..hi as a zero-padded (m, max_len) uint8 matrix plus lengths."""
+        hi = len(self) if hi is None else hi
+        keys = [self.key(i) for i in range(lo, hi)]
+        return _pad(keys)
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        """Split into at most `count` contiguous, near-equal index ranges."""
+        n = len(self)
+        count = max(1, min(count, n))
+        bounds = np.linspace(0, n, count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def shard(self, lo: int, hi: int) -> 'ShardSpace':
+        """Lazy view of keys lo..hi (what a worker receives)."""
+        return ShardSpace(self, lo, hi)
+
+    def index_of(self, name: str) -> Optional[int]:
+        """Index of a key by name (linear scan over names)."""
+        for i in range(len(self)):
+            if self.name(i) == name:
+                return i
+        return None
+
+    # Dict-style access so existing `for name, key in keys.items()` loops keep working
+    def items(self) -> Iterator[Tuple[str, np.ndarray]]:
+        return iter(self)
+
+    def __iter__(self) -> Iterator[Tuple[str, np.ndarray]]:
+        for i in range(len(self)):
+            yield self.name(i), self.key(i)
+
+    def __contains__(self, name: str) -> bool:
+        return self.index_of(name) is not None
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            i = self.index_of(item)
+            if i is None:
+                raise KeyError(item)
+            return self.key(i)
+        if isinstance(item, slice):
+            lo, hi, step = item.indices(len(self))
+            return [(self.name(i), self.key(i)) for i in range(lo, hi, step)]
+        i = item + len(self) if item < 0 else item
+        return self.name(i), self.key(i)
+
+def _pad(keys: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.array([len(k) for k in keys], dtype=np.int32)
+    out = np.zeros((len(keys), int(lengths.max()) if len(keys) else 0), dtype=np.uint8)
+    for row, k in enumerate(keys):
+        out[row, :len(k)] = k
+    return out, lengths
+
+def extend_keys(packed: np.ndarray, lengths: np.ndarray, n: int) -> np.ndarray:
+    """Repeat every packed key to n positions: (m, max_len) -> (m, n)."""
+    cols = np.arange(n)[None, :] % lengths[:, None]
+    return np.take_along_axis(packed, cols, axis=1)
+
+# =============================================================================
+# CONCRETE SPACES
+# =============================================================================
+
+class SequenceSpace(KeySpace):
+    """Windows of a base sequence: length x offset x transform.
+
+    Only windows that fit inside the sequence exist. Names come from
+    `template` (fields: label, offset, length) plus the transform suffix.
+    """
+
+    def __init__(self, label: str, sequence: Sequence[int], lengths: Iterable[int],
+                 offsets: range = range(1), transforms: Sequence[Transform] = (IDENTITY,),
+                 template: str = "{label}_S{offset}_L{length}"):
+        self.label = label
+        # Reduce in Python first: recurrence terms overflow int64
+        self.sequence = np.array([int(v) % ALPHABET_SIZE for v in sequence], dtype=np.uint8)
+        self.offsets = offsets
+        self.transforms = list(transforms)
+        self.template = template
+        n = len(self.sequence)
+        # Number of offsets whose window of each length fits
+        self.lengths = []
+        counts = []
+        for length in lengths:
+            fit = len(range(offsets.start, min(offsets.stop, n - length + 1), offsets.step)) \
+                if length > 0 else 0
+            if fit > 0:
+                self.lengths.append(int(length))
+                counts.append(fit)
+        self.counts = np.array(counts, dtype=np.int64)
+        self.cum = np.concatenate([[0], np.cumsum(self.counts * len(self.transforms))])
+
+    def __len__(self) -> int:
+        return int(self.cum[-1])
+
+    @property
+    def max_length(self) -> int:
+        return max(self.lengths, default=0)
+
+    def _decode(self, idx: np.ndarray):
+        group = np.searchsorted(self.cum, idx, side='right') - 1
+        rest = idx - self.cum[group]
+        t = len(self.transforms)
+        offset = self.offsets.start + (rest // t) * self.offsets.step
+        return group, offset, rest % t
+
+    def name(self, i: int) -> str:
+        group, offset, tr = (int(x[0]) for x in self._decode(np.array([i])))
+        return self.template.format(label=self.label, offset=offset, length=self.lengths[group]) + \
+            self.transforms[tr].suffix
+
+    def key(self, i: int) -> np.ndarray:
+        keys, lengths = self.packed(i, i + 1)
+        return keys[0, :lengths[0]]
+
+    def packed(self, lo: int = 0, hi: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        hi = len(self) if hi is None else hi
+        idx = np.arange(lo, hi)
+        group, offset, tr = self._decode(idx)
+        lengths = np.array(self.lengths, dtype=np.int32)[group] if len(idx) else np.zeros(0, np.int32)
+        out = np.zeros((len(idx), int(lengths.max()) if len(idx) else 0), dtype=np.uint8)
+        for g in np.unique(group):
+            length = self.lengths[g]
+            for t in np.unique(tr[group == g]):
+                rows = np.flatnonzero((group == g) & (tr == t))
+                windows = self.sequence[offset[rows, None] + np.arange(length)]
+                out[rows, :length] = self.transforms[t].apply(windows)
+        return out, lengths
+
+class ListSpace(KeySpace):
+    """Explicit base keys (word lists, known keys) x transforms."""
+
+    def __init__(self, entries: Sequence[Tuple[str, Sequence[int]]],
+                 transforms: Sequence[Transform] = (IDENTITY,)):
+        self.entries = [(name, (np.asarray(k, dtype=np.int64) % ALPHABET_SIZE).astype(np.uint8))
+                        for name, k in entries if len(k) > 0]
+        self.transforms = list(transforms)
+
+    @classmethod
+    def from_words(cls, prefix: str, words: Iterable[str],
+                   transforms: Sequence[Transform] = (IDENTITY,)) -> 'ListSpace':
+        return cls([(f"{prefix}{w}", text_to_key(w)) for w in words], transforms)
+
+    def __len__(self) -> int:
+        return len(self.entries) * len(self.transforms)
+
+    @property
+    def max_length(self) -> int:
+        return max((len(k) for _, k in self.entries), default=0)
+
+    def name(self, i: int) -> str:
+        e, t = divmod(i, len(self.transforms))
+        return self.entries[e][0] + self.transforms[t].suffix
+
+    def key(self, i: int) -> np.ndarray:
+        e, t = divmod(i, len(self.transforms))
+        return self.transforms[t].apply(self.entries[e][1][None, :])[0]
+
+class RandomSpace(KeySpace):
+    """Reproducible random keys: key j depends only on (seed, j), so any
+    shard regenerates exactly its own keys, and transforms of key j are
+    transforms of the same draw."""
+
+    def __init__(self, label: str, count: int, min_length: int, max_length: int,
+                 seed: int = 3301, transforms: Sequence[Transform] = (IDENTITY,),
+                 template: str = "{label}_{index}"):
+        self.label = label
+        self.template = template
+        self.count = count
+        self.min_length = min_length
+        self._max_length = max_length
+        self.seed = seed
+        self.transforms = list(transforms)
+
+    def __len__(self) -> int:
+        return self.count * len(self.transforms)
+
+    @property
+    def max_length(self) -> int:
+        return self._max_length
+
+    def name(self, i: int) -> str:
+        j, t = divmod(i, len(self.transforms))
+        return self.template.format(label=self.label, index=j) + self.transforms[t].suffix
+
+    def key(self, i: int) -> np.ndarray:
+        j, t = divmod(i, len(self.transforms))
+        rng = np.random.default_rng((self.seed, j))
+        length = int(rng.integers(self.min_length, self._max_length + 1))
+        draw = rng.integers(0, ALPHABET_SIZE, size=length).astype(np.uint8)
+        return self.transforms[t].apply(draw[None, :])[0]
+
+class CompositeSpace(KeySpace):
+    """Concatenation of key spaces."""
+
+    def __init__(self, parts: Sequence[KeySpace]):
+        self.parts = [p for p in parts if len(p) > 0]
+        self.cum = np.concatenate([[0], np.cumsum([len(p) for p in self.parts])]).astype(np.int64)
+
+    def __len__(self) -> int:
+        return int(self.cum[-1])
+
+    @property
+    def max_length(self) -> int:
+        return max((p.max_length for p in self.parts), default=0)
+
+    def _part(self, i: int) -> Tuple[KeySpace, int]:
+        p = int(np.searchsorted(self.cum, i, side='right') - 1)
+        return self.parts[p], i - int(self.cum[p])
+
+    def name(self, i: int) -> str:
+        part, j = self._part(i)
+        return part.name(j)
+
+    def key(self, i: int) -> np.ndarray:
+        part, j = self._part(i)
+        return part.key(j)
+
+    def _split(self, lo: int, hi: int):
+        for p, part in enumerate(self.parts):
+            a, b = max(lo, int(self.cum[p])), min(hi, int(self.cum[p + 1]))
+            if a < b:
+                yield part, a - int(self.cum[p]), b - int(self.cum[p])
+
+    def names(self, lo: int = 0, hi: Optional[int] = None) -> List[str]:
+        hi = len(self) if hi is None else hi
+        return list(itertools.chain.from_iterable(part.names(a, b) for part, a, b in self._split(lo, hi)))
+
+    def packed(self, lo: int = 0, hi: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        hi = len(self) if hi is None else hi
+        blocks = [part.packed(a, b) for part, a, b in self._split(lo, hi)]
+        if not blocks:
+            return np.zeros((0, 0), dtype=np.uint8), np.zeros(0, dtype=np.int32)
+        width = max(k.shape[1] for k, _ in blocks)
+        keys = np.concatenate([np.pad(k, ((0, 0), (0, width - k.shape[1]))) for k, _ in blocks])
+        return keys, np.concatenate([l for _, l in blocks])
+
+    def index_of(self, name: str) -> Optional[int]:
+        for p, part in enumerate(self.parts):
+            j = part.index_of(name)
+            if j is not None:
+                return int(self.cum[p]) + j
+        return None
+
+class ShardSpace(KeySpace):
+    """Contiguous index range of another space."""
+
+    def __init__(self, parent: KeySpace, lo: int, hi: int):
+        self.parent, self.lo, self.hi = parent, lo, hi
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    @property
+    def max_length(self) -> int:
+        return self.parent.max_length
+
+    def name(self, i: int) -> str:
+        return self.parent.name(self.lo + i)
+
+    def key(self, i: int) -> np.ndarray:
+        return self.parent.key(self.lo + i)
+
+    def names(self, lo: int = 0, hi: Optional[int] = None) -> List[str]:
+        hi = len(self) if hi is None else hi
+        return self.parent.names(self.lo + lo, self.lo + hi)
+
+    def packed(self, lo: int = 0, hi: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        hi = len(self) if hi is None else hi
+        return self.parent.packed(self.lo + lo, self.lo + hi)
+
+class PackedSpace(KeySpace):
+    """A space materialised into flat arrays: concatenated keys with their
+    offsets, plus a name blob with its offsets. Bigger than the descriptor
+    it came from, but every field is a plain array, so workers can attach
+    it from shared memory instead of regenerating keys per shard."""
+
+    def __init__(self, key_blob: np.ndarray, key_offsets: np.ndarray, name_blob: np.ndarray,
+                 name_offsets: np.ndarray):
+        self.key_blob, self.key_offsets = key_blob, key_offsets
+        self.name_blob, self.name_offsets = name_blob, name_offsets
+        self._index: Optional[Dict[str, int]] = None     # name -> first index, built on first lookup
+
+    @staticmethod
+    def _blob(parts: List[np.ndarray], lengths: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        lengths = np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        blob = np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+        return blob.astype(np.uint8), offsets
+
+    @classmethod
+    def from_space(cls, space: KeySpace, batch: int = 65536) -> 'PackedSpace':
+        """Materialise `space` one batch of keys at a time (never as one padded matrix)."""
+        key_parts, key_lengths, name_parts, name_lengths = [], [], [], []
+        for lo in range(0, len(space), batch):
+            hi = min(lo + batch, len(space))
+            keys, lengths = space.packed(lo, hi)
+            key_parts.append(keys[np.arange(keys.shape[1])[None, :] < lengths[:, None]])
+            key_lengths.append(lengths)
+            names = [n.encode() for n in space.names(lo, hi)]
+            name_parts.append(np.frombuffer(b''.join(names), dtype=np.uint8))
+            name_lengths.append(np.array([len(n) for n in names], dtype=np.int64))
+        key_blob, key_offsets = cls._blob(key_parts, key_lengths)
+        name_blob, name_offsets = cls._blob(name_parts, name_lengths)
+        return cls(key_blob, key_offsets, name_blob, name_offsets)
+
+    def __len__(self) -> int:
+        return len(self.key_offsets) - 1
+
+    @property
+    def max_length(self) -> int:
+        return int(np.diff(self.key_offsets).max(initial=0))
+
+    def name(self, i: int) -> str:
+        return self.name_blob[self.name_offsets[i]:self.name_offsets[i + 1]].tobytes().decode()
+
+    def key(self, i: int) -> np.ndarray:
+        return self.key_blob[self.key_offsets[i]:self.key_offsets[i + 1]].copy()
+
+    def index_of(self, name: str) -> Optional[int]:
+        """Index of a key by name (the name blob is decoded once per process)."""
+        if self._index is None:
+            blob, bounds = self.name_blob.tobytes(), self.name_offsets.tolist()
+            self._index = {}
+            for i in range(len(self)):
+                self._index.setdefault(blob[bounds[i]:bounds[i + 1]].decode(), i)
+        return self._index.get(name)
+
+    def packed(self, lo: int = 0, hi: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        hi = len(self) if hi is None else hi
+        starts = self.key_offsets[lo:hi]
+        lengths = (self.key_offsets[lo + 1:hi + 1] - starts).astype(np.int32)
+        cols = np.arange(int(lengths.max(initial=0)))
+        inside = cols[None, :] < lengths[:, None]
+        idx = np.where(inside, starts[:, None] + cols[None, :], 0)
+        return np.where(inside, self.key_blob[idx] if len(self.key_blob) else 0, 0).astype(np.uint8), lengths
+
+if __name__ == "__main__":
+    from master_dictionary import PRIMES_MOD_29, CICADA_TERMS
+    space = CompositeSpace([
+        SequenceSpace('PRIMES', PRIMES_MOD_29, lengths=range(3, 101), offsets=range(0, 1000),
+                      transforms=transform_product(shifts=range(29), reverse=True)),
+        ListSpace.from_words('WORD_', CICADA_TERMS, transform_product(shifts=range(29), reverse=True)),
+        RandomSpace('RANDOM', 1000, 3, 50),
+    ])
+    print(f"{len(space):,} keys described, max length {space.max_length}")
+    for lo, hi in space.shards(4):
+        keys, lengths = space.packed(lo, min(hi, lo + 5))
+        print(f"  shard [{lo:,}, {hi:,}): first {space.name(lo)} = {keys[0, :lengths[0]].tolist()[:10]}")
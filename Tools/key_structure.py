@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+KEYSTREAM STRUCTURE ANALYZER
+============================
+
+Finds the generating rule of a recovered keystream fragment (from a crib,
+crib_engine, or a solved page in verified_keys.json) so the rest of the
+key can be extended and tried immediately.
+
+Models fitted over GF(29) (fragments may contain '?' wildcards):
+- LINEAR_RECURRENCE  k[n] = -(c1 k[n-1] + ... + cL k[n-L])   Berlekamp-Massey
+- PERIODIC           k[n] = k[n-p]
+- POLYNOMIAL         k[i] = a0 + a1 i + ... + ad i^d          (d = 1: affine)
+- MULTIPLICATIVE     k[i] = a g^i + b                          (g = 2..28)
+- DIFFERENCE_*       the same periodic / polynomial checks on the first and
+                     second differences (gap cycles, see cyclic_gap_solver)
+
+Every model is scored by how many known terms it predicts beyond the ones
+it was fitted from. Significance is -log10 of the chance a uniform random
+key does as well (binomial tail, 1/29 per term), less log10 of the number
+of models of its family tried:
+
+    significance = -log10 P[Bin(known - parameters, 1/29) >= matches - parameters]
+                   - log10(tried)
+
+Berlekamp-Massey always returns some recurrence; it only counts when the
+fragment is longer than twice its linear complexity.
+
+    models = analyze_key(fragment)
+    key = models[0].extend(500)
+    plain = decrypt(load_page_indices(page), key, 'SUB')
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from keystream_index import parse_fragment
+from master_dictionary import ALPHABET_SIZE, INDEX_TO_LATIN, load_page_indices
+from rune_ngrams import default_model
+
+P = ALPHABET_SIZE
+LOG10_P = math.log10(P)
+VERIFIED_KEYS_PATH = Path(__file__).parent / "verified_keys.json"
+MAX_DEGREE = 3
+MODES = ('SUB', 'ADD', 'BEAUFORT')
+
+Fragment = Sequence[Optional[int]]
+
+@dataclass
+class KeyModel:
+    """A generating rule that reproduces a keystream fragment."""
+    kind: str
+    description: str
+    parameters: int             # Terms consumed by the fit
+    matches: int                # Known terms the rule reproduces
+    known: int                  # Known terms in the fragment
+    significance: float
+    generate: Callable[[int], np.ndarray] = field(repr=False)
+
+    @property
+    def exact(self) -> bool:
+        return self.matches == self.known
+
+    def extend(self, length: int) -> np.ndarray:
+        """The first `length` key terms under this rule."""
+        return self.generate(length) % P
+
+# =============================================================================
+# GF(29) ALGEBRA
+# =============================================================================
+
+def inverse(a: int) -> int:
+    return pow(int(a) % P, P - 2, P)
+
+def berlekamp_massey(seq: Sequence[int]) -> List[int]:
+    """Connection polynomial [1, c1, ..., cL] of the shortest recurrence:
+    sum(c[j] * s[n - j]) == 0 for all n >= L."""
+    c, b = [1], [1]
+    length, shift, last = 0, 1, 1
+    for n, s in enumerate(seq):
+        d = (s + sum(c[j] * seq[n - j] for j in range(1, length + 1))) % P
+        if d == 0:
+            shift += 1
+            continue
+        coef = d * inverse(last) % P
+        t = list(c)
+        c += [0] * (len(b) + shift - len(c))
+        for j, bj in enumerate(b):
+            c[j + shift] = (c[j + shift] - coef * bj) % P
+        if 2 * length <= n:
+            length, b, last, shift = n + 1 - length, t, d, 1
+        else:
+            shift += 1
+    return c[:length + 1] + [0] * max(0, length + 1 - len(c))
+
+def run_recurrence(connection: Sequence[int], seed: Sequence[int], length: int,
+                   back: int = 0) -> np.ndarray:
+    """`length` terms from the seed on, preceded by `back` terms run backwards
+    (needs an invertible c_L; -1 where it is not)."""
+    out = list(seed[:length])
+    order = len(connection) - 1
+    while len(out) < length:
+        out.append(-sum(connection[j] * out[-j] for j in range(1, order + 1)) % P)
+    head: List[int] = []
+    if back and order and connection[order] % P:
+        tail_inv = inverse(connection[order])
+        window = list(seed[:order])
+        for _ in range(back):
+            prev = -(window[order - 1] + sum(connection[j] * window[order - 1 - j]
+                                             for j in range(1, order))) * tail_inv % P
+            window = [prev] + window[:-1]
+            head.append(prev)
+    head = head[::-1] if len(head) == back else [-1] * back
+    return np.array(head + out, dtype=np.int64)
+
+def solve_mod(a: np.ndarray, b: np.ndarray) -> Optional[np.ndarray]:
+    """x with a @ x == b (mod 29) from the first rows reaching full column
+    rank, or None if the rows never do."""
+    rows, cols = a.shape
+    basis: List[Tuple[np.ndarray, int]] = []     # reduced rows with pivot column
+    for r in range(rows):
+        row = np.append(a[r] % P, b[r] % P).astype(np.int64)
+        for vec, col in basis:
+            row = (row - row[col] * vec) % P
+        nz = np.flatnonzero(row[:cols])
+        if len(nz) == 0:
+            continue
+        col = int(nz[0])
+        row = row * inverse(row[col]) % P
+        basis = [((vec - vec[col] * row) % P, c) for vec, c in basis]
+        basis.append((row, col))
+        if len(basis) == cols:
+            x = np.zeros(cols, dtype=np.int64)
+            for vec, c in basis:
+                x[c] = vec[cols]
+            return x
+    return None
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+def chance_significance(hits: int, trials: int) -> float:
+    """-log10 P[at least `hits` of `trials` uniform terms match]."""
+    if hits <= 0 or trials <= 0:
+        return 0.0
+    q = 1.0 / P
+    tail = sum(math.comb(trials, k) * q ** k * (1 - q) ** (trials - k)
+               for k in range(hits, trials + 1))
+    return -math.log10(tail) if tail > 0 else hits * LOG10_P
+
+def _known(fragment: Fragment) -> Tuple[np.ndarray, np.ndarray]:
+    pos = np.array([i for i, k in enumerate(fragment) if k is not None], dtype=np.int64)
+    val = np.array([fragment[i] % P for i in pos], dtype=np.int64)
+    return pos, val
+
+def _model(kind: str, description: str, parameters: int, pos: np.ndarray, val: np.ndarray,
+           generate: Callable[[int], np.ndarray], tried: int) -> KeyModel:
+    n = int(pos.max()) + 1 if len(pos) else 0
+    matches = int((generate(n)[pos] % P == val).sum()) if n else 0
+    sig = chance_significance(matches - parameters, len(pos) - parameters) - math.log10(max(tried, 1))
+    return KeyModel(kind, description, parameters, matches, len(pos), sig, generate)
+
+def longest_run(fragment: Fragment) -> Tuple[int, List[int]]:
+    """(start, values) of the longest wildcard-free stretch."""
+    best, start = (0, []), 0
+    for i in range(len(fragment) + 1):
+        if i == len(fragment) or fragment[i] is None:
+            if i - start > len(best[1]):
+                best = (start, [int(v) % P for v in fragment[start:i]])
+            start = i + 1
+    return best
+
+def fit_recurrence(fragment: Fragment) -> Optional[KeyModel]:
+    start, run = longest_run(fragment)
+    if len(run) < 3:
+        return None
+    connection = berlekamp_massey(run)
+    order = len(connection) - 1
+    seed = run[:order]
+
+    def generate(n: int, conn=connection, seed=seed, start=start) -> np.ndarray:
+        # The run may start after a wildcard: run the recurrence back to 0 too
+        if not order:
+            return np.zeros(n, dtype=np.int64)
+        return run_recurrence(conn, seed, max(n - start, 0), back=start)[:n]
+
+    pos, val = _known(fragment)
+    coeffs = ', '.join(str((-x) % P) for x in connection[1:])
+    return _model('LINEAR_RECURRENCE', f"order {order}: k[n] = [{coeffs}] . k[n-1..n-{order}]",
+                  2 * order, pos, val, generate, tried=1)
+
+def fit_periodic(fragment: Fragment, max_period: int = 32, label: str = 'PERIODIC') -> Optional[KeyModel]:
+    pos, val = _known(fragment)
+    for p in range(1, min(max_period, len(fragment) - 1) + 1):
+        table = {}
+        if all(table.setdefault(i % p, v) == v for i, v in zip(pos.tolist(), val.tolist())):
+            cycle = np.array([table.get(r, 0) for r in range(p)], dtype=np.int64)
+            model = _model(label, f"period {p}: {cycle.tolist()}", len(table), pos, val,
+                           lambda n, c=cycle: np.resize(c, n), tried=max_period)
+            return model if model.matches > model.parameters else None
+    return None
+
+def fit_polynomial(fragment: Fragment, degree: int, label: str = 'POLYNOMIAL') -> Optional[KeyModel]:
+    pos, val = _known(fragment)
+    if len(pos) <= degree + 1:
+        return None
+    powers = np.arange(degree + 1)
+    vander = np.array([[pow(int(i), int(d), P) for d in powers] for i in pos], dtype=np.int64)
+    coeffs = solve_mod(vander, val)
+    if coeffs is None:
+        return None
+
+    def generate(n: int, c=coeffs) -> np.ndarray:
+        i = np.arange(n, dtype=np.int64) % P
+        return sum(int(c[d]) * (i ** d % P) for d in range(len(c))) % P
+
+    terms = ' + '.join(f"{int(c)}i^{d}" if d else str(int(c)) for d, c in enumerate(coeffs))
+    kind = 'AFFINE' if degree == 1 and label == 'POLYNOMIAL' else label
+    return _model(kind, f"degree {degree}: k[i] = {terms}", degree + 1, pos, val, generate, tried=1)
+
+def fit_multiplicative(fragment: Fragment) -> Optional[KeyModel]:
+    """Best k[i] = a * g^i + b over every base g."""
+    pos, val = _known(fragment)
+    if len(pos) <= 2:
+        return None
+    best = None
+    for g in range(2, P):
+        basis = np.stack([np.array([pow(g, int(i), P) for i in pos]), np.ones(len(pos), np.int64)], axis=1)
+        ab = solve_mod(basis, val)
+        if ab is None:
+            continue
+        a, b = int(ab[0]), int(ab[1])
+        model = _model('MULTIPLICATIVE', f"k[i] = {a} * {g}^i + {b}", 2, pos, val,
+                       lambda n, a=a, g=g, b=b: (a * np.array([pow(g, i, P) for i in range(n)],
+                                                             dtype=np.int64) + b) % P,
+                       tried=P - 2)
+        if best is None or model.matches > best.matches:
+            best = model
+    return best
+
+def differences(fragment: Fragment) -> List[Optional[int]]:
+    return [None if a is None or b is None else (b - a) % P for a, b in zip(fragment, fragment[1:])]
+
+def _integrate(diff: Callable[[int], np.ndarray], first: int) -> Callable[[int], np.ndarray]:
+    """Generator of the key starting at `first` whose differences follow `diff`."""
+    def generate(n: int) -> np.ndarray:
+        steps = diff(max(n - 1, 0)) % P
+        return ((np.concatenate([[0], np.cumsum(steps)]) + first) % P)[:n]
+    return generate
+
+def fit_differences(fragment: Fragment) -> List[KeyModel]:
+    """Periodic / polynomial models of the first and second differences."""
+    models = []
+    pos, val = _known(fragment)
+    d = list(fragment)
+    for order in (1, 2):
+        d = differences(d)
+        for fitted in (fit_periodic(d, label='DIFFERENCE'), fit_polynomial(d, 1, label='DIFFERENCE')):
+            if fitted is None or fragment[0] is None or (order == 2 and fragment[1] is None):
+                continue
+            diff = fitted.generate
+            if order == 2:
+                diff = _integrate(diff, (fragment[1] - fragment[0]) % P)
+            generate = _integrate(diff, int(fragment[0]))
+            model = _model(f"DIFFERENCE_{order}", f"{'second' if order == 2 else 'first'} "
+                           f"differences {fitted.description}", fitted.parameters + order,
+                           pos, val, generate, tried=32 if 'period' in fitted.description else 1)
+            models.append(model)
+    return models
+
+def analyze_key(fragment: Fragment, min_significance: float = 0.0) -> List[KeyModel]:
+    """Every model that explains the fragment, most significant first."""
+    candidates = [fit_recurrence(fragment), fit_periodic(fragment), fit_multiplicative(fragment)]
+    candidates += [fit_polynomial(fragment, d) for d in range(1, MAX_DEGREE + 1)]
+    candidates += fit_differences(fragment)
+    models = [m for m in candidates if m is not None and m.significance >= min_significance]
+    models.sort(key=lambda m: (-m.significance, m.parameters))
+    return models
+
+# =============================================================================
+# APPLICATION
+# =============================================================================
+
+def decrypt(cipher: Sequence[int], key: Sequence[int], mode: str = 'SUB') -> np.ndarray:
+    """Inverse of word_pattern_index.implied_key."""
+    c = np.asarray(cipher, dtype=np.int64)
+    k = np.asarray(key, dtype=np.int64)[:len(c)]
+    if mode == 'SUB':
+        return (c - k) % P
+    if mode == 'ADD':
+        return (c + k) % P
+    if mode == 'BEAUFORT':
+        return (k - c) % P
+    raise ValueError(f"unknown mode {mode}")
+
+def apply_model(model: KeyModel, pages: Sequence[int], mode: str = 'SUB',
+                continuous: bool = True) -> Dict[int, Tuple[float, str]]:
+    """Decrypt pages with the extended key: (bigram score, Latin) per page.
+
+    continuous=True keeps the key running across the pages in order, as a
+    single keystream spanning a section would."""
+    model_ngrams = default_model()
+    ciphers = {p: load_page_indices(p) for p in pages}
+    total = sum(len(c) for c in ciphers.values())
+    key = model.extend(total if continuous else max((len(c) for c in ciphers.values()), default=0))
+    out, offset = {}, 0
+    for page, cipher in ciphers.items():
+        if not cipher:
+            continue
+        segment = key[offset:offset + len(cipher)] if continuous else key[:len(cipher)]
+        plain = decrypt(cipher, segment, mode)
+        out[page] = (float(model_ngrams.score_matrix(plain)[0]),
+                     ''.join(INDEX_TO_LATIN[int(p)] for p in plain))
+        if continuous:
+            offset += len(cipher)
+    return out
+
+def load_verified_keys(path: Path = VERIFIED_KEYS_PATH) -> Dict[int, List[int]]:
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the generating rule of a keystream fragment")
+    parser.add_argument("--fragment", type=str, default=None, help="'3,14,?,7' or Latin 'EO?PATH'")
+    parser.add_argument("--verified", type=int, default=None, help="Page key from verified_keys.json")
+    parser.add_argument("--apply", type=int, nargs='+', default=None, help="Pages to decrypt with the best model")
+    parser.add_argument("--mode", default='SUB', choices=MODES)
+    parser.add_argument("--min-significance", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.fragment:
+        fragment = parse_fragment(args.fragment)
+    elif args.verified is not None:
+        fragment = load_verified_keys().get(args.verified)
+        if fragment is None:
+            parser.error(f"no verified key for page {args.verified}")
+    else:
+        parser.error("give --fragment or --verified")
+
+    models = analyze_key(fragment, args.min_significance)
+    known = sum(k is not None for k in fragment)
+    print(f"[KEY] {len(fragment)} terms ({known} known): {len(models)} models")
+    for m in models:
+        flag = 'exact' if m.exact else f"{m.matches}/{m.known}"
+        print(f"  {m.significance:6.1f}  {m.kind:<18s} {flag:<7s} {m.description}")
+    if models:
+        print(f"  next terms: {models[0].extend(len(fragment) + 20)[len(fragment):].tolist()}")
+
+    if args.apply and models:
+        for page, (score, latin) in apply_model(models[0], args.apply, args.mode).items():
+            print(f"  page {page:02d} {score:7.3f}  {latin[:70]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+KEYSTREAM FRAGMENT INDEX
+========================
+
+Answers "where could this recovered key fragment have come from?" in
+milliseconds, across every generated and textual key source at once.
+
+Sources (all as mod-29 streams):
+- prime / prime-totient / Fibonacci / Lucas sequences mod 29
+- decimal digits of pi, e, the golden ratio and sqrt(2)
+- reference corpora (corpus_store), key_search_corpus.txt and the solved plaintexts
+  (as rune indices and as Gematria prime values mod 29)
+- every page's ciphertext
+
+Every source is concatenated into one array. The exact base-29 code of
+every k-gram (a rolling hash that cannot collide for k <= 12) is sorted
+once, so a lookup is a binary search plus verification of the full
+fragment. A second table over first differences makes the search
+invariant to an unknown constant shift (key = source + s).
+
+Fragments may contain wildcards (None or -1) at unknown positions.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corpus_store import load_corpus, tokenize
+from master_dictionary import (
+    ALPHABET_SIZE, CORPUS_FILES, FIBONACCI_MOD_29, INDEX_TO_LATIN, INDEX_TO_PRIME,
+    LUCAS_MOD_29, PRIME_TOTIENTS_MOD_29, PRIMES_MOD_29, available_pages,
+    load_page_indices, load_solved_page_texts, text_to_key,
+)
+from math_sequences import CONSTANTS, sequence
+
+WILDCARD = -1
+DEFAULT_K = 4
+
+_PRIME_MOD = np.array([INDEX_TO_PRIME[i] % ALPHABET_SIZE for i in range(ALPHABET_SIZE)], dtype=np.uint8)
+
+# =============================================================================
+# KEY SOURCES
+# =============================================================================
+
+def default_key_sources() -> Dict[str, np.ndarray]:
+    """Named mod-29 streams a recovered key fragment may come from."""
+    sources: Dict[str, Sequence[int]] = {
+        'PRIMES': PRIMES_MOD_29,
+        'TOTIENTS': PRIME_TOTIENTS_MOD_29,
+        'FIBONACCI': FIBONACCI_MOD_29,
+        'LUCAS': LUCAS_MOD_29,
+    }
+    for const in CONSTANTS:
+        sources[f'DIGITS_{const}'] = sequence(f'DIGITS_{const}', 1000)
+
+    # Reference texts come pre-transliterated from the corpus store
+    streams = {}
+    for name in list(CORPUS_FILES) + ['key_search']:
+        try:
+            streams[f'CORPUS_{name.upper()}'] = np.asarray(load_corpus(name).runes)
+        except (KeyError, OSError):
+            continue
+    streams.update({f'PLAINTEXT_P{page:02d}': tokenize(text)
+                    for page, text in load_solved_page_texts().items()})
+    for name, runes in streams.items():
+        sources[name] = runes
+        sources[f'{name}_PRIMEVAL'] = _PRIME_MOD[runes]
+
+    for page in available_pages():
+        sources[f'CIPHER_P{page:02d}'] = load_page_indices(page)
+    return {k: np.asarray(v, dtype=np.uint8) for k, v in sources.items() if len(v) > 0}
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+@dataclass
+class FragmentHit:
+    """One place a fragment occurs: key[i] = (source[offset + i] + shift) mod 29."""
+    source: str
+    offset: int
+    shift: int = 0
+
+def _kgram_codes(stream: np.ndarray, k: int) -> np.ndarray:
+    """Exact base-29 code of every k-gram of a stream."""
+    if len(stream) < k:
+        return np.zeros(0, dtype=np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(stream.astype(np.int64), k)
+    code = np.zeros(len(windows), dtype=np.int64)
+    for i in range(k):
+        code = code * ALPHABET_SIZE + windows[:, i]
+    return code
+
+@dataclass
+class _SortedGrams:
+    codes: np.ndarray       # sorted k-gram codes
+    positions: np.ndarray   # start position in the concatenated stream
+
+def _sorted_grams(data: np.ndarray, starts: np.ndarray, ends: np.ndarray, k: int) -> _SortedGrams:
+    codes = _kgram_codes(data, k)
+    pos = np.arange(len(codes))
+    # Drop k-grams that straddle two sources
+    src = np.searchsorted(starts, pos, side='right') - 1
+    keep = pos + k <= ends[src]
+    codes, pos = codes[keep], pos[keep]
+    order = np.argsort(codes, kind='stable')
+    return _SortedGrams(codes[order], pos[order])
+
+@dataclass
+class KeystreamIndex:
+    names: List[str]
+    starts: np.ndarray      # (sources,) offset of each source in data
+    ends: np.ndarray
+    data: np.ndarray        # concatenated streams, uint8
+    diffs: np.ndarray       # data[i + 1] - data[i] mod 29 (garbage across boundaries)
+    k: int
+    grams: _SortedGrams
+    diff_grams: _SortedGrams
+
+    @property
+    def total_runes(self) -> int:
+        return len(self.data)
+
+    def _locate(self, pos: int) -> Tuple[str, int]:
+        src = int(np.searchsorted(self.starts, pos, side='right') - 1)
+        return self.names[src], int(pos - self.starts[src])
+
+    def _candidates(self, stream: np.ndarray, frag: np.ndarray, grams: _SortedGrams) -> np.ndarray:
+        """Start positions in `stream` where every known entry of frag matches."""
+        known = frag >= 0
+        length = len(frag)
+        # Seed with the longest wildcard-free run if it is at least k long
+        best_start, best_len, run = 0, 0, 0
+        for i, ok in enumerate(known):
+            run = run + 1 if ok else 0
+            if run > best_len:
+                best_len, best_start = run, i - run + 1
+        if best_len >= self.k:
+            code = int(_kgram_codes(frag[best_start:best_start + self.k], self.k)[0])
+            lo, hi = np.searchsorted(grams.codes, [code, code + 1])
+            cand = grams.positions[lo:hi] - best_start
+            cand = cand[(cand >= 0) & (cand + length <= len(stream))]
+        else:
+            cand = np.arange(max(0, len(stream) - length + 1))
+        for i in np.flatnonzero(known):
+            if len(cand) == 0:
+                break
+            cand = cand[stream[cand + i] == frag[i]]
+        return cand
+
+    def _in_one_source(self, cand: np.ndarray, length: int) -> np.ndarray:
+        src = np.searchsorted(self.starts, cand, side='right') - 1
+        return cand[cand + length <= self.ends[src]]
+
+    def search(self, fragment: Sequence[Optional[int]], shift_invariant: bool = False,
+               max_hits: int = 1000) -> List[FragmentHit]:
+        """Every (source, offset[, shift]) consistent with the fragment.
+
+        fragment: key values, None / -1 for unknown positions.
+        shift_invariant: also allow key = source + s for an unknown constant s.
+        """
+        frag = np.array([WILDCARD if v is None or v < 0 else int(v) % ALPHABET_SIZE
+                         for v in fragment], dtype=np.int64)
+        if not (frag >= 0).any():
+            return []
+
+        if not shift_invariant:
+            cand = self._in_one_source(self._candidates(self.data, frag, self.grams), len(frag))
+            return [FragmentHit(*self._locate(int(p))) for p in cand[:max_hits]]
+
+        # Differences are known only where both neighbours are known
+        both = (frag[:-1] >= 0) & (frag[1:] >= 0)
+        if both.any():
+            dfrag = np.where(both, (frag[1:] - frag[:-1]) % ALPHABET_SIZE, WILDCARD)
+            cand = self._candidates(self.diffs, dfrag, self.diff_grams)
+        else:
+            # No adjacent known pair to anchor the difference index: scan every position
+            cand = np.arange(max(0, len(self.data) - len(frag) + 1))
+        cand = self._in_one_source(cand, len(frag))
+        # The first known entry fixes the shift; every other known entry must agree with it
+        known = np.flatnonzero(frag >= 0)
+        shifts = (frag[known[0]] - self.data[cand + known[0]]) % ALPHABET_SIZE
+        for i in known[1:]:
+            fits = (self.data[cand + i] + shifts) % ALPHABET_SIZE == frag[i]
+            cand, shifts = cand[fits], shifts[fits]
+        return [FragmentHit(*self._locate(int(p)), int(s)) for p, s in zip(cand[:max_hits], shifts[:max_hits])]
+
+    def search_batch(self, fragments: np.ndarray, shift_invariant: bool = False
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorised search for a (m, L >= k + 1) matrix of wildcard-free fragments.
+
+        Returns parallel arrays (row, position in data, shift); use
+        locate(position) to turn a position into (source, offset).
+        """
+        frags = np.asarray(fragments, dtype=np.int64)
+        m, length = frags.shape
+        if shift_invariant:
+            stream, grams = self.diffs, self.diff_grams
+            query = (frags[:, 1:] - frags[:, :-1]) % ALPHABET_SIZE
+        else:
+            stream, grams = self.data, self.grams
+            query = frags
+        codes = np.zeros(m, dtype=np.int64)
+        for i in range(self.k):
+            codes = codes * ALPHABET_SIZE + query[:, i]
+        lo = np.searchsorted(grams.codes, codes)
+        hi = np.searchsorted(grams.codes, codes + 1)
+        counts = hi - lo
+
+        # Expand every row into its seed candidates, then verify column by column
+        rows = np.repeat(np.arange(m), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        pos = grams.positions[np.repeat(lo, counts) + np.arange(len(rows)) - first]
+        fits = pos + length <= len(self.data)
+        rows, pos = rows[fits], pos[fits]
+        for i in range(self.k, query.shape[1]):
+            fits = stream[pos + i] == query[rows, i]
+            rows, pos = rows[fits], pos[fits]
+        src = np.searchsorted(self.starts, pos, side='right') - 1
+        fits = pos + length <= self.ends[src]
+        rows, pos = rows[fits], pos[fits]
+        shifts = (frags[rows, 0] - self.data[pos]) % ALPHABET_SIZE if shift_invariant \
+            else np.zeros(len(rows), dtype=np.int64)
+        return rows, pos, shifts
+
+    def locate(self, pos: int) -> Tuple[str, int]:
+        """(source name, offset) of a position in the concatenated data."""
+        return self._locate(pos)
+
+def build_index(sources: Dict[str, np.ndarray], k: int = DEFAULT_K) -> KeystreamIndex:
+    """Index named mod-29 streams by their exact k-gram codes (k <= 12)."""
+    if not 1 <= k <= 12:
+        raise ValueError("k must be between 1 and 12 for exact int64 codes")
+    names = list(sources)
+    lengths = np.array([len(sources[n]) for n in names], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    ends = starts + lengths
+    data = np.concatenate([sources[n] for n in names]).astype(np.uint8)
+    diffs = ((data[1:].astype(np.int16) - data[:-1]) % ALPHABET_SIZE).astype(np.uint8)
+    return KeystreamIndex(
+        names=names, starts=starts, ends=ends, data=data, diffs=diffs, k=k,
+        grams=_sorted_grams(data, starts, ends, k),
+        # A difference k-gram at p spans data[p .. p + k]
+        diff_grams=_sorted_grams(diffs, starts, ends - 1, k),
+    )
+
+@lru_cache(maxsize=1)
+def default_index() -> KeystreamIndex:
+    """Index over all default key sources (built once per process)."""
+    return build_index(default_key_sources())
+
+def parse_fragment(text: str) -> List[Optional[int]]:
+    """'3,14,?,7' (indices) or 'EO?PATH' (Latin, ? = wildcard) -> fragment."""
+    if ',' in text or text.replace('?', '').isdigit():
+        return [None if t.strip() == '?' else int(t) for t in text.split(',')]
+    frag: List[Optional[int]] = []
+    for i, part in enumerate(text.upper().split('?')):
+        if i:
+            frag.append(None)
+        frag.extend(text_to_key(part))
+    return frag
+
+def main():
+    parser = argparse.ArgumentParser(description="Keystream fragment search index")
+    parser.add_argument("fragment", help="Latin (EO?PATH) or comma indices (3,14,?,7); ? = wildcard")
+    parser.add_argument("--shift", action="store_true", help="Allow an unknown constant shift")
+    parser.add_argument("--max-hits", type=int, default=50)
+    args = parser.parse_args()
+
+    t0 = time.time()
+    index = default_index()
+    print(f"[INDEX] {len(index.names)} sources, {index.total_runes} runes "
+          f"(built in {time.time() - t0:.2f}s)")
+
+    frag = parse_fragment(args.fragment)
+    t0 = time.time()
+    hits = index.search(frag, shift_invariant=args.shift, max_hits=args.max_hits)
+    print(f"[QUERY] {frag} -> {len(hits)} hits in {(time.time() - t0) * 1000:.1f} ms")
+    for h in hits:
+        s = index.starts[index.names.index(h.source)] + h.offset
+        context = ''.join(INDEX_TO_LATIN[int(v)] for v in index.data[s:s + len(frag)])
+        print(f"  {h.source:<28s} @{h.offset:<7d} shift {h.shift:2d}  {context}")
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ import os
 import re
 from collections import Counter
 
+from corpus_store import load_corpus, tokenize
+from master_dictionary import CORPUS_FILES
+
 # Gematria Primus mapping
 GP_RUNE_TO_INDEX = {
     'ᚠ': 0, 'ᚢ': 1, 'ᚦ': 2, 'ᚩ': 3, 'ᚱ': 4, 'ᚳ': 5, 'ᚷ': 6, 'ᚹ': 7, 'ᚻ': 8,
@@ -65,24 +68,9 @@ def read_runes(filepath):
     return runes
 
 def text_to_key_indices(text):
-    """Convert English text to Gematria Primus indices for use as running key."""
-    text = text.upper()
-    indices = []
-    i = 0
-    while i < len(text):
-        # Try two-character digraphs first
-        if i + 1 < len(text):
-            digraph = text[i:i+2]
-            if digraph in LETTER_TO_INDEX:
-                indices.append(LETTER_TO_INDEX[digraph])
-                i += 2
-                continue
-        # Try single character
-        char = text[i]
-        if char in LETTER_TO_INDEX:
-            indices.append(LETTER_TO_INDEX[char])
-        i += 1
-    return indices
+    """Convert English text to Gematria Primus indices for use as running key
+    (the shared corpus-store tokenizer: digraphs, K/Q->C, V->U, Z->S)."""
+    return tokenize(text).tolist()
 
 def decrypt_sub(cipher_indices, key_indices):
     """Decrypt using SUB: plaintext = (cipher - key) mod 29"""
@@ -168,12 +156,8 @@ def run_liber_al_attack():
     print("LIBER AL VEL LEGIS RUNNING KEY ATTACK")
     print("="*70)
     
-    # Load Liber AL
-    liber_al_path = "c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/research/liber_al_vel_legis.txt"
-    liber_al = load_liber_al(liber_al_path)
-    
-    # Convert to key indices
-    key_indices = text_to_key_indices(liber_al)
+    # Load Liber AL (transliterated once by the corpus store)
+    key_indices = load_corpus('liber_al').runes.tolist()
     print(f"Liber AL key length: {len(key_indices)} indices")
     
     # Test pages to attack
@@ -299,8 +283,7 @@ def run_chapter_specific_attack():
     print("CHAPTER-SPECIFIC ATTACK")
     print("="*70)
     
-    liber_al_path = "c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/research/liber_al_vel_legis.txt"
-    liber_al = load_liber_al(liber_al_path)
+    liber_al = load_liber_al(CORPUS_FILES['liber_al'])
     
     # Split into chapters
     chapters = re.split(r'Chapter [IVX]+', liber_al)
@@ -364,9 +347,7 @@ def test_sacred_number_offsets():
         666,   # Number of the Beast
     ]
     
-    liber_al_path = "c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/research/liber_al_vel_legis.txt"
-    liber_al = load_liber_al(liber_al_path)
-    key_indices = text_to_key_indices(liber_al)
+    key_indices = load_corpus('liber_al').runes.tolist()
     
     page_num = 18
     rune_path = f"c:/Users/tyler/Repos/Cicada3301/LiberPrimus/pages/page_{page_num:02d}/runes.txt"
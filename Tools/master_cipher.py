@@ -6,12 +6,21 @@ MASTER CIPHER PROGRAM v2.0
 The definitive Liber Primus cipher-breaking tool.
 
 Features:
-- DUAL GPU support with work queue distribution
+- DUAL GPU support with cost-estimated work units and work stealing
 - Multi-layer decryption (cipher chaining)
 - Comprehensive cipher types
 - Modular plugin architecture
 - Progress saving/resuming
 - Configurable attack parameters
+- Distributed mode: a coordinator (--serve) leases the same units over
+  TCP to workers on other hosts (--worker); CPU nodes run with
+  MASTER_CIPHER_CPU=1. A coordinator off 127.0.0.1 needs --authkey or
+  BROKER_AUTHKEY
+- Run metrics (--metrics, --profile): phase timers, keys/s, queue depth
+  and ETA in .cache/metrics, summarised by `python metrics.py show`
+- Vigenère candidates go through the score_cascade prefix test first;
+  only those whose first runes read like English are decrypted in full
+  and scored (--no-cascade scores everything)
 
 Author: Wulfic
 Date: January 2026
@@ -19,23 +28,45 @@ Date: January 2026
 
 import os
 import sys
-import json
 import time
 import math
 import argparse
-import queue
-import threading
 import multiprocessing as mp
-from multiprocessing import Queue, Process, Manager
+from multiprocessing import Process, Manager
 import numpy as np
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional, Set, Any, Callable
-from dataclasses import dataclass, field
-from datetime import datetime
-from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import dataclasses
 import hashlib
 
+from aho_corasick import latin_automaton
+from cipher_registry import (
+    CIPHER_REGISTRY, AffineCipher, AtbashCipher, CaesarCipher, CipherChain, CipherResult,
+    RailFenceCipher, SubstitutionCipher,
+)
+# The cipher classes used to live here; scripts still import them from this module
+from cipher_registry import (  # noqa: F401
+    AutokeyCipher, BaseCipher, BifidCipher, ColumnarCipher, GronsfeldCipher, HillCipher,
+    InterruptedKeyCipher, PortaCipher, ProgressiveKeyCipher, RunningKeyCipher, SkipCipher,
+)
+from corpus_store import load_corpus
+from eval_cache import EvalCache, context_seed, stream_hashes
+from key_canon import KeyPlan, plan_keys, prune_chains, single_layer_forms
+from key_space import (
+    IDENTITY, CompositeSpace, KeySpace, ListSpace, PackedSpace, RandomSpace, SequenceSpace,
+    transform_product,
+)
+from math_sequences import primes_upto, sequence
+from results_db import ResultRecord, ResultsDB, write_reports
+from work_broker import (
+    DEFAULT_AUTHKEY, DEFAULT_LEASE_TTL, BrokerServer, LeaseBroker, parse_address, run_worker, server_authkey,
+)
+from work_stealing import WorkUnit, run_units, split_range, target_cost
+from metrics import add_arguments as add_metrics_arguments, configure_from_args, get_metrics
+from score_cascade import REJECTED, Cascade, calibrated_cascade
+from shared_data import SharedArrays, attach_tree, resolve
+
 # =============================================================================
 # CUDA SETUP - DUAL GPU SUPPORT
 # =============================================================================
@@ -65,9 +96,19 @@ try:
     print(f"[SUCCESS] {GPU_COUNT} GPU(s) initialized!")
     
 except Exception as e:
-    print(f"[FATAL ERROR] GPU initialization failed: {e}")
-    print("This tool requires CUDA GPUs.")
-    sys.exit(1)
+    if not os.environ.get('MASTER_CIPHER_CPU'):
+        print(f"[FATAL ERROR] GPU initialization failed: {e}")
+        print("This tool requires CUDA GPUs (set MASTER_CIPHER_CPU=1 to run a CPU worker).")
+        sys.exit(1)
+    
+    # CPU worker nodes: NumPy stands in for CuPy, the attack code is unchanged
+    import types
+    cp = types.ModuleType('numpy_as_cupy')
+    cp.__dict__.update({name: getattr(np, name) for name in dir(np) if not name.startswith('_')})
+    cp.asnumpy = np.asarray
+    cuda = None
+    GPU_COUNT, GPU_INFO, GPU_AVAILABLE = 0, [], False
+    print(f"[CPU] GPU unavailable ({e}); MASTER_CIPHER_CPU set, running on NumPy")
 
 # =============================================================================
 # GEMATRIA PRIMUS DEFINITIONS
@@ -109,58 +150,7 @@ LATIN_TO_INDEX['Z'] = LATIN_TO_INDEX['S']
 # MATHEMATICAL SEQUENCES
 # =============================================================================
 
-def sieve_primes(limit: int) -> List[int]:
-    sieve = [True] * (limit + 1)
-    sieve[0] = sieve[1] = False
-    for i in range(2, int(limit**0.5) + 1):
-        if sieve[i]:
-            for j in range(i*i, limit + 1, i):
-                sieve[j] = False
-    return [i for i, p in enumerate(sieve) if p]
-
-PRIMES = sieve_primes(10000)
-
-def totient(n: int) -> int:
-    if n == 1: return 1
-    result = n
-    p = 2
-    temp = n
-    while p * p <= temp:
-        if temp % p == 0:
-            while temp % p == 0:
-                temp //= p
-            result -= result // p
-        p += 1
-    if temp > 1:
-        result -= result // temp
-    return result
-
-def fibonacci(n: int) -> List[int]:
-    if n <= 0: return []
-    if n == 1: return [0]
-    f = [0, 1]
-    for _ in range(2, n): f.append(f[-1] + f[-2])
-    return f
-
-def lucas(n: int) -> List[int]:
-    if n <= 0: return []
-    if n == 1: return [2]
-    l = [2, 1]
-    for _ in range(2, n): l.append(l[-1] + l[-2])
-    return l
-
-def tribonacci(n: int) -> List[int]:
-    if n <= 0: return []
-    t = [0, 0, 1]
-    while len(t) < n: t.append(t[-1] + t[-2] + t[-3])
-    return t[:n]
-
-def pell(n: int) -> List[int]:
-    if n <= 0: return []
-    if n == 1: return [0]
-    p = [0, 1]
-    for _ in range(2, n): p.append(2 * p[-1] + p[-2])
-    return p
+PRIMES = primes_upto(10000).tolist()
 
 def catalan(n: int) -> List[int]:
     result = [1]
@@ -168,490 +158,23 @@ def catalan(n: int) -> List[int]:
         result.append(result[-1] * 2 * (2 * i - 1) // (i + 1))
     return result[:n]
 
-FIBONACCI = fibonacci(500)
-LUCAS = lucas(500)
-TRIBONACCI = tribonacci(500)
-PELL = pell(500)
+# Recurrences come back reduced mod 29 (their only use is as key material)
+FIBONACCI = sequence('FIBONACCI', 500).tolist()
+LUCAS = sequence('LUCAS', 500).tolist()
+TRIBONACCI = sequence('TRIBONACCI', 500).tolist()
+PELL = sequence('PELL', 500).tolist()
 CATALAN = catalan(100)
-TOTIENTS = [totient(i) for i in range(1, 1001)]
-
-PI_DIGITS = [3,1,4,1,5,9,2,6,5,3,5,8,9,7,9,3,2,3,8,4,6,2,6,4,3,3,8,3,2,7,9,5,0,2,8,8,4,1,9,7,1,6,9,3,9,9,3,7,5,1]
-E_DIGITS = [2,7,1,8,2,8,1,8,2,8,4,5,9,0,4,5,2,3,5,3,6,0,2,8,7,4,7,1,3,5,2,6,6,2,4,9,7,7,5,7,2,4,7,0,9,3,6,9,9,9]
-PHI_DIGITS = [1,6,1,8,0,3,3,9,8,8,7,4,9,8,9,4,8,4,8,2,0,4,5,8,6,8,3,4,3,6,5,6,3,8,1,1,7,7,2,0,3,0,9,1,7,9,8,0,5,7]
-SQRT2_DIGITS = [1,4,1,4,2,1,3,5,6,2,3,7,3,0,9,5,0,4,8,8,0,1,6,8,8,7,2,4,2,0,9,6,9,8,0,7,8,5,6,9,6,7,1,8,7,5,3,7,6,9]
-
-# =============================================================================
-# CIPHER BASE CLASS - PLUGIN ARCHITECTURE
-# =============================================================================
-
-@dataclass
-class CipherResult:
-    """Result from a cipher operation."""
-    plaintext: str
-    score: float
-    cipher_name: str
-    key_name: str
-    mode: str
-    details: Dict = field(default_factory=dict)
-
-class BaseCipher(ABC):
-    """Abstract base class for all cipher types."""
-    
-    name: str = "BaseCipher"
-    
-    @abstractmethod
-    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'SUB') -> np.ndarray:
-        """Decrypt ciphertext with given key."""
-        pass
-    
-    @abstractmethod
-    def get_modes(self) -> List[str]:
-        """Return list of supported modes."""
-        pass
-
-class SubstitutionCipher(BaseCipher):
-    """Vigenère-style substitution cipher."""
-    
-    name = "SUBSTITUTION"
-    
-    def get_modes(self) -> List[str]:
-        return ['SUB', 'ADD', 'SUB_REV', 'ADD_REV', 'BEAUFORT', 'XOR']
-    
-    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'SUB') -> np.ndarray:
-        n = len(ciphertext)
-        key_len = len(key)
-        extended_key = np.array([key[i % key_len] for i in range(n)])
-        
-        if mode == 'SUB':
-            return (ciphertext - extended_key) % MOD
-        elif mode == 'ADD':
-            return (ciphertext + extended_key) % MOD
-        elif mode == 'SUB_REV':
-            return (extended_key - ciphertext) % MOD
-        elif mode == 'ADD_REV':
-            return (MOD - ciphertext - extended_key) % MOD
-        elif mode == 'BEAUFORT':
-            return (extended_key - ciphertext) % MOD
-        elif mode == 'XOR':
-            return ciphertext ^ extended_key
-        else:
-            return (ciphertext - extended_key) % MOD
-
-class CaesarCipher(BaseCipher):
-    """Simple shift cipher."""
-    
-    name = "CAESAR"
-    
-    def get_modes(self) -> List[str]:
-        return ['SHIFT']
-    
-    def decrypt(self, ciphertext: np.ndarray, shift: int, mode: str = 'SHIFT') -> np.ndarray:
-        return (ciphertext - shift) % MOD
-
-class AtbashCipher(BaseCipher):
-    """Atbash mirror cipher."""
-    
-    name = "ATBASH"
-    
-    def get_modes(self) -> List[str]:
-        return ['MIRROR']
-    
-    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray = None, mode: str = 'MIRROR') -> np.ndarray:
-        return (MOD - 1 - ciphertext) % MOD
-
-class AffineCipher(BaseCipher):
-    """Affine cipher: ax + b mod 29."""
-    
-    name = "AFFINE"
-    
-    def get_modes(self) -> List[str]:
-        return ['AFFINE']
-    
-    def decrypt(self, ciphertext: np.ndarray, params: Tuple[int, int], mode: str = 'AFFINE') -> np.ndarray:
-        a, b = params
-        # Find modular inverse of a
-        a_inv = pow(a, -1, MOD) if math.gcd(a, MOD) == 1 else None
-        if a_inv is None:
-            return ciphertext  # Invalid, return unchanged
-        return (a_inv * (ciphertext - b)) % MOD
-
-class HillCipher(BaseCipher):
-    """Hill cipher with 2x2 matrix."""
-    
-    name = "HILL"
-    
-    def get_modes(self) -> List[str]:
-        return ['2x2']
-    
-    def decrypt(self, ciphertext: np.ndarray, matrix: np.ndarray, mode: str = '2x2') -> np.ndarray:
-        # Pad to even length
-        if len(ciphertext) % 2 != 0:
-            ciphertext = np.append(ciphertext, [0])
-        
-        # Matrix inverse mod 29
-        det = int((matrix[0,0] * matrix[1,1] - matrix[0,1] * matrix[1,0]) % MOD)
-        if math.gcd(det, MOD) != 1:
-            return ciphertext[:len(ciphertext)]  # Invalid matrix
-        
-        det_inv = pow(det, -1, MOD)
-        inv_matrix = np.array([
-            [matrix[1,1], -matrix[0,1]],
-            [-matrix[1,0], matrix[0,0]]
-        ]) * det_inv % MOD
-        
-        # Decrypt in pairs
-        result = []
-        for i in range(0, len(ciphertext), 2):
-            pair = np.array([ciphertext[i], ciphertext[i+1]])
-            decrypted_pair = inv_matrix @ pair % MOD
-            result.extend(decrypted_pair.astype(int))
-        
-        return np.array(result[:len(ciphertext)])
-
-class RailFenceCipher(BaseCipher):
-    """Rail fence transposition cipher."""
-    
-    name = "RAILFENCE"
-    
-    def get_modes(self) -> List[str]:
-        return ['RAILS']
-    
-    def decrypt(self, ciphertext: np.ndarray, rails: int, mode: str = 'RAILS') -> np.ndarray:
-        n = len(ciphertext)
-        if rails < 2 or rails >= n:
-            return ciphertext
-        
-        # Build pattern
-        fence = [[None] * n for _ in range(rails)]
-        rail = 0
-        direction = 1
-        for i in range(n):
-            fence[rail][i] = True
-            rail += direction
-            if rail == 0 or rail == rails - 1:
-                direction = -direction
-        
-        # Fill in values
-        idx = 0
-        for r in range(rails):
-            for c in range(n):
-                if fence[r][c]:
-                    fence[r][c] = int(ciphertext[idx])
-                    idx += 1
-        
-        # Read off
-        result = []
-        rail = 0
-        direction = 1
-        for i in range(n):
-            result.append(fence[rail][i])
-            rail += direction
-            if rail == 0 or rail == rails - 1:
-                direction = -direction
-        
-        return np.array(result)
-
-class AutokeyCipher(BaseCipher):
-    """Autokey cipher using plaintext as key extension."""
-    
-    name = "AUTOKEY"
-    
-    def get_modes(self) -> List[str]:
-        return ['PLAINTEXT', 'CIPHERTEXT']
-    
-    def decrypt(self, ciphertext: np.ndarray, primer: np.ndarray, mode: str = 'PLAINTEXT') -> np.ndarray:
-        result = []
-        key = list(primer)
-        
-        for i, c in enumerate(ciphertext):
-            if i < len(key):
-                k = key[i]
-            else:
-                if mode == 'PLAINTEXT':
-                    k = result[i - len(primer)]
-                else:  # CIPHERTEXT
-                    k = ciphertext[i - len(primer)]
-            
-            p = (c - k) % MOD
-            result.append(p)
-        
-        return np.array(result)
-
-class ColumnarCipher(BaseCipher):
-    """Columnar transposition cipher."""
-    
-    name = "COLUMNAR"
-    
-    def get_modes(self) -> List[str]:
-        return ['COLUMNAR']
-    
-    def decrypt(self, ciphertext: np.ndarray, key_order: List[int], mode: str = 'COLUMNAR') -> np.ndarray:
-        n = len(ciphertext)
-        cols = len(key_order)
-        rows = math.ceil(n / cols)
-        
-        # Calculate column lengths
-        full_cols = n % cols if n % cols != 0 else cols
-        col_lens = [rows if i < full_cols else rows - 1 for i in range(cols)]
-        
-        # Reorder columns
-        sorted_order = sorted(range(cols), key=lambda x: key_order[x])
-        
-        # Read off
-        grid = []
-        pos = 0
-        for col_idx in sorted_order:
-            col_len = col_lens[col_idx]
-            grid.append(list(ciphertext[pos:pos + col_len]))
-            pos += col_len
-        
-        # Unsort
-        unsorted_grid = [None] * cols
-        for i, col_idx in enumerate(sorted_order):
-            unsorted_grid[col_idx] = grid[i]
-        
-        # Read row by row
-        result = []
-        for row in range(rows):
-            for col in range(cols):
-                if row < len(unsorted_grid[col]):
-                    result.append(unsorted_grid[col][row])
-        
-        return np.array(result[:n])
-
-class PortaCipher(BaseCipher):
-    """Porta cipher - reciprocal cipher with 13 alphabets."""
-    
-    name = "PORTA"
-    
-    def get_modes(self) -> List[str]:
-        return ['PORTA']
-    
-    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'PORTA') -> np.ndarray:
-        """Porta is reciprocal - encrypt = decrypt."""
-        result = []
-        key_len = len(key)
-        half = MOD // 2  # 14 for mod 29
-        
-        for i, c in enumerate(ciphertext):
-            k = key[i % key_len]
-            tableau_row = k // 2  # Which of 14 tableaux to use
-            
-            if c < half:
-                # First half: shift by tableau + half
-                p = (c + tableau_row + half) % MOD
-            else:
-                # Second half: shift back
-                p = (c - tableau_row - half) % MOD
-            result.append(p)
-        
-        return np.array(result)
-
-class GronsfeldCipher(BaseCipher):
-    """Gronsfeld cipher - Vigenère variant using only digits 0-9."""
-    
-    name = "GRONSFELD"
-    
-    def get_modes(self) -> List[str]:
-        return ['SUB', 'ADD']
-    
-    def decrypt(self, ciphertext: np.ndarray, digits: List[int], mode: str = 'SUB') -> np.ndarray:
-        """Decrypt using digit key (each digit 0-9)."""
-        result = []
-        key_len = len(digits)
-        
-        for i, c in enumerate(ciphertext):
-            d = digits[i % key_len] % 10  # Ensure 0-9
-            if mode == 'SUB':
-                p = (c - d) % MOD
-            else:
-                p = (c + d) % MOD
-            result.append(p)
-        
-        return np.array(result)
-
-class BifidCipher(BaseCipher):
-    """Bifid cipher using Polybius square fractionation."""
-    
-    name = "BIFID"
-    
-    def get_modes(self) -> List[str]:
-        return ['PERIOD_5', 'PERIOD_7', 'PERIOD_11', 'FULL']
-    
-    def decrypt(self, ciphertext: np.ndarray, period: int = 5, mode: str = 'PERIOD_5') -> np.ndarray:
-        """Decrypt Bifid cipher."""
-        n = len(ciphertext)
-        
-        # Use a 6x5 grid for 29 chars (close approximation)
-        grid_size = 6  # 6x5 = 30 positions
-        
-        # Extract period from mode
-        if mode == 'FULL':
-            period = n
-        elif mode.startswith('PERIOD_'):
-            period = int(mode.split('_')[1])
-        
-        result = []
-        
-        # Process in periods
-        for start in range(0, n, period):
-            block = ciphertext[start:start + period]
-            block_len = len(block)
-            
-            # Convert to row/col coordinates
-            rows = [int(c) // grid_size for c in block]
-            cols = [int(c) % grid_size for c in block]
-            
-            # Interleave (reverse of encryption)
-            combined = rows + cols
-            
-            # De-interleave
-            for i in range(block_len):
-                r = combined[i]
-                c = combined[i + block_len] if i + block_len < len(combined) else 0
-                p = (r * grid_size + c) % MOD
-                result.append(p)
-        
-        return np.array(result[:n])
-
-class SkipCipher(BaseCipher):
-    """Skip/Scytale cipher - read every nth character."""
-    
-    name = "SKIP"
-    
-    def get_modes(self) -> List[str]:
-        return ['SKIP']
-    
-    def decrypt(self, ciphertext: np.ndarray, skip: int, mode: str = 'SKIP') -> np.ndarray:
-        """Read every skip-th character."""
-        n = len(ciphertext)
-        if skip < 2 or skip >= n:
-            return ciphertext
-        
-        result = [0] * n
-        pos = 0
-        for i, c in enumerate(ciphertext):
-            result[(i * skip) % n] = c
-            
-        return np.array(result)
-
-class ProgressiveKeyCipher(BaseCipher):
-    """Progressive key cipher - key shifts with each position."""
-    
-    name = "PROGRESSIVE"
-    
-    def get_modes(self) -> List[str]:
-        return ['LINEAR', 'QUADRATIC', 'FIBONACCI']
-    
-    def decrypt(self, ciphertext: np.ndarray, base_key: np.ndarray, mode: str = 'LINEAR') -> np.ndarray:
-        """Decrypt with progressively shifting key."""
-        result = []
-        key_len = len(base_key)
-        
-        for i, c in enumerate(ciphertext):
-            base_k = base_key[i % key_len]
-            
-            if mode == 'LINEAR':
-                k = (base_k + i) % MOD
-            elif mode == 'QUADRATIC':
-                k = (base_k + i * i) % MOD
-            elif mode == 'FIBONACCI':
-                fib_shift = FIBONACCI[min(i, len(FIBONACCI) - 1)] if FIBONACCI else i
-                k = (base_k + fib_shift) % MOD
-            else:
-                k = base_k
-            
-            p = (c - k) % MOD
-            result.append(p)
-        
-        return np.array(result)
-
-class InterruptedKeyCipher(BaseCipher):
-    """Interrupted key cipher - key resets at certain positions."""
-    
-    name = "INTERRUPTED"
-    
-    def get_modes(self) -> List[str]:
-        return ['PRIME_RESET', 'TOTIENT_RESET']
-    
-    def decrypt(self, ciphertext: np.ndarray, key: np.ndarray, mode: str = 'PRIME_RESET') -> np.ndarray:
-        """Decrypt with key that resets at special positions."""
-        result = []
-        key_len = len(key)
-        key_pos = 0
-        
-        for i, c in enumerate(ciphertext):
-            # Check if we should reset key position
-            if mode == 'PRIME_RESET' and i in PRIME_SET:
-                key_pos = 0
-            elif mode == 'TOTIENT_RESET' and i < len(TOTIENTS) and TOTIENTS[i] == i - 1:
-                key_pos = 0  # Reset at primes (φ(p) = p-1)
-            
-            k = key[key_pos % key_len]
-            p = (c - k) % MOD
-            result.append(p)
-            key_pos += 1
-        
-        return np.array(result)
+TOTIENTS = sequence('TOTIENTS', 1000, mod=None).tolist()
 
-class RunningKeyCipher(BaseCipher):
-    """Running key cipher using text as key."""
-    
-    name = "RUNNING_KEY"
-    
-    def get_modes(self) -> List[str]:
-        return ['SUB', 'ADD']
-    
-    def decrypt(self, ciphertext: np.ndarray, running_text: np.ndarray, mode: str = 'SUB') -> np.ndarray:
-        """Decrypt using running key text."""
-        result = []
-        key_len = len(running_text)
-        
-        for i, c in enumerate(ciphertext):
-            k = running_text[i % key_len]
-            if mode == 'SUB':
-                p = (c - k) % MOD
-            else:
-                p = (c + k) % MOD
-            result.append(p)
-        
-        return np.array(result)
-
-# Global for interrupted key cipher
-PRIME_SET = set(PRIMES[:500])
-
-# =============================================================================
-# CIPHER REGISTRY
-# =============================================================================
-
-CIPHER_REGISTRY: Dict[str, BaseCipher] = {
-    'SUBSTITUTION': SubstitutionCipher(),
-    'CAESAR': CaesarCipher(),
-    'ATBASH': AtbashCipher(),
-    'AFFINE': AffineCipher(),
-    'HILL': HillCipher(),
-    'RAILFENCE': RailFenceCipher(),
-    'AUTOKEY': AutokeyCipher(),
-    'COLUMNAR': ColumnarCipher(),
-    'PORTA': PortaCipher(),
-    'GRONSFELD': GronsfeldCipher(),
-    'BIFID': BifidCipher(),
-    'SKIP': SkipCipher(),
-    'PROGRESSIVE': ProgressiveKeyCipher(),
-    'INTERRUPTED': InterruptedKeyCipher(),
-    'RUNNING_KEY': RunningKeyCipher(),
-}
+PI_DIGITS = sequence('DIGITS_PI', 50).tolist()
+E_DIGITS = sequence('DIGITS_E', 50).tolist()
+PHI_DIGITS = sequence('DIGITS_PHI', 50).tolist()
+SQRT2_DIGITS = sequence('DIGITS_SQRT2', 50).tolist()
 
 # =============================================================================
 # MULTI-LAYER CIPHER CHAINS
 # =============================================================================
 
-@dataclass
-class CipherChain:
-    """Represents a chain of ciphers to apply in sequence."""
-    name: str
-    steps: List[Tuple[str, Any, str]]  # (cipher_name, key/params, mode)
-
 def create_cipher_chains() -> List[CipherChain]:
     """Generate multi-layer cipher chains to test."""
     chains = []
@@ -790,125 +313,66 @@ def text_to_key(text: str) -> List[int]:
         i += 1
     return result
 
-def generate_master_keys(max_len: int = 200) -> Dict[str, List[int]]:
-    """Generate comprehensive key dictionary."""
-    keys = {}
-    
-    # Caesar shifts
-    for shift in range(29):
-        keys[f'CAESAR_{shift}'] = [shift]
-    
-    # Prime sequences
-    for start in range(0, 200, 10):
-        for length in [20, 50, 100]:
-            seq = [p % MOD for p in PRIMES[start:start+length]]
-            if seq:
-                keys[f'PRIMES_S{start}_L{length}'] = seq
-                keys[f'PRIMES_S{start}_L{length}_REVERSED'] = seq[::-1]
-    
-    # Totient sequences
-    for start in range(0, 200, 10):
-        seq = [t % MOD for t in TOTIENTS[start:start+100] if start+100 <= len(TOTIENTS)]
-        if seq:
-            keys[f'TOTIENT_S{start}'] = seq
-    
-    # Fibonacci
-    seq = [f % MOD for f in FIBONACCI[:100]]
-    keys['FIBONACCI'] = seq
-    keys['FIBONACCI_REVERSED'] = seq[::-1]
-    
-    # Lucas
-    seq = [l % MOD for l in LUCAS[:100]]
-    keys['LUCAS'] = seq
-    keys['LUCAS_REVERSED'] = seq[::-1]
-    
-    # Tribonacci
-    seq = [t % MOD for t in TRIBONACCI[:100]]
-    keys['TRIBONACCI'] = seq
-    
-    # Pell
-    seq = [p % MOD for p in PELL[:100]]
-    keys['PELL'] = seq
-    
-    # Mathematical constants
-    keys['PI'] = [d % MOD for d in PI_DIGITS]
-    keys['E'] = [d % MOD for d in E_DIGITS]
-    keys['PHI'] = [d % MOD for d in PHI_DIGITS]
-    keys['SQRT2'] = [d % MOD for d in SQRT2_DIGITS]
-    
-    # PHI as prime indices (the key that partially solved Page 55!)
-    # We expand this since it was successful
-    for start in range(0, 50, 5):
-        length = 50
-        indices = PHI_DIGITS[start:start+length]
-        if len(indices) == length:
-            key_seq = []
-            valid = True
-            for d in indices:
-                if d < len(PRIMES):
-                    key_seq.append(PRIMES[d] % MOD)
-                else:
-                    valid = False
-                    break
-            if valid:
-                keys[f'PHI_PRIME_S{start}'] = key_seq
-                keys[f'PHI_PRIME_S{start}_REVERSED'] = key_seq[::-1]
+# Additive modes tried with every key (SUB_REV and BEAUFORT are the same map;
+# the canonical plan keeps one of them)
+VIGENERE_MODES = ['SUB', 'ADD', 'SUB_REV', 'ADD_REV', 'BEAUFORT', 'XOR']
 
-    # Similar logic for PI and E with prime indices
-    for const_name, digits in [('PI', PI_DIGITS), ('E', E_DIGITS)]:
-        for start in range(0, 50, 10):
-            indices = digits[start:start+50]
-            if len(indices) == 50:
-                key_seq = [PRIMES[d] % MOD for d in indices if d < len(PRIMES)]
-                if len(key_seq) == 50: # Only if all valid
-                    keys[f'{const_name}_PRIME_S{start}'] = key_seq
+def generate_master_keys(max_len: int = 200) -> KeySpace:
+    """Describe the comprehensive key space (keys are generated on demand).
 
+    Affine (a, b) pairs are not Vigenère keys and are attacked separately
+    in GPUWorker.attack_page.
+    """
+    rev = transform_product(reverse=True)
+    parts: List[KeySpace] = [
+        # Caesar shifts
+        ListSpace([(f'CAESAR_{shift}', [shift]) for shift in range(29)]),
+        # Prime and totient sequences
+        SequenceSpace('PRIMES', PRIMES, lengths=[20, 50, 100], offsets=range(0, 200, 10), transforms=rev),
+        SequenceSpace('TOTIENT', TOTIENTS, lengths=[100], offsets=range(0, 200, 10),
+                      template='{label}_S{offset}'),
+        # Recurrences
+        SequenceSpace('FIBONACCI', FIBONACCI, lengths=[100], transforms=rev, template='{label}'),
+        SequenceSpace('LUCAS', LUCAS, lengths=[100], transforms=rev, template='{label}'),
+        SequenceSpace('TRIBONACCI', TRIBONACCI, lengths=[100], template='{label}'),
+        SequenceSpace('PELL', PELL, lengths=[100], template='{label}'),
+    ]
+    # Mathematical constants
+    for name, digits in [('PI', PI_DIGITS), ('E', E_DIGITS), ('PHI', PHI_DIGITS), ('SQRT2', SQRT2_DIGITS)]:
+        parts.append(SequenceSpace(name, digits, lengths=[len(digits)], template='{label}'))
+    
+    # Constant digits as prime indices (PHI partially solved Page 55, so it gets reversals too)
+    for name, digits, step, transforms in [('PHI', PHI_DIGITS, 5, rev), ('PI', PI_DIGITS, 10, [IDENTITY]),
+                                           ('E', E_DIGITS, 10, [IDENTITY])]:
+        prime_digits = [PRIMES[d] for d in digits]
+        parts.append(SequenceSpace(f'{name}_PRIME', prime_digits, lengths=[50], offsets=range(0, 50, step),
+                                   transforms=transforms, template='{label}_S{offset}'))
+    
     # Gematria primes
     gematria_primes = [v[2] for v in GEMATRIA.values()]
-    keys['GEMATRIA_PRIMES'] = [p % MOD for p in gematria_primes]
-    keys['GEMATRIA_PRIMES_REVERSED'] = [p % MOD for p in gematria_primes[::-1]]
+    parts.append(SequenceSpace('GEMATRIA_PRIMES', gematria_primes, lengths=[len(gematria_primes)],
+                               transforms=rev, template='{label}'))
     
-    # Cicada keywords
-    for word in CICADA_KEYWORDS:
-        key = text_to_key(word)
-        if key:
-            keys[f'WORD_{word}'] = key
-            keys[f'WORD_{word}_REVERSED'] = key[::-1]
-            # Shifted versions
-            for shift in [1, 2, 3, 7, 11, 13, 17, 19, 23]:
-                keys[f'WORD_{word}+{shift}'] = [(k + shift) % MOD for k in key]
-                keys[f'WORD_{word}+{shift}_REVERSED'] = [(k + shift) % MOD for k in key[::-1]]
+    # Cicada keywords with shifted versions
+    parts.append(ListSpace([(f'WORD_{word}', text_to_key(word)) for word in dict.fromkeys(CICADA_KEYWORDS)],
+                           transform_product(shifts=[0, 1, 2, 3, 7, 11, 13, 17, 19, 23], reverse=True)))
     
-    # Emerson Self-Reliance Running Key
+    # Emerson Self-Reliance Running Key (excerpt, transliterated by the corpus store)
     try:
-        emerson_path = os.path.join(os.path.dirname(__file__), 'emerson_self_reliance.txt')
-        if os.path.exists(emerson_path):
-            with open(emerson_path, 'r', encoding='utf-8') as f:
-                emerson_text = f.read()
-            emerson_key = text_to_key(emerson_text)
-            if emerson_key:
-                # Store full key, and also chunks
-                keys['EMERSON_FULL'] = emerson_key
-                # Create chunks of length 100
-                for i in range(0, min(len(emerson_key), 1000), 100):
-                    keys[f'EMERSON_CHUNK_{i}'] = emerson_key[i:i+100]
+        emerson_key = load_corpus('emerson_excerpt').runes
+        if len(emerson_key):
+            # Full key, and also chunks of length 100
+            parts.append(SequenceSpace('EMERSON_FULL', emerson_key, lengths=[len(emerson_key)],
+                                       template='{label}'))
+            parts.append(SequenceSpace('EMERSON_CHUNK', emerson_key, lengths=[100],
+                                       offsets=range(0, 1000, 100), template='{label}_{offset}'))
     except Exception as e:
         print(f"Warning: Could not load Emerson key: {e}")
-
-    # Affine parameters (a, b) where gcd(a, 29) = 1
-    valid_a = [a for a in range(1, 29) if math.gcd(a, 29) == 1]
-    for a in valid_a:
-        for b in range(29):
-            keys[f'AFFINE_{a}_{b}'] = [a, b]
-            keys[f'AFFINE_{a}_{b}_REVERSED'] = [a, (29 - b) % 29]
     
-    # Random exploration
-    np.random.seed(3301)  # Deterministic
-    for i in range(100):
-        keys[f'RANDOM_{i}'] = list(np.random.randint(0, 29, size=50))
-        keys[f'RANDOM_{i}_REVERSED'] = list(np.random.randint(0, 29, size=50))[::-1]
+    # Random exploration (deterministic; _REV entries are reversals of the same draw)
+    parts.append(RandomSpace('RANDOM', 100, 50, 50, seed=3301, transforms=rev))
     
-    return keys
+    return CompositeSpace(parts)
 
 # =============================================================================
 # SCORING FUNCTIONS
@@ -951,6 +415,29 @@ CICADA_PHRASES = [
     'INSTRUCTION', 'PARABLE', 'KOAN', 'SACRED', 'TRUTH',
 ]
 
+# Word and phrase bonuses compiled into one automaton (single pass per text)
+WORD_AUTOMATON = latin_automaton({
+    **{word: len(word) * 3 for word in COMMON_WORDS},
+    **{phrase: 50 for phrase in CICADA_PHRASES},
+})
+
+# Part of every evaluation cache key: bump when score_plaintext changes
+SCORER_VERSION = 'master_cipher.score_plaintext/1'
+
+def vigenere_decrypt(ct, ext_key, mode: str):
+    """One Vigenère-family mode over a (rows, n) extended-key matrix (CuPy or NumPy)."""
+    if mode == 'SUB':
+        return (ct - ext_key) % MOD
+    if mode == 'ADD':
+        return (ct + ext_key) % MOD
+    if mode in ('SUB_REV', 'BEAUFORT'):
+        return (ext_key - ct) % MOD
+    if mode == 'ADD_REV':
+        return (MOD - ct - ext_key) % MOD
+    if mode == 'XOR':
+        return ct ^ ext_key
+    raise ValueError(f"unknown mode {mode}")
+
 def indices_to_text(indices: np.ndarray) -> str:
     """Convert index array to Latin text."""
     return ''.join(INDEX_TO_LATIN.get(int(i), '?') for i in indices)
@@ -975,15 +462,8 @@ def score_plaintext(text: str) -> float:
         if trigram in ENGLISH_TRIGRAMS:
             score += ENGLISH_TRIGRAMS[trigram] * 1.5
     
-    # Word matching
-    for word in COMMON_WORDS:
-        if word in text:
-            score += len(word) * 3
-    
-    # Cicada phrase matching (high bonus)
-    for phrase in CICADA_PHRASES:
-        if phrase.replace(' ', '') in text:
-            score += 50
+    # Word matching + Cicada phrase matching (high bonus)
+    score += WORD_AUTOMATON.presence_score(text)
     
     # Vowel ratio
     vowels = sum(1 for c in text if c in 'AEIOU')
@@ -1012,213 +492,334 @@ def score_plaintext(text: str) -> float:
 class GPUWorker:
     """Worker process for a single GPU."""
     
-    def __init__(self, gpu_id: int, keys: Dict[str, List[int]], chains: List[CipherChain]):
+    def __init__(self, gpu_id: int, plan: KeyPlan, chains: List[CipherChain], cascade: bool = True):
         self.gpu_id = gpu_id
-        self.keys = keys
+        self.plan = plan
+        self.keys = plan.keys
         self.chains = chains
+        self.cascade: Optional[Cascade] = calibrated_cascade() if cascade else None
         self.substitution = SubstitutionCipher()
         self.caesar = CaesarCipher()
         self.atbash = AtbashCipher()
         self.affine = AffineCipher()
+        self.cache = EvalCache()
     
     def set_gpu(self):
         """Set this process to use specific GPU."""
-        cuda.Device(self.gpu_id).use()
-    
-    def attack_page(self, rune_indices: np.ndarray, page_num: int) -> List[CipherResult]:
-        """Run all attacks on a single page."""
+        if cuda is not None:
+            cuda.Device(self.gpu_id).use()
+    
+    def attack_page(self, rune_indices: np.ndarray, page_num: int,
+                    tasks: Optional[Tuple[int, int]] = None, chain_range: Optional[Tuple[int, int]] = None,
+                    single_layer: bool = True) -> List[CipherResult]:
+        """Run all attacks on a single page.
+
+        A distributed work unit covers one range of the Vigenère plan's tasks
+        and one range of the chains; only the page's first unit also runs
+        the single-layer and reversed-ciphertext phases.
+        """
         self.set_gpu()
+        metrics = get_metrics()
+        plan = self.plan if tasks is None else self.plan.shard(*tasks)
+        chains = self.chains if chain_range is None else self.chains[slice(*chain_range)]
         results = []
         
         # Convert to CuPy array
         ct_gpu = cp.array(rune_indices)
         
         # === PHASE 1: Single-layer attacks ===
+        if single_layer:
+            # Caesar shifts
+            with metrics.phase('caesar'):
+                for shift in range(29):
+                    pt_gpu = (ct_gpu - shift) % MOD
+                    pt = cp.asnumpy(pt_gpu)
+                    text = indices_to_text(pt)
+                    score = score_plaintext(text)
+                    if score > 500:
+                        results.append(CipherResult(text[:100], score, 'CAESAR', f'SHIFT_{shift}', 'SHIFT',
+                                                    key=[shift]))
         
-        # Caesar shifts
-        for shift in range(29):
-            pt_gpu = (ct_gpu - shift) % MOD
-            pt = cp.asnumpy(pt_gpu)
-            text = indices_to_text(pt)
-            score = score_plaintext(text)
-            if score > 500:
-                results.append(CipherResult(text[:100], score, 'CAESAR', f'SHIFT_{shift}', 'SHIFT'))
-        
-        # Atbash
-        pt_gpu = (MOD - 1 - ct_gpu) % MOD
-        pt = cp.asnumpy(pt_gpu)
-        text = indices_to_text(pt)
-        score = score_plaintext(text)
-        if score > 500:
-            results.append(CipherResult(text[:100], score, 'ATBASH', 'MIRROR', 'MIRROR'))
-        
-        # Vigenère with all keys
-        for key_name, key in self.keys.items():
-            if key_name.startswith('AFFINE_'):
-                continue  # Handle separately
-            
-            key_gpu = cp.array(key)
-            n = len(ct_gpu)
-            key_len = len(key_gpu)
-            ext_key = cp.array([key[i % key_len] for i in range(n)])
-            
-            for mode in ['SUB', 'ADD', 'SUB_REV', 'ADD_REV', 'BEAUFORT', 'XOR']:
-                if mode == 'SUB':
-                    pt_gpu = (ct_gpu - ext_key) % MOD
-                elif mode == 'ADD':
-                    pt_gpu = (ct_gpu + ext_key) % MOD
-                elif mode == 'SUB_REV':
-                    pt_gpu = (ext_key - ct_gpu) % MOD
-                elif mode == 'ADD_REV':
-                    pt_gpu = (MOD - ct_gpu - ext_key) % MOD
-                elif mode == 'BEAUFORT':
-                    pt_gpu = (ext_key - ct_gpu) % MOD
-                elif mode == 'XOR':
-                    pt_gpu = ct_gpu ^ ext_key
-                
-                pt = cp.asnumpy(pt_gpu)
-                text = indices_to_text(pt)
-                score = score_plaintext(text)
-                if score > 500:
-                    results.append(CipherResult(text[:100], score, 'VIGENERE', key_name, mode))
-        
-        # Affine cipher
-        valid_a = [a for a in range(1, 29) if math.gcd(a, 29) == 1]
-        for a in valid_a:
-            a_inv = pow(a, -1, MOD)
-            for b in range(29):
-                pt_gpu = (a_inv * (ct_gpu - b)) % MOD
+            # Atbash
+            with metrics.phase('atbash'):
+                pt_gpu = (MOD - 1 - ct_gpu) % MOD
                 pt = cp.asnumpy(pt_gpu)
                 text = indices_to_text(pt)
                 score = score_plaintext(text)
                 if score > 500:
-                    results.append(CipherResult(text[:100], score, 'AFFINE', f'a={a},b={b}', 'AFFINE'))
+                    results.append(CipherResult(text[:100], score, 'ATBASH', 'MIRROR', 'MIRROR'))
+            metrics.count('keys', 30)
         
-        # === PHASE 2: Multi-layer attacks ===
-        for chain in self.chains:
-            current = ct_gpu.copy()
-            
-            try:
-                for cipher_name, params, mode in chain.steps:
-                    if cipher_name == 'CAESAR':
-                        current = (current - params) % MOD
-                    elif cipher_name == 'ATBASH':
-                        current = (MOD - 1 - current) % MOD
-                    elif cipher_name == 'REVERSE':
-                        current = current[::-1]
-                    elif cipher_name == 'SUBSTITUTION':
-                        key_gpu = cp.array(params)
-                        n = len(current)
-                        key_len = len(key_gpu)
-                        ext_key = cp.array([params[i % key_len] for i in range(n)])
-                        if mode == 'SUB':
-                            current = (current - ext_key) % MOD
-                        elif mode == 'ADD':
-                            current = (current + ext_key) % MOD
-                    elif cipher_name == 'RAILFENCE':
-                        # Handle on CPU for complexity
-                        current_np = cp.asnumpy(current)
-                        rf = RailFenceCipher()
-                        current_np = rf.decrypt(current_np, params, 'RAILS')
-                        current = cp.array(current_np)
-                    elif cipher_name in CIPHER_REGISTRY:
-                        # Fallback for other ciphers (PORTA, GRONSFELD, BIFID, etc)
-                        # We use CPU implementation via CIPHER_REGISTRY
-                        current_np = cp.asnumpy(current)
-                        cipher_obj = CIPHER_REGISTRY[cipher_name]
-                        current_np = cipher_obj.decrypt(current_np, params, mode)
-                        current = cp.array(current_np)
+        # Vigenère with every canonical (key, mode); equivalent pairs were pruned before dispatch.
+        # Pairs scored in an earlier run are skipped; cached hits are only decrypted again
+        # Candidates the prefix test rejects are cached as REJECTED, so the cascade is part of the key
+        n = len(ct_gpu)
+        scorer = SCORER_VERSION if self.cascade is None else f"{SCORER_VERSION}:{self.cascade.signature()}"
+        with metrics.phase('vigenere'):
+            for mode, ext_keys, names in plan.by_mode(n):
+                key_idx = plan.key_idx[plan.mode_idx == plan.modes.index(mode)]
+                hashes = stream_hashes(context_seed(rune_indices, mode, '', scorer), ext_keys)
+                known, cached = self.cache.lookup(hashes)
+                rows = np.flatnonzero(~known | (cached > 500))
+                metrics.count('keys', len(ext_keys))
+                metrics.count('cache_hits', int(known.sum()))
+                if len(rows) == 0:
+                    continue
+                with metrics.phase('vigenere/decrypt'):
+                    ext_key = cp.array(ext_keys[rows], dtype=ct_gpu.dtype)
+                    if self.cascade is not None:
+                        # Decrypt and test the first runes only; cached hits skip the test
+                        k = self.cascade.prefix
+                        head = cp.asnumpy(vigenere_decrypt(ct_gpu[:k], ext_key[:, :k], mode))
+                        keep = known[rows] | self.cascade.passes(head)
+                        metrics.count('rejected', int((~keep).sum()))
+                        rows, ext_key = rows[keep], ext_key[cp.asarray(keep)]
+                    plaintexts = cp.asnumpy(vigenere_decrypt(ct_gpu, ext_key, mode))
                 
-                pt = cp.asnumpy(current)
-                text = indices_to_text(pt)
-                score = score_plaintext(text)
-                if score > 500:
-                    results.append(CipherResult(text[:100], score, 'CHAIN', chain.name, 'MULTI'))
-            
-            except Exception as e:
-                continue  # Skip failed chains
+                fresh = np.full(len(ext_keys), REJECTED)
+                with metrics.phase('vigenere/score'):
+                    for row, pt in zip(rows, plaintexts):
+                        key_name = names[row]
+                        text = indices_to_text(pt)
+                        if known[row]:
+                            score = float(cached[row])
+                        else:
+                            score = fresh[row] = score_plaintext(text)
+                        if score > 500:
+                            aliases = self.plan.aliases_of(key_name, mode)
+                            results.append(CipherResult(text[:100], score, 'VIGENERE', key_name, mode,
+                                                        {'aliases': aliases} if aliases else {},
+                                                        key=plan.keys.key(int(key_idx[row])).tolist()))
+                metrics.count('scored', int((~known[rows]).sum()))
+                self.cache.store(hashes[~known], fresh[~known])
         
-        # === PHASE 3: Reversed ciphertext ===
-        ct_rev = ct_gpu[::-1]
+        if single_layer:
+            # Affine cipher (a = 1 is a Caesar shift, a = b = 28 is Atbash: both done above)
+            with metrics.phase('affine'):
+                valid_a = [a for a in range(2, 29) if math.gcd(a, 29) == 1]
+                for a in valid_a:
+                    a_inv = pow(a, -1, MOD)
+                    for b in range(29):
+                        if a == b == MOD - 1:
+                            continue
+                        pt_gpu = (a_inv * (ct_gpu - b)) % MOD
+                        pt = cp.asnumpy(pt_gpu)
+                        text = indices_to_text(pt)
+                        score = score_plaintext(text)
+                        if score > 500:
+                            results.append(CipherResult(text[:100], score, 'AFFINE', f'a={a},b={b}', 'AFFINE'))
+            metrics.count('keys', 27 * 29 - 1)
         
-        # Caesar on reversed
-        for shift in range(29):
-            pt_gpu = (ct_rev - shift) % MOD
-            pt = cp.asnumpy(pt_gpu)
-            text = indices_to_text(pt)
-            score = score_plaintext(text)
-            if score > 500:
-                results.append(CipherResult(text[:100], score, 'CAESAR_REV', f'SHIFT_{shift}', 'REV'))
-        
-        # Top keys on reversed
-        for key_name in ['PHI_PRIME_S0', 'WORD_DIVINITY', 'PRIMES_S0_L50']:
-            if key_name in self.keys:
-                key = self.keys[key_name]
-                key_gpu = cp.array(key)
-                n = len(ct_rev)
-                key_len = len(key_gpu)
-                ext_key = cp.array([key[i % key_len] for i in range(n)])
+        # === PHASE 2: Multi-layer attacks ===
+        with metrics.phase('chains'):
+            chain_hashes = np.array([context_seed(rune_indices, 'MULTI', repr(chain.steps), SCORER_VERSION)
+                                     for chain in chains], dtype=np.uint64)
+            known, cached = self.cache.lookup(chain_hashes)
+            new_hashes, new_scores = [], []
+            for chain, h, is_known, cached_score in zip(chains, chain_hashes, known, cached):
+                if is_known and cached_score <= 500:
+                    continue
+                current = ct_gpu.copy()
                 
-                for mode in ['SUB', 'ADD']:
-                    if mode == 'SUB':
-                        pt_gpu = (ct_rev - ext_key) % MOD
-                    else:
-                        pt_gpu = (ct_rev + ext_key) % MOD
+                try:
+                    for cipher_name, params, mode in chain.steps:
+                        if cipher_name == 'CAESAR':
+                            current = (current - params) % MOD
+                        elif cipher_name == 'ATBASH':
+                            current = (MOD - 1 - current) % MOD
+                        elif cipher_name == 'REVERSE':
+                            current = current[::-1]
+                        elif cipher_name == 'SUBSTITUTION':
+                            key_gpu = cp.array(params)
+                            n = len(current)
+                            key_len = len(key_gpu)
+                            ext_key = cp.array([params[i % key_len] for i in range(n)])
+                            if mode == 'SUB':
+                                current = (current - ext_key) % MOD
+                            elif mode == 'ADD':
+                                current = (current + ext_key) % MOD
+                        elif cipher_name == 'RAILFENCE':
+                            # Handle on CPU for complexity
+                            current_np = cp.asnumpy(current)
+                            rf = RailFenceCipher()
+                            current_np = rf.decrypt(current_np, params, 'RAILS')
+                            current = cp.array(current_np)
+                        elif cipher_name in CIPHER_REGISTRY:
+                            # Fallback for other ciphers (PORTA, GRONSFELD, BIFID, etc)
+                            # We use CPU implementation via CIPHER_REGISTRY
+                            current_np = cp.asnumpy(current)
+                            cipher_obj = CIPHER_REGISTRY[cipher_name]
+                            current_np = cipher_obj.decrypt(current_np, params, mode)
+                            current = cp.array(current_np)
                     
+                    pt = cp.asnumpy(current)
+                    text = indices_to_text(pt)
+                    if is_known:
+                        score = float(cached_score)
+                    else:
+                        score = score_plaintext(text)
+                        new_hashes.append(h)
+                        new_scores.append(score)
+                    if score > 500:
+                        results.append(CipherResult(text[:100], score, 'CHAIN', chain.name, 'MULTI'))
+                
+                except Exception as e:
+                    continue  # Skip failed chains
+            self.cache.store(np.array(new_hashes, dtype=np.uint64), new_scores)
+            self.cache.flush()
+        metrics.count('chains', len(chains))
+        metrics.count('cache_hits', int(known.sum()))
+        metrics.count('scored', len(new_scores))
+        
+        # === PHASE 3: Reversed ciphertext ===
+        if single_layer:
+            with metrics.phase('reversed'):
+                ct_rev = ct_gpu[::-1]
+            
+                # Caesar on reversed
+                for shift in range(29):
+                    pt_gpu = (ct_rev - shift) % MOD
                     pt = cp.asnumpy(pt_gpu)
                     text = indices_to_text(pt)
                     score = score_plaintext(text)
                     if score > 500:
-                        results.append(CipherResult(text[:100], score, 'VIGENERE_REV', key_name, f'{mode}_REV'))
+                        results.append(CipherResult(text[:100], score, 'CAESAR_REV', f'SHIFT_{shift}', 'REV',
+                                                    key=[shift]))
+            
+                # Top keys on reversed
+                for key_name in ['PHI_PRIME_S0', 'WORD_DIVINITY', 'PRIMES_S0_L50']:
+                    key_index = self.keys.index_of(key_name)
+                    if key_index is not None:
+                        key = self.keys.key(key_index)
+                        key_gpu = cp.array(key)
+                        n = len(ct_rev)
+                        key_len = len(key_gpu)
+                        ext_key = cp.array([key[i % key_len] for i in range(n)])
+                    
+                        for mode in ['SUB', 'ADD']:
+                            if mode == 'SUB':
+                                pt_gpu = (ct_rev - ext_key) % MOD
+                            else:
+                                pt_gpu = (ct_rev + ext_key) % MOD
+                        
+                            pt = cp.asnumpy(pt_gpu)
+                            text = indices_to_text(pt)
+                            score = score_plaintext(text)
+                            if score > 500:
+                                results.append(CipherResult(text[:100], score, 'VIGENERE_REV', key_name, f'{mode}_REV',
+                                                            key=[int(k) for k in key]))
+            metrics.count('keys', 29 + 6)
         
         return sorted(results, key=lambda x: -x.score)[:10]
 
 # =============================================================================
-# WORK QUEUE SYSTEM
+# WORK UNITS
 # =============================================================================
 
-def gpu_worker_process(gpu_id: int, page_queue: Queue, result_queue: Queue, 
-                       keys: Dict, chains: List[CipherChain], pages_dir: Path):
-    """Worker process for GPU."""
-    worker = GPUWorker(gpu_id, keys, chains)
+# Estimated cost of a unit in rune-evaluations (decrypt + score of one rune)
+CHAIN_EVALS = 2.0               # A chain is a few cheap steps plus one score
+SINGLE_LAYER_EVALS = 29 + 1 + 27 * 29 - 1 + 29 + 6      # Caesar, Atbash, Affine, reversed
+
+def load_page_runes(pages_dir: Path, page_num: int) -> Optional[np.ndarray]:
+    """Rune indices of a page, or None when it is missing or too short to attack."""
+    runes_file = pages_dir / f"page_{page_num:02d}" / "runes.txt"
+    if not runes_file.exists():
+        return None
+    
+    with open(runes_file, 'r', encoding='utf-8') as f:
+        runes = f.read().strip()
+    
+    rune_indices = np.array([RUNE_TO_INDEX.get(r, 0) for r in runes if r in RUNE_TO_INDEX])
+    return rune_indices if len(rune_indices) >= 5 else None
+
+def build_attack_plan() -> Tuple[KeyPlan, List[CipherChain], Dict[str, str]]:
+    """Canonical Vigenère plan and pruned chains (identical on every node)."""
+    plan = plan_keys(generate_master_keys(), VIGENERE_MODES, covered=single_layer_forms())
+    chains, chain_aliases = prune_chains(create_cipher_chains(), plan)
+    return plan, chains, chain_aliases
+
+def attack_fingerprint(plan: KeyPlan, chains: List[CipherChain], cascade: bool = True) -> str:
+    """Digest of the work a node would do, so mismatched code versions refuse to join."""
+    h = hashlib.sha256(plan.key_idx.tobytes())
+    h.update(plan.mode_idx.tobytes())
+    h.update(repr([(c.name, c.steps) for c in chains]).encode())
+    h.update(SCORER_VERSION.encode())
+    h.update(calibrated_cascade().signature().encode() if cascade else b'no-cascade')
+    return h.hexdigest()[:16]
+
+def attack_cost(page_runes: Dict[int, np.ndarray], tasks: int, chains: int) -> float:
+    """Estimated cost of attacking every page with the whole plan."""
+    return sum(len(r) for r in page_runes.values()) * (SINGLE_LAYER_EVALS + tasks + CHAIN_EVALS * chains)
+
+def make_units(page_runes: Dict[int, np.ndarray], tasks: int, chains: int,
+               target: float) -> List[Dict[str, Any]]:
+    """page x (single-layer | Vigenère task range | chain range) work units.
+
+    Ranges are sized so each unit costs about `target` rune-evaluations;
+    a page's cost grows with its length, so long pages split into more
+    units. Units come largest first.
+    """
+    units = []
+    for page_num, runes in page_runes.items():
+        n = len(runes)
+        base = {'page': page_num, 'runes': runes.tolist(), 'tasks': (0, 0), 'chains': (0, 0),
+                'single_layer': False}
+        units.append(dict(base, single_layer=True, cost=n * SINGLE_LAYER_EVALS))
+        for lo, hi in split_range(tasks, n, target):
+            units.append(dict(base, tasks=(lo, hi), cost=n * (hi - lo)))
+        for lo, hi in split_range(chains, n * CHAIN_EVALS, target):
+            units.append(dict(base, chains=(lo, hi), cost=n * CHAIN_EVALS * (hi - lo)))
+    return sorted(units, key=lambda u: -u['cost'])
+
+def unit_label(unit: Dict[str, Any]) -> str:
+    parts = [f"Page {unit['page']:02d}"]
+    if unit['single_layer']:
+        parts.append("single-layer")
+    if unit['tasks'][1] > unit['tasks'][0]:
+        parts.append(f"tasks {unit['tasks'][0]}-{unit['tasks'][1]}")
+    if unit['chains'][1] > unit['chains'][0]:
+        parts.append(f"chains {unit['chains'][0]}-{unit['chains'][1]}")
+    return ' '.join(parts)
+
+def run_unit(worker: GPUWorker, unit: Dict[str, Any]) -> List[CipherResult]:
+    """Attack one unit; the top ten of its slice of the page."""
+    return worker.attack_page(resolve(unit['runes']), unit['page'], tuple(unit['tasks']),
+                              tuple(unit['chains']), unit['single_layer'])
+
+def gpu_worker_setup(gpu_id: int, context: Tuple[KeyPlan, List[CipherChain], bool]) -> GPUWorker:
+    """Per-process state of a local work-stealing worker (plan and chains attached from shared memory)."""
+    worker = GPUWorker(gpu_id, *attach_tree(context))
     worker.set_gpu()
-    
-    while True:
-        try:
-            page_num = page_queue.get(timeout=1)
-            if page_num is None:  # Poison pill
-                break
-            
-            # Load page
-            page_dir = pages_dir / f"page_{page_num:02d}"
-            runes_file = page_dir / "runes.txt"
-            
-            if not runes_file.exists():
-                result_queue.put((page_num, []))
-                continue
-            
-            with open(runes_file, 'r', encoding='utf-8') as f:
-                runes = f.read().strip()
-            
-            rune_indices = np.array([RUNE_TO_INDEX.get(r, 0) for r in runes if r in RUNE_TO_INDEX])
-            
-            if len(rune_indices) < 5:
-                result_queue.put((page_num, []))
-                continue
-            
-            # Attack
-            start = time.time()
-            results = worker.attack_page(rune_indices, page_num)
-            elapsed = time.time() - start
-            
-            print(f"[GPU {gpu_id}] Page {page_num:02d}: {len(results)} results in {elapsed:.1f}s")
-            result_queue.put((page_num, results))
-            
-        except queue.Empty:
-            continue
-        except Exception as e:
-            print(f"[GPU {gpu_id}] Error: {e}")
-            continue
+    return worker
+
+def merge_unit_results(results: Dict[int, List[CipherResult]], units: List[Dict[str, Any]],
+                       into: Dict[int, List[CipherResult]]):
+    """A page's best hits are the best of its units' top tens."""
+    for unit_id, unit_results in results.items():
+        into.setdefault(units[unit_id]['page'], []).extend(unit_results or [])
+    for page, page_results in into.items():
+        into[page] = sorted(page_results, key=lambda x: -x.score)[:10]
+
+def distributed_worker(address: Tuple[str, int], authkey: bytes, gpu_id: int = 0,
+                       plan: Optional[KeyPlan] = None, chains: Optional[List[CipherChain]] = None,
+                       cascade: bool = True) -> int:
+    """Serve work units of a coordinator until it has none left (any host)."""
+    if plan is None or chains is None:
+        plan, chains, _ = build_attack_plan()
+    worker = GPUWorker(gpu_id, plan, chains, cascade)
+    fingerprint = attack_fingerprint(plan, chains, cascade)
+    
+    def check(info: Dict[str, Any]):
+        if info.get('fingerprint') != fingerprint:
+            raise RuntimeError(f"plan mismatch: coordinator {info.get('fingerprint')}, this node {fingerprint}")
+    
+    def handler(unit: Dict[str, Any]) -> List[CipherResult]:
+        start = time.time()
+        results = run_unit(worker, unit)
+        print(f"[WORKER {gpu_id}] {unit_label(unit)}: {len(results)} results in {time.time() - start:.1f}s")
+        return results
+    
+    return run_worker(address, authkey, handler, check=check)
 
 # =============================================================================
 # MAIN ATTACK ORCHESTRATOR
@@ -1227,15 +828,20 @@ def gpu_worker_process(gpu_id: int, page_queue: Queue, result_queue: Queue,
 class MasterCipherAttack:
     """Orchestrates the full attack across multiple GPUs."""
     
-    def __init__(self, pages_dir: Path, output_file: Path):
+    def __init__(self, pages_dir: Path, output_file: Path, cascade: bool = True):
         self.pages_dir = pages_dir
         self.output_file = output_file
-        self.keys = generate_master_keys()
-        self.chains = create_cipher_chains()
+        self.cascade = cascade
         self.results = {}
         
+        # Drop (key, mode) pairs and chains that provably give the same plaintext
+        self.plan, self.chains, self.chain_aliases = build_attack_plan()
+        self.keys = self.plan.keys
+        
         print(f"[KEYGEN] Generated {len(self.keys)} keys")
-        print(f"[CHAINS] Generated {len(self.chains)} multi-layer chains")
+        print(f"[CANON] {self.plan.summary()}")
+        print(f"[CHAINS] Generated {len(self.chains)} multi-layer chains "
+              f"({len(self.chain_aliases)} equivalent chains pruned)")
     
     def get_pages_to_attack(self, page_spec: str) -> List[int]:
         """Parse page specification."""
@@ -1248,119 +854,127 @@ class MasterCipherAttack:
         else:
             return [int(p) for p in page_spec.split(',')]
     
-    def run_attack(self, pages: List[int], num_gpus: int = None):
-        """Run attack with GPU work queue."""
+    def page_runes(self, pages: List[int]) -> Dict[int, np.ndarray]:
+        """Runes of the attackable pages; missing or too-short pages get no results."""
+        page_runes = {}
+        for page in pages:
+            runes = load_page_runes(self.pages_dir, page)
+            if runes is None:
+                self.results[page] = []
+            else:
+                page_runes[page] = runes
+        return page_runes
+    
+    def run_attack(self, pages: List[int], num_gpus: int = None, units_per_worker: int = 8):
+        """Run attack as cost-estimated units on work-stealing GPU workers."""
         if num_gpus is None:
-            num_gpus = min(GPU_COUNT, 2)
+            num_gpus = max(1, min(GPU_COUNT, 2))
+        
+        page_runes = self.page_runes(pages)
+        total = attack_cost(page_runes, len(self.plan), len(self.chains))
+        units = make_units(page_runes, len(self.plan), len(self.chains),
+                           target_cost(total, num_gpus, units_per_worker))
         
         print(f"\n{'='*70}")
-        print(f"MASTER CIPHER ATTACK - {len(pages)} pages on {num_gpus} GPU(s)")
+        print(f"MASTER CIPHER ATTACK - {len(page_runes)} pages as {len(units)} units on {num_gpus} GPU(s)")
         print(f"{'='*70}")
         print(f"Keys: {len(self.keys)}")
         print(f"Chains: {len(self.chains)}")
         print(f"{'='*70}\n")
         
         start_time = time.time()
-        
-        # Create queues
-        page_queue = Queue()
-        result_queue = Queue()
-        
-        # Add pages to queue
-        for page in pages:
-            page_queue.put(page)
-        
-        # Add poison pills
-        for _ in range(num_gpus):
-            page_queue.put(None)
-        
-        # Start worker processes
-        workers = []
-        for gpu_id in range(num_gpus):
-            p = Process(target=gpu_worker_process, args=(
-                gpu_id, page_queue, result_queue, self.keys, self.chains, self.pages_dir
-            ))
-            p.start()
-            workers.append(p)
-        
-        # Collect results
-        results_collected = 0
-        while results_collected < len(pages):
-            try:
-                page_num, page_results = result_queue.get(timeout=300)
-                self.results[page_num] = page_results
-                results_collected += 1
-                print(f"[PROGRESS] {results_collected}/{len(pages)} pages complete")
-            except queue.Empty:
-                print("[WARNING] Timeout waiting for results")
-                break
-        
-        # Wait for workers
-        for p in workers:
-            p.join(timeout=10)
+        # Workers attach the key matrix and page runes instead of unpickling or regenerating them
+        with SharedArrays() as shared:
+            plan = dataclasses.replace(self.plan, keys=PackedSpace.from_space(self.plan.keys), signatures={})
+            context = shared.share_tree((plan, self.chains, self.cascade))
+            work = [WorkUnit(i, u['cost'], dict(u, runes=shared.share(page_runes[u['page']], f"page{u['page']}")),
+                             unit_label(u)) for i, u in enumerate(units)]
+            print(f"[SHARED] {len(shared)} segments, {shared.nbytes / 2**20:.1f} MB")
+            results, stats = run_units(work, run_unit, num_gpus, setup=gpu_worker_setup, context=context,
+                                       cost_unit='rune-evals')
+        merge_unit_results(results, units, self.results)
+        for unit_id, error in stats.failed.items():
+            print(f"[WARNING] {work[unit_id].label}: {error}")
+        print(f"[SCHED] {stats.summary()}")
         
         elapsed = time.time() - start_time
         print(f"\n[COMPLETE] Attack finished in {elapsed:.1f}s ({elapsed/60:.1f} min)")
         
         # Save results
-        self.save_results()
+        self.save_results(elapsed, pages)
     
-    def save_results(self):
-        """Save results to markdown and JSON."""
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write("# MASTER CIPHER ATTACK RESULTS\n\n")
-            f.write(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"**GPUs:** {GPU_COUNT}\n")
-            f.write(f"**Keys:** {len(self.keys)}\n")
-            f.write(f"**Chains:** {len(self.chains)}\n\n")
-            
-            f.write("---\n\n## Summary\n\n")
-            f.write("| Page | Score | Cipher | Key | Mode | Preview |\n")
-            f.write("|------|-------|--------|-----|------|--------|\n")
-            
-            for page_num in sorted(self.results.keys()):
-                results = self.results[page_num]
-                if results:
-                    best = results[0]
-                    preview = best.plaintext[:50].replace('|', '\\|')
-                    f.write(f"| {page_num:02d} | {best.score:.1f} | {best.cipher_name} | `{best.key_name}` | {best.mode} | {preview}... |\n")
-                else:
-                    f.write(f"| {page_num:02d} | - | - | - | - | No results |\n")
+    def run_distributed(self, pages: List[int], address: Tuple[str, int], authkey: Optional[bytes],
+                        units_per_page: int = 16, local_workers: int = 0,
+                        lease_ttl: float = DEFAULT_LEASE_TTL):
+        """Coordinate the attack over TCP: workers on any host lease cost-estimated units.
+        
+        `local_workers` also starts that many worker processes on this machine.
+        Units are leased largest first, so the small ones fill in at the end.
+        """
+        page_runes = self.page_runes(pages)
+        total = attack_cost(page_runes, len(self.plan), len(self.chains))
+        units = make_units(page_runes, len(self.plan), len(self.chains),
+                           total / max(1, units_per_page * len(page_runes)))
+        broker = LeaseBroker(units, lease_ttl=lease_ttl,
+                             info={'fingerprint': attack_fingerprint(self.plan, self.chains, self.cascade)})
+        
+        start_time = time.time()
+        with BrokerServer(broker, address, authkey) as server:
+            print(f"\n{'='*70}")
+            print(f"MASTER CIPHER ATTACK - {len(page_runes)} pages as {len(units)} units, "
+                  f"coordinator on {server.address[0]}:{server.address[1]}")
+            print(f"{'='*70}\n")
             
-            f.write("\n---\n\n## Details\n\n")
+            workers = []
+            for i in range(local_workers):
+                p = Process(target=distributed_worker,
+                            args=(server.connect_address, server.authkey, i % max(1, GPU_COUNT)),
+                            kwargs={'cascade': self.cascade})
+                p.start()
+                workers.append(p)
             
-            for page_num in sorted(self.results.keys()):
-                results = self.results[page_num]
-                f.write(f"### Page {page_num:02d}\n\n")
-                
-                if not results:
-                    f.write("No results above threshold.\n\n")
-                    continue
-                
-                for i, r in enumerate(results[:5], 1):
-                    f.write(f"**{i}. Score: {r.score:.1f}** | Cipher: `{r.cipher_name}` | Key: `{r.key_name}` | Mode: {r.mode}\n")
-                    f.write(f"```\n{r.plaintext}\n```\n\n")
+            metrics = get_metrics()
+            metrics.plan(len(units), 'units')
+
+            def report(line: str):
+                status = broker.status()
+                metrics.advance(status['done'] - metrics.work_done)
+                metrics.gauge('queue', status['pending'])
+                metrics.tick()
+                print(line)
+
+            broker.wait(report=report)
+            for p in workers:
+                p.join(timeout=10)
         
-        # JSON output
-        json_file = self.output_file.with_suffix('.json')
-        json_data = {}
-        for page_num, results in self.results.items():
-            json_data[str(page_num)] = [
-                {
-                    'plaintext': r.plaintext,
-                    'score': r.score,
-                    'cipher': r.cipher_name,
-                    'key': r.key_name,
-                    'mode': r.mode
-                }
-                for r in results
-            ]
+        merge_unit_results(broker.results(), units, self.results)
+        for unit_id, reason in broker.failures().items():
+            print(f"[WARNING] {unit_label(units[unit_id])} gave up: {reason}")
+        for name, stats in broker.workers().items():
+            print(f"[WORKER] {name}: {stats.completed} units, {stats.busy_seconds:.1f}s busy")
         
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2)
+        elapsed = time.time() - start_time
+        print(f"\n[COMPLETE] Attack finished in {elapsed:.1f}s ({elapsed/60:.1f} min)")
+        self.save_results(elapsed, pages)
+    
+    def save_results(self, elapsed: Optional[float] = None, pages: Optional[List[int]] = None):
+        """Record the hits in the results database and write the Markdown / JSON views."""
+        with ResultsDB() as db:
+            run_id = db.start_run('master_cipher', {'pages': pages, 'keys': len(self.keys),
+                                                    'chains': len(self.chains)})
+            with db.writer(run_id) as writer:
+                for page_num, results in self.results.items():
+                    writer.extend(ResultRecord(page_num, r.score, r.cipher_name, r.key_name, r.mode,
+                                               chain=r.key_name if r.cipher_name == 'CHAIN' else '',
+                                               plaintext=r.plaintext, key=r.key, details=r.details)
+                                  for r in results)
+            db.finish_run(run_id, elapsed)
+            md, js = write_reports(db, run_id, self.output_file, "MASTER CIPHER ATTACK RESULTS",
+                                   {'GPUs': GPU_COUNT, 'Keys': len(self.keys), 'Chains': len(self.chains)})
         
-        print(f"[SAVED] {self.output_file}")
-        print(f"[SAVED] {json_file}")
+        print(f"[SAVED] run {run_id} -> {db.path}")
+        print(f"[SAVED] {md}")
+        print(f"[SAVED] {js}")
 
 # =============================================================================
 # MAIN
@@ -1374,17 +988,54 @@ def main():
                         help='Number of GPUs to use')
     parser.add_argument('--output', type=str, default='MASTER_RESULTS.md',
                         help='Output file')
+    parser.add_argument('--serve', type=str, default=None, metavar='HOST:PORT',
+                        help='Coordinate a distributed attack, handing out work units over TCP '
+                             '(HOST defaults to 127.0.0.1)')
+    parser.add_argument('--worker', type=str, default=None, metavar='HOST:PORT',
+                        help='Work for the coordinator at this address')
+    parser.add_argument('--authkey', type=str, default=None,
+                        help='Shared secret of the coordinator and its workers (default: BROKER_AUTHKEY, '
+                             'or a built-in key the coordinator only serves on loopback with)')
+    parser.add_argument('--local-workers', type=int, default=0,
+                        help='Worker processes the coordinator starts on this machine')
+    parser.add_argument('--units-per-worker', type=int, default=8,
+                        help='Cost-estimated work units per local GPU worker')
+    parser.add_argument('--units-per-page', type=int, default=16,
+                        help='Average work units per page in a distributed attack')
+    parser.add_argument('--lease-ttl', type=float, default=DEFAULT_LEASE_TTL,
+                        help='Seconds without a heartbeat before a unit is reassigned')
+    parser.add_argument('--gpu', type=int, default=0, help='GPU a worker uses')
+    parser.add_argument('--no-cascade', action='store_true',
+                        help='Fully score every Vigenère candidate instead of prefix-testing it first')
+    add_metrics_arguments(parser)
     
     args = parser.parse_args()
+    configure_from_args('master_cipher-worker' if args.worker else 'master_cipher', args)
+    authkey = args.authkey.encode() if args.authkey is not None else None
+    if args.serve:
+        try:
+            authkey = server_authkey(parse_address(args.serve)[0], authkey)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    if args.worker:
+        done = distributed_worker(parse_address(args.worker), authkey or DEFAULT_AUTHKEY, args.gpu,
+                                  cascade=not args.no_cascade)
+        print(f"[WORKER] Finished: {done} units")
+        return
     
     pages_dir = Path(__file__).parent.parent / 'pages'
     output_file = Path(__file__).parent / args.output
     
-    attack = MasterCipherAttack(pages_dir, output_file)
+    attack = MasterCipherAttack(pages_dir, output_file, cascade=not args.no_cascade)
     pages = attack.get_pages_to_attack(args.pages)
     
     print(f"[PAGES] Attacking: {pages}")
-    attack.run_attack(pages, args.gpus)
+    if args.serve:
+        attack.run_distributed(pages, parse_address(args.serve), authkey, args.units_per_page,
+                               args.local_workers, args.lease_ttl)
+    else:
+        attack.run_attack(pages, args.gpus, args.units_per_worker)
 
 if __name__ == '__main__':
     main()
@@ -12,14 +12,22 @@ This module contains ALL relevant data for cryptanalysis:
 - Common English words and trigrams
 - Cicada-specific terminology
 
+Everything derived from the sources (primes, totients, word -> key tables,
+Self-Reliance word sets) is compiled once into a versioned binary artifact
+(.cache/master_dictionary.npz) that is rebuilt only when this module or the
+Self-Reliance text changes. Those names are lazy module attributes, loaded
+on first access, so importing the module for the alphabet costs nothing.
+
 Author: Wulfic
 Date: January 2026
 """
 
+import hashlib
 import os
 import re
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Any, Callable, Dict, List, Tuple, Set
 from functools import lru_cache
 
 # =============================================================================
@@ -86,15 +94,11 @@ def sieve_of_eratosthenes(limit: int) -> List[int]:
                 sieve[j] = False
     return [i for i, is_prime in enumerate(sieve) if is_prime]
 
-# Generate primes up to 10000 (enough for most purposes)
-PRIMES = sieve_of_eratosthenes(10000)
-PRIME_SET = set(PRIMES)
-
-# First 500 primes (commonly used)
-FIRST_500_PRIMES = PRIMES[:500]
+# Primes up to 10000 (enough for most purposes)
+PRIME_LIMIT = 10000
 
-# Primes mod 29 (for direct use as key values)
-PRIMES_MOD_29 = [p % ALPHABET_SIZE for p in PRIMES]
+# Lazy (see COMPILED ARTIFACT): PRIMES, PRIME_SET, FIRST_500_PRIMES (commonly
+# used), PRIMES_MOD_29 (for direct use as key values)
 
 @lru_cache(maxsize=10000)
 def totient(n: int) -> int:
@@ -114,12 +118,8 @@ def totient(n: int) -> int:
         result -= result // temp
     return result
 
-# Precompute totients for first 1000 numbers
-TOTIENTS = {i: totient(i) for i in range(1, 1001)}
-
-# Totient of primes: φ(p) = p - 1
-PRIME_TOTIENTS = [p - 1 for p in PRIMES]
-PRIME_TOTIENTS_MOD_29 = [(p - 1) % ALPHABET_SIZE for p in PRIMES]
+# Lazy: TOTIENTS (first 1000 numbers), PRIME_TOTIENTS (φ(p) = p - 1),
+# PRIME_TOTIENTS_MOD_29
 
 # =============================================================================
 # FIBONACCI AND LUCAS SEQUENCES
@@ -147,18 +147,15 @@ def generate_lucas(n: int) -> List[int]:
         luc.append(luc[-1] + luc[-2])
     return luc
 
-FIBONACCI = generate_fibonacci(100)
-LUCAS = generate_lucas(100)
-
-FIBONACCI_MOD_29 = [f % ALPHABET_SIZE for f in FIBONACCI]
-LUCAS_MOD_29 = [l % ALPHABET_SIZE for l in LUCAS]
+# Lazy: FIBONACCI, LUCAS (first 100 terms), FIBONACCI_MOD_29, LUCAS_MOD_29
 
 # =============================================================================
 # KNOWN KEYS FROM SOLVED PAGES
 # =============================================================================
 
-# Verified keys that successfully decoded pages
-KNOWN_KEYS = {
+# Verified keys that successfully decoded pages (None = text_to_key(name)).
+# KNOWN_KEYS itself is lazy.
+KNOWN_KEY_SPECS = {
     'DIVINITY': [23, 10, 28, 10, 29, 10, 16, 26],  # Pages 03, 04, 61
     'FIRFUMFERENFE': None,  # Pages 14, 15, 72 - Will compute
     'CONSUMPTION': None,  # Page 62
@@ -211,11 +208,6 @@ def text_to_key(text: str) -> List[int]:
         i += 1
     return result
 
-# Compute all key indices
-for key_name in KNOWN_KEYS:
-    if KNOWN_KEYS[key_name] is None:
-        KNOWN_KEYS[key_name] = text_to_key(key_name)
-
 # =============================================================================
 # CICADA-SPECIFIC TERMS
 # =============================================================================
@@ -254,25 +246,27 @@ CICADA_TERMS = [
     "THREETHREEZEROONE", "THREEZERONEONE", "THREETHOUSANDTHREEHUNDREDONE",
 ]
 
-CICADA_TERM_KEYS = {term: text_to_key(term) for term in CICADA_TERMS}
+# Lazy: CICADA_TERM_KEYS
 
 # =============================================================================
 # SELF-RELIANCE EXTRACTION
 # =============================================================================
 
+SELF_RELIANCE_PATHS = [
+    Path(__file__).parent / "reference" / "research" / "Self-Reliance.txt",
+    Path(__file__).parent.parent / "LiberPrimus" / "reference" / "research" / "Self-Reliance.txt",
+    Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/research/Self-Reliance.txt"),
+]
+
 def load_self_reliance() -> str:
     """Load Self-Reliance text if available."""
-    paths = [
-        Path(__file__).parent / "reference" / "research" / "Self-Reliance.txt",
-        Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/research/Self-Reliance.txt"),
-    ]
-    for path in paths:
+    for path in SELF_RELIANCE_PATHS:
         if path.exists():
             with open(path, 'r', encoding='utf-8', errors='ignore') as f:
                 return f.read()
     return ""
 
-SELF_RELIANCE_TEXT = load_self_reliance()
+# Lazy: SELF_RELIANCE_TEXT
 
 def extract_words_from_text(text: str) -> Set[str]:
     """Extract unique words from text, cleaned."""
@@ -280,8 +274,7 @@ def extract_words_from_text(text: str) -> Set[str]:
     # Filter to reasonable length
     return {w for w in words if 2 <= len(w) <= 30}
 
-SELF_RELIANCE_WORDS = extract_words_from_text(SELF_RELIANCE_TEXT)
-SELF_RELIANCE_WORD_KEYS = {w: text_to_key(w) for w in SELF_RELIANCE_WORDS}
+# Lazy: SELF_RELIANCE_WORDS, SELF_RELIANCE_WORD_KEYS
 
 # Key phrases from Self-Reliance that might be used
 SELF_RELIANCE_PHRASES = [
@@ -309,9 +302,7 @@ SOLVED_PLAINTEXTS = {
     55: "ANENDWITHINTHADEEPWEBTHEREEXISTSAPAGETHATHASESTOTHEIDYTWOFEUERYPILGRIMTOSEEKOUTTHISPAGE",
 }
 
-SOLVED_PLAINTEXT_WORDS = set()
-for pt in SOLVED_PLAINTEXTS.values():
-    SOLVED_PLAINTEXT_WORDS.update(extract_words_from_text(pt))
+# Lazy: SOLVED_PLAINTEXT_WORDS
 
 # =============================================================================
 # COMMON ENGLISH WORDS
@@ -359,7 +350,7 @@ COMMON_ENGLISH_WORDS = [
     "DIVINE", "GOD", "GODS", "HEAVEN", "HELL", "ANGEL", "DEMON", "SPIRIT",
 ]
 
-COMMON_WORD_KEYS = {w: text_to_key(w) for w in COMMON_ENGLISH_WORDS}
+# Lazy: COMMON_WORD_KEYS
 
 # =============================================================================
 # TRIGRAMS AND N-GRAMS FOR SCORING
@@ -409,8 +400,7 @@ NUMBER_3301_FACTORS = [1, 3301]  # 3301 is prime
 # Key lengths from solved pages (many are prime)
 KNOWN_KEY_LENGTHS = [7, 8, 9, 11, 13, 17, 29, 43, 53, 61, 71, 83, 89, 97]
 
-# Prime key lengths to try
-PRIME_KEY_LENGTHS = [p for p in PRIMES if p <= 200]
+# Lazy: PRIME_KEY_LENGTHS (prime key lengths to try, up to 200)
 
 # Offset values to try (all possible for mod 29)
 OFFSETS = list(range(ALPHABET_SIZE))
@@ -423,21 +413,20 @@ def get_all_words() -> Set[str]:
     """Get combined set of all words from all sources."""
     all_words = set(CICADA_TERMS)
     all_words.update(COMMON_ENGLISH_WORDS)
-    all_words.update(SELF_RELIANCE_WORDS)
-    all_words.update(SOLVED_PLAINTEXT_WORDS)
+    all_words.update(_lazy('SELF_RELIANCE_WORDS'))
+    all_words.update(_lazy('SOLVED_PLAINTEXT_WORDS'))
     return all_words
 
 def get_all_keys() -> Dict[str, List[int]]:
     """Get dictionary of all words mapped to their key indices."""
     all_keys = {}
-    all_keys.update(CICADA_TERM_KEYS)
-    all_keys.update(COMMON_WORD_KEYS)
-    all_keys.update(SELF_RELIANCE_WORD_KEYS)
-    all_keys.update(KNOWN_KEYS)
+    all_keys.update(_lazy('CICADA_TERM_KEYS'))
+    all_keys.update(_lazy('COMMON_WORD_KEYS'))
+    all_keys.update(_lazy('SELF_RELIANCE_WORD_KEYS'))
+    all_keys.update(_lazy('KNOWN_KEYS'))
     return all_keys
 
-ALL_WORDS = get_all_words()
-ALL_KEYS = get_all_keys()
+# Lazy: ALL_WORDS, ALL_KEYS
 
 # =============================================================================
 # UTILITY FUNCTIONS FOR KEY GENERATION
@@ -447,17 +436,17 @@ def generate_prime_sequence_key(length: int, start_prime_idx: int = 0,
                                  use_totient: bool = False) -> List[int]:
     """Generate a key using sequential primes or their totients."""
     if use_totient:
-        return [PRIME_TOTIENTS_MOD_29[start_prime_idx + i] for i in range(length)]
+        return [_lazy('PRIME_TOTIENTS_MOD_29')[start_prime_idx + i] for i in range(length)]
     else:
-        return [PRIMES_MOD_29[start_prime_idx + i] for i in range(length)]
+        return [_lazy('PRIMES_MOD_29')[start_prime_idx + i] for i in range(length)]
 
 def generate_fibonacci_key(length: int, start_idx: int = 0) -> List[int]:
     """Generate a key using Fibonacci sequence."""
-    return [FIBONACCI_MOD_29[start_idx + i] for i in range(length)]
+    return [_lazy('FIBONACCI_MOD_29')[start_idx + i] for i in range(length)]
 
 def generate_lucas_key(length: int, start_idx: int = 0) -> List[int]:
     """Generate a key using Lucas sequence."""
-    return [LUCAS_MOD_29[start_idx + i] for i in range(length)]
+    return [_lazy('LUCAS_MOD_29')[start_idx + i] for i in range(length)]
 
 def generate_offset_variations(key: List[int], offsets: List[int] = None) -> List[Tuple[int, List[int]]]:
     """Generate all offset variations of a key."""
@@ -477,6 +466,228 @@ def invert_key(key: List[int]) -> List[int]:
     """Invert key values (for decrypt/encrypt swap)."""
     return [(ALPHABET_SIZE - k) % ALPHABET_SIZE for k in key]
 
+# =============================================================================
+# PAGE LOADING
+# =============================================================================
+
+PAGES_DIR = Path(__file__).parent.parent / "LiberPrimus" / "pages"
+
+# Characters that separate words in the transcripts
+WORD_SEPARATORS = '-.•/&'
+
+def load_page_runes(page_num: int) -> str:
+    """Load the raw rune transcript of a page (empty string if missing)."""
+    runes_file = PAGES_DIR / f"page_{page_num:02d}" / "runes.txt"
+    if not runes_file.exists():
+        return ""
+    with open(runes_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def load_page_indices(page_num: int) -> List[int]:
+    """Load a page as a flat list of Gematria indices (separators dropped)."""
+    return [RUNE_TO_INDEX[c] for c in load_page_runes(page_num) if c in RUNE_TO_INDEX]
+
+def available_pages() -> List[int]:
+    """Page numbers that have a runes.txt transcript."""
+    return sorted(int(d.name[5:]) for d in PAGES_DIR.glob("page_*")
+                  if (d / "runes.txt").exists())
+
+def split_rune_words(rune_text: str) -> List[Tuple[int, List[int]]]:
+    """Split a transcript into words.
+
+    Returns (stream_offset, indices) per word, where stream_offset is the
+    position of the word's first rune in the separator-free index stream.
+    """
+    words = []
+    current: List[int] = []
+    offset = 0
+    for char in rune_text:
+        if char in RUNE_TO_INDEX:
+            current.append(RUNE_TO_INDEX[char])
+        elif current:
+            words.append((offset, current))
+            offset += len(current)
+            current = []
+    if current:
+        words.append((offset, current))
+    return words
+
+def load_solved_page_texts() -> Dict[int, str]:
+    """Word-segmented plaintexts of solved pages, parsed from the page READMEs.
+
+    Picks up the "Full Plaintext" code blocks and the "English Translation"
+    block quotes.
+    """
+    texts = {}
+    for readme in sorted(PAGES_DIR.glob("page_*/README.md")):
+        with open(readme, 'r', encoding='utf-8') as f:
+            content = f.read()
+        blocks = re.findall(r'\*\*Full Plaintext:\*\*\s*```\n(.*?)```', content, re.S)
+        for section in re.findall(r'### English Translation\n(.*?)(?:\n---|\n##|\Z)', content, re.S):
+            lines = [l.lstrip('> ').strip() for l in section.splitlines() if l.startswith('>')]
+            blocks.append('\n'.join(l for l in lines if not l.startswith('`')))
+        text = re.sub(r'[^A-Z\s]', ' ', '\n'.join(blocks).upper())
+        text = re.sub(r'[ \t]+', ' ', text).strip()
+        if text:
+            texts[int(readme.parent.name[5:])] = text
+    return texts
+
+# =============================================================================
+# REFERENCE CORPORA
+# =============================================================================
+
+REFERENCE_DIR = Path(__file__).parent.parent / "LiberPrimus" / "reference" / "research"
+
+CORPUS_FILES = {
+    'self_reliance': REFERENCE_DIR / "Self-Reliance.txt",
+    'liber_al': REFERENCE_DIR / "liber_al_vel_legis.txt",
+    'deor': Path(__file__).parent.parent / "Analysis" / "Reference_Docs" / "deor_poem.txt",
+}
+
+def load_corpus_text(name: str) -> str:
+    """Load a reference corpus by name (empty string if missing)."""
+    path = CORPUS_FILES.get(name)
+    if path is None or not path.exists():
+        return ""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+# =============================================================================
+# COMPILED ARTIFACT AND LAZY ATTRIBUTES
+# =============================================================================
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+ARTIFACT_PATH = CACHE_DIR / "master_dictionary.npz"
+ARTIFACT_VERSION = 1        # Bump when the artifact layout changes
+SEQUENCE_SOURCE = Path(__file__).parent / "math_sequences.py"
+
+# Word -> key tables stored in the artifact (flat uint8 keys + offsets)
+_KEY_TABLES = ('known', 'cicada', 'common', 'self_reliance')
+
+def _self_reliance_path():
+    return next((p for p in SELF_RELIANCE_PATHS if p.exists()), None)
+
+def artifact_fingerprint() -> str:
+    """Hash of the artifact version and every source it is compiled from."""
+    h = hashlib.sha256(f"v{ARTIFACT_VERSION}".encode())
+    h.update(Path(__file__).read_bytes())
+    h.update(SEQUENCE_SOURCE.read_bytes())
+    sr = _self_reliance_path()
+    if sr is not None:
+        h.update(sr.read_bytes())
+    return h.hexdigest()
+
+def _key_table(word_keys: Dict[str, List[int]]) -> Tuple[List[str], List[int], List[int]]:
+    words = list(word_keys)
+    lengths = [len(word_keys[w]) for w in words]
+    offsets = [0]
+    for n in lengths:
+        offsets.append(offsets[-1] + n)
+    flat = [k for w in words for k in word_keys[w]]
+    return words, flat, offsets
+
+def compile_artifact(path: Path = ARTIFACT_PATH) -> Dict[str, Any]:
+    """Compute every derived table from the sources and write the artifact."""
+    import numpy as np
+    from math_sequences import primes_upto, sequence
+
+    primes = primes_upto(PRIME_LIMIT)
+    sr_words = sorted(extract_words_from_text(load_self_reliance()))
+    solved_words = set()
+    for pt in SOLVED_PLAINTEXTS.values():
+        solved_words.update(extract_words_from_text(pt))
+
+    tables = {
+        'known': {name: key if key is not None else text_to_key(name)
+                  for name, key in KNOWN_KEY_SPECS.items()},
+        'cicada': {term: text_to_key(term) for term in CICADA_TERMS},
+        'common': {w: text_to_key(w) for w in COMMON_ENGLISH_WORDS},
+        'self_reliance': {w: text_to_key(w) for w in sr_words},
+    }
+    arrays = {
+        'fingerprint': np.array(artifact_fingerprint()),
+        'primes': primes.astype(np.int32),
+        'totients': sequence('TOTIENTS', 1000, mod=None).astype(np.int32),
+        'solved_words': np.array(sorted(solved_words)),
+    }
+    for name in _KEY_TABLES:
+        words, flat, offsets = _key_table(tables[name])
+        arrays[f'{name}_words'] = np.array(words)
+        arrays[f'{name}_keys'] = np.array(flat, dtype=np.uint8)
+        arrays[f'{name}_offsets'] = np.array(offsets, dtype=np.int32)
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Read-only checkout: use the in-memory tables
+    return arrays
+
+@lru_cache(maxsize=1)
+def load_artifact() -> Dict[str, Any]:
+    """The compiled tables, rebuilding the artifact if any source changed."""
+    if ARTIFACT_PATH.exists():
+        import numpy as np
+        try:
+            with np.load(ARTIFACT_PATH) as data:
+                if str(data['fingerprint']) == artifact_fingerprint():
+                    return {k: data[k] for k in data.files}
+        except (OSError, ValueError, KeyError):
+            pass
+    return compile_artifact()
+
+def _word_keys(table: str) -> Dict[str, List[int]]:
+    data = load_artifact()
+    words = data[f'{table}_words'].tolist()
+    flat = data[f'{table}_keys'].tolist()
+    offsets = data[f'{table}_offsets'].tolist()
+    return {w: flat[offsets[i]:offsets[i + 1]] for i, w in enumerate(words)}
+
+def _primes() -> List[int]:
+    return load_artifact()['primes'].tolist()
+
+_LAZY: Dict[str, Callable[[], Any]] = {
+    'PRIMES': _primes,
+    'PRIME_SET': lambda: set(_lazy('PRIMES')),
+    'FIRST_500_PRIMES': lambda: _lazy('PRIMES')[:500],
+    'PRIMES_MOD_29': lambda: [p % ALPHABET_SIZE for p in _lazy('PRIMES')],
+    'TOTIENTS': lambda: dict(enumerate(load_artifact()['totients'].tolist(), start=1)),
+    'PRIME_TOTIENTS': lambda: [p - 1 for p in _lazy('PRIMES')],
+    'PRIME_TOTIENTS_MOD_29': lambda: [(p - 1) % ALPHABET_SIZE for p in _lazy('PRIMES')],
+    'FIBONACCI': lambda: generate_fibonacci(100),
+    'LUCAS': lambda: generate_lucas(100),
+    'FIBONACCI_MOD_29': lambda: [f % ALPHABET_SIZE for f in _lazy('FIBONACCI')],
+    'LUCAS_MOD_29': lambda: [l % ALPHABET_SIZE for l in _lazy('LUCAS')],
+    'KNOWN_KEYS': lambda: _word_keys('known'),
+    'CICADA_TERM_KEYS': lambda: _word_keys('cicada'),
+    'COMMON_WORD_KEYS': lambda: _word_keys('common'),
+    'SELF_RELIANCE_TEXT': load_self_reliance,
+    'SELF_RELIANCE_WORDS': lambda: set(load_artifact()['self_reliance_words'].tolist()),
+    'SELF_RELIANCE_WORD_KEYS': lambda: _word_keys('self_reliance'),
+    'SOLVED_PLAINTEXT_WORDS': lambda: set(load_artifact()['solved_words'].tolist()),
+    'PRIME_KEY_LENGTHS': lambda: [p for p in _lazy('PRIMES') if p <= 200],
+    'ALL_WORDS': get_all_words,
+    'ALL_KEYS': get_all_keys,
+}
+
+def __getattr__(name: str) -> Any:
+    """Build a lazy attribute on first access and keep it as a module global."""
+    builder = _LAZY.get(name)
+    if builder is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = builder()
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
+def _lazy(name: str) -> Any:
+    """Lazy attribute access from inside this module (globals bypass __getattr__)."""
+    return globals()[name] if name in globals() else __getattr__(name)
+
 # =============================================================================
 # SUMMARY STATISTICS
 # =============================================================================
@@ -487,19 +698,22 @@ def print_dictionary_stats():
     print("MASTER DICTIONARY STATISTICS")
     print("=" * 60)
     print(f"Alphabet size: {ALPHABET_SIZE}")
-    print(f"Total primes loaded: {len(PRIMES)}")
+    print(f"Total primes loaded: {len(_lazy('PRIMES'))}")
     print(f"Cicada-specific terms: {len(CICADA_TERMS)}")
-    print(f"Self-Reliance words: {len(SELF_RELIANCE_WORDS)}")
+    print(f"Self-Reliance words: {len(_lazy('SELF_RELIANCE_WORDS'))}")
     print(f"Common English words: {len(COMMON_ENGLISH_WORDS)}")
-    print(f"Solved plaintext words: {len(SOLVED_PLAINTEXT_WORDS)}")
-    print(f"Total unique words: {len(ALL_WORDS)}")
-    print(f"Total keys available: {len(ALL_KEYS)}")
+    print(f"Solved plaintext words: {len(_lazy('SOLVED_PLAINTEXT_WORDS'))}")
+    print(f"Total unique words: {len(_lazy('ALL_WORDS'))}")
+    print(f"Total keys available: {len(_lazy('ALL_KEYS'))}")
     print(f"Trigrams for scoring: {len(TRIGRAMS)}")
     print(f"Bigrams for scoring: {len(BIGRAMS)}")
     print(f"Quadgrams for scoring: {len(QUADGRAMS)}")
     print("=" * 60)
 
 if __name__ == "__main__":
+    if '--rebuild' in sys.argv:
+        compile_artifact()
+        print(f"Rebuilt {ARTIFACT_PATH}")
     print_dictionary_stats()
     
     # Test some conversions
@@ -12,6 +12,8 @@ Testing various mathematical sequences as key streams.
 from pathlib import Path
 from collections import Counter
 
+from math_sequences import primes_upto, sequence
+
 LETTERS = ['F', 'U', 'TH', 'O', 'R', 'C', 'G', 'W', 'H', 'N', 'I', 'J', 
            'EO', 'P', 'X', 'S', 'T', 'B', 'E', 'M', 'L', 'NG', 'OE', 'D',
            'A', 'AE', 'Y', 'IO', 'EA']
@@ -23,42 +25,16 @@ RUNE_MAP = {
     'ᚪ': 24, 'ᚫ': 25, 'ᚣ': 26, 'ᛡ': 27, 'ᛠ': 28,
 }
 
-# Extended prime list
-def sieve_primes(n):
-    """Generate primes up to n using sieve."""
-    sieve = [True] * (n + 1)
-    sieve[0] = sieve[1] = False
-    for i in range(2, int(n**0.5) + 1):
-        if sieve[i]:
-            for j in range(i*i, n + 1, i):
-                sieve[j] = False
-    return [i for i in range(n + 1) if sieve[i]]
-
-PRIMES = sieve_primes(10000)
-
-# Fibonacci sequence
-def fibonacci_sequence(n):
-    fib = [0, 1]
-    for i in range(2, n):
-        fib.append(fib[-1] + fib[-2])
-    return fib
-
-FIBONACCI = fibonacci_sequence(1000)
-
-# Lucas numbers
-def lucas_sequence(n):
-    luc = [2, 1]
-    for i in range(2, n):
-        luc.append(luc[-1] + luc[-2])
-    return luc
-
-LUCAS = lucas_sequence(1000)
+# Extended prime list and recurrences (reduced mod 29) from the sequence library
+PRIMES = primes_upto(10000).tolist()
+FIBONACCI = sequence('FIBONACCI', 1000).tolist()
+LUCAS = sequence('LUCAS', 1000).tolist()
 
 # Triangular numbers
 TRIANGULAR = [n * (n + 1) // 2 for n in range(1, 1001)]
 
 # Prime gaps
-PRIME_GAPS = [PRIMES[i+1] - PRIMES[i] for i in range(len(PRIMES) - 1)]
+PRIME_GAPS = sequence('PRIME_GAPS', len(PRIMES) - 1, mod=None).tolist()
 
 def load_page(page_num):
     script_dir = Path(__file__).parent
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+MATHEMATICAL SEQUENCE LIBRARY
+=============================
+
+Millions of terms of every number-theoretic key source, generated with
+numpy and cached on disk as arrays:
+
+- PRIMES, COMPOSITES        boolean sieve
+- TOTIENTS                  φ(n) for n = 1.. (vectorised per-prime sieve)
+- PRIME_TOTIENTS            φ(p) = p - 1
+- PRIME_GAPS                p[n+1] - p[n]
+- FIBONACCI, LUCAS, PELL,   computed mod 29 over one period of the state
+  TRIBONACCI                (Pisano period 14 for Fibonacci) and tiled
+- DIGITS_PI / E / PHI /     decimal digits by binary splitting and Newton
+  SQRT2                     square roots on exact decimal arithmetic
+
+Any name can be prefixed with PRIME_INDEXED_ or COMPOSITE_INDEXED_ to keep
+only the terms whose index n is prime (F(2), F(3), F(5), ...) or composite.
+
+    >>> sequence('FIBONACCI', 5)              # mod 29 by default
+    >>> sequence('PRIMES', 5, mod=None)       # raw values
+    >>> sequence('PRIME_INDEXED_TOTIENTS', 1_000_000)
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import decimal
+import math
+import os
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from master_dictionary import ALPHABET_SIZE, CACHE_DIR
+
+SEQUENCE_DIR = CACHE_DIR / "sequences"
+SEQUENCE_VERSION = 1        # Bump when any builder's output changes
+MIN_TERMS = 10000           # Smallest prefix worth caching
+DEFAULT_TERMS = 100000
+
+PRIME_INDEXED = 'PRIME_INDEXED_'
+COMPOSITE_INDEXED = 'COMPOSITE_INDEXED_'
+
+# =============================================================================
+# SIEVES
+# =============================================================================
+
+def prime_sieve(limit: int) -> np.ndarray:
+    """is_prime[n] for 0 <= n <= limit."""
+    is_prime = np.ones(max(limit + 1, 2), dtype=bool)
+    is_prime[:2] = False
+    for p in range(2, math.isqrt(limit) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = False
+    return is_prime[:limit + 1]
+
+def primes_upto(limit: int) -> np.ndarray:
+    return np.flatnonzero(prime_sieve(limit)).astype(np.int64)
+
+def nth_prime_bound(count: int) -> int:
+    """Upper bound on the count-th prime (Rosser's theorem)."""
+    if count < 6:
+        return 13
+    ln = math.log(count)
+    return int(count * (ln + math.log(ln))) + 1
+
+def first_primes(count: int) -> np.ndarray:
+    return primes_upto(nth_prime_bound(count))[:count]
+
+def first_composites(count: int) -> np.ndarray:
+    limit = 2 * count + 16
+    while True:
+        composites = np.flatnonzero(~prime_sieve(limit))
+        composites = composites[composites >= 4]
+        if len(composites) >= count:
+            return composites[:count].astype(np.int64)
+        limit *= 2
+
+def totients_upto(limit: int) -> np.ndarray:
+    """φ(n) for 0 <= n <= limit (φ(0) = 0).
+
+    Each prime p removes its share from every multiple at once:
+    φ(n) = n · Π (1 - 1/p), one slice update per prime.
+    """
+    phi = np.arange(limit + 1, dtype=np.int64)
+    for p in primes_upto(limit):
+        phi[p::p] -= phi[p::p] // p
+    return phi
+
+# =============================================================================
+# RECURRENCES MOD 29
+# =============================================================================
+
+# a[n] = c1*a[n-1] + c2*a[n-2] + ...  ->  (coefficients, seed terms)
+RECURRENCES: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {
+    'FIBONACCI': ((1, 1), (0, 1)),
+    'LUCAS': ((1, 1), (2, 1)),
+    'PELL': ((2, 1), (0, 1)),
+    'TRIBONACCI': ((1, 1, 1), (0, 0, 1)),
+}
+
+def recurrence_cycle(coefficients: Tuple[int, ...], seeds: Tuple[int, ...],
+                     mod: int = ALPHABET_SIZE) -> Tuple[List[int], List[int]]:
+    """(pre-period, period) of a linear recurrence mod `mod`.
+
+    The state space is finite, so the terms are eventually periodic; for
+    Fibonacci mod 29 this is the Pisano period of 14.
+    """
+    terms = [s % mod for s in seeds]
+    order = len(seeds)
+    seen = {tuple(terms): 0}
+    while True:
+        terms.append(sum(c * terms[-1 - i] for i, c in enumerate(coefficients)) % mod)
+        state = tuple(terms[-order:])
+        start = len(terms) - order
+        if state in seen:
+            first = seen[state]
+            return terms[:first], terms[first:start]
+        seen[state] = start
+
+def recurrence_mod(name: str, count: int, mod: int = ALPHABET_SIZE) -> np.ndarray:
+    """First `count` terms of a named recurrence mod `mod` (tiled period)."""
+    head, period = recurrence_cycle(*RECURRENCES[name], mod=mod)
+    head = np.array(head, dtype=np.uint8)
+    tail = np.resize(np.array(period, dtype=np.uint8), max(count - len(head), 0))
+    return np.concatenate([head, tail])[:count]
+
+# =============================================================================
+# CONSTANT DIGITS
+# =============================================================================
+
+# Exact integer arithmetic on decimals (libmpdec multiplies large operands
+# with a number-theoretic transform, far faster than int for 10^6 digits)
+_EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+_CHUDNOVSKY_C3 = 640320 ** 3 // 24
+
+def _context(digits: int) -> decimal.Context:
+    return decimal.Context(prec=digits + 10, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+def _sqrt(x: int, digits: int) -> decimal.Decimal:
+    """sqrt(x) via Newton on 1/sqrt(x), doubling precision each step."""
+    x = decimal.Decimal(x)
+    y = decimal.Decimal(1 / math.sqrt(float(x)))
+    prec = 15
+    while prec < digits:
+        prec = min(2 * prec, digits)
+        ctx = _context(prec)
+        y = ctx.divide(ctx.multiply(y, ctx.subtract(3, ctx.multiply(x, ctx.multiply(y, y)))), 2)
+    return _context(digits).multiply(x, y)
+
+def _split_e(a: int, b: int) -> Tuple[decimal.Decimal, decimal.Decimal]:
+    """P/Q = sum over a < k <= b of a!/k!."""
+    if b - a == 1:
+        return decimal.Decimal(1), decimal.Decimal(b)
+    m = (a + b) // 2
+    p1, q1 = _split_e(a, m)
+    p2, q2 = _split_e(m, b)
+    return _EXACT.add(_EXACT.multiply(p1, q2), p2), _EXACT.multiply(q1, q2)
+
+def _split_pi(a: int, b: int) -> Tuple[decimal.Decimal, decimal.Decimal, decimal.Decimal]:
+    """Chudnovsky binary splitting terms P, Q, T over [a, b)."""
+    if b - a == 1:
+        if a == 0:
+            p = q = decimal.Decimal(1)
+        else:
+            p = decimal.Decimal((6 * a - 5) * (2 * a - 1) * (6 * a - 1))
+            q = decimal.Decimal(a * a * a * _CHUDNOVSKY_C3)
+        t = _EXACT.multiply(p, decimal.Decimal(13591409 + 545140134 * a))
+        return p, q, (-t if a & 1 else t)
+    m = (a + b) // 2
+    p1, q1, t1 = _split_pi(a, m)
+    p2, q2, t2 = _split_pi(m, b)
+    mul = _EXACT.multiply
+    return mul(p1, p2), mul(q1, q2), _EXACT.add(mul(q2, t1), mul(p1, t2))
+
+def constant_value(name: str, digits: int) -> decimal.Decimal:
+    """PI, E, PHI or SQRT2 to `digits` significant digits (plus guard digits)."""
+    ctx = _context(digits)
+    if name == 'PI':
+        _, q, t = _split_pi(0, digits // 14 + 2)          # ~14.18 digits per term
+        return ctx.divide(ctx.multiply(ctx.multiply(q, 426880), _sqrt(10005, digits)), t)
+    if name == 'E':
+        n = 2
+        while math.lgamma(n + 1) / math.log(10) < digits + 10:
+            n *= 2
+        p, q = _split_e(0, n)
+        return ctx.add(1, ctx.divide(p, q))
+    if name == 'PHI':
+        return ctx.divide(ctx.add(1, _sqrt(5, digits)), 2)
+    if name == 'SQRT2':
+        return _sqrt(2, digits)
+    raise ValueError(f"unknown constant {name}")
+
+CONSTANTS = ('PI', 'E', 'PHI', 'SQRT2')
+
+def constant_digits(name: str, count: int = 1000) -> np.ndarray:
+    """First `count` decimal digits of a constant, leading digit included."""
+    text = str(constant_value(name, count)).replace('.', '')
+    return (np.frombuffer(text[:count].encode(), dtype=np.uint8) - ord('0')).astype(np.uint8)
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+@dataclass(frozen=True)
+class SequenceSpec:
+    """How to build the first `count` terms of a named sequence."""
+    name: str
+    build: Callable[[int], np.ndarray]
+    first_index: int = 1        # n of the first term (F(0) = 0 starts at 0)
+    modular: bool = False       # Terms are only known mod 29
+
+def _totients(count: int) -> np.ndarray:
+    return totients_upto(count)[1:]
+
+def _prime_gaps(count: int) -> np.ndarray:
+    return np.diff(first_primes(count + 1))
+
+SEQUENCES: Dict[str, SequenceSpec] = {
+    'PRIMES': SequenceSpec('PRIMES', first_primes),
+    'COMPOSITES': SequenceSpec('COMPOSITES', first_composites),
+    'TOTIENTS': SequenceSpec('TOTIENTS', _totients),
+    'PRIME_TOTIENTS': SequenceSpec('PRIME_TOTIENTS', lambda n: first_primes(n) - 1),
+    'PRIME_GAPS': SequenceSpec('PRIME_GAPS', _prime_gaps),
+}
+for _name in RECURRENCES:
+    SEQUENCES[_name] = SequenceSpec(_name, lambda n, r=_name: recurrence_mod(r, n),
+                                    first_index=0, modular=True)
+for _name in CONSTANTS:
+    SEQUENCES[f'DIGITS_{_name}'] = SequenceSpec(f'DIGITS_{_name}',
+                                                lambda n, c=_name: constant_digits(c, n))
+
+def _indexed(base: SequenceSpec, prime: bool) -> SequenceSpec:
+    """Terms of `base` whose index n is prime (or composite)."""
+    def build(count: int) -> np.ndarray:
+        indices = first_primes(count) if prime else first_composites(count)
+        positions = indices - base.first_index
+        terms = _terms(base.name, int(positions[-1]) + 1) if count else np.zeros(0, np.int64)
+        return np.asarray(terms[positions[:count]])
+    prefix = PRIME_INDEXED if prime else COMPOSITE_INDEXED
+    return SequenceSpec(prefix + base.name, build, modular=base.modular)
+
+def get_spec(name: str) -> SequenceSpec:
+    name = name.upper()
+    for prefix, prime in ((PRIME_INDEXED, True), (COMPOSITE_INDEXED, False)):
+        if name.startswith(prefix):
+            return _indexed(get_spec(name[len(prefix):]), prime)
+    if name not in SEQUENCES:
+        raise KeyError(f"unknown sequence {name}")
+    return SEQUENCES[name]
+
+def sequence_names(indexed: bool = True) -> List[str]:
+    names = list(SEQUENCES)
+    if indexed:
+        names += [p + n for p in (PRIME_INDEXED, COMPOSITE_INDEXED) for n in SEQUENCES]
+    return names
+
+# =============================================================================
+# DISK CACHE
+# =============================================================================
+
+# Longest prefix of each sequence loaded in this process
+_LOADED: Dict[str, np.ndarray] = {}
+
+def _cache_path(name: str):
+    return SEQUENCE_DIR / f"{name}.v{SEQUENCE_VERSION}.npy"
+
+def _save(name: str, terms: np.ndarray) -> None:
+    path = _cache_path(name)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, terms)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Read-only checkout: keep the terms in memory only
+
+def _terms(name: str, count: int) -> np.ndarray:
+    """At least `count` stored terms of `name` (raw, or mod 29 if modular)."""
+    cached = _LOADED.get(name)
+    if cached is None:
+        path = _cache_path(name)
+        if path.exists():
+            try:
+                cached = np.load(path, mmap_mode='r')
+            except (OSError, ValueError):
+                cached = None
+    if cached is None or len(cached) < count:
+        # Grow geometrically so slowly increasing requests rebuild rarely
+        size = max(count, MIN_TERMS, 2 * len(cached) if cached is not None else 0)
+        terms = get_spec(name).build(size)
+        dtype = np.uint8 if terms.max(initial=0) < 256 else np.int64
+        cached = np.ascontiguousarray(terms, dtype=dtype)
+        _save(name, cached)
+    _LOADED[name] = cached
+    return cached
+
+def sequence(name: str, count: int, mod: Optional[int] = ALPHABET_SIZE) -> np.ndarray:
+    """First `count` terms of a named sequence.
+
+    With `mod` (default 29) the terms come back reduced as uint8, ready to
+    use as a key; with mod=None the raw values come back (not available for
+    recurrences, which are only generated mod 29).
+    """
+    name = name.upper()
+    spec = get_spec(name)
+    terms = _terms(name, count)[:count]
+    if mod is None:
+        if spec.modular:
+            raise ValueError(f"{name} is only generated mod {ALPHABET_SIZE}")
+        return np.array(terms, dtype=np.int64)
+    if spec.modular and mod != ALPHABET_SIZE:
+        raise ValueError(f"{name} is only generated mod {ALPHABET_SIZE}")
+    return (np.asarray(terms, dtype=np.int64) % mod).astype(np.uint8)
+
+@lru_cache(maxsize=None)
+def default_sequences(count: int = DEFAULT_TERMS) -> Dict[str, np.ndarray]:
+    """Every base sequence mod 29 (shared by key generators)."""
+    return {name: sequence(name, count) for name in SEQUENCES}
+
+def clear_cache() -> int:
+    """Delete cached sequence files; returns how many were removed."""
+    _LOADED.clear()
+    default_sequences.cache_clear()
+    removed = 0
+    if SEQUENCE_DIR.exists():
+        for path in SEQUENCE_DIR.glob("*.npy"):
+            path.unlink()
+            removed += 1
+    return removed
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached mathematical sequences mod 29")
+    parser.add_argument("names", nargs='*', help="Sequences (default: every base sequence)")
+    parser.add_argument("--count", type=int, default=DEFAULT_TERMS, help="Terms per sequence")
+    parser.add_argument("--raw", action="store_true", help="Show raw values instead of mod 29")
+    parser.add_argument("--show", type=int, default=20, help="Terms to print")
+    parser.add_argument("--list", action="store_true", help="List available names")
+    parser.add_argument("--clear", action="store_true", help="Delete the disk cache first")
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(sequence_names()))
+        return
+    if args.clear:
+        print(f"[SEQ] Removed {clear_cache()} cached files")
+
+    for name in args.names or list(SEQUENCES):
+        raw = args.raw and not get_spec(name).modular
+        start = time.time()
+        terms = sequence(name, args.count, mod=None if raw else ALPHABET_SIZE)
+        head = ' '.join(str(int(t)) for t in terms[:args.show])
+        print(f"[SEQ] {name:<30s} {len(terms):>9,} terms {time.time() - start:6.2f}s  {head}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+RUN METRICS
+===========
+
+Counters, phase timers and planned-work ETA for long-running attacks, with
+periodic JSON-lines snapshots and a live one-line summary:
+
+    metrics = configure('master_cipher', interval=5, profile='cprofile')   # coordinator
+    metrics.plan(total_cost, 'rune-evals')
+
+    m = get_metrics()                        # any process, workers included
+    with m.phase('vigenere'):
+        ...
+        m.count('keys', len(batch))
+    m.advance(unit_cost)                     # planned work done -> ETA
+
+    [METRICS] 0:02:10 | 34% of 1.2M rune-evals, ETA 4m12s | keys 1.4M (28.1k/s) |
+              vigenere 61% chains 22% caesar 3% | queue 14 | 4 procs 93% busy
+
+- Every process writes its own file in the run directory
+  (.cache/metrics/<name>-<time>/main.jsonl, worker-<pid>.jsonl). Workers
+  find the directory through CICADA_METRICS_DIR, which configure() sets
+  before they are started, so nothing has to be threaded through task
+  payloads. The coordinator's summary merges the latest line of each file.
+- A snapshot is written when a top-level phase ends or tick() is called
+  and `interval` seconds have passed, and once more at process exit.
+- Phase shares are seconds over the busy seconds (time inside top-level
+  phases) of all processes; busy / elapsed is a process's utilization.
+- Unconfigured, get_metrics() returns a disabled instance: count() is one
+  attribute test and phase() returns a shared no-op context.
+- `profile` runs cProfile (or pyinstrument, when installed) in every
+  process and writes <file>.prof / <file>.html next to its snapshots.
+
+    python metrics.py list
+    python metrics.py show [RUN]             # latest run by default
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import util as mp_util
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from master_dictionary import CACHE_DIR
+
+METRICS_DIR = CACHE_DIR / "metrics"
+ENV_DIR = 'CICADA_METRICS_DIR'
+ENV_INTERVAL = 'CICADA_METRICS_INTERVAL'
+ENV_PROFILE = 'CICADA_PROFILE'
+DEFAULT_INTERVAL = 5.0
+PROFILERS = ('cprofile', 'pyinstrument')
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class _Phase:
+    """Times one `with metrics.phase(name)` block."""
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics, self.name = metrics, name
+
+    def __enter__(self):
+        self.metrics._depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        m = self.metrics
+        m._depth -= 1
+        timer = m.timers.get(self.name)
+        if timer is None:
+            timer = m.timers[self.name] = [0.0, 0]
+        timer[0] += seconds
+        timer[1] += 1
+        if m._depth == 0:
+            m.busy += seconds
+            m.tick()
+        return False
+
+_NO_PHASE = contextlib.nullcontext()
+
+class Metrics:
+    """Per-process counters, timers and gauges; disabled when path is None."""
+
+    def __init__(self, path: Optional[Path] = None, role: str = 'main', interval: float = DEFAULT_INTERVAL,
+                 live: bool = False, profile: Optional[str] = None):
+        self.enabled = path is not None
+        self.path = Path(path) if path is not None else None
+        self.role = role
+        self.interval = interval
+        self.live = live
+        self.pid = os.getpid()
+        self.counters: Dict[str, float] = {}
+        self.timers: Dict[str, List[float]] = {}        # name -> [seconds, calls]
+        self.gauges: Dict[str, float] = {}
+        self.work_total = 0.0
+        self.work_done = 0.0
+        self.work_unit = ''
+        self.busy = 0.0
+        self.started = time.time()
+        self._depth = 0
+        self._last_write = self.started
+        self._previous: Optional[Dict[str, Any]] = None     # Last merged view, for rates
+        self._profiler = _start_profiler(profile) if self.enabled and profile else None
+        self._closed = False
+
+    # --- recording ---------------------------------------------------------
+
+    def count(self, name: str, n: float = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float) -> None:
+        if self.enabled:
+            self.gauges[name] = value
+
+    def phase(self, name: str):
+        """Context manager timing a phase or kernel."""
+        return _Phase(self, name) if self.enabled else _NO_PHASE
+
+    def plan(self, total: float, unit: str = 'items') -> None:
+        """Add planned work; advance() reports progress against it."""
+        if self.enabled:
+            self.work_total += total
+            self.work_unit = unit or self.work_unit
+
+    def advance(self, n: float = 1) -> None:
+        if self.enabled:
+            self.work_done += n
+
+    # --- output ------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {'time': now, 'role': self.role, 'pid': self.pid, 'elapsed': now - self.started,
+                'busy': self.busy, 'counters': dict(self.counters),
+                'timers': {k: list(v) for k, v in self.timers.items()}, 'gauges': dict(self.gauges),
+                'work': {'total': self.work_total, 'done': self.work_done, 'unit': self.work_unit}}
+
+    def tick(self, force: bool = False) -> None:
+        """Write a snapshot (and print the live summary) once `interval` has passed."""
+        if not self.enabled or self._closed:
+            return
+        now = time.time()
+        if not force and now - self._last_write < self.interval:
+            return
+        self._last_write = now
+        snap = self.snapshot()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snap) + '\n')
+        if self.live:
+            merged = merge([snap] + [s for s in latest_snapshots(self.path.parent) if s['pid'] != self.pid])
+            print(f"[METRICS] {summary_line(merged, self._previous)}", flush=True)
+            self._previous = merged
+
+    def close(self) -> None:
+        """Final snapshot and profile; runs at process exit when configured."""
+        if not self.enabled or self._closed:
+            return
+        self.tick(force=True)
+        self._closed = True
+        if self._profiler is not None:
+            _stop_profiler(self._profiler, self.path)
+            self._profiler = None
+
+_process: Optional[Metrics] = None
+
+def configure(name: str, interval: float = DEFAULT_INTERVAL, profile: Optional[str] = None,
+              live: bool = True, root: Path = METRICS_DIR) -> Metrics:
+    """Start a metrics run in this (coordinator) process; workers started later join it."""
+    global _process
+    directory = root / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    directory.mkdir(parents=True, exist_ok=True)
+    os.environ[ENV_DIR] = str(directory)
+    os.environ[ENV_INTERVAL] = str(interval)
+    if profile:
+        os.environ[ENV_PROFILE] = profile
+    else:
+        os.environ.pop(ENV_PROFILE, None)
+    _process = Metrics(directory / "main.jsonl", 'main', interval, live, profile)
+    atexit.register(_process.close)
+    print(f"[METRICS] writing to {directory}")
+    return _process
+
+def get_metrics() -> Metrics:
+    """This process's metrics: the configured run, a worker joining it, or disabled."""
+    global _process
+    if _process is None or _process.pid != os.getpid():            # Forked children start over
+        directory = os.environ.get(ENV_DIR)
+        if directory:
+            role = f"worker-{os.getpid()}"
+            _process = Metrics(Path(directory) / f"{role}.jsonl", role,
+                               float(os.environ.get(ENV_INTERVAL, DEFAULT_INTERVAL)),
+                               profile=os.environ.get(ENV_PROFILE))
+            # multiprocessing children leave through os._exit, which skips atexit
+            mp_util.Finalize(None, _process.close, exitpriority=100)
+            atexit.register(_process.close)
+        else:
+            _process = Metrics(None)
+    return _process
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+def _start_profiler(kind: str):
+    if kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("[METRICS] pyinstrument not installed, using cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def _stop_profiler(profiler, path: Path):
+    if hasattr(profiler, 'output_html'):                    # pyinstrument
+        profiler.stop()
+        path.with_suffix('.html').write_text(profiler.output_html(), encoding='utf-8')
+    else:
+        profiler.disable()
+        profiler.dump_stats(str(path.with_suffix('.prof')))
+
+# =============================================================================
+# READING AND SUMMARIES
+# =============================================================================
+
+def _last_line(path: Path, block: int = 1 << 16) -> Optional[str]:
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - block))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    return lines[-1].decode('utf-8') if lines else None
+
+def latest_snapshots(directory: Path) -> List[Dict[str, Any]]:
+    """The newest snapshot of every process in a run directory."""
+    out = []
+    for path in sorted(Path(directory).glob("*.jsonl")):
+        try:
+            line = _last_line(path)
+            if line:
+                out.append(json.loads(line))
+        except (OSError, ValueError):
+            continue                    # A worker may be halfway through a write
+    return out
+
+def merge(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One view of a run: counters, timers and busy time summed over processes."""
+    counters: Dict[str, float] = {}
+    timers: Dict[str, List[float]] = {}
+    gauges: Dict[str, float] = {}
+    work = {'total': 0.0, 'done': 0.0, 'unit': ''}
+    for snap in snapshots:
+        for k, v in snap['counters'].items():
+            counters[k] = counters.get(k, 0) + v
+        for k, (seconds, calls) in snap['timers'].items():
+            t = timers.setdefault(k, [0.0, 0])
+            t[0] += seconds
+            t[1] += calls
+        if snap['role'] == 'main':
+            gauges.update(snap['gauges'])
+        work['total'] += snap['work']['total']
+        work['done'] += snap['work']['done']
+        work['unit'] = work['unit'] or snap['work']['unit']
+    main = next((s for s in snapshots if s['role'] == 'main'), snapshots[0] if snapshots else None)
+    workers = [s for s in snapshots if s['role'] != 'main']
+    return {
+        'time': max((s['time'] for s in snapshots), default=time.time()),
+        'elapsed': main['elapsed'] if main else 0.0,
+        'busy': sum(s['busy'] for s in snapshots),
+        'counters': counters, 'timers': timers, 'gauges': gauges, 'work': work,
+        'processes': len(snapshots), 'workers': len(workers),
+        'utilization': (sum(s['busy'] for s in workers) / max(1e-9, sum(s['elapsed'] for s in workers))
+                        if workers else (main['busy'] / max(1e-9, main['elapsed']) if main else 0.0)),
+    }
+
+def _si(value: float) -> str:
+    for scale, suffix in ((1e9, 'G'), (1e6, 'M'), (1e3, 'k')):
+        if abs(value) >= scale:
+            return f"{value / scale:.1f}{suffix}"
+    return f"{value:.0f}" if float(value).is_integer() else f"{value:.1f}"
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+def summary_line(view: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> str:
+    """Elapsed | planned work and ETA | counters and rates | phase shares | gauges | utilization."""
+    parts = [_duration(view['elapsed'])]
+    work = view['work']
+    if work['total'] > 0:
+        done = min(work['done'], work['total'])
+        part = f"{100 * done / work['total']:.0f}% of {_si(work['total'])} {work['unit']}".rstrip()
+        if 0 < done < work['total']:
+            eta = (work['total'] - done) * view['elapsed'] / done
+            part += f", ETA {_duration(eta)}"
+        parts.append(part)
+    if previous is not None and view['time'] - previous['time'] < 1.0:
+        previous = None                 # Too short a window (the exit snapshot): use the run average
+    dt = view['time'] - previous['time'] if previous else view['elapsed']
+    counters = []
+    for name, value in sorted(view['counters'].items(), key=lambda kv: -kv[1])[:3]:
+        before = previous['counters'].get(name, 0) if previous else 0
+        counters.append(f"{name} {_si(value)} ({_si((value - before) / max(dt, 1e-9))}/s)")
+    if counters:
+        parts.append(', '.join(counters))
+    if view['busy'] > 0:
+        top = sorted(view['timers'].items(), key=lambda kv: -kv[1][0])[:4]
+        parts.append(' '.join(f"{name} {100 * t[0] / view['busy']:.0f}%" for name, t in top))
+    for name, value in view['gauges'].items():
+        parts.append(f"{name} {_si(value)}")
+    parts.append(f"{view['processes']} procs {100 * view['utilization']:.0f}% busy")
+    return ' | '.join(parts)
+
+def print_report(directory: Path):
+    snapshots = latest_snapshots(directory)
+    if not snapshots:
+        print(f"[METRICS] no snapshots in {directory}")
+        return
+    view = merge(snapshots)
+    print(f"[METRICS] {directory.name}: {summary_line(view)}")
+    print(f"\n  {'phase':<24} {'seconds':>10} {'calls':>10} {'share':>7}")
+    for name, (seconds, calls) in sorted(view['timers'].items(), key=lambda kv: -kv[1][0]):
+        print(f"  {name:<24} {seconds:>10.2f} {calls:>10,} {100 * seconds / max(view['busy'], 1e-9):>6.1f}%")
+    print(f"\n  {'counter':<24} {'total':>10} {'per s':>10}")
+    for name, value in sorted(view['counters'].items()):
+        print(f"  {name:<24} {_si(value):>10} {_si(value / max(view['elapsed'], 1e-9)):>10}")
+    print(f"\n  {'process':<24} {'elapsed':>10} {'busy':>10} {'util':>7}")
+    for snap in sorted(snapshots, key=lambda s: s['role'] != 'main'):
+        print(f"  {snap['role']:<24} {snap['elapsed']:>10.1f} {snap['busy']:>10.1f} "
+              f"{100 * snap['busy'] / max(snap['elapsed'], 1e-9):>6.0f}%")
+    profiles = sorted(p.name for p in directory.iterdir() if p.suffix in ('.prof', '.html'))
+    if profiles:
+        print(f"\n  profiles: {', '.join(profiles)}  (python -m pstats <file>.prof)")
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """--metrics / --metrics-interval / --profile for an attack's command line."""
+    parser.add_argument('--metrics', action='store_true',
+                        help=f'Write metrics snapshots under {METRICS_DIR} and print a live summary')
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_INTERVAL,
+                        help='Seconds between metrics snapshots')
+    parser.add_argument('--profile', choices=PROFILERS, default=None,
+                        help='Profile every process (implies --metrics)')
+
+def configure_from_args(name: str, args) -> Metrics:
+    if args.metrics or args.profile:
+        return configure(name, args.metrics_interval, args.profile)
+    return get_metrics()
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect metrics written by instrumented attacks")
+    parser.add_argument("--root", type=Path, default=METRICS_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List metrics runs")
+    show = sub.add_parser("show", help="Phase, counter and process totals of a run")
+    show.add_argument("run", nargs='?', default=None, help="Run directory or name (default: latest)")
+    args = parser.parse_args()
+
+    runs = sorted((d for d in args.root.glob("*") if d.is_dir()), key=lambda d: d.stat().st_mtime)
+    if args.command == "list":
+        for d in runs:
+            print(f"  {d.name}: {len(list(d.glob('*.jsonl')))} processes")
+        return 0
+    if args.run is None:
+        if not runs:
+            print(f"[METRICS] no runs in {args.root}")
+            return 1
+        directory = runs[-1]
+    else:
+        directory = Path(args.run) if Path(args.run).is_dir() else args.root / args.run
+    print_report(directory)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,7 +7,7 @@ Maximizes CPU utilization with aggressive parallel key testing.
 Uses all CPU cores for maximum throughput.
 
 Features:
-- Aggressive parallel processing (all cores)
+- Aggressive parallel processing (all cores, work-stealing units across pages)
 - Massive key generation (millions of combinations)
 - Running key attacks with Self-Reliance
 - All cipher variants tested
@@ -20,16 +20,23 @@ Date: January 2026
 import os
 import sys
 import time
-import json
 import argparse
+import dataclasses
 from pathlib import Path
-from datetime import datetime
 from typing import List, Dict, Tuple, Optional
-from concurrent.futures import ProcessPoolExecutor, as_completed
 import multiprocessing as mp
 
 import numpy as np
 
+from corpus_store import load_corpus, tokenize
+from key_canon import KeyPlan, plan_keys
+from key_space import (
+    IDENTITY, CompositeSpace, KeySpace, ListSpace, PackedSpace, RandomSpace, SequenceSpace, Transform,
+)
+from results_db import ResultRecord, ResultsDB, write_reports
+from shared_data import SharedArrays, attach_tree, resolve
+from work_stealing import WorkUnit, run_units, split_range, target_cost
+
 # =============================================================================
 # GEMATRIA PRIMUS ALPHABET (29 CHARACTERS)
 # =============================================================================
@@ -185,62 +192,38 @@ def word_to_key(word: str) -> np.ndarray:
                 break
     return np.array(indices, dtype=np.int32) if indices else None
 
-def generate_all_keys() -> List[Tuple[str, np.ndarray]]:
-    """Generate all keys to try."""
-    keys = []
-    
-    # 1. Caesar shifts
-    for i in range(ALPHABET_SIZE):
-        keys.append((f"CAESAR_{i}", np.array([i], dtype=np.int32)))
-    
-    # 2. Known words and variations
-    for word in KNOWN_WORDS:
-        key = word_to_key(word)
-        if key is not None and len(key) > 0:
-            keys.append((f"W:{word}", key))
-            keys.append((f"W:{word}_REV", key[::-1].copy()))
-            for offset in [1, 3, 7, 11, 13]:
-                keys.append((f"W:{word}+{offset}", (key + offset) % 29))
-    
-    # 3. Prime sequences
-    for length in [3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83]:
-        for start in range(0, min(300, len(PRIMES_MOD_29) - length), 3):
-            key = np.array(PRIMES_MOD_29[start:start+length], dtype=np.int32)
-            keys.append((f"P:L{length}S{start}", key))
-    
-    # 4. φ(prime) sequences
-    for length in [3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83]:
-        for start in range(0, min(300, len(PRIME_TOTIENTS_MOD_29) - length), 3):
-            key = np.array(PRIME_TOTIENTS_MOD_29[start:start+length], dtype=np.int32)
-            keys.append((f"PHI:L{length}S{start}", key))
-    
-    # 5. Fibonacci sequences
-    for length in range(3, 60, 2):
-        for start in range(0, min(60, len(FIBONACCI_MOD_29) - length), 2):
-            key = np.array(FIBONACCI_MOD_29[start:start+length], dtype=np.int32)
-            keys.append((f"FIB:L{length}S{start}", key))
-    
-    # 6. Lucas sequences
-    for length in range(3, 60, 2):
-        for start in range(0, min(60, len(LUCAS_MOD_29) - length), 2):
-            key = np.array(LUCAS_MOD_29[start:start+length], dtype=np.int32)
-            keys.append((f"LUC:L{length}S{start}", key))
-    
-    # 7. Random keys for exploration
-    np.random.seed(3301)
-    for i in range(2000):
-        length = np.random.randint(3, 50)
-        key = np.random.randint(0, 29, size=length, dtype=np.int32)
-        keys.append((f"RND:{i}", key))
-    
-    print(f"[KEYGEN] Generated {len(keys)} keys")
+def generate_all_keys() -> KeySpace:
+    """Describe all keys to try (each worker generates only its own shard)."""
+    prime_lengths = [3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83]
+    word_transforms = [IDENTITY, Transform(reverse=True)] + [Transform(shift=o) for o in [1, 3, 7, 11, 13]]
+    
+    keys = CompositeSpace([
+        # 1. Caesar shifts
+        ListSpace([(f"CAESAR_{i}", [i]) for i in range(ALPHABET_SIZE)]),
+        # 2. Known words and variations
+        ListSpace([(f"W:{word}", key) for word in KNOWN_WORDS
+                   for key in [word_to_key(word)] if key is not None], word_transforms),
+        # 3. Prime sequences
+        SequenceSpace("P", PRIMES_MOD_29, prime_lengths, range(0, 300, 3), template="{label}:L{length}S{offset}"),
+        # 4. φ(prime) sequences
+        SequenceSpace("PHI", PRIME_TOTIENTS_MOD_29, prime_lengths, range(0, 300, 3),
+                      template="{label}:L{length}S{offset}"),
+        # 5. Fibonacci sequences
+        SequenceSpace("FIB", FIBONACCI_MOD_29, range(3, 60, 2), range(0, 60, 2), template="{label}:L{length}S{offset}"),
+        # 6. Lucas sequences
+        SequenceSpace("LUC", LUCAS_MOD_29, range(3, 60, 2), range(0, 60, 2), template="{label}:L{length}S{offset}"),
+        # 7. Random keys for exploration
+        RandomSpace("RND", 2000, 3, 49, seed=3301, template="{label}:{index}"),
+    ])
+    
+    print(f"[KEYGEN] Described {len(keys)} keys")
     return keys
 
 # =============================================================================
 # CIPHER WORKER
 # =============================================================================
 
-def try_key(args: Tuple[str, np.ndarray, np.ndarray, str]) -> Tuple[float, str, str, str]:
+def try_key(args: Tuple[str, np.ndarray, np.ndarray, str]) -> Tuple[float, str, str, str, List[int]]:
     """Worker to try a single key."""
     key_name, key, cipher, mode = args
     
@@ -258,15 +241,36 @@ def try_key(args: Tuple[str, np.ndarray, np.ndarray, str]) -> Tuple[float, str,
     score = score_text(plaintext)
     text = indices_to_text(plaintext) if score > 5 else ""
     
-    return (score, key_name, mode, text)
-
-def try_phi_sequence(args: Tuple[int, np.ndarray, str]) -> Tuple[float, str, str, str]:
+    return (score, key_name, mode, text, [int(k) for k in key])
+
+def try_key_shard(args: Tuple[KeyPlan, np.ndarray]) -> List[Tuple[float, str, str, str, List[int]]]:
+    """Worker to generate one shard of keys and try each with its canonical modes."""
+    plan, cipher = args
+    
+    results = []
+    for mode, key_repeated, names in plan.by_mode(len(cipher)):
+        key_idx = plan.key_idx[plan.mode_idx == plan.modes.index(mode)]
+        key_repeated = key_repeated.astype(np.int32)
+        if mode == 'SUB':
+            plaintexts = (cipher[None, :] - key_repeated) % ALPHABET_SIZE
+        elif mode == 'ADD':
+            plaintexts = (cipher[None, :] + key_repeated) % ALPHABET_SIZE
+        else:  # SUB_REV
+            plaintexts = (key_repeated - cipher[None, :]) % ALPHABET_SIZE
+        for row, plaintext in enumerate(plaintexts):
+            score = score_text(plaintext)
+            if score > 5:
+                results.append((score, names[row], mode, indices_to_text(plaintext),
+                                plan.keys.key(int(key_idx[row])).tolist()))
+    return results
+
+def try_phi_sequence(args: Tuple[int, np.ndarray, str]) -> Tuple[float, str, str, str, Optional[List[int]]]:
     """Worker for φ(prime) sequence decryption."""
     start_idx, cipher, mode = args
     cipher_len = len(cipher)
     
     if start_idx + cipher_len > len(PRIME_TOTIENTS_MOD_29):
-        return (0.0, "", "", "")
+        return (0.0, "", "", "", None)
     
     key_seq = np.array(PRIME_TOTIENTS_MOD_29[start_idx:start_idx + cipher_len], dtype=np.int32)
     
@@ -278,44 +282,23 @@ def try_phi_sequence(args: Tuple[int, np.ndarray, str]) -> Tuple[float, str, str
     score = score_text(plaintext)
     text = indices_to_text(plaintext) if score > 5 else ""
     
-    return (score, f"PHI_START_{start_idx}", f"PHI_{mode}", text)
+    return (score, f"PHI_START_{start_idx}", f"PHI_{mode}", text, key_seq.tolist())
 
 # =============================================================================
 # RUNNING KEY ATTACK
 # =============================================================================
 
 def text_to_indices(text: str) -> np.ndarray:
-    """Convert text to Gematria indices."""
-    indices = []
-    text = text.upper()
-    i = 0
-    while i < len(text):
-        found = False
-        if i + 1 < len(text):
-            digraph = text[i:i+2]
-            for idx, lat in INDEX_TO_LATIN.items():
-                if lat == digraph:
-                    indices.append(idx)
-                    i += 2
-                    found = True
-                    break
-        if not found:
-            c = text[i]
-            for idx, lat in INDEX_TO_LATIN.items():
-                if lat == c or (len(lat) == 1 and lat == c):
-                    indices.append(idx)
-                    found = True
-                    break
-            i += 1
-    return np.array(indices, dtype=np.int32)
-
-def try_running_key(args: Tuple[int, np.ndarray, np.ndarray, str]) -> Tuple[float, str, str, str]:
+    """Convert text to Gematria indices (shared corpus-store tokenizer)."""
+    return tokenize(text).astype(np.int32)
+
+def try_running_key(args: Tuple[int, np.ndarray, np.ndarray, str]) -> Tuple[float, str, str, str, Optional[List[int]]]:
     """Worker for running key attack."""
     start, cipher, key_indices, mode = args
     cipher_len = len(cipher)
     
     if start + cipher_len > len(key_indices):
-        return (0.0, "", "", "")
+        return (0.0, "", "", "", None)
     
     key_segment = key_indices[start:start + cipher_len]
     
@@ -327,7 +310,31 @@ def try_running_key(args: Tuple[int, np.ndarray, np.ndarray, str]) -> Tuple[floa
     score = score_text(plaintext)
     text = indices_to_text(plaintext) if score > 5 else ""
     
-    return (score, f"RK_START_{start}", f"RK_{mode}", text)
+    return (score, f"RK_START_{start}", f"RK_{mode}", text, key_segment.tolist())
+
+def attach_context(worker_id: int, context: Tuple[KeyPlan, object]) -> Tuple[KeyPlan, Optional[np.ndarray]]:
+    """Per-worker state: the key plan and Self-Reliance attached from shared memory."""
+    return attach_tree(context)
+
+def run_unit(context: Tuple[KeyPlan, Optional[np.ndarray]],
+             unit: Tuple[str, int, int, int, np.ndarray]) -> List[Tuple[float, str, str, str, List[int]]]:
+    """Worker for one work unit: a key range, or a range of φ(prime) / running-key starts."""
+    plan, running_key = context
+    phase, _, lo, hi, cipher = unit
+    cipher = resolve(cipher)
+    if phase == 'KEYS':
+        return try_key_shard((plan.shard(lo, hi), cipher))
+    
+    results = []
+    for start in range(lo, hi):
+        for mode in ['SUB', 'ADD']:
+            if phase == 'PHI':
+                result = try_phi_sequence((start, cipher, mode))
+            else:  # RK: every 5th position of Self-Reliance
+                result = try_running_key((start * 5, cipher, running_key, mode))
+            if result[0] > 5:
+                results.append(result)
+    return results
 
 # =============================================================================
 # MAIN SOLVER
@@ -340,20 +347,13 @@ class AggressiveSolver:
         self._load_self_reliance()
     
     def _load_self_reliance(self):
-        """Load Self-Reliance text."""
-        paths = [
-            Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/research/Self-Reliance.txt"),
-            Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/Self-Reliance.txt"),
-            Path("c:/Users/tyler/Repos/Cicada3301/LiberPrimus/reference/Self-Reliance.txt"),
-        ]
-        for path in paths:
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                self.self_reliance_indices = text_to_indices(text)
-                print(f"[INFO] Loaded Self-Reliance: {len(self.self_reliance_indices)} indices")
-                return
-        print("[WARN] Self-Reliance not found")
+        """Load Self-Reliance runes from the shared corpus store."""
+        try:
+            self.self_reliance_indices = load_corpus('self_reliance').runes.astype(np.int32)
+        except (KeyError, OSError):
+            print("[WARN] Self-Reliance not found")
+            return
+        print(f"[INFO] Loaded Self-Reliance: {len(self.self_reliance_indices)} indices")
     
     def load_cipher(self, page_num: int) -> np.ndarray:
         """Load cipher from page."""
@@ -367,77 +367,78 @@ class AggressiveSolver:
         indices = [RUNE_TO_INDEX[c] for c in runes if c in RUNE_TO_INDEX]
         return np.array(indices, dtype=np.int32)
     
-    def solve_page(self, page_num: int) -> List[Tuple[float, str, str, str]]:
-        """Solve a single page with all attacks."""
-        print(f"\n{'='*60}")
-        print(f"[PAGE {page_num:02d}] AGGRESSIVE ATTACK")
-        print('='*60)
-        
-        cipher = self.load_cipher(page_num)
-        print(f"[INFO] Loaded {len(cipher)} runes")
+    def phase_ranges(self, cipher_len: int) -> Dict[str, int]:
+        """Number of keys / start positions each phase tries on a page."""
+        ranges = {'PHI': max(0, min(1000, len(PRIME_TOTIENTS_MOD_29) - cipher_len))}
+        if self.self_reliance_indices is not None and len(self.self_reliance_indices) > cipher_len:
+            ranges['RK'] = len(range(0, len(self.self_reliance_indices) - cipher_len, 5))
+        return ranges
+    
+    def make_units(self, ciphers: Dict[int, np.ndarray], plan: KeyPlan) -> List[WorkUnit]:
+        """page x (key range | φ(prime) starts | running-key starts), each of about equal cost."""
+        specs = []
+        for page_num, cipher in ciphers.items():
+            n = len(cipher)
+            specs.append(('KEYS', page_num, len(plan), n))
+            for phase, count in self.phase_ranges(n).items():
+                specs.append((phase, page_num, count, 2 * n))       # SUB and ADD per start
+        target = target_cost(sum(count * cost for _, _, count, cost in specs), self.num_workers)
         
-        all_results = []
+        units = []
+        for phase, page_num, count, item_cost in specs:
+            for lo, hi in split_range(count, item_cost, target):
+                units.append(WorkUnit(len(units), (hi - lo) * item_cost,
+                                      (phase, page_num, lo, hi, ciphers[page_num]),
+                                      f"Page {page_num:02d} {phase} {lo}-{hi}"))
+        return units
+    
+    def solve_pages(self, pages: List[int]) -> Dict[int, List[Tuple[float, str, str, str, List[int]]]]:
+        """Attack several pages at once as work units on work-stealing processes."""
+        ciphers = {}
+        page_results: Dict[int, List[Tuple[float, str, str, str, List[int]]]] = {}
+        for page_num in pages:
+            try:
+                ciphers[page_num] = self.load_cipher(page_num)
+            except FileNotFoundError as e:
+                print(f"[ERROR] Page {page_num}: {e}")
+            page_results[page_num] = []
         
-        # 1. Dictionary/Key attack
-        print("[PHASE 1] Dictionary + Key attack...")
         keys = generate_all_keys()
         
-        tasks = []
-        for key_name, key in keys:
-            for mode in ['SUB', 'ADD', 'SUB_REV']:
-                tasks.append((key_name, key, cipher, mode))
-        
-        print(f"[INFO] Running {len(tasks)} key combinations with {self.num_workers} workers...")
-        
-        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
-            futures = [executor.submit(try_key, task) for task in tasks]
-            for i, future in enumerate(as_completed(futures)):
-                result = future.result()
-                if result[0] > 5:  # Only keep meaningful results
-                    all_results.append(result)
-                if (i + 1) % 50000 == 0:
-                    print(f"[PROGRESS] {i + 1}/{len(tasks)} completed...")
+        # Equivalent (key, mode) pairs decrypt identically: keep one of each
+        plan = plan_keys(keys, ['SUB', 'ADD', 'SUB_REV'])
+        print(f"[CANON] {plan.summary()}")
         
-        print(f"[PHASE 1] Found {len(all_results)} candidates")
+        # Workers receive index ranges of the key space, not the keys; the packed keys,
+        # page runes and Self-Reliance are attached from shared memory
+        units = self.make_units(ciphers, plan)
+        print(f"[INFO] {len(ciphers)} pages as {len(units)} units on {self.num_workers} workers...")
         
-        # 2. φ(prime) sequence attack
-        print("[PHASE 2] φ(prime) sequence attack...")
-        phi_tasks = []
-        max_start = min(1000, len(PRIME_TOTIENTS_MOD_29) - len(cipher))
-        for start in range(max_start):
-            for mode in ['SUB', 'ADD']:
-                phi_tasks.append((start, cipher, mode))
+        with SharedArrays() as shared:
+            worker_plan = dataclasses.replace(plan, keys=PackedSpace.from_space(plan.keys), signatures={})
+            context = shared.share_tree((worker_plan, self.self_reliance_indices))
+            for unit in units:
+                phase, page_num, lo, hi, cipher = unit.payload
+                unit.payload = (phase, page_num, lo, hi, shared.share(cipher, f"page{page_num}"))
+            results, stats = run_units(units, run_unit, self.num_workers, setup=attach_context, context=context)
+        for unit_id, unit_results in results.items():
+            page_results[units[unit_id].payload[1]].extend(unit_results or [])
+        for unit_id, error in stats.failed.items():
+            print(f"[ERROR] {units[unit_id].label}: {error}")
+        print(f"[SCHED] {stats.summary()}")
         
-        print(f"[INFO] Testing {len(phi_tasks)} φ(prime) sequences...")
-        
-        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
-            futures = [executor.submit(try_phi_sequence, task) for task in phi_tasks]
-            for future in as_completed(futures):
-                result = future.result()
-                if result[0] > 5:
-                    all_results.append(result)
-        
-        # 3. Running key attack with Self-Reliance
-        if self.self_reliance_indices is not None and len(self.self_reliance_indices) > len(cipher):
-            print("[PHASE 3] Running key attack (Self-Reliance)...")
-            max_starts = len(self.self_reliance_indices) - len(cipher)
-            
-            rk_tasks = []
-            for start in range(0, max_starts, 5):  # Every 5th position
-                for mode in ['SUB', 'ADD']:
-                    rk_tasks.append((start, cipher, self.self_reliance_indices, mode))
-            
-            print(f"[INFO] Testing {len(rk_tasks)} running key positions...")
-            
-            with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
-                futures = [executor.submit(try_running_key, task) for task in rk_tasks]
-                for future in as_completed(futures):
-                    result = future.result()
-                    if result[0] > 5:
-                        all_results.append(result)
+        for page_num, all_results in page_results.items():
+            all_results.sort(reverse=True, key=lambda x: x[0])
+            page_results[page_num] = all_results[:50]
+        return page_results
+    
+    def solve_page(self, page_num: int) -> List[Tuple[float, str, str, str, List[int]]]:
+        """Solve a single page with all attacks."""
+        print(f"\n{'='*60}")
+        print(f"[PAGE {page_num:02d}] AGGRESSIVE ATTACK")
+        print('='*60)
         
-        # Sort results
-        all_results.sort(reverse=True, key=lambda x: x[0])
+        all_results = self.solve_pages([page_num])[page_num]
         
         if all_results:
             print(f"\n[BEST] Score: {all_results[0][0]:.1f}")
@@ -447,7 +448,7 @@ class AggressiveSolver:
         else:
             print("[WARN] No candidates found!")
         
-        return all_results[:50]
+        return all_results
 
 # =============================================================================
 # BATCH PROCESSOR
@@ -460,13 +461,16 @@ SKIP_PAGES = [0, 1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16,  # LP1 solv
 UNSOLVED_PAGES = [2] + list(range(17, 55)) + list(range(58, 73))
 UNSOLVED_PAGES = [p for p in UNSOLVED_PAGES if p not in SKIP_PAGES]
 
-def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md"):
-    """Run batch attack on multiple pages."""
+def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md", num_workers: int = None):
+    """Run batch attack on multiple pages.
+    
+    All pages are split into work units up front, so workers never idle
+    while one long page finishes.
+    """
     if pages is None:
         pages = UNSOLVED_PAGES
     
-    solver = AggressiveSolver()
-    all_page_results = {}
+    solver = AggressiveSolver(num_workers)
     start_time = time.time()
     
     print("=" * 70)
@@ -476,20 +480,10 @@ def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md")
     print(f"Workers: {solver.num_workers}")
     print("=" * 70)
     
-    for i, page_num in enumerate(pages, 1):
-        print(f"\n[{i}/{len(pages)}] Processing Page {page_num:02d}")
-        
-        page_start = time.time()
-        
-        try:
-            results = solver.solve_page(page_num)
-            all_page_results[page_num] = results
-        except Exception as e:
-            print(f"[ERROR] Page {page_num}: {e}")
-            all_page_results[page_num] = []
-        
-        page_time = time.time() - page_start
-        print(f"[TIME] Page {page_num}: {page_time:.1f}s")
+    all_page_results = solver.solve_pages(pages)
+    for page_num, results in all_page_results.items():
+        if results:
+            print(f"[BEST] Page {page_num:02d}: {results[0][0]:.1f} {results[0][1]} {results[0][2]}")
     
     total_time = time.time() - start_time
     
@@ -505,61 +499,20 @@ def batch_attack(pages: List[int] = None, output_path: str = "BATCH_RESULTS.md")
     print("=" * 70)
 
 def save_results(results: Dict, output_path: str, total_time: float):
-    """Save results to markdown."""
-    lines = [
-        "# AGGRESSIVE BATCH ATTACK RESULTS",
-        "",
-        f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        f"**Duration:** {total_time:.1f}s ({total_time/60:.1f} min)",
-        f"**Pages:** {len(results)}",
-        "",
-        "---",
-        "",
-        "## Summary",
-        "",
-        "| Page | Score | Key | Mode | Preview |",
-        "|------|-------|-----|------|---------|",
-    ]
-    
-    for page_num in sorted(results.keys()):
-        page_results = results[page_num]
-        if page_results:
-            top = page_results[0]
-            preview = top[3][:35].replace('|', '\\|').replace('\n', ' ')
-            lines.append(f"| {page_num:02d} | {top[0]:.1f} | `{top[1][:18]}` | {top[2]} | {preview}... |")
-        else:
-            lines.append(f"| {page_num:02d} | - | - | - | No results |")
-    
-    lines.extend(["", "---", "", "## Details", ""])
-    
-    for page_num in sorted(results.keys()):
-        page_results = results[page_num]
-        lines.append(f"### Page {page_num:02d}")
-        lines.append("")
-        
-        if not page_results:
-            lines.append("*No results.*\n")
-            continue
-        
-        for i, (score, key, mode, text) in enumerate(page_results[:5], 1):
-            lines.append(f"**{i}. Score: {score:.1f}** | Key: `{key}` | Mode: {mode}")
-            lines.append(f"```\n{text[:300]}\n```\n")
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
-    
-    # Also save JSON
-    json_path = output_path.replace('.md', '.json')
-    json_data = {
-        'metadata': {'date': datetime.now().isoformat(), 'duration': total_time},
-        'results': {str(p): [{'score': s, 'key': k, 'mode': m, 'text': t} 
-                             for s, k, m, t in r] for p, r in results.items()}
-    }
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, indent=2)
-    
-    print(f"[SAVED] {output_path}")
-    print(f"[SAVED] {json_path}")
+    """Record the hits in the results database and write the Markdown / JSON views."""
+    with ResultsDB() as db:
+        run_id = db.start_run('parallel_attack', {'pages': sorted(results)})
+        with db.writer(run_id) as writer:
+            for page_num, page_results in results.items():
+                writer.extend(ResultRecord(page_num, score, 'VIGENERE', key_name, mode, plaintext=text, key=key)
+                              for score, key_name, mode, text, key in page_results)
+        db.finish_run(run_id, total_time)
+        md, js = write_reports(db, run_id, Path(output_path), "AGGRESSIVE BATCH ATTACK RESULTS",
+                               {'Pages': len(results)})
+    
+    print(f"[SAVED] run {run_id} -> {db.path}")
+    print(f"[SAVED] {md}")
+    print(f"[SAVED] {js}")
 
 def main():
     parser = argparse.ArgumentParser(description="Aggressive parallel batch attack")
@@ -575,7 +528,7 @@ def main():
     else:
         pages = [int(p.strip()) for p in args.pages.split(',')]
     
-    batch_attack(pages, args.output)
+    batch_attack(pages, args.output, args.workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+PRIME-VALUE (GEMATRIA SUM) ENGINE
+=================================
+
+Every rune has a Gematria Primus prime value (F=2 ... EA=109). This module
+works in that domain over any packed corpus, by default the whole book
+(corpus_store.load_book):
+
+- per-rune prime values as one vectorised lookup
+- a prefix-sum array, so any rune range sums in O(1):
+      sum(lo, hi) = prefix[hi] - prefix[lo]
+- word / line / sentence / page sums for every unit at once
+- prime and emirp flags for every sum (sieve lookups, no trial division)
+- a global index sum -> (page, word) locations
+
+so hypotheses like "words whose sum is prime select the key" run over the
+whole book in one call:
+
+    pv = default_prime_values()
+    pv.locate(270)                          # every word summing to 270
+    keep = pv.flags('word')['prime']        # words with a prime sum
+    pv.gather('word', keep)                 # their runes, concatenated
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from corpus_store import Corpus, load_book
+from master_dictionary import ALPHABET_SIZE, INDEX_TO_LATIN, INDEX_TO_PRIME
+from math_sequences import prime_sieve
+
+RUNE_PRIMES = np.array([INDEX_TO_PRIME[i] for i in range(ALPHABET_SIZE)], dtype=np.int64)
+
+@dataclass
+class Location:
+    """Where a word sum occurs."""
+    page: Optional[int]     # Page number (None outside the book)
+    word: int               # Word index within the page (global index otherwise)
+    offset: int             # Rune offset in the corpus
+    length: int
+
+# =============================================================================
+# ARITHMETIC
+# =============================================================================
+
+def prime_values(runes: Sequence[int]) -> np.ndarray:
+    """Prime value of every rune index."""
+    return RUNE_PRIMES[np.asarray(runes, dtype=np.intp)]
+
+def prime_sum(runes: Sequence[int]) -> int:
+    return int(prime_values(runes).sum())
+
+def is_prime(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        return np.zeros(values.shape, dtype=bool)
+    sieve = prime_sieve(max(int(values.max()), 2))
+    return sieve[np.clip(values, 0, None)] & (values >= 0)
+
+def reverse_digits(values: np.ndarray) -> np.ndarray:
+    """Decimal digit reversal (123 -> 321) of every value."""
+    rest = np.asarray(values, dtype=np.int64).copy()
+    out = np.zeros_like(rest)
+    while rest.any():
+        out = np.where(rest > 0, out * 10 + rest % 10, out)
+        rest //= 10
+    return out
+
+def is_emirp(values: np.ndarray) -> np.ndarray:
+    """Primes whose digit reversal is a different prime (13 <-> 31)."""
+    values = np.asarray(values, dtype=np.int64)
+    rev = reverse_digits(values)
+    return is_prime(values) & is_prime(rev) & (rev != values)
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class PrimeValues:
+    """Prime-value prefix sums and unit tables over one packed corpus."""
+
+    def __init__(self, corpus: Corpus):
+        self.corpus = corpus
+        self.values = prime_values(corpus.runes)
+        self.prefix = np.zeros(len(self.values) + 1, dtype=np.int64)
+        np.cumsum(self.values, out=self.prefix[1:])
+        self._sums: Dict[str, np.ndarray] = {}
+        self._flags: Dict[str, Dict[str, np.ndarray]] = {}
+        self._word_page: Optional[np.ndarray] = None
+        # Word sums sorted once for locate(): word indices in sum order, and the sums in that order
+        self._order = np.argsort(self.sums('word'), kind='stable')
+        self._sorted_sums = self.sums('word')[self._order]
+
+    def sum(self, lo: int, hi: int) -> int:
+        """Prime sum of runes [lo, hi)."""
+        return int(self.prefix[hi] - self.prefix[lo])
+
+    def spans(self, unit: str) -> np.ndarray:
+        """(units, 2) rune offsets [lo, hi) of every word / line / sentence / page."""
+        return self.corpus.spans(unit)
+
+    def sums(self, unit: str = 'word') -> np.ndarray:
+        """Prime sum of every unit."""
+        if unit not in self._sums:
+            s = self.spans(unit)
+            self._sums[unit] = self.prefix[s[:, 1]] - self.prefix[s[:, 0]]
+        return self._sums[unit]
+
+    def flags(self, unit: str = 'word') -> Dict[str, np.ndarray]:
+        """Boolean 'prime' and 'emirp' flags of every unit sum."""
+        if unit not in self._flags:
+            sums = self.sums(unit)
+            self._flags[unit] = {'prime': is_prime(sums), 'emirp': is_emirp(sums)}
+        return self._flags[unit]
+
+    def page_of_word(self) -> Optional[np.ndarray]:
+        """Page index (into corpus.page_numbers) of every word, or None."""
+        if self.corpus.page_starts is None:
+            return None
+        if self._word_page is None:
+            n_words = len(self.corpus.word_offsets) - 1
+            self._word_page = np.searchsorted(self.corpus.page_starts, np.arange(n_words), side='right') - 1
+        return self._word_page
+
+    def locate(self, total: int) -> List[Location]:
+        """Every word whose prime sum equals `total`."""
+        lo, hi = np.searchsorted(self._sorted_sums, [total, total + 1])
+        words = np.sort(self._order[lo:hi])
+        return [self._location(int(w)) for w in words]
+
+    def _location(self, word: int) -> Location:
+        c = self.corpus
+        offset = int(c.word_offsets[word])
+        length = int(c.word_offsets[word + 1]) - offset
+        pages = self.page_of_word()
+        if pages is None:
+            return Location(None, word, offset, length)
+        p = int(pages[word])
+        return Location(int(c.page_numbers[p]), word - int(c.page_starts[p]), offset, length)
+
+    def sum_index(self) -> Dict[int, List[Location]]:
+        """sum -> every (page, word) location with that sum."""
+        index: Dict[int, List[Location]] = {}
+        for w, s in enumerate(self.sums('word').tolist()):
+            index.setdefault(s, []).append(self._location(w))
+        return index
+
+    def gather(self, unit: str, mask: np.ndarray) -> np.ndarray:
+        """Runes of the selected units, concatenated in corpus order."""
+        s = self.spans(unit)[np.asarray(mask, dtype=bool)]
+        if len(s) == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.concatenate([self.corpus.runes[lo:hi] for lo, hi in s])
+
+    def page_mask(self, unit: str, pages: Sequence[int]) -> np.ndarray:
+        """Units that start on one of the given page numbers (book only)."""
+        c = self.corpus
+        if c.page_starts is None:
+            raise KeyError(f"{c.name} has no pages")
+        page_lo = c.word_offsets[c.page_starts]
+        page_idx = np.searchsorted(page_lo, self.spans(unit)[:, 0], side='right') - 1
+        return np.isin(c.page_numbers[page_idx], list(pages))
+
+@lru_cache(maxsize=1)
+def default_prime_values() -> PrimeValues:
+    """Engine over the whole book (built once per process)."""
+    return PrimeValues(load_book())
+
+def main():
+    parser = argparse.ArgumentParser(description="Gematria prime-value sums over the book")
+    parser.add_argument("--sum", type=int, nargs='*', default=None, help="Locate words with these sums")
+    parser.add_argument("--unit", default='word', choices=['word', 'line', 'sentence', 'page'])
+    parser.add_argument("--pages", type=int, nargs='+', default=None, help="Restrict the summary")
+    parser.add_argument("--top", type=int, default=15, help="Most frequent sums to show")
+    args = parser.parse_args()
+
+    pv = default_prime_values()
+    sums = pv.sums(args.unit)
+    flags = pv.flags(args.unit)
+    mask = pv.page_mask(args.unit, args.pages) if args.pages else np.ones(len(sums), dtype=bool)
+    print(f"[PV] {len(pv.values)} runes, {mask.sum()} {args.unit}s: "
+          f"{flags['prime'][mask].sum()} prime sums, {flags['emirp'][mask].sum()} emirp sums")
+    for s, n in Counter(sums[mask].tolist()).most_common(args.top):
+        print(f"  {s:6d} x{n:<4d} {'prime' if is_prime(np.array([s]))[0] else ''}")
+
+    for total in args.sum or []:
+        locations = pv.locate(total)
+        print(f"\n[PV] sum {total}: {len(locations)} words")
+        for loc in locations[:args.top]:
+            word = pv.corpus.runes[loc.offset:loc.offset + loc.length]
+            print(f"  page {loc.page:>2}  word {loc.word:<4d} {''.join(INDEX_TO_LATIN[int(r)] for r in word)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+RESULTS DATABASE
+================
+
+One embedded SQLite store for every attack's hits, replacing the
+Markdown / JSON dumps that were overwritten on each run (and parsed back
+with regexes). Each run is a row in `runs`; its hits go to `hits`, indexed
+on page, cipher family, key hash and name, chain and score.
+
+    with ResultsDB() as db:
+        run = db.start_run('master_cipher', {'pages': 'unsolved'})
+        with db.writer(run) as w:                  # batched upserts
+            w.add(ResultRecord(page=20, score=812.0, cipher='VIGENERE',
+                               key_name='WORD_DIVINITY', mode='SUB', plaintext='...'))
+        db.finish_run(run)
+        db.best_per_page()                         # across all runs
+        db.best_keys(tool='batch_attack')          # one tool: scores are on its scale
+        db.hits_for_key('WORD_DIVINITY')
+        write_reports(db, run, Path('MASTER_RESULTS.md'), 'MASTER CIPHER ATTACK RESULTS')
+
+Hits are unique per (run, page, cipher, key hash, mode, chain); writing one
+again keeps the higher score. The key hash is taken over the key values
+when the tool knows them and over the key name otherwise, so
+"all hits of key X" also matches runs that only recorded names.
+
+Workers open their own ResultsDB on the same path: the database runs in
+WAL mode with a busy timeout, so concurrent writers queue their batches
+instead of failing. Markdown and JSON reports are generated views.
+
+Each tool scores on its own scale (master_cipher in the hundreds,
+brute_force_solver around 0-1), so rankings across tools only make sense
+filtered by tool or run_id.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+RESULTS_DB = Path(__file__).parent / "results" / "results.sqlite"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    tool        TEXT NOT NULL,
+    started     TEXT NOT NULL,
+    finished    TEXT,
+    elapsed     REAL,
+    params      TEXT
+);
+CREATE TABLE IF NOT EXISTS hits (
+    id          INTEGER PRIMARY KEY,
+    run_id      INTEGER NOT NULL REFERENCES runs(id),
+    page        INTEGER NOT NULL,
+    family      TEXT NOT NULL,
+    cipher      TEXT NOT NULL,
+    key_name    TEXT NOT NULL,
+    key_hash    TEXT NOT NULL,
+    key         TEXT,
+    mode        TEXT NOT NULL DEFAULT '',
+    chain       TEXT NOT NULL DEFAULT '',
+    score       REAL NOT NULL,
+    plaintext   TEXT,
+    details     TEXT,
+    UNIQUE (run_id, page, cipher, key_hash, mode, chain)
+);
+CREATE INDEX IF NOT EXISTS hits_page_score ON hits (page, score DESC);
+CREATE INDEX IF NOT EXISTS hits_family ON hits (family, score DESC);
+CREATE INDEX IF NOT EXISTS hits_key_hash ON hits (key_hash);
+CREATE INDEX IF NOT EXISTS hits_key_name ON hits (key_name);
+CREATE INDEX IF NOT EXISTS hits_chain ON hits (chain) WHERE chain != '';
+CREATE INDEX IF NOT EXISTS hits_score ON hits (score DESC);
+CREATE INDEX IF NOT EXISTS hits_run ON hits (run_id, page);
+"""
+
+UPSERT = """
+INSERT INTO hits (run_id, page, family, cipher, key_name, key_hash, key, mode, chain, score, plaintext, details)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (run_id, page, cipher, key_hash, mode, chain) DO UPDATE SET
+    score = excluded.score, plaintext = excluded.plaintext, details = excluded.details,
+    key = COALESCE(excluded.key, hits.key)
+WHERE excluded.score > hits.score
+"""
+
+# Cipher names used across the tools -> family
+CIPHER_FAMILIES = {
+    'VIGENERE': 'vigenere', 'VIGENERE_REV': 'vigenere', 'SUBSTITUTION': 'vigenere',
+    'GRONSFELD': 'vigenere', 'RUNNING_KEY': 'vigenere', 'PROGRESSIVE': 'vigenere',
+    'INTERRUPTED': 'vigenere', 'AUTOKEY': 'autokey', 'PORTA': 'vigenere',
+    'CAESAR': 'shift', 'CAESAR_REV': 'shift', 'ATBASH': 'shift', 'AFFINE': 'affine',
+    'HILL': 'polygraphic', 'BIFID': 'polygraphic',
+    'RAILFENCE': 'transposition', 'COLUMNAR': 'transposition', 'SKIP': 'transposition',
+    'CHAIN': 'chain',
+}
+
+@dataclass
+class ResultRecord:
+    """One hit as a tool reports it."""
+    page: int
+    score: float
+    cipher: str
+    key_name: str
+    mode: str = ''
+    chain: str = ''
+    plaintext: str = ''
+    key: Optional[Sequence[int]] = None
+    family: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+def cipher_family(cipher: str) -> str:
+    return CIPHER_FAMILIES.get(cipher.upper(), cipher.lower())
+
+def key_hash(key: Optional[Sequence[int]], key_name: str = '') -> str:
+    """Content hash of a key (of its name when the values are unknown)."""
+    if key is not None:
+        data = b'K' + bytes(int(k) % 256 for k in key)
+    else:
+        data = b'N' + key_name.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()[:16]
+
+def _row(run_id: int, r: ResultRecord) -> Tuple:
+    key = [int(k) for k in r.key] if r.key is not None else None
+    return (run_id, int(r.page), r.family or cipher_family(r.cipher), r.cipher, r.key_name,
+            key_hash(key, r.key_name), json.dumps(key) if key is not None else None,
+            r.mode or '', r.chain or '', float(r.score), r.plaintext,
+            json.dumps(r.details) if r.details else None)
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class ResultsDB:
+    """Connection to the results store (one per process)."""
+
+    def __init__(self, path: Path = RESULTS_DB, timeout: float = 60.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=timeout)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'ResultsDB':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- runs ---------------------------------------------------------------
+
+    def start_run(self, tool: str, params: Optional[Dict[str, Any]] = None) -> int:
+        with self.conn:
+            cur = self.conn.execute("INSERT INTO runs (tool, started, params) VALUES (?, ?, ?)",
+                                    (tool, datetime.now().isoformat(timespec='seconds'),
+                                     json.dumps(params or {}, default=str)))
+        return int(cur.lastrowid)
+
+    def finish_run(self, run_id: int, elapsed: Optional[float] = None):
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished = ?, elapsed = ? WHERE id = ?",
+                              (datetime.now().isoformat(timespec='seconds'), elapsed, run_id))
+
+    def runs(self, tool: Optional[str] = None) -> List[sqlite3.Row]:
+        sql = "SELECT r.*, COUNT(h.id) AS hits FROM runs r LEFT JOIN hits h ON h.run_id = r.id"
+        args: Tuple = ()
+        if tool:
+            sql, args = sql + " WHERE r.tool = ?", (tool,)
+        return self.conn.execute(sql + " GROUP BY r.id ORDER BY r.id", args).fetchall()
+
+    def run(self, run_id: int) -> Optional[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+
+    def latest_run(self, tool: Optional[str] = None) -> Optional[int]:
+        sql, args = "SELECT MAX(id) FROM runs", ()
+        if tool:
+            sql, args = sql + " WHERE tool = ?", (tool,)
+        value = self.conn.execute(sql, args).fetchone()[0]
+        return int(value) if value is not None else None
+
+    # --- writes -------------------------------------------------------------
+
+    def upsert(self, run_id: int, records: Iterable[ResultRecord]) -> int:
+        """Write a batch of hits in one transaction."""
+        rows = [_row(run_id, r) for r in records]
+        if rows:
+            with self.conn:
+                self.conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    def writer(self, run_id: int, batch: int = 1000) -> 'ResultWriter':
+        return ResultWriter(self, run_id, batch)
+
+    # --- queries ------------------------------------------------------------
+
+    @staticmethod
+    def _filters(run_id=None, tool=None, page=None, family=None, chain=None,
+                 min_score=None) -> Tuple[str, List]:
+        clauses, args = [], []
+        for column, value in (('run_id', run_id), ('page', page), ('family', family), ('chain', chain)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if tool is not None:
+            clauses.append("run_id IN (SELECT id FROM runs WHERE tool = ?)")
+            args.append(tool)
+        if min_score is not None:
+            clauses.append("score >= ?")
+            args.append(min_score)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def top(self, limit: int = 10, **filters) -> List[sqlite3.Row]:
+        """Highest-scoring hits matching run_id / tool / page / family / chain / min_score."""
+        where, args = self._filters(**filters)
+        return self.conn.execute(f"SELECT * FROM hits{where} ORDER BY score DESC LIMIT ?",
+                                 args + [limit]).fetchall()
+
+    def best_per_page(self, per_page: int = 1, **filters) -> List[sqlite3.Row]:
+        """The best `per_page` hits of every page (all runs unless run_id is given)."""
+        where, args = self._filters(**filters)
+        sql = (f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER "
+               f"(PARTITION BY page ORDER BY score DESC) AS rank FROM hits{where}) "
+               f"WHERE rank <= ? ORDER BY page, rank")
+        return self.conn.execute(sql, args + [per_page]).fetchall()
+
+    def hits_for_key(self, key_name: Optional[str] = None, key: Optional[Sequence[int]] = None,
+                     limit: int = 100) -> List[sqlite3.Row]:
+        """Every hit of a key, by values and/or by name."""
+        hashes = []
+        if key is not None:
+            hashes.append(key_hash(key))
+        if key_name is not None:
+            hashes.append(key_hash(None, key_name))
+        if not hashes:
+            return []
+        sql = (f"SELECT * FROM hits WHERE key_hash IN ({','.join('?' * len(hashes))})"
+               + (" OR key_name = ?" if key_name is not None else "") + " ORDER BY score DESC LIMIT ?")
+        args = hashes + ([key_name] if key_name is not None else []) + [limit]
+        return self.conn.execute(sql, args).fetchall()
+
+    def best_keys(self, min_score: Optional[float] = None, modes: Optional[Sequence[str]] = None,
+                  **filters) -> Dict[int, List[int]]:
+        """page -> key values of its best hit that recorded them (only hits in `modes` if given).
+
+        Pass tool or run_id: scores of different tools are not comparable.
+        """
+        where, args = self._filters(min_score=min_score, **filters)
+        where = (where + " AND" if where else " WHERE") + " key IS NOT NULL"
+        if modes:
+            where += f" AND mode IN ({','.join('?' * len(modes))})"
+            args += list(modes)
+        rows = self.conn.execute(f"SELECT page, key FROM (SELECT page, key, ROW_NUMBER() OVER "
+                                 f"(PARTITION BY page ORDER BY score DESC) AS rank FROM hits{where}) "
+                                 f"WHERE rank = 1", args).fetchall()
+        return {int(r['page']): json.loads(r['key']) for r in rows}
+
+class ResultWriter:
+    """Buffers records and upserts them in batches."""
+
+    def __init__(self, db: ResultsDB, run_id: int, batch: int = 1000):
+        self.db, self.run_id, self.batch = db, run_id, batch
+        self.buffer: List[ResultRecord] = []
+        self.written = 0
+
+    def add(self, record: ResultRecord):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.batch:
+            self.flush()
+
+    def extend(self, records: Iterable[ResultRecord]):
+        for r in records:
+            self.add(r)
+
+    def flush(self):
+        self.written += self.db.upsert(self.run_id, self.buffer)
+        self.buffer = []
+
+    def __enter__(self) -> 'ResultWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+# =============================================================================
+# REPORTS (GENERATED VIEWS)
+# =============================================================================
+
+def _details(row: sqlite3.Row) -> Dict[str, Any]:
+    return json.loads(row['details']) if row['details'] else {}
+
+def markdown_report(db: ResultsDB, run_id: int, title: str, header: Optional[Dict[str, Any]] = None,
+                    per_page: int = 5) -> str:
+    """Summary table (best hit per page) plus the top hits of every page."""
+    run = db.run(run_id)
+    lines = [f"# {title}", "", f"**Date:** {run['started'].replace('T', ' ')}", f"**Run:** {run_id}"]
+    if run['elapsed'] is not None:
+        lines.append(f"**Duration:** {run['elapsed']:.1f}s ({run['elapsed'] / 60:.1f} min)")
+    lines += [f"**{k}:** {v}" for k, v in (header or {}).items()]
+    lines += ["", "---", "", "## Summary", "",
+              "| Page | Score | Cipher | Key | Mode | Preview |",
+              "|------|-------|--------|-----|------|--------|"]
+
+    rows = db.best_per_page(per_page, run_id=run_id)
+    by_page: Dict[int, List[sqlite3.Row]] = {}
+    for r in rows:
+        by_page.setdefault(r['page'], []).append(r)
+    # Pages the run attacked without a hit still get a row
+    attacked = json.loads(run['params'] or '{}').get('pages') or []
+    pages = sorted(set(by_page) | {int(p) for p in attacked})
+    for page in pages:
+        if page not in by_page:
+            lines.append(f"| {page:02d} | - | - | - | - | No results |")
+            continue
+        best = by_page[page][0]
+        preview = (best['plaintext'] or '')[:50].replace('|', '\\|').replace('\n', ' ')
+        lines.append(f"| {page:02d} | {best['score']:.1f} | {best['cipher']} | `{best['key_name']}` | "
+                     f"{best['mode']} | {preview}... |")
+
+    lines += ["", "---", "", "## Details", ""]
+    for page in pages:
+        lines += [f"### Page {page:02d}", ""]
+        if page not in by_page:
+            lines += ["*No results.*", ""]
+        for i, r in enumerate(by_page.get(page, []), 1):
+            lines.append(f"**{i}. Score: {r['score']:.1f}** | Cipher: `{r['cipher']}` | "
+                         f"Key: `{r['key_name']}` | Mode: {r['mode']}")
+            aliases = _details(r).get('aliases')
+            if aliases:
+                lines.append(f"Equivalent: {', '.join(f'`{a}`' for a in aliases)}")
+            if r['key']:
+                lines.append(f"- **Key:** {r['key']}")
+            lines += [f"```\n{r['plaintext'] or ''}\n```", ""]
+    return '\n'.join(lines)
+
+def json_report(db: ResultsDB, run_id: int, per_page: int = 10) -> Dict[str, Any]:
+    run = db.run(run_id)
+    out: Dict[str, Any] = {'run': dict(run), 'results': {}}
+    for r in db.best_per_page(per_page, run_id=run_id):
+        out['results'].setdefault(str(r['page']), []).append({
+            'score': r['score'], 'cipher': r['cipher'], 'key': r['key_name'], 'mode': r['mode'],
+            'chain': r['chain'], 'plaintext': r['plaintext'],
+            'key_values': json.loads(r['key']) if r['key'] else None,
+            'aliases': _details(r).get('aliases', []),
+        })
+    return out
+
+def write_reports(db: ResultsDB, run_id: int, output: Path, title: str,
+                  header: Optional[Dict[str, Any]] = None, per_page: int = 5) -> Tuple[Path, Path]:
+    """Write the Markdown view to `output` and the JSON view next to it."""
+    output = Path(output)
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(markdown_report(db, run_id, title, header, per_page))
+    json_path = output.with_suffix('.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(json_report(db, run_id, per_page), f, indent=2)
+    return output, json_path
+
+# =============================================================================
+# LEGACY IMPORT
+# =============================================================================
+
+def import_json(db: ResultsDB, path: Path, tool: Optional[str] = None) -> int:
+    """Load an old MASTER_RESULTS / BATCH_RESULTS style JSON dump as a run."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    pages = data.get('results', data) if isinstance(data, dict) else {}
+    run_id = db.start_run(tool or Path(path).stem, {'imported_from': str(path)})
+    records = []
+    for page, hits in pages.items():
+        if not str(page).isdigit() or not isinstance(hits, list):
+            continue
+        for h in hits:
+            if not isinstance(h, dict) or 'score' not in h:
+                continue
+            cipher = h.get('cipher', 'VIGENERE')
+            records.append(ResultRecord(int(page), float(h['score']), cipher, str(h.get('key', '')),
+                                        h.get('mode', ''), h.get('chain', ''),
+                                        h.get('plaintext', h.get('text', '')), h.get('key_values'),
+                                        details={'aliases': h['aliases']} if h.get('aliases') else {}))
+    db.upsert(run_id, records)
+    db.finish_run(run_id)
+    return run_id
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the attack results database")
+    parser.add_argument("--db", type=Path, default=RESULTS_DB)
+    parser.add_argument("--runs", action="store_true", help="List runs")
+    parser.add_argument("--best", action="store_true", help="Best hit per page across runs")
+    parser.add_argument("--page", type=int, default=None, help="Top hits of one page")
+    parser.add_argument("--family", type=str, default=None)
+    parser.add_argument("--tool", type=str, default=None, help="Only hits of runs by this tool")
+    parser.add_argument("--key", type=str, default=None, help="Every hit of a key name")
+    parser.add_argument("--report", type=int, default=None, help="Write reports of a run id")
+    parser.add_argument("--output", type=Path, default=Path("RESULTS_REPORT.md"))
+    parser.add_argument("--import-json", type=Path, nargs='+', default=None, help="Import old JSON dumps")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with ResultsDB(args.db) as db:
+        for path in args.import_json or []:
+            run = import_json(db, path)
+            print(f"[DB] imported {path} as run {run}")
+        if args.runs:
+            for r in db.runs():
+                print(f"  run {r['id']:4d}  {r['tool']:<24s} {r['started']}  {r['hits']:>7,} hits")
+        start = time.time()
+        rows: List[sqlite3.Row] = []
+        if args.best:
+            rows = db.best_per_page(family=args.family, tool=args.tool)
+        elif args.page is not None:
+            rows = db.top(args.limit, page=args.page, family=args.family, tool=args.tool)
+        elif args.key:
+            rows = db.hits_for_key(args.key, limit=args.limit)
+        for r in rows:
+            print(f"  p{r['page']:02d} {r['score']:9.2f}  run {r['run_id']:<4d} {r['cipher']:<14s} "
+                  f"{r['key_name'][:28]:<28s} {r['mode']:<8s} {(r['plaintext'] or '')[:40]}")
+        if rows:
+            print(f"[DB] {len(rows)} rows in {1000 * (time.time() - start):.1f} ms")
+        if args.report is not None:
+            md, js = write_reports(db, args.report, args.output, f"RESULTS OF RUN {args.report}")
+            print(f"[SAVED] {md}\n[SAVED] {js}")
+
+if __name__ == "__main__":
+    main()
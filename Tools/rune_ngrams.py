@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+RUNE-DOMAIN N-GRAM MODEL
+========================
+
+Unigram / bigram / trigram log-probability tables over the 29 Gematria
+Primus indices, trained on the reference texts transliterated to runes.
+
+Scoring directly on index arrays avoids the indices -> Latin -> substring
+round trip the older scorers do, and lets whole candidate matrices be
+scored with a single fancy-indexing pass.
+
+Tables:
+- unigram[a]        log P(a)
+- bigram[a, b]      log P(b | a)
+- trigram[a, b, c]  log P(c | a, b)
+
+Author: Wulfic
+Date: January 2026
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+from master_dictionary import (
+    ALPHABET_SIZE, SELF_RELIANCE_TEXT, SOLVED_PLAINTEXTS, text_to_key,
+)
+
+# =============================================================================
+# MODEL
+# =============================================================================
+
+@dataclass
+class NgramModel:
+    """Log-probability tables in the rune-index domain."""
+    unigram: np.ndarray   # (29,)
+    bigram: np.ndarray    # (29, 29)
+    trigram: np.ndarray   # (29, 29, 29)
+    tokens: int = 0       # Training size (runes)
+
+    def score_bigrams(self, indices: Sequence[int]) -> float:
+        """Sum of log P(b | a) over all adjacent pairs."""
+        idx = np.asarray(indices, dtype=np.intp)
+        if len(idx) < 2:
+            return 0.0
+        return float(self.bigram[idx[:-1], idx[1:]].sum())
+
+    def score_trigrams(self, indices: Sequence[int]) -> float:
+        """Sum of log P(c | a, b) over all adjacent triples."""
+        idx = np.asarray(indices, dtype=np.intp)
+        if len(idx) < 3:
+            return 0.0
+        return float(self.trigram[idx[:-2], idx[1:-1], idx[2:]].sum())
+
+    def score_matrix(self, plaintexts: np.ndarray, order: int = 2) -> np.ndarray:
+        """Per-row mean log-probability of a (batch, n) candidate matrix."""
+        pt = np.asarray(plaintexts, dtype=np.intp)
+        if pt.ndim == 1:
+            pt = pt[None, :]
+        n = pt.shape[1]
+        if order >= 3 and n >= 3:
+            return self.trigram[pt[:, :-2], pt[:, 1:-1], pt[:, 2:]].mean(axis=1)
+        if n >= 2:
+            return self.bigram[pt[:, :-1], pt[:, 1:]].mean(axis=1)
+        return self.unigram[pt].mean(axis=1)
+
+def train_ngram_model(sequences: Iterable[Sequence[int]], smoothing: float = 0.5) -> NgramModel:
+    """Train additive-smoothed n-gram tables from index sequences."""
+    n = ALPHABET_SIZE
+    uni = np.full(n, smoothing, dtype=np.float64)
+    bi = np.full((n, n), smoothing, dtype=np.float64)
+    tri = np.full((n, n, n), smoothing, dtype=np.float64)
+    tokens = 0
+
+    for seq in sequences:
+        idx = np.asarray(seq, dtype=np.intp)
+        if len(idx) == 0:
+            continue
+        tokens += len(idx)
+        np.add.at(uni, idx, 1)
+        if len(idx) >= 2:
+            np.add.at(bi, (idx[:-1], idx[1:]), 1)
+        if len(idx) >= 3:
+            np.add.at(tri, (idx[:-2], idx[1:-1], idx[2:]), 1)
+
+    return NgramModel(
+        unigram=np.log(uni / uni.sum()).astype(np.float32),
+        bigram=np.log(bi / bi.sum(axis=1, keepdims=True)).astype(np.float32),
+        trigram=np.log(tri / tri.sum(axis=2, keepdims=True)).astype(np.float32),
+        tokens=tokens,
+    )
+
+def reference_sequences() -> List[List[int]]:
+    """Default training texts: Self-Reliance plus the solved plaintexts."""
+    seqs = []
+    for paragraph in SELF_RELIANCE_TEXT.split('\n\n'):
+        key = text_to_key(''.join(c for c in paragraph.upper() if c.isalpha()))
+        if key:
+            seqs.append(key)
+    for pt in SOLVED_PLAINTEXTS.values():
+        seqs.append(text_to_key(pt))
+    return seqs
+
+@lru_cache(maxsize=1)
+def default_model() -> NgramModel:
+    """Model trained on the reference texts (built once per process)."""
+    return train_ngram_model(reference_sequences())
+
+if __name__ == "__main__":
+    model = default_model()
+    print(f"Trained on {model.tokens} runes")
+    from master_dictionary import load_page_indices
+    for page in (56, 20):
+        idx = load_page_indices(page)
+        print(f"Page {page:02d}: bigram/rune = {model.score_matrix(np.array(idx))[0]:.3f}")
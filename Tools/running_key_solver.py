@@ -22,6 +22,7 @@ from master_dictionary import (
     ALPHABET_SIZE, RUNE_TO_INDEX, INDEX_TO_LATIN,
     TRIGRAMS, QUADGRAMS, SELF_RELIANCE_TEXT, text_to_key
 )
+from shared_data import SharedArrays, resolve
 
 # =============================================================================
 # RUNNING KEY CIPHER
@@ -83,8 +84,9 @@ def score_text(indices: np.ndarray) -> float:
 # =============================================================================
 
 def worker_try_offset(args: Tuple[int, np.ndarray, np.ndarray, str]) -> Tuple[int, str, float, str]:
-    """Worker to try a specific offset."""
+    """Worker to try a specific offset (cipher and key source may be shared-memory refs)."""
     offset, cipher, key_source, mode = args
+    cipher, key_source = resolve(cipher), resolve(key_source)
     plaintext = running_key_decrypt(cipher, key_source, offset, mode)
     score = score_text(plaintext)
     text = indices_to_text(plaintext)
@@ -147,12 +149,15 @@ class RunningKeySolver:
             
             print(f"[INFO] Trying source: {src_name} with {max_off} offsets...")
             
+            # Tasks carry shared-memory refs, not copies of the cipher and the whole source
+            shared = SharedArrays()
+            cipher_ref, source_ref = shared.share(cipher), shared.share(key_source)
             tasks = []
             for offset in range(max_off):
                 for mode in ["SUB", "ADD", "SUB_REV"]:
-                    tasks.append((offset, cipher, key_source, mode))
+                    tasks.append((offset, cipher_ref, source_ref, mode))
             
-            with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            with shared, ProcessPoolExecutor(max_workers=self.num_workers) as executor:
                 futures = [executor.submit(worker_try_offset, task) for task in tasks]
                 
                 for future in as_completed(futures):
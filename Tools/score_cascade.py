@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SCORING CASCADE
+===============
+
+Early-abort scoring for batches of candidate plaintexts. Almost every
+candidate an attack produces is noise, and its first few dozen runes
+already say so:
+
+    cascade = calibrated_cascade()              # 40-rune prefix, 0.1% false rejects
+    keep = cascade.passes(plaintexts)           # (batch,) bool, one table lookup pass
+    for row in np.flatnonzero(keep):
+        score = score_combined(plaintexts[row]) # full n-gram scoring of the survivors
+    ...                                         # segmentation for the top few only
+
+1. Prefix: mean rune-domain bigram log-likelihood (rune_ngrams) of the
+   first k runes. Rejected candidates are never converted to text or
+   scored; callers record them as REJECTED.
+2. Full n-gram scoring of the survivors (the caller's scorer).
+3. Word segmentation, the costliest feature, for the top survivors only.
+
+The bigram model is trained on Self-Reliance and the solved pages spelt
+the way the runes spell them (ING is one rune, V is written U), since a
+real decryption reads "AWARNNGBELIEUE", not text_to_key's "AWARNINGBELIEE".
+
+The threshold is set to a target false-reject rate against the known
+solutions (load_solved_page_texts, duplicates merged): every k-rune
+window of each solution is scored with a model trained without that
+solution, and the threshold is the `frr` quantile of those scores, or
+the normal-fit quantile if that is lower, since a couple of thousand
+overlapping windows say little about the far tail. Candidates shorter
+than k runes always pass.
+
+    python score_cascade.py                     # calibration table and measured speedup
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import NormalDist
+from typing import Dict, List
+
+import numpy as np
+
+from master_dictionary import ALPHABET_SIZE, LATIN_TO_INDEX, SELF_RELIANCE_TEXT, load_solved_page_texts, text_to_key
+from rune_ngrams import NgramModel, train_ngram_model
+
+DEFAULT_PREFIX = 40
+DEFAULT_FRR = 0.001
+NOISE_SAMPLES = 100_000
+SEED = 3301
+
+# Score recorded (and cached) for candidates the prefix test rejects
+REJECTED = float('-inf')
+
+# =============================================================================
+# CASCADE
+# =============================================================================
+
+@dataclass
+class Cascade:
+    """A calibrated prefix test; small enough to ship with every task."""
+    prefix: int                 # Runes the test looks at
+    threshold: float            # Minimum mean log P(b | a) over the prefix
+    frr: float                  # Target false-reject rate on the known solutions
+    bigram: np.ndarray          # (29, 29) log P(b | a), the deployed model
+    windows: int = 0            # Solution windows calibrated on
+    noise_reject: float = 0.0   # Fraction of uniform-random prefixes rejected
+
+    def signature(self) -> str:
+        """Part of evaluation-cache keys: cached scores depend on what was rejected."""
+        return f"cascade/{self.prefix}/{self.threshold:.4f}"
+
+    def prefix_scores(self, plaintexts: np.ndarray) -> np.ndarray:
+        """Mean bigram log-likelihood of each row's first `prefix` runes."""
+        pt = np.asarray(plaintexts)
+        if pt.ndim == 1:
+            pt = pt[None, :]
+        head = pt[:, :self.prefix].astype(np.intp)
+        valid = (head >= 0) & (head < ALPHABET_SIZE)       # XOR can leave the alphabet
+        head = np.where(valid, head, 0)
+        scores = self.bigram[head[:, :-1], head[:, 1:]].mean(axis=1)
+        scores[~valid.all(axis=1)] = REJECTED
+        return scores
+
+    def passes(self, plaintexts: np.ndarray) -> np.ndarray:
+        """Stage 1: which rows go on to full scoring."""
+        pt = np.asarray(plaintexts)
+        if pt.ndim == 1:
+            pt = pt[None, :]
+        if pt.shape[1] < self.prefix:
+            return np.ones(len(pt), dtype=bool)
+        return self.prefix_scores(pt) >= self.threshold
+
+# =============================================================================
+# TRAINING TEXTS
+# =============================================================================
+
+def runeglish(text: str) -> List[int]:
+    """English in the runes' own spelling: ING is one rune, V is U, QU is CW, Z is S."""
+    letters = re.sub(r'[^A-Z]', '', text.upper())
+    letters = letters.replace('QU', 'CW').replace('Q', 'CW').replace('V', 'U').replace('Z', 'S')
+    out: List[int] = []
+    for i, part in enumerate(letters.split('ING')):
+        if i:
+            out.append(LATIN_TO_INDEX['NG'])
+        out.extend(text_to_key(part))
+    return out
+
+def solutions() -> Dict[int, List[int]]:
+    """Solved-page plaintexts in runes, one entry per distinct text."""
+    out: Dict[int, List[int]] = {}
+    for page, text in sorted(load_solved_page_texts().items()):
+        seq = runeglish(text)
+        if seq and seq not in out.values():
+            out[page] = seq
+    return out
+
+def self_reliance() -> List[List[int]]:
+    return [seq for seq in map(runeglish, SELF_RELIANCE_TEXT.split('\n\n')) if seq]
+
+@lru_cache(maxsize=1)
+def cascade_model() -> NgramModel:
+    """The deployed model: Self-Reliance plus every solution."""
+    return train_ngram_model(self_reliance() + list(solutions().values()))
+
+# =============================================================================
+# CALIBRATION
+# =============================================================================
+
+def solution_windows(prefix: int) -> np.ndarray:
+    """Prefix score of every k-rune window of each solution, held out of its model."""
+    solved, base = solutions(), self_reliance()
+    scores: List[np.ndarray] = []
+    for page, seq in solved.items():
+        if len(seq) < prefix:
+            continue
+        model = train_ngram_model(base + [s for p, s in solved.items() if p != page])
+        windows = np.lib.stride_tricks.sliding_window_view(np.array(seq, dtype=np.intp), prefix)
+        scores.append(model.bigram[windows[:, :-1], windows[:, 1:]].mean(axis=1))
+    return np.concatenate(scores) if scores else np.zeros(0)
+
+def calibrate(prefix: int = DEFAULT_PREFIX, frr: float = DEFAULT_FRR) -> Cascade:
+    """Threshold at the target false-reject rate on the held-out solution windows."""
+    genuine = solution_windows(prefix)
+    if len(genuine) < 2:
+        raise ValueError(f"no known solution is {prefix} runes long")
+    fitted = NormalDist(float(genuine.mean()), float(genuine.std())).inv_cdf(frr)
+    threshold = min(float(np.quantile(genuine, frr)), fitted)
+    cascade = Cascade(prefix, threshold, frr, cascade_model().bigram, windows=len(genuine))
+    noise = np.random.default_rng(SEED).integers(0, ALPHABET_SIZE, (NOISE_SAMPLES, prefix))
+    cascade.noise_reject = float((~cascade.passes(noise)).mean())
+    return cascade
+
+@lru_cache(maxsize=8)
+def calibrated_cascade(prefix: int = DEFAULT_PREFIX, frr: float = DEFAULT_FRR) -> Cascade:
+    """calibrate() once per process."""
+    return calibrate(prefix, frr)
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def measure_speedup(cascade: Cascade, candidates: int = 2000) -> None:
+    """Full score_combined on random candidates versus the cascade in front of it."""
+    from brute_force_solver import score_combined
+    pt = np.random.default_rng(SEED + 1).integers(0, ALPHABET_SIZE, (candidates, 2 * cascade.prefix))
+    t = time.perf_counter()
+    for row in pt:
+        score_combined(row)
+    full = time.perf_counter() - t
+    t = time.perf_counter()
+    for row in np.flatnonzero(cascade.passes(pt)):
+        score_combined(pt[row])
+    staged = time.perf_counter() - t
+    print(f"\n[SPEED] {candidates} random {pt.shape[1]}-rune candidates: full scoring {full * 1e3:.1f} ms, "
+          f"cascade {staged * 1e3:.1f} ms ({full / max(staged, 1e-9):.0f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the early-abort prefix scoring cascade")
+    parser.add_argument("--prefix", type=int, action="append", default=None,
+                        help=f"Prefix length in runes (repeatable, default {DEFAULT_PREFIX})")
+    parser.add_argument("--frr", type=float, action="append", default=None,
+                        help=f"Target false-reject rate (repeatable, default {DEFAULT_FRR})")
+    parser.add_argument("--no-speed", action="store_true", help="Skip the scoring speed comparison")
+    args = parser.parse_args()
+
+    print(f"  {'prefix':>6} {'frr':>7} {'windows':>8} {'threshold':>10} {'noise rejected':>15}")
+    for prefix in args.prefix or [DEFAULT_PREFIX]:
+        for frr in args.frr or [DEFAULT_FRR]:
+            c = calibrated_cascade(prefix, frr)
+            print(f"  {prefix:>6} {frr:>7.4f} {c.windows:>8} {c.threshold:>10.3f} {100 * c.noise_reject:>14.3f}%")
+    if not args.no_speed:
+        measure_speedup(calibrated_cascade(DEFAULT_PREFIX, DEFAULT_FRR))
+
+if __name__ == "__main__":
+    main()
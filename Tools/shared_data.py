@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+SHARED-MEMORY DATA LAYER
+========================
+
+Read-only arrays handed to worker processes through named shared memory
+instead of pickles. Without it every spawned worker (and, for executor
+tasks, every task) gets its own copy of the key matrices, page runes and
+corpora, even though none of them change during a run.
+
+    with SharedArrays() as shared:                       # coordinator
+        ref = shared.share(self_reliance, name='self_reliance')
+        ctx = shared.share_tree((plan, chains))          # arrays inside become refs
+        pool.submit(worker, ref, ...)                    # refs pickle to ~100 bytes
+
+    def worker(ref, ...):                                # any child process
+        key_source = attach(ref)                         # zero-copy, read-only view
+        plan, chains = attach_tree(ctx)
+
+- A SharedRef is the segment name plus shape and dtype; attaching maps
+  the segment once per process and returns a non-writeable ndarray view.
+- Segments are reference counted in the owning SharedArrays: sharing
+  the same name again reuses the segment, release() drops a reference,
+  and the last release (or close(), the with-block exit, or interpreter
+  exit) unlinks it.
+- `resolve()` accepts a ref, an array or a list, so worker functions
+  keep working with plain arrays (distributed units, direct calls).
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import copy
+import itertools
+import os
+import sys
+import time
+import weakref
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+MIN_SHARED_BYTES = 4096         # share_tree leaves smaller arrays in the pickle
+SEGMENT_PREFIX = 'cic'
+
+_counter = itertools.count()
+
+@dataclass(frozen=True)
+class SharedRef:
+    """Picklable handle to one array in a shared-memory segment."""
+    segment: str
+    shape: tuple
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+# =============================================================================
+# OWNER SIDE
+# =============================================================================
+
+def _unlink_all(segments: Dict[str, shared_memory.SharedMemory]):
+    for shm in segments.values():
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+class SharedArrays:
+    """Owner of the shared segments of one run."""
+
+    def __init__(self):
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._refs: Dict[str, SharedRef] = {}          # share() name -> ref
+        self._counts: Dict[str, int] = {}
+        self._sources: Dict[str, Any] = {}              # Keeps id()-named sources alive
+        self._finalizer = weakref.finalize(self, _unlink_all, self._segments)
+
+    def share(self, array: np.ndarray, name: Optional[str] = None) -> SharedRef:
+        """Copy an array into a segment once; later calls with the same name add a reference."""
+        name = name or f"id{id(array)}"
+        if name in self._refs:
+            self._counts[name] += 1
+            return self._refs[name]
+        array = np.ascontiguousarray(array)
+        segment = f"{SEGMENT_PREFIX}{os.getpid()}_{next(_counter)}"
+        shm = shared_memory.SharedMemory(name=segment, create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+        ref = SharedRef(segment, tuple(array.shape), array.dtype.str)
+        self._segments[segment] = shm
+        self._refs[name], self._counts[name], self._sources[name] = ref, 1, array
+        return ref
+
+    def release(self, name: str):
+        """Drop one reference; the segment is unlinked with the last one."""
+        self._counts[name] -= 1
+        if self._counts[name] == 0:
+            ref = self._refs.pop(name)
+            del self._counts[name], self._sources[name]
+            _unlink_all({ref.segment: self._segments.pop(ref.segment)})
+
+    def share_tree(self, obj: Any, min_bytes: int = MIN_SHARED_BYTES) -> Any:
+        """Copy of obj with every array of at least min_bytes replaced by a SharedRef.
+
+        Walks dicts, lists, tuples and object attributes (dataclasses, key
+        spaces, corpora); the original object is left untouched.
+        """
+        if isinstance(obj, np.ndarray):
+            return self.share(obj) if obj.nbytes >= min_bytes else obj
+        if isinstance(obj, dict):
+            return {k: self.share_tree(v, min_bytes) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            items = [self.share_tree(v, min_bytes) for v in obj]
+            return items if isinstance(obj, list) else tuple(items)
+        if hasattr(obj, '__dict__') and not isinstance(obj, type):
+            out = copy.copy(obj)
+            for k, v in vars(obj).items():
+                setattr(out, k, self.share_tree(v, min_bytes))
+            return out
+        return obj
+
+    @property
+    def nbytes(self) -> int:
+        return sum(shm.size for shm in self._segments.values())
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def close(self):
+        """Unlink every segment (workers that are still attached keep their mappings)."""
+        self._refs.clear()
+        self._counts.clear()
+        self._sources.clear()
+        self._finalizer()
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+_attached: Dict[str, shared_memory.SharedMemory] = {}       # Mapped once per process
+
+def _open(segment: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=segment, track=False)
+    return shared_memory.SharedMemory(name=segment)
+
+def attach(ref: SharedRef) -> np.ndarray:
+    """Zero-copy, read-only view of a shared array."""
+    shm = _attached.get(ref.segment)
+    if shm is None:
+        shm = _attached[ref.segment] = _open(ref.segment)
+    view = np.ndarray(ref.shape, np.dtype(ref.dtype), buffer=shm.buf)
+    view.flags.writeable = False
+    return view
+
+def resolve(value: Any) -> np.ndarray:
+    """attach() a ref; arrays and lists pass through as arrays."""
+    return attach(value) if isinstance(value, SharedRef) else np.asarray(value)
+
+def attach_tree(obj: Any) -> Any:
+    """Inverse of SharedArrays.share_tree (in place for objects, which are private copies here)."""
+    if isinstance(obj, SharedRef):
+        return attach(obj)
+    if isinstance(obj, dict):
+        return {k: attach_tree(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        items = [attach_tree(v) for v in obj]
+        return items if isinstance(obj, list) else tuple(items)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        for k, v in vars(obj).items():
+            setattr(obj, k, attach_tree(v))
+    return obj
+
+# =============================================================================
+# DEMO
+# =============================================================================
+
+def _checksum(ref: SharedRef) -> int:
+    return int(attach(ref).sum())
+
+def main():
+    import pickle
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing as mp
+
+    parser = argparse.ArgumentParser(description="Compare pickled and shared-memory task payloads")
+    parser.add_argument("--mb", type=float, default=64.0, help="Array size in MB")
+    parser.add_argument("--tasks", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    data = np.random.default_rng(0).integers(0, 29, int(args.mb * 2**20), dtype=np.uint8)
+    ctx = mp.get_context('spawn')
+    with SharedArrays() as shared, ProcessPoolExecutor(args.workers, mp_context=ctx) as pool:
+        ref = shared.share(data, name='demo')
+        print(f"[SHARED] payload per task: pickled array {len(pickle.dumps(data)):,} B, "
+              f"ref {len(pickle.dumps(ref)):,} B")
+        list(pool.map(_checksum, [ref] * args.workers))                  # Warm up the workers
+        start = time.time()
+        sums = list(pool.map(_checksum, [ref] * args.tasks))
+        print(f"[SHARED] {args.tasks} tasks via shared memory: {time.time() - start:.2f}s")
+        start = time.time()
+        list(pool.map(np.sum, [data] * args.tasks))
+        print(f"[SHARED] {args.tasks} tasks via pickles:       {time.time() - start:.2f}s")
+        assert len(set(sums)) == 1
+
+if __name__ == "__main__":
+    main()
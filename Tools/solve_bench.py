@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+TIME-TO-SOLUTION BENCHMARK
+==========================
+
+End-to-end regression suite for the search engines. bench_suite.py times
+the building blocks; this measures whether an engine actually finds a
+known answer, and how much search it takes:
+
+    python solve_bench.py run                       # every engine, pages 55 74 1, 5 seeds
+    python solve_bench.py run --engine hill_climb --seeds 20
+    python solve_bench.py compare                   # last run vs the one before it
+    python solve_bench.py history
+
+Each solved page's plaintext is re-encrypted with a seeded secret of the
+kind the engine searches for, and the engine runs on the result:
+
+- brute_force  Vigenère over a window of BruteForceSolver's canonical plan
+- autokey      BruteForceSolver's autokey phase over a window of its keys
+- hill_climb   liber_primus_solver: frequency key + ±1 hill climbing,
+               on a seeded suffix of the page (at least 3/4 of it)
+- running_key  RunningKeySolver over Self-Reliance offsets and modes
+- chain        master_cipher's multi-layer chains (needs a GPU or
+               MASTER_CIPHER_CPU=1, otherwise skipped)
+
+A probe wraps the engine's own scorer, so every candidate it evaluates
+is counted and compared with the ground truth. Candidates the scoring
+cascade rejects on their prefix are counted too (once, in the order
+they were generated), so evaluation counts stay comparable with runs
+made without the cascade; trials also record how many were rejected. Per engine and page the
+run records the success rate over seeds (the top-scored candidate is
+the plaintext), evaluations and wall-clock to the first correct
+candidate, throughput and peak traced memory (seed 0, a separate pass).
+Exhaustive engines search `--budget` evaluations around the secret, so
+a run takes minutes instead of hours.
+
+Engines run in this process: their pools only distribute the same worker
+calls, and the probe has to see every one. Evaluation counts do not
+depend on machine load, so `compare` gates on success rate and
+evaluations-to-hit and only reports wall-clock changes.
+
+Ground truth: page 55 (φ(prime) shift, literal F at 56), page 74 (the
+Parable, plaintext) and page 1 (Atbash). The page keys in
+verified_keys.json decrypt to repeating fragments, not English, so they
+are not used as answers.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bench_suite import append_history, describe_run, find_run, git_commit, import_master_cipher, load_history
+from master_dictionary import ALPHABET_SIZE, CACHE_DIR, INDEX_TO_LATIN, load_page_indices
+
+HISTORY_FILE = CACHE_DIR / "solve_history.jsonl"
+SEED = 3301
+DEFAULT_PAGES = (55, 74, 1)
+DEFAULT_BUDGET = 10000          # Evaluations an exhaustive engine gets per trial
+DEFAULT_ACCURACY = 0.9          # Fraction of runes a candidate needs to count as the answer
+DEFAULT_THRESHOLD = 0.10        # More evaluations to the first hit by over 10% is a regression
+
+# =============================================================================
+# GROUND TRUTH
+# =============================================================================
+
+def _phi_prime(runes: np.ndarray) -> np.ndarray:
+    from brute_force_solver import phi_prime_decrypt_np
+    return phi_prime_decrypt_np(runes, 0, [56])
+
+# page -> (method, runes -> plaintext, crib the plaintext must contain)
+TRUTHS: Dict[int, Tuple[str, Callable[[np.ndarray], np.ndarray], str]] = {
+    55: ("φ(prime) shift, literal F at 56", _phi_prime, "WITHINTHEDEEPWEB"),
+    74: ("plaintext (the Parable)", lambda runes: runes, "PARABLE"),
+    1: ("Atbash", lambda runes: ALPHABET_SIZE - 1 - runes, "AWARN"),
+}
+
+def latin(indices: np.ndarray) -> str:
+    return ''.join(INDEX_TO_LATIN[int(i)] for i in indices)
+
+def load_truth(page: int) -> np.ndarray:
+    """Plaintext rune indices of a solved page (checked against its crib)."""
+    method, solve, crib = TRUTHS[page]
+    runes = np.array(load_page_indices(page), dtype=np.int64)
+    plain = np.asarray(solve(runes), dtype=np.int64) % ALPHABET_SIZE
+    if crib not in latin(plain):
+        raise ValueError(f"page {page} does not decrypt to '{crib}...' by {method}")
+    return plain
+
+# =============================================================================
+# PROBE
+# =============================================================================
+
+class Probe:
+    """Counts an engine's evaluations and checks every candidate against the truth."""
+
+    def __init__(self, truth: np.ndarray, accuracy: float = DEFAULT_ACCURACY):
+        self.truth = truth
+        self.accuracy = accuracy
+        self.evals = 0
+        self.rejected = 0
+        self.first_hit: Optional[int] = None
+        self.hit_seconds: Optional[float] = None
+        self.best_score = -math.inf
+        self.best_accuracy = 0.0
+        self.start = time.perf_counter()
+        self._last = 0.0
+        self._screened = 0         # Prefix-tested survivors already counted, awaiting their score
+
+    def candidate(self, plaintext) -> None:
+        pt = np.asarray(plaintext)
+        self._last = float(np.mean(pt == self.truth)) if pt.shape == self.truth.shape else 0.0
+        if self._screened:
+            self._screened -= 1
+            return
+        self.evals += 1
+        if self.first_hit is None and self._last >= self.accuracy:
+            self.first_hit, self.hit_seconds = self.evals, time.perf_counter() - self.start
+
+    def screened(self, plaintexts, keep: np.ndarray) -> None:
+        """Count a prefix-tested batch; survivors are scored (not counted) later."""
+        pt = np.asarray(plaintexts)
+        for row, kept in zip(pt[None, :] if pt.ndim == 1 else pt, keep):
+            self.candidate(row)
+            if kept:
+                self._screened += 1
+            else:
+                self.rejected += 1
+
+    def scored(self, score: float) -> None:
+        """The engine ranks by this score, so the best-scored candidate is its answer."""
+        if score > self.best_score:
+            self.best_score, self.best_accuracy = score, self._last
+
+    @property
+    def solved(self) -> bool:
+        return self.best_accuracy >= self.accuracy
+
+    @contextlib.contextmanager
+    def watching(self, module, render: str, score: Optional[str] = None,
+                 screen: Optional[Tuple[Any, str]] = None) -> Iterator['Probe']:
+        """Route module.render (called with each candidate's indices) and
+        module.score through the probe; one function when it does both.
+        screen is an (owner, method) prefix test called with candidate
+        batches before any of them are scored."""
+        saved = {name: getattr(module, name) for name in (render, score) if name}
+
+        def rendered(plaintext, *args, **kwargs):
+            self.candidate(plaintext)
+            out = saved[render](plaintext, *args, **kwargs)
+            if score is None:
+                self.scored(out)
+            return out
+
+        def scored(text, *args, **kwargs):
+            out = saved[score](text, *args, **kwargs)
+            self.scored(out)
+            return out
+
+        setattr(module, render, rendered)
+        if score:
+            setattr(module, score, scored)
+        if screen:
+            owner, method = screen
+            test = getattr(owner, method)
+
+            def screening(obj, plaintexts, *args, **kwargs):
+                keep = test(obj, plaintexts, *args, **kwargs)
+                self.screened(plaintexts, keep)
+                return keep
+
+            setattr(owner, method, screening)
+        try:
+            yield self
+        finally:
+            for name, fn in saved.items():
+                setattr(module, name, fn)
+            if screen:
+                setattr(owner, method, test)
+
+# =============================================================================
+# ENGINES
+# =============================================================================
+
+@dataclass
+class Scenario:
+    """One solved page re-encrypted with a secret the engine has to recover."""
+    engine: str
+    page: int
+    seed: int
+    truth: np.ndarray
+    cipher: np.ndarray
+    secret: str
+    params: Dict[str, Any]
+
+class Engine:
+    """An engine adapter: encrypt() makes a scenario, search() runs the engine on it."""
+    name = ''
+
+    def setup(self) -> None:
+        """Import the engine and build what every trial shares (ImportError skips it)."""
+
+    def hook(self) -> Tuple[Any, str, Optional[str]]:
+        """(module, render, score) for Probe.watching."""
+        raise NotImplementedError
+
+    def screen(self) -> Optional[Tuple[Any, str]]:
+        """(owner, method) of a prefix test the engine runs before scoring, if any."""
+        return None
+
+    def plaintext(self, truth: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """The part of the page a trial encrypts (all of it unless overridden)."""
+        return truth
+
+    def encrypt(self, truth: np.ndarray, rng: np.random.Generator, budget: int
+                ) -> Tuple[np.ndarray, str, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def search(self, cipher: np.ndarray, params: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+ENGINES: Dict[str, Engine] = {}
+
+def engine(cls):
+    ENGINES[cls.name] = cls()
+    return cls
+
+def _window(rng: np.random.Generator, total: int, budget: int) -> Tuple[int, int]:
+    lo = int(rng.integers(0, max(1, total - budget + 1)))
+    return lo, min(total, lo + budget)
+
+def _check(decrypted: np.ndarray, truth: np.ndarray, secret: str) -> None:
+    if not np.array_equal(np.asarray(decrypted) % ALPHABET_SIZE, truth):
+        raise AssertionError(f"re-encryption with {secret} does not decrypt back")
+
+@engine
+class BruteForceEngine(Engine):
+    name = 'brute_force'
+
+    def setup(self):
+        import brute_force_solver
+        self.bfs = brute_force_solver
+        self.config = brute_force_solver.Config(verbose=False, use_cache=False)
+        keys = brute_force_solver.generate_all_keys(self.config)
+        solver = brute_force_solver.BruteForceSolver(self.config)
+        self.plan = solver.plan_vigenere(keys)
+        self.cascade = solver.cascade
+
+    def hook(self):
+        return self.bfs, 'score_combined', None
+
+    def screen(self):
+        return (self.bfs.Cascade, 'passes') if self.cascade is not None else None
+
+    def encrypt(self, truth, rng, budget):
+        lo, hi = _window(rng, len(self.plan), budget)
+        task = int(rng.integers(lo, hi))
+        k, mode = int(self.plan.key_idx[task]), self.plan.modes[self.plan.mode_idx[task]]
+        key = np.resize(self.plan.keys.key(k), len(truth)).astype(np.int64)
+        cipher = {'SUB': truth + key, 'ADD': truth - key, 'SUB_REV': key - truth}[mode] % ALPHABET_SIZE
+        secret = f"{self.plan.keys.name(k)}/{mode}"
+        _check(dict(self.bfs.CIPHER_MODES)[mode](cipher, key), truth, secret)
+        return cipher.astype(np.int32), secret, {'lo': lo, 'hi': hi}
+
+    def search(self, cipher, params):
+        shard = self.plan.shard(params['lo'], params['hi'])
+        self.bfs.worker_try_key_shard((shard, cipher, self.config.score_weights, 0.0, 10, self.cascade))
+
+@engine
+class AutokeyEngine(BruteForceEngine):
+    name = 'autokey'
+
+    def setup(self):
+        import brute_force_solver
+        self.bfs = brute_force_solver
+        self.config = brute_force_solver.Config(verbose=False, use_cache=False)
+        self.keys = brute_force_solver.generate_all_keys(self.config)
+        self.cascade = brute_force_solver.BruteForceSolver(self.config).cascade
+
+    def encrypt(self, truth, rng, budget):
+        lo, hi = _window(rng, len(self.keys), budget)
+        while True:
+            i = int(rng.integers(lo, hi))
+            primer = self.keys.key(i).astype(np.int64)
+            if len(primer) <= 20:           # The autokey phase only seeds with short keys
+                break
+        stream = np.concatenate([primer, truth])[:len(truth)]
+        cipher = ((truth + stream) % ALPHABET_SIZE).astype(np.int32)
+        secret = f"{self.keys.name(i)}/AUTOKEY"
+        _check(self.bfs.autokey_decrypt_np(cipher, primer), truth, secret)
+        return cipher, secret, {'lo': lo, 'hi': hi}
+
+    def search(self, cipher, params):
+        weights = self.config.score_weights
+        for i in range(params['lo'], params['hi']):
+            key = self.keys.key(i)
+            if len(key) <= 20:
+                self.bfs.worker_try_autokey((self.keys.name(i), key, cipher, weights, self.cascade))
+
+@engine
+class HillClimbEngine(Engine):
+    name = 'hill_climb'
+    KEY_LENGTHS = (3, 5, 7)
+
+    def setup(self):
+        import liber_primus_solver
+        self.lps = liber_primus_solver
+
+    def hook(self):
+        return self.lps, 'indices_to_text', 'score_english'
+
+    def plaintext(self, truth, rng):
+        # The climb is the same for every key of one length (it only sees the key
+        # through the cipher's column frequencies), so seeds differ by the text
+        return truth[int(rng.integers(0, len(truth) // 4 + 1)):]
+
+    def encrypt(self, truth, rng, budget):
+        key = rng.integers(0, ALPHABET_SIZE, int(rng.choice(self.KEY_LENGTHS))).tolist()
+        cipher = self.lps.encrypt_sub(truth.tolist(), key)
+        secret = f"SUB key of length {len(key)} on {len(truth)} runes"
+        _check(self.lps.decrypt_sub(cipher, key), truth, secret)
+        return np.array(cipher), secret, {'key_length': len(key)}
+
+    def search(self, cipher, params):
+        runes = cipher.tolist()
+        start = self.lps.generate_frequency_key(runes, params['key_length'])
+        self.lps.hill_climb_optimize(runes, start, max_iterations=500)
+
+@engine
+class RunningKeyEngine(Engine):
+    name = 'running_key'
+    MODES = ("SUB", "ADD", "SUB_REV")
+
+    def setup(self):
+        import running_key_solver
+        from master_dictionary import SELF_RELIANCE_TEXT
+        if not SELF_RELIANCE_TEXT:
+            raise ImportError("Self-Reliance text not available")
+        self.rks = running_key_solver
+        self.source = running_key_solver.prepare_running_key_source(SELF_RELIANCE_TEXT)
+
+    def hook(self):
+        return self.rks, 'score_text', None
+
+    def encrypt(self, truth, rng, budget):
+        max_offset = max(1, min(budget // len(self.MODES), len(self.source) - len(truth)))
+        offset, mode = int(rng.integers(max_offset)), str(rng.choice(self.MODES))
+        key = self.source[offset:offset + len(truth)].astype(np.int64)
+        cipher = {'SUB': truth + key, 'ADD': truth - key, 'SUB_REV': key - truth}[mode] % ALPHABET_SIZE
+        secret = f"SELF_RELIANCE@{offset}/{mode}"
+        _check(self.rks.running_key_decrypt(cipher, self.source, offset, mode), truth, secret)
+        return cipher.astype(np.int32), secret, {'max_offset': max_offset}
+
+    def search(self, cipher, params):
+        # RunningKeySolver.solve's task order, one worker call at a time
+        for offset in range(params['max_offset']):
+            for mode in self.MODES:
+                self.rks.worker_try_offset((offset, cipher, self.source, mode))
+
+def _invert_step(step: Tuple[str, Any, str], plain: np.ndarray) -> np.ndarray:
+    """Input that one chain step decrypts to plain (substitutions and transpositions)."""
+    from cipher_registry import apply_chain
+    n = len(plain)
+    perm = apply_chain(np.arange(n), [step])
+    if np.array_equal(np.sort(perm), np.arange(n)):
+        out = np.empty(n, dtype=np.int64)
+        out[perm] = plain
+    else:
+        table = np.stack([apply_chain(np.full(n, v), [step]) % ALPHABET_SIZE for v in range(ALPHABET_SIZE)])
+        out = np.argmax(table == plain[None, :], axis=0)
+    if not np.array_equal(apply_chain(out, [step]) % ALPHABET_SIZE, plain):
+        raise ValueError(f"{step[0]} cannot be inverted position by position")
+    return out
+
+@engine
+class ChainEngine(Engine):
+    name = 'chain'
+
+    def setup(self):
+        self.mc = import_master_cipher()
+        with contextlib.redirect_stdout(io.StringIO()):
+            plan, self.chains, _ = self.mc.build_attack_plan()
+            self.worker = self.mc.GPUWorker(0, plan, self.chains)
+
+    def hook(self):
+        return self.mc, 'indices_to_text', 'score_plaintext'
+
+    def encrypt(self, truth, rng, budget):
+        for c in rng.permutation(len(self.chains)):
+            chain = self.chains[int(c)]
+            try:
+                cipher = truth
+                for step in reversed(chain.steps):
+                    cipher = _invert_step(step, cipher)
+            except ValueError:
+                continue                    # Fractionating steps (Bifid) have no such inverse
+            return cipher.astype(np.int64), chain.name, {}
+        raise ValueError("no invertible chain")
+
+    def search(self, cipher, params):
+        from eval_cache import EvalCache
+        # A fresh cache: scores remembered from earlier trials would skip evaluations
+        with tempfile.TemporaryDirectory() as tmp:
+            self.worker.cache = EvalCache(Path(tmp) / "evals.sqlite", max_entries=100_000)
+            try:
+                self.worker.attack_page(cipher, 0, tasks=(0, 0), single_layer=False)
+            finally:
+                self.worker.cache.close()
+
+# =============================================================================
+# RUNNING
+# =============================================================================
+
+def run_trial(eng: Engine, scenario: Scenario, accuracy: float, trace_memory: bool = False) -> Dict[str, Any]:
+    probe = Probe(scenario.truth, accuracy)
+    with contextlib.redirect_stdout(io.StringIO()), probe.watching(*eng.hook(), screen=eng.screen()):
+        if trace_memory:
+            tracemalloc.start()
+        probe.start = time.perf_counter()
+        try:
+            eng.search(scenario.cipher, scenario.params)
+        finally:
+            seconds = time.perf_counter() - probe.start
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+            if trace_memory:
+                tracemalloc.stop()
+    return {'seed': scenario.seed, 'secret': scenario.secret, 'solved': probe.solved,
+            'best_accuracy': round(probe.best_accuracy, 4), 'evals': probe.evals, 'rejected': probe.rejected,
+            'first_hit': probe.first_hit, 'hit_seconds': probe.hit_seconds, 'seconds': seconds,
+            'peak_mb': peak / 2**20 if trace_memory else None}
+
+def _median(values: List[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+def summarize(trials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    peaks = [t['peak_mb'] for t in trials if t['peak_mb'] is not None]
+    return {
+        'trials': len(trials),
+        'success': sum(t['solved'] for t in trials) / len(trials),
+        'hits': sum(t['first_hit'] is not None for t in trials),
+        'evals_to_hit': _median([t['first_hit'] for t in trials]),
+        'seconds_to_hit': _median([t['hit_seconds'] for t in trials]),
+        'seconds': _median([t['seconds'] for t in trials]),
+        'rate': sum(t['evals'] for t in trials) / max(1e-9, sum(t['seconds'] for t in trials)),
+        'peak_mb': max(peaks) if peaks else None,
+        'detail': trials,
+    }
+
+def _num(value: Optional[float], fmt: str) -> str:
+    return '-' if value is None else format(value, fmt)
+
+def run_suite(engines: List[str], pages: List[int], seeds: int, budget: int, accuracy: float,
+              memory: bool = True) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """(engine/page -> summary, engine -> skip reason)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        truths = {page: load_truth(page) for page in pages}
+    results, skipped = {}, {}
+    print(f"  {'engine/page':<18} {'solved':>7} {'evals->hit':>11} {'s->hit':>8} {'s/trial':>8} "
+          f"{'evals/s':>9} {'peak MB':>8}")
+    for name in engines:
+        eng = ENGINES[name]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                eng.setup()
+        except ImportError as e:
+            skipped[name] = str(e)
+            print(f"  [SKIP] {name}: {e}")
+            continue
+        for page, truth in truths.items():
+            trials = []
+            for seed in range(seeds):
+                rng = np.random.default_rng([SEED, seed, page, zlib.crc32(name.encode())])
+                plain = eng.plaintext(truth, rng)
+                cipher, secret, params = eng.encrypt(plain, rng, budget)
+                scenario = Scenario(name, page, seed, plain, cipher, secret, params)
+                trial = run_trial(eng, scenario, accuracy)
+                if memory and seed == 0:
+                    trial['peak_mb'] = run_trial(eng, scenario, accuracy, trace_memory=True)['peak_mb']
+                trials.append(trial)
+            key = f"{name}/{page}"
+            results[key] = r = summarize(trials)
+            print(f"  {key:<18} {round(r['success'] * r['trials']):>3}/{r['trials']:<3} "
+                  f"{_num(r['evals_to_hit'], ',.0f'):>11} {_num(r['seconds_to_hit'], '.2f'):>8} "
+                  f"{_num(r['seconds'], '.2f'):>8} {r['rate']:>9,.0f} {_num(r['peak_mb'], '.2f'):>8}")
+    return results, skipped
+
+# =============================================================================
+# COMPARISON
+# =============================================================================
+
+def compare_runs(base: Dict[str, Any], head: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+                 ) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]], str]]:
+    """(engine/page, base summary, head summary, status).
+
+    REGRESSION: fewer seeds solved, a first hit lost, or more evaluations
+    to the first hit than the threshold allows. Wall-clock alone only
+    shows as 'slower' / 'faster'.
+    """
+    rows = []
+    for key in sorted(set(base['results']) | set(head['results'])):
+        b, h = base['results'].get(key), head['results'].get(key)
+        if b is None or h is None:
+            rows.append((key, b, h, 'new' if b is None else 'gone'))
+            continue
+        evals = (h['evals_to_hit'] / b['evals_to_hit']
+                 if b['evals_to_hit'] and h['evals_to_hit'] is not None else 1.0)
+        time_ratio = (h['seconds_to_hit'] / b['seconds_to_hit']
+                      if b['seconds_to_hit'] and h['seconds_to_hit'] is not None else 1.0)
+        if h['success'] < b['success'] or h['hits'] < b['hits'] or evals > 1 + threshold:
+            status = 'REGRESSION'
+        elif h['success'] > b['success'] or h['hits'] > b['hits'] or evals < 1 - threshold:
+            status = 'better'
+        else:
+            status = 'slower' if time_ratio > 1 + threshold else 'faster' if time_ratio < 1 - threshold else 'ok'
+        rows.append((key, b, h, status))
+    return rows
+
+def report_comparison(base: Dict[str, Any], head: Dict[str, Any], threshold: float,
+                      partial: bool = False) -> int:
+    """Print the comparison; 1 when anything regressed. `partial` hides results head did not run."""
+    print(f"\n[COMPARE] base {describe_run(base)}")
+    print(f"[COMPARE] head {describe_run(head)}")
+    for key in ('host', 'settings'):
+        if base.get(key) != head.get(key):
+            print(f"[WARNING] runs differ in {key}: {base.get(key)} vs {head.get(key)}")
+
+    def cell(r: Optional[Dict[str, Any]]) -> str:
+        if r is None:
+            return '-'
+        return (f"{round(r['success'] * r['trials'])}/{r['trials']} "
+                f"{_num(r['evals_to_hit'], ',.0f')} ev {_num(r['seconds_to_hit'], '.2f')}s")
+
+    rows = [r for r in compare_runs(base, head, threshold) if not (partial and r[3] == 'gone')]
+    for key, b, h, status in rows:
+        print(f"  {key:<18} {cell(b):>24} -> {cell(h):<24} {status}")
+    regressions = [r for r in rows if r[3] == 'REGRESSION']
+    print(f"[COMPARE] {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def cmd_run(args) -> int:
+    engines = args.engine or list(ENGINES)
+    pages = args.page or list(DEFAULT_PAGES)
+    print(f"[SOLVE] engines {', '.join(engines)} on pages {pages}: {args.seeds} seeds, "
+          f"budget {args.budget:,} evaluations, hit at {100 * args.accuracy:.0f}% of runes")
+    results, skipped = run_suite(engines, pages, args.seeds, args.budget, args.accuracy, not args.no_memory)
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'), 'label': args.label, 'commit': git_commit(),
+        'host': platform.node(), 'python': platform.python_version(), 'numpy': np.__version__,
+        'cpus': os.cpu_count(), 'results': results, 'skipped': skipped,
+        'settings': {'seeds': args.seeds, 'budget': args.budget, 'accuracy': args.accuracy},
+    }
+    if args.no_save:
+        return 0
+    history = load_history(args.history)
+    append_history(record, args.history)
+    print(f"[SOLVE] saved {len(results)} results to {args.history}")
+    base = next((run for run in reversed(history) if set(run['results']) & set(results)), None)
+    if base is not None:
+        return report_comparison(base, record, args.threshold, partial=True)
+    return 0
+
+def cmd_compare(args) -> int:
+    history = load_history(args.history)
+    if len(history) < 2 and (args.base is None or args.head is None):
+        print(f"[COMPARE] need two runs in {args.history}, have {len(history)}")
+        return 2
+    try:
+        base = find_run(history, args.base if args.base is not None else '-2')
+        head = find_run(history, args.head if args.head is not None else '-1')
+    except KeyError as e:
+        print(f"[COMPARE] {e.args[0]}")
+        return 2
+    return report_comparison(base, head, args.threshold)
+
+def cmd_history(args) -> int:
+    for i, run in enumerate(load_history(args.history)):
+        print(f"  #{i:<3} {describe_run(run)}: {len(run['results'])} engine/page results, {run['settings']}")
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time-to-solution benchmark on re-encrypted solved pages")
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help="History file (JSON lines)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the engines and append the results to the history")
+    run.add_argument("--engine", action="append", choices=list(ENGINES), help="Engine to run (repeatable)")
+    run.add_argument("--page", action="append", type=int, choices=sorted(TRUTHS), help="Solved page (repeatable)")
+    run.add_argument("--seeds", type=int, default=None, help="Secrets per engine and page (default 5, quick 2)")
+    run.add_argument("--budget", type=int, default=None,
+                     help="Evaluations per exhaustive trial (default 10000, quick 2000)")
+    run.add_argument("--accuracy", type=float, default=DEFAULT_ACCURACY,
+                     help="Fraction of runes a candidate must match to count as the answer")
+    run.add_argument("--quick", action="store_true", help="Fewer seeds and a smaller budget")
+    run.add_argument("--no-memory", action="store_true", help="Skip the traced-memory pass")
+    run.add_argument("--label", type=str, default='', help="Name to compare against later (e.g. baseline)")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run.add_argument("--no-save", action="store_true", help="Print only, leave the history alone")
+
+    compare = sub.add_parser("compare", help="Flag engines that solve less or search longer")
+    compare.add_argument("--base", type=str, default=None, help="Label, commit or index (default -2)")
+    compare.add_argument("--head", type=str, default=None, help="Label, commit or index (default -1)")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="Relative increase in evaluations-to-hit that counts as a regression")
+
+    sub.add_parser("history", help="List recorded runs")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        args.seeds = args.seeds or (2 if args.quick else 5)
+        args.budget = args.budget or (2000 if args.quick else DEFAULT_BUDGET)
+        return cmd_run(args)
+    if args.command == "compare":
+        return cmd_compare(args)
+    return cmd_history(args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
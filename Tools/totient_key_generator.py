@@ -20,6 +20,8 @@ Hypotheses:
 import math
 import os
 
+from math_sequences import totients_upto
+
 # Gematria Primus prime values
 GP_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 
              41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 
@@ -45,17 +47,8 @@ def euler_totient(n):
         result -= result // n
     return result
 
-def sieve_totient(n):
-    """Calculate φ(1) to φ(n) using sieve method"""
-    phi = list(range(n + 1))
-    for i in range(2, n + 1):
-        if phi[i] == i:  # i is prime
-            for j in range(i, n + 1, i):
-                phi[j] -= phi[j] // i
-    return phi
-
 # Calculate totients for first 200 numbers
-phi = sieve_totient(200)
+phi = totients_upto(200).tolist()
 
 print("=" * 70)
 print("TOTIENT FUNCTION ANALYSIS FOR LIBER PRIMUS")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+TRIE / VITERBI WORD SEGMENTATION ON RUNE-INDEX ARRAYS
+=====================================================
+
+Batch word segmentation for candidate plaintexts, working directly on
+Gematria index arrays instead of Latin strings.
+
+- Word lists are compiled once into a flat rune-index trie
+  (children[node, rune] -> node, word_logp[node]).
+- Viterbi runs over a whole (batch, n) uint8 matrix at once: for every
+  start position the trie is walked for all rows in parallel, so the cost
+  is O(n * max_word_len) numpy operations regardless of batch size.
+- Unknown runes are allowed at a fixed per-rune penalty, so every text has
+  a segmentation and scores stay comparable.
+
+The per-rune Viterbi score and word coverage are exposed as scoring
+features (segmentation_score / word_coverage) for the brute-force engines.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from master_dictionary import ALPHABET_SIZE, INDEX_TO_LATIN, text_to_key
+from word_pattern_index import MAX_WORD_RUNES, collect_word_counts
+
+NEG_INF = np.float32(-1e9)
+
+# Single-rune entries in the corpora are mostly initials and possessive S
+SINGLE_RUNE_WORDS = {'A', 'I', 'O'}
+
+# =============================================================================
+# TRIE
+# =============================================================================
+
+@dataclass
+class RuneTrie:
+    """Flat trie over rune indices. Node 0 is the root, the last node is dead."""
+    children: np.ndarray    # (nodes + 1, 29) int32
+    word_logp: np.ndarray   # (nodes + 1,) float32, NEG_INF if not a word end
+    words: Dict[int, str]   # terminal node -> word
+    max_len: int
+    unknown_logp: float     # Penalty for a rune not covered by any word
+
+    @property
+    def dead(self) -> int:
+        return len(self.children) - 1
+
+def compile_trie(word_counts: Dict[str, int], max_len: int = MAX_WORD_RUNES,
+                 min_runes: int = 1, unknown_margin: float = 2.0) -> RuneTrie:
+    """Compile word -> count into a trie with unigram word log-probabilities."""
+    total = float(sum(word_counts.values())) or 1.0
+    children: List[List[int]] = [[-1] * ALPHABET_SIZE]
+    logp: List[float] = [float(NEG_INF)]
+    words: Dict[int, str] = {}
+
+    for word, count in word_counts.items():
+        key = text_to_key(word)
+        if not (min_runes <= len(key) <= max_len):
+            continue
+        if len(key) == 1 and word not in SINGLE_RUNE_WORDS:
+            continue
+        node = 0
+        for r in key:
+            nxt = children[node][r]
+            if nxt < 0:
+                nxt = len(children)
+                children[node][r] = nxt
+                children.append([-1] * ALPHABET_SIZE)
+                logp.append(float(NEG_INF))
+            node = nxt
+        lp = float(np.log(count / total))
+        if lp > logp[node]:
+            logp[node] = lp
+            words[node] = word
+
+    dead = len(children)
+    table = np.array(children + [[dead] * ALPHABET_SIZE], dtype=np.int32)
+    table[table < 0] = dead
+    word_logp = np.array(logp + [float(NEG_INF)], dtype=np.float32)
+    finite = word_logp[word_logp > NEG_INF]
+    unknown = float(finite.min()) - unknown_margin if len(finite) else -20.0
+    return RuneTrie(table, word_logp, words, max_len, unknown)
+
+@lru_cache(maxsize=1)
+def default_trie() -> RuneTrie:
+    """Trie over the default word sources (built once per process)."""
+    return compile_trie(collect_word_counts())
+
+# =============================================================================
+# VITERBI
+# =============================================================================
+
+def viterbi_batch(plaintexts: np.ndarray, trie: Optional[RuneTrie] = None,
+                  backpointers: bool = False):
+    """Segment every row of a (batch, n) index matrix.
+
+    Returns (score, covered) per row: total log-probability of the best
+    segmentation and the number of runes inside dictionary words. With
+    backpointers=True also returns the (batch, n + 1) start-index array.
+    """
+    trie = trie or default_trie()
+    pt = np.asarray(plaintexts)
+    if pt.ndim == 1:
+        pt = pt[None, :]
+    pt = pt.astype(np.intp)
+    batch, n = pt.shape
+    rows = np.arange(batch)
+
+    best = np.full((batch, n + 1), NEG_INF, dtype=np.float32)
+    cover = np.zeros((batch, n + 1), dtype=np.int32)
+    back = np.zeros((batch, n + 1), dtype=np.int32)
+    best[:, 0] = 0.0
+    unk = np.float32(trie.unknown_logp)
+
+    for i in range(n):
+        base, base_cov = best[:, i], cover[:, i]
+
+        # Unknown single rune
+        cand = base + unk
+        better = cand > best[:, i + 1]
+        best[better, i + 1] = cand[better]
+        cover[better, i + 1] = base_cov[better]
+        back[better, i + 1] = i
+
+        # Dictionary words starting at i
+        node = np.zeros(batch, dtype=np.intp)
+        for d in range(1, min(trie.max_len, n - i) + 1):
+            node = trie.children[node, pt[rows, i + d - 1]]
+            if (node == trie.dead).all():
+                break
+            cand = base + trie.word_logp[node]
+            better = cand > best[:, i + d]
+            if better.any():
+                best[better, i + d] = cand[better]
+                cover[better, i + d] = base_cov[better] + d
+                back[better, i + d] = i
+
+    if backpointers:
+        return best[:, n], cover[:, n], back
+    return best[:, n], cover[:, n]
+
+def segment(indices, trie: Optional[RuneTrie] = None) -> List[Tuple[str, bool]]:
+    """Best segmentation of one text as (Latin segment, is_word) pairs."""
+    trie = trie or default_trie()
+    idx = np.asarray(indices, dtype=np.intp)
+    _, _, back = viterbi_batch(idx[None, :], trie, backpointers=True)
+    back = back[0]
+
+    pieces = []
+    end = len(idx)
+    while end > 0:
+        start = int(back[end])
+        node = 0
+        for r in idx[start:end]:
+            node = trie.children[node, r]
+        latin = ''.join(INDEX_TO_LATIN[int(r)] for r in idx[start:end])
+        is_word = end - start > 1 or trie.word_logp[node] > NEG_INF
+        pieces.append((trie.words.get(int(node), latin) if is_word else latin, is_word))
+        end = start
+    return pieces[::-1]
+
+# =============================================================================
+# SCORING FEATURES
+# =============================================================================
+
+def segmentation_score(plaintexts: np.ndarray, trie: Optional[RuneTrie] = None) -> np.ndarray:
+    """Viterbi log-probability per rune (higher = more word-like)."""
+    pt = np.asarray(plaintexts)
+    score, _ = viterbi_batch(pt, trie)
+    return score / max(1, pt.shape[-1])
+
+def word_coverage(plaintexts: np.ndarray, trie: Optional[RuneTrie] = None) -> np.ndarray:
+    """Fraction of runes covered by dictionary words in the best segmentation."""
+    pt = np.asarray(plaintexts)
+    _, covered = viterbi_batch(pt, trie)
+    return covered / max(1, pt.shape[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Trie/Viterbi rune-index word segmentation")
+    parser.add_argument("text", nargs='?', default=None, help="Latin text to segment")
+    parser.add_argument("--page", type=int, default=None, help="Segment a page's raw runes")
+    args = parser.parse_args()
+
+    trie = default_trie()
+    print(f"[TRIE] {len(trie.words)} words, {len(trie.children) - 1} nodes")
+
+    if args.page is not None:
+        from master_dictionary import load_page_indices
+        idx = load_page_indices(args.page)
+    else:
+        idx = text_to_key(args.text or "WITHINTHEDEEPWEBTHEREEXISTSAPAGE")
+
+    pieces = segment(idx, trie)
+    print(' '.join(f"[{w}]" if is_word else w for w, is_word in pieces))
+    arr = np.array(idx)[None, :]
+    print(f"Score/rune: {segmentation_score(arr, trie)[0]:.3f}  "
+          f"Coverage: {word_coverage(arr, trie)[0] * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -85,6 +85,11 @@ from dataclasses import dataclass
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
+from aho_corasick import latin_automaton
+from eval_cache import EvalCache, context_seed, stream_hashes
+from math_sequences import primes_upto, sequence
+from metrics import add_arguments as add_metrics_arguments, configure_from_args, get_metrics
+
 # =============================================================================
 # CUDA SETUP - GPU ONLY, NO FALLBACK
 # =============================================================================
@@ -176,17 +181,7 @@ LATIN_TO_INDEX['K'] = LATIN_TO_INDEX['C']
 # MATHEMATICAL SEQUENCES
 # =============================================================================
 
-def sieve_primes(limit: int) -> List[int]:
-    """Sieve of Eratosthenes."""
-    sieve = [True] * (limit + 1)
-    sieve[0] = sieve[1] = False
-    for i in range(2, int(limit**0.5) + 1):
-        if sieve[i]:
-            for j in range(i*i, limit + 1, i):
-                sieve[j] = False
-    return [i for i, p in enumerate(sieve) if p]
-
-PRIMES = sieve_primes(10000)
+PRIMES = primes_upto(10000).tolist()
 PRIME_SET = set(PRIMES)
 
 def totient(n: int) -> int:
@@ -206,37 +201,6 @@ def totient(n: int) -> int:
         result -= result // temp
     return result
 
-def fibonacci(n: int) -> List[int]:
-    """First n Fibonacci numbers."""
-    if n <= 0: return []
-    if n == 1: return [0]
-    f = [0, 1]
-    for _ in range(2, n): f.append(f[-1] + f[-2])
-    return f
-
-def lucas(n: int) -> List[int]:
-    """First n Lucas numbers."""
-    if n <= 0: return []
-    if n == 1: return [2]
-    l = [2, 1]
-    for _ in range(2, n): l.append(l[-1] + l[-2])
-    return l
-
-def tribonacci(n: int) -> List[int]:
-    """First n Tribonacci numbers."""
-    if n <= 0: return []
-    t = [0, 0, 1]
-    while len(t) < n: t.append(t[-1] + t[-2] + t[-3])
-    return t[:n]
-
-def pell(n: int) -> List[int]:
-    """First n Pell numbers."""
-    if n <= 0: return []
-    if n == 1: return [0]
-    p = [0, 1]
-    for _ in range(2, n): p.append(2 * p[-1] + p[-2])
-    return p
-
 def catalan(n: int) -> List[int]:
     """First n Catalan numbers."""
     result = [1]
@@ -257,21 +221,21 @@ def perfect_numbers(n: int) -> List[int]:
     known = [6, 28, 496, 8128, 33550336]
     return known[:n]
 
-# Precompute sequences
-FIBONACCI = fibonacci(200)
-LUCAS = lucas(200)
-TRIBONACCI = tribonacci(200)
-PELL = pell(200)
+# Precompute sequences (recurrences come back reduced mod 29)
+FIBONACCI = sequence('FIBONACCI', 200).tolist()
+LUCAS = sequence('LUCAS', 200).tolist()
+TRIBONACCI = sequence('TRIBONACCI', 200).tolist()
+PELL = sequence('PELL', 200).tolist()
 CATALAN = catalan(50)
 TRIANGULAR = triangular(500)
 SQUARES = squares(500)
-TOTIENTS = [totient(i) for i in range(1, 1001)]
+TOTIENTS = sequence('TOTIENTS', 1000, mod=None).tolist()
 
 # Mathematical constants as digit sequences
-PI_DIGITS = [3,1,4,1,5,9,2,6,5,3,5,8,9,7,9,3,2,3,8,4,6,2,6,4,3,3,8,3,2,7,9,5,0,2,8,8,4,1,9,7,1,6,9,3,9,9,3,7,5,1]
-E_DIGITS = [2,7,1,8,2,8,1,8,2,8,4,5,9,0,4,5,2,3,5,3,6,0,2,8,7,4,7,1,3,5,2,6,6,2,4,9,7,7,5,7,2,4,7,0,9,3,6,9,9,9]
-PHI_DIGITS = [1,6,1,8,0,3,3,9,8,8,7,4,9,8,9,4,8,4,8,2,0,4,5,8,6,8,3,4,3,6,5,6,3,8,1,1,7,7,2,0,3,0,9,1,7,9,8,0,5,7]  # Golden ratio
-SQRT2_DIGITS = [1,4,1,4,2,1,3,5,6,2,3,7,3,0,9,5,0,4,8,8,0,1,6,8,8,7,2,4,2,0,9,6,9,8,0,7,8,5,6,9,6,7,1,8,7,5,3,7,6,9]
+PI_DIGITS = sequence('DIGITS_PI', 50).tolist()
+E_DIGITS = sequence('DIGITS_E', 50).tolist()
+PHI_DIGITS = sequence('DIGITS_PHI', 50).tolist()  # Golden ratio
+SQRT2_DIGITS = sequence('DIGITS_SQRT2', 50).tolist()
 
 # =============================================================================
 # CICADA KEYWORDS AND PHRASES
@@ -633,9 +597,10 @@ class GPUCipherEngine:
         return matrix.flatten()[:n]
     
     def batch_decrypt(self, cipher: cp.ndarray, keys: Dict[str, List[int]], 
-                      modes: List[str]) -> List[Tuple[str, str, cp.ndarray]]:
+                      modes: List[str], only: Optional[Set[Tuple[str, str]]] = None
+                      ) -> List[Tuple[str, str, cp.ndarray]]:
         """
-        Batch decrypt with all keys and modes.
+        Batch decrypt with all keys and modes (or only the given (key, mode) pairs).
         
         Returns list of (key_name, mode, plaintext_array)
         """
@@ -648,6 +613,8 @@ class GPUCipherEngine:
             key_gpu = cp.array(key_values, dtype=cp.int32)
             
             for mode in modes:
+                if only is not None and (key_name, mode) not in only:
+                    continue
                 try:
                     if mode == 'SUB':
                         pt = self.vigenere_sub(cipher, key_gpu)
@@ -729,6 +696,13 @@ KNOWN_PHRASES = [
     'THATISNOTWHATYOUARE', 'THATISWHATY0UDO', 'TESTTHECNOWLEDGE',
 ]
 
+# Part of every evaluation cache key: bump when score_plaintext changes
+SCORER_VERSION = 'ultimate_gpu_attack.score_plaintext/1'
+
+# Words count every occurrence, phrases count once
+WORD_AUTOMATON = latin_automaton({word: len(word) * 50 for word in ENGLISH_WORDS})
+PHRASE_AUTOMATON = latin_automaton({phrase: len(phrase) * 100 for phrase in KNOWN_PHRASES})
+
 def indices_to_text(indices: np.ndarray) -> str:
     """Convert index array to Latin text."""
     return ''.join(INDEX_TO_LATIN.get(int(i), '?') for i in indices)
@@ -754,15 +728,10 @@ def score_plaintext(text: str) -> float:
             score += ENGLISH_TRIGRAMS[trigram] * 2.0
     
     # Word scoring (sliding window check) - heavily weighted
-    for word in ENGLISH_WORDS:
-        count = text.count(word)
-        if count > 0:
-            score += len(word) * 50 * count
+    score += WORD_AUTOMATON.count_score(text)
     
     # Known phrase scoring - extremely high weight
-    for phrase in KNOWN_PHRASES:
-        if phrase in text:
-            score += len(phrase) * 100
+    score += PHRASE_AUTOMATON.presence_score(text)
     
     # Consecutive vowel/consonant patterns (English-like)
     vowels = set('AEIOU')
@@ -822,6 +791,7 @@ class UltimateGPUAttack:
         self.gpu = GPUCipherEngine()
         self.keys = generate_all_keys()
         self.modes = ['SUB', 'ADD', 'SUB_REV', 'ADD_REV', 'BEAUFORT', 'XOR']
+        self.cache = EvalCache()
         
     def load_page(self, page_num: int) -> Optional[cp.ndarray]:
         """Load runes from a page."""
@@ -841,6 +811,50 @@ class UltimateGPUAttack:
         
         return None
     
+    def vigenere_phase(self, cipher: cp.ndarray, top_n: int, min_score: float = 5.0
+                       ) -> List[Tuple[float, str, str, str]]:
+        """Every key x mode on one ciphertext, skipping pairs scored in earlier runs.
+
+        Only the best `top_n` cached pairs are decrypted again for their text.
+        """
+        cipher_host = cp.asnumpy(cipher)
+        names = [name for name, values in self.keys.items() if values]
+        ext = np.stack([np.resize(np.asarray(self.keys[name], dtype=np.int64), len(cipher_host)) for name in names])
+        pairs = [(name, mode) for mode in self.modes for name in names]
+        hashes = np.concatenate([stream_hashes(context_seed(cipher_host, mode, '', SCORER_VERSION), ext)
+                                 for mode in self.modes])
+        known, cached = self.cache.lookup(hashes)
+        metrics = get_metrics()
+        metrics.count('keys', len(pairs))
+        metrics.count('cache_hits', int(known.sum()))
+        
+        best = np.flatnonzero(known & (cached >= min_score))
+        best = best[np.argsort(-cached[best], kind='stable')[:top_n]]
+        todo = {pairs[i] for i in np.flatnonzero(~known)} | {pairs[i] for i in best}
+        with metrics.phase('vigenere/decrypt'):
+            batch = self.gpu.batch_decrypt(cipher, self.keys, self.modes, only=todo)
+        
+        position = {pair: i for i, pair in enumerate(pairs)}
+        scores = dict(zip((pairs[i] for i in best), cached[best]))
+        new_hashes, new_scores = [], []
+        results = []
+        with metrics.phase('vigenere/score'):           # Includes the device-to-host copies
+            for key_name, mode, pt_gpu in batch:
+                text = indices_to_text(cp.asnumpy(pt_gpu))
+                score = scores.get((key_name, mode))
+                if score is None:
+                    score = score_plaintext(text)
+                    new_hashes.append(hashes[position[(key_name, mode)]])
+                    new_scores.append(score)
+                if score >= min_score:
+                    results.append((float(score), key_name, mode, text))
+        metrics.count('scored', len(new_scores))
+        self.cache.store(np.array(new_hashes, dtype=np.uint64), new_scores)
+        self.cache.flush()
+        
+        results.sort(reverse=True, key=lambda x: x[0])
+        return results
+    
     def attack_page(self, page_num: int, top_n: int = 10) -> List[Tuple[float, str, str, str]]:
         """Run full attack on a single page."""
         print(f"\n{'='*60}")
@@ -856,95 +870,108 @@ class UltimateGPUAttack:
         
         all_results = []
         start = time.time()
+        metrics = get_metrics()
         
         # Phase 1: Caesar shifts (all 29)
         print("[PHASE 1] Caesar shifts (29 variants)...")
-        caesar_results = self.gpu.caesar_all_shifts(cipher)
-        for shift in range(29):
-            pt = caesar_results[shift]
-            text = indices_to_text(cp.asnumpy(pt))
-            score = score_plaintext(text)
-            if score > 5.0:
-                all_results.append((score, f'CAESAR_{shift}', 'SUB', text))
-        
-        # Also try Caesar on reversed ciphertext
-        cipher_rev = self.gpu.reverse_cipher(cipher)
-        caesar_rev_results = self.gpu.caesar_all_shifts(cipher_rev)
-        for shift in range(29):
-            pt = caesar_rev_results[shift]
-            text = indices_to_text(cp.asnumpy(pt))
-            score = score_plaintext(text)
-            if score > 5.0:
-                all_results.append((score, f'CAESAR_{shift}_REV', 'SUB', text))
+        with metrics.phase('caesar'):
+            caesar_results = self.gpu.caesar_all_shifts(cipher)
+            for shift in range(29):
+                pt = caesar_results[shift]
+                text = indices_to_text(cp.asnumpy(pt))
+                score = score_plaintext(text)
+                if score > 5.0:
+                    all_results.append((score, f'CAESAR_{shift}', 'SUB', text))
+            
+            # Also try Caesar on reversed ciphertext
+            cipher_rev = self.gpu.reverse_cipher(cipher)
+            caesar_rev_results = self.gpu.caesar_all_shifts(cipher_rev)
+            for shift in range(29):
+                pt = caesar_rev_results[shift]
+                text = indices_to_text(cp.asnumpy(pt))
+                score = score_plaintext(text)
+                if score > 5.0:
+                    all_results.append((score, f'CAESAR_{shift}_REV', 'SUB', text))
+        metrics.count('keys', 2 * 29)
         
         # Phase 2: Atbash
         print("[PHASE 2] Atbash cipher...")
-        atbash_result = self.gpu.atbash(cipher)
-        text = indices_to_text(cp.asnumpy(atbash_result))
-        score = score_plaintext(text)
-        if score > 5.0:
-            all_results.append((score, 'ATBASH', 'ATBASH', text))
+        with metrics.phase('atbash'):
+            atbash_result = self.gpu.atbash(cipher)
+            text = indices_to_text(cp.asnumpy(atbash_result))
+            score = score_plaintext(text)
+            if score > 5.0:
+                all_results.append((score, 'ATBASH', 'ATBASH', text))
+        metrics.count('keys')
         
         # Phase 3: Affine cipher (all valid combinations)
         print("[PHASE 3] Affine cipher (all combinations)...")
         valid_a = [i for i in range(1, 29) if math.gcd(i, 29) == 1]
-        for a in valid_a:
-            for b in range(29):
-                pt = self.gpu.affine_decrypt(cipher, a, b)
-                text = indices_to_text(cp.asnumpy(pt))
-                score = score_plaintext(text)
-                if score > 5.0:
-                    all_results.append((score, f'AFFINE_{a}_{b}', 'AFFINE', text))
+        with metrics.phase('affine'):
+            for a in valid_a:
+                for b in range(29):
+                    pt = self.gpu.affine_decrypt(cipher, a, b)
+                    text = indices_to_text(cp.asnumpy(pt))
+                    score = score_plaintext(text)
+                    if score > 5.0:
+                        all_results.append((score, f'AFFINE_{a}_{b}', 'AFFINE', text))
+        metrics.count('keys', len(valid_a) * 29)
         
         # Phase 4: Multiplicative cipher
         print("[PHASE 4] Multiplicative cipher...")
-        for mult in valid_a:
-            pt = self.gpu.multiplicative(cipher, mult)
-            text = indices_to_text(cp.asnumpy(pt))
-            score = score_plaintext(text)
-            if score > 5.0:
-                all_results.append((score, f'MULT_{mult}', 'MULT', text))
+        with metrics.phase('multiplicative'):
+            for mult in valid_a:
+                pt = self.gpu.multiplicative(cipher, mult)
+                text = indices_to_text(cp.asnumpy(pt))
+                score = score_plaintext(text)
+                if score > 5.0:
+                    all_results.append((score, f'MULT_{mult}', 'MULT', text))
+        metrics.count('keys', len(valid_a))
         
         # Phase 5: Progressive key
         print("[PHASE 5] Progressive key cipher...")
-        for base in range(29):
-            pt = self.gpu.progressive_key(cipher, base)
-            text = indices_to_text(cp.asnumpy(pt))
-            score = score_plaintext(text)
-            if score > 5.0:
-                all_results.append((score, f'PROGRESSIVE_{base}', 'PROGRESSIVE', text))
-        
-        # Phase 6: Skip cipher
-        print("[PHASE 6] Skip cipher...")
-        for skip in range(2, 20):
-            if skip < len(cipher):
-                pt = self.gpu.skip_cipher(cipher, skip)
+        with metrics.phase('progressive'):
+            for base in range(29):
+                pt = self.gpu.progressive_key(cipher, base)
                 text = indices_to_text(cp.asnumpy(pt))
                 score = score_plaintext(text)
                 if score > 5.0:
-                    all_results.append((score, f'SKIP_{skip}', 'SKIP', text))
+                    all_results.append((score, f'PROGRESSIVE_{base}', 'PROGRESSIVE', text))
+        metrics.count('keys', 29)
+        
+        # Phase 6: Skip cipher
+        print("[PHASE 6] Skip cipher...")
+        with metrics.phase('skip'):
+            for skip in range(2, 20):
+                if skip < len(cipher):
+                    pt = self.gpu.skip_cipher(cipher, skip)
+                    text = indices_to_text(cp.asnumpy(pt))
+                    score = score_plaintext(text)
+                    if score > 5.0:
+                        all_results.append((score, f'SKIP_{skip}', 'SKIP', text))
+        metrics.count('keys', 18)
         
         # Phase 7: Columnar transposition
         print("[PHASE 7] Columnar transposition...")
-        for cols in range(2, 20):
-            pt = self.gpu.columnar_unscramble(cipher, cols)
-            text = indices_to_text(cp.asnumpy(pt))
-            score = score_plaintext(text)
-            if score > 5.0:
-                all_results.append((score, f'COLUMNAR_{cols}', 'COLUMNAR', text))
+        with metrics.phase('columnar'):
+            for cols in range(2, 20):
+                pt = self.gpu.columnar_unscramble(cipher, cols)
+                text = indices_to_text(cp.asnumpy(pt))
+                score = score_plaintext(text)
+                if score > 5.0:
+                    all_results.append((score, f'COLUMNAR_{cols}', 'COLUMNAR', text))
+        metrics.count('keys', 18)
         
         # Phase 8: Vigenère with all keys and modes
         print(f"[PHASE 8] Vigenère attack ({len(self.keys)} keys × {len(self.modes)} modes)...")
-        batch_results = self.gpu.batch_decrypt(cipher, self.keys, self.modes)
-        scored = score_batch_gpu(batch_results, min_score=5.0)
-        all_results.extend(scored)
+        with metrics.phase('vigenere'):
+            all_results.extend(self.vigenere_phase(cipher, top_n))
         
         # Phase 9: Vigenère on reversed ciphertext
         print("[PHASE 9] Vigenère on reversed ciphertext...")
-        batch_rev_results = self.gpu.batch_decrypt(cipher_rev, self.keys, self.modes)
-        scored_rev = score_batch_gpu(batch_rev_results, min_score=5.0)
-        for score, key, mode, text in scored_rev:
-            all_results.append((score, f'{key}_REVERSED', mode, text))
+        with metrics.phase('vigenere_reversed'):
+            for score, key, mode, text in self.vigenere_phase(cipher_rev, top_n):
+                all_results.append((score, f'{key}_REVERSED', mode, text))
         
         elapsed = time.time() - start
         
@@ -975,11 +1002,16 @@ class UltimateGPUAttack:
         
         all_page_results = {}
         total_start = time.time()
+        metrics = get_metrics()
+        metrics.plan(len(pages), 'pages')
         
         for i, page in enumerate(pages):
             print(f"\n[{i+1}/{len(pages)}] Processing Page {page}...")
             results = self.attack_page(page)
             all_page_results[page] = results
+            metrics.advance()
+            metrics.gauge('queue', len(pages) - i - 1)
+            metrics.tick()
         
         total_time = time.time() - total_start
         
@@ -1061,7 +1093,9 @@ def main():
                        help='Output file name')
     parser.add_argument('--top', type=int, default=10,
                        help='Number of top results per page')
+    add_metrics_arguments(parser)
     args = parser.parse_args()
+    configure_from_args('ultimate_gpu_attack', args)
     
     # Determine pages to attack
     if args.pages == 'all':
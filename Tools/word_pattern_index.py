@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+WORD-PATTERN (ISOMORPH) DICTIONARY INDEX
+========================================
+
+Index of plaintext words by their rune-domain shape, so word-boundary
+attacks can look up compatible words instead of scanning word lists.
+
+Every word is transliterated once to Gematria indices and filed under:
+- its rune length                 (any key: Vigenère / running key)
+- its repetition pattern (ABCA)   (monoalphabetic: substitution, affine)
+- its difference signature        (constant key per word: Caesar / shift)
+
+Each bucket holds a (words, matrix) pair, so for a cipher word the
+compatible plaintexts and their implied key fragments come out of one
+dict lookup and one vectorised subtraction.
+
+Sources: master_dictionary.get_all_words(), the solved-page plaintexts
+and the reference corpora.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from master_dictionary import (
+    ALPHABET_SIZE, CORPUS_FILES, INDEX_TO_LATIN, get_all_words,
+    load_corpus_text, load_page_runes, load_solved_page_texts,
+    split_rune_words, text_to_key,
+)
+
+MAX_WORD_RUNES = 16
+
+# =============================================================================
+# WORD SHAPES
+# =============================================================================
+
+def repetition_pattern(indices: Sequence[int]) -> Tuple[int, ...]:
+    """Canonical repetition pattern, e.g. DEED -> (0, 1, 1, 0)."""
+    seen: Dict[int, int] = {}
+    return tuple(seen.setdefault(int(i), len(seen)) for i in indices)
+
+def difference_signature(indices: Sequence[int]) -> Tuple[int, ...]:
+    """Length plus successive differences mod 29; invariant under a constant shift."""
+    idx = [int(i) for i in indices]
+    return (len(idx),) + tuple((b - a) % ALPHABET_SIZE for a, b in zip(idx, idx[1:]))
+
+def implied_key(cipher: np.ndarray, plain: np.ndarray, mode: str = 'SUB') -> np.ndarray:
+    """Key that maps plain -> cipher under a mode (broadcasts over rows)."""
+    if mode == 'SUB':          # p = c - k
+        return (cipher - plain) % ALPHABET_SIZE
+    if mode == 'ADD':          # p = c + k
+        return (plain - cipher) % ALPHABET_SIZE
+    if mode == 'BEAUFORT':     # p = k - c
+        return (plain + cipher) % ALPHABET_SIZE
+    raise ValueError(f"unknown mode {mode}")
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+@dataclass
+class Bucket:
+    """Words sharing one shape, with their index rows stacked."""
+    words: List[str]
+    matrix: np.ndarray      # (m, L) uint8
+    weights: np.ndarray     # (m,) log frequency weight
+
+@dataclass
+class WordPatternIndex:
+    """Length / repetition-pattern / difference-signature index of words."""
+    by_length: Dict[int, Bucket] = field(default_factory=dict)
+    by_pattern: Dict[Tuple[int, ...], Bucket] = field(default_factory=dict)
+    by_difference: Dict[Tuple[int, ...], Bucket] = field(default_factory=dict)
+
+    def candidates(self, cipher_word: Sequence[int], cipher: str = 'VIGENERE') -> Optional[Bucket]:
+        """Plaintext words compatible with a cipher word.
+
+        cipher: VIGENERE (any key), SUBSTITUTION (same repetition pattern),
+        SHIFT (constant key across the word), or BEAUFORT_SHIFT.
+        """
+        if cipher == 'VIGENERE':
+            return self.by_length.get(len(cipher_word))
+        if cipher == 'SUBSTITUTION':
+            return self.by_pattern.get(repetition_pattern(cipher_word))
+        if cipher == 'SHIFT':
+            return self.by_difference.get(difference_signature(cipher_word))
+        if cipher == 'BEAUFORT_SHIFT':
+            neg = [(-int(c)) % ALPHABET_SIZE for c in cipher_word]
+            return self.by_difference.get(difference_signature(neg))
+        raise ValueError(f"unknown cipher {cipher}")
+
+    def implied_keys(self, cipher_word: Sequence[int], mode: str = 'SUB',
+                     cipher: str = 'VIGENERE') -> Tuple[List[str], np.ndarray]:
+        """(words, key fragments) for every compatible plaintext word."""
+        bucket = self.candidates(cipher_word, cipher)
+        if bucket is None:
+            return [], np.zeros((0, len(cipher_word)), dtype=np.uint8)
+        c = np.asarray(cipher_word, dtype=np.int16)[None, :]
+        keys = implied_key(c, bucket.matrix.astype(np.int16), mode).astype(np.uint8)
+        return bucket.words, keys
+
+def _bucketize(groups: Dict, weights: Dict[str, float]) -> Dict:
+    out = {}
+    for shape, members in groups.items():
+        members.sort(key=lambda wk: -weights[wk[0]])
+        out[shape] = Bucket(
+            words=[w for w, _ in members],
+            matrix=np.array([k for _, k in members], dtype=np.uint8),
+            weights=np.array([weights[w] for w, _ in members], dtype=np.float32),
+        )
+    return out
+
+def build_index(word_counts: Dict[str, int]) -> WordPatternIndex:
+    """Build the index from word -> occurrence count."""
+    by_len: Dict[int, list] = {}
+    by_pat: Dict[Tuple, list] = {}
+    by_diff: Dict[Tuple, list] = {}
+    seen_keys = set()
+    weights = {w: float(np.log1p(c)) for w, c in word_counts.items()}
+
+    for word in word_counts:
+        key = tuple(text_to_key(word))
+        if not key or len(key) > MAX_WORD_RUNES or key in seen_keys:
+            continue
+        seen_keys.add(key)
+        by_len.setdefault(len(key), []).append((word, key))
+        by_pat.setdefault(repetition_pattern(key), []).append((word, key))
+        by_diff.setdefault(difference_signature(key), []).append((word, key))
+
+    return WordPatternIndex(_bucketize(by_len, weights), _bucketize(by_pat, weights),
+                            _bucketize(by_diff, weights))
+
+def collect_word_counts() -> Counter:
+    """Words from the master dictionary, solved pages and corpora, with counts."""
+    counts: Counter = Counter()
+    texts = list(load_solved_page_texts().values())
+    texts += [load_corpus_text(name) for name in CORPUS_FILES]
+    for text in texts:
+        counts.update(re.findall(r'[A-Z]+', text.upper()))
+    for word in get_all_words():
+        counts[word] += 1
+    return counts
+
+@lru_cache(maxsize=1)
+def default_index() -> WordPatternIndex:
+    """Index over all default word sources (built once per process)."""
+    return build_index(collect_word_counts())
+
+# =============================================================================
+# WORD-CONSTRAINED KEY SEARCH
+# =============================================================================
+
+def page_cipher_words(page_num: int) -> List[Tuple[int, List[int]]]:
+    """(stream offset, indices) for every word on a page."""
+    return split_rune_words(load_page_runes(page_num))
+
+def periodic_key_votes(words: List[Tuple[int, List[int]]], period: int,
+                       index: Optional[WordPatternIndex] = None, mode: str = 'SUB',
+                       min_len: int = 2, top_words: int = 200) -> np.ndarray:
+    """Vote matrix V[residue, key value] for a period-`period` key.
+
+    Each cipher word's candidate plaintexts cast weighted votes for the key
+    values they imply at stream positions (offset + i) mod period.
+    """
+    index = index or default_index()
+    votes = np.zeros((period, ALPHABET_SIZE), dtype=np.float64)
+    for offset, cw in words:
+        if len(cw) < min_len:
+            continue
+        bucket = index.candidates(cw)
+        if bucket is None:
+            continue
+        keys = implied_key(np.asarray(cw, dtype=np.int16)[None, :],
+                           bucket.matrix[:top_words].astype(np.int16), mode)
+        w = bucket.weights[:top_words] / max(1, len(bucket.words))
+        residues = (offset + np.arange(len(cw))) % period
+        for col, r in enumerate(residues):
+            np.add.at(votes[r], keys[:, col], w)
+    return votes
+
+def word_constrained_key_search(page_num: int, periods: Sequence[int], mode: str = 'SUB',
+                                index: Optional[WordPatternIndex] = None) -> List[Tuple[float, int, List[int]]]:
+    """Rank periodic keys by how well the page's words agree on them.
+
+    Returns (score, period, key) sorted best first; score is the mean
+    per-residue vote share of the winning key value.
+    """
+    index = index or default_index()
+    words = page_cipher_words(page_num)
+    results = []
+    for period in periods:
+        votes = periodic_key_votes(words, period, index, mode)
+        totals = votes.sum(axis=1)
+        share = votes.max(axis=1) / np.where(totals > 0, totals, 1)
+        results.append((float(share.mean()), period, [int(k) for k in votes.argmax(axis=1)]))
+    results.sort(key=lambda r: -r[0])
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Word-pattern dictionary index")
+    parser.add_argument("--page", type=int, default=None, help="Page for word-constrained key search")
+    parser.add_argument("--word", type=str, default=None, help="Show pattern matches for a Latin word")
+    parser.add_argument("--mode", type=str, default='SUB', choices=['SUB', 'ADD', 'BEAUFORT'])
+    parser.add_argument("--max-period", type=int, default=30, help="Largest key period to rank")
+    args = parser.parse_args()
+
+    index = default_index()
+    print(f"[INDEX] {sum(len(b.words) for b in index.by_length.values())} words, "
+          f"{len(index.by_pattern)} patterns, {len(index.by_difference)} difference signatures")
+
+    if args.word:
+        key = text_to_key(args.word)
+        bucket = index.candidates(key, 'SUBSTITUTION')
+        print(f"{args.word} pattern {repetition_pattern(key)}: "
+              f"{bucket.words[:20] if bucket else []}")
+
+    if args.page is not None:
+        ranked = word_constrained_key_search(args.page, range(1, args.max_period + 1), args.mode, index)
+        for score, period, key in ranked[:10]:
+            latin = ''.join(INDEX_TO_LATIN[k] for k in key)
+            print(f"  period {period:3d}: agreement {score:.3f}  key {latin}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+WORK BROKER
+===========
+
+Lease-based work distribution over TCP for attacks that outgrow one
+machine. A coordinator holds a list of opaque work units; workers on any
+host connect, lease a unit, heartbeat while they run it and hand back its
+result:
+
+    # coordinator
+    broker = LeaseBroker(units, lease_ttl=120, info={'fingerprint': fp})
+    with BrokerServer(broker, ('0.0.0.0', 29029), b'secret') as server:
+        broker.wait(report=print)
+    broker.results()                        # unit id -> result
+
+    # every worker (any host)
+    run_worker(('coordinator', 29029), b'secret', handler)
+
+A lease that is not renewed within `lease_ttl` seconds (worker crashed,
+host lost) goes back to the queue and is granted again; a unit that keeps
+failing is given up after `max_attempts` leases with a None result. The
+first result returned for a unit wins, so a slow worker whose lease was
+reassigned cannot corrupt anything.
+
+The transport is multiprocessing.managers (pickle over an authenticated
+socket), so anyone holding the authkey can run code on the coordinator.
+The broker binds 127.0.0.1 by default; serving on any other address
+needs an authkey set on purpose (BROKER_AUTHKEY or an explicit argument)
+rather than the built-in one, and the port should still only be exposed
+on a trusted network.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import ipaddress
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 29029
+AUTHKEY_FROM_ENV = 'BROKER_AUTHKEY' in os.environ
+DEFAULT_AUTHKEY = os.environ.get('BROKER_AUTHKEY', 'cicada3301').encode()     # Built-in key: loopback only
+DEFAULT_LEASE_TTL = 120.0
+
+Address = Tuple[str, int]
+
+@dataclass
+class Lease:
+    """One granted unit."""
+    worker: str
+    deadline: float
+    attempt: int
+
+@dataclass
+class WorkerStats:
+    """What the coordinator knows about one worker."""
+    last_seen: float
+    completed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    leased_at: Dict[int, float] = field(default_factory=dict)
+
+# =============================================================================
+# BROKER
+# =============================================================================
+
+class LeaseBroker:
+    """Queue of work units handed out under expiring leases (thread-safe)."""
+
+    def __init__(self, units: Sequence[Any], lease_ttl: float = DEFAULT_LEASE_TTL,
+                 max_attempts: int = 5, info: Optional[Dict[str, Any]] = None):
+        self.units = list(units)
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self._info = dict(info or {}, lease_ttl=lease_ttl, units=len(self.units))
+        self._pending: List[int] = list(range(len(self.units)))[::-1]    # pop() from the end
+        self._leases: Dict[int, Lease] = {}
+        self._attempts: Dict[int, int] = {}
+        self._results: Dict[int, Any] = {}
+        self._failed: Dict[int, str] = {}
+        self._workers: Dict[str, WorkerStats] = {}
+        self._lock = threading.Lock()
+
+    def info(self) -> Dict[str, Any]:
+        """Run description workers check before taking work."""
+        return self._info
+
+    def _seen(self, worker: str) -> WorkerStats:
+        stats = self._workers.setdefault(worker, WorkerStats(time.time()))
+        stats.last_seen = time.time()
+        return stats
+
+    def _reap(self):
+        """Return expired leases to the queue (or give up on them)."""
+        now = time.time()
+        for unit_id, lease in list(self._leases.items()):
+            if lease.deadline < now:
+                del self._leases[unit_id]
+                self._requeue(unit_id, f"lease of {lease.worker} expired")
+
+    def _requeue(self, unit_id: int, reason: str):
+        if self._attempts.get(unit_id, 0) >= self.max_attempts:
+            self._failed[unit_id] = reason
+            self._results[unit_id] = None
+        else:
+            self._pending.insert(0, unit_id)        # Retried after the fresh units
+
+    def lease(self, worker: str) -> Optional[Tuple[int, Any]]:
+        """(unit id, unit) for the worker, or None when nothing is free right now."""
+        with self._lock:
+            self._seen(worker)
+            self._reap()
+            while self._pending:
+                unit_id = self._pending.pop()
+                if unit_id in self._results:
+                    continue
+                attempt = self._attempts.get(unit_id, 0) + 1
+                self._attempts[unit_id] = attempt
+                self._leases[unit_id] = Lease(worker, time.time() + self.lease_ttl, attempt)
+                self._workers[worker].leased_at[unit_id] = time.time()
+                return unit_id, self.units[unit_id]
+            return None
+
+    def heartbeat(self, worker: str, unit_id: int) -> bool:
+        """Extend a lease; False when the worker no longer holds it."""
+        with self._lock:
+            self._seen(worker)
+            lease = self._leases.get(unit_id)
+            if lease is None or lease.worker != worker:
+                return False
+            lease.deadline = time.time() + self.lease_ttl
+            return True
+
+    def complete(self, worker: str, unit_id: int, result: Any) -> bool:
+        """Hand back a result; False when the unit was already done."""
+        with self._lock:
+            stats = self._seen(worker)
+            started = stats.leased_at.pop(unit_id, None)
+            if started is not None:
+                stats.busy_seconds += time.time() - started
+            if unit_id in self._results:
+                return False
+            self._leases.pop(unit_id, None)
+            self._results[unit_id] = result
+            stats.completed += 1
+            return True
+
+    def fail(self, worker: str, unit_id: int, error: str):
+        """Give a unit back at once after an error."""
+        with self._lock:
+            stats = self._seen(worker)
+            stats.leased_at.pop(unit_id, None)
+            stats.failed += 1
+            lease = self._leases.get(unit_id)
+            if lease is not None and lease.worker == worker:
+                del self._leases[unit_id]
+                self._requeue(unit_id, f"{worker}: {error}")
+
+    def finished(self) -> bool:
+        with self._lock:
+            self._reap()
+            return len(self._results) == len(self.units)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._reap()
+            now = time.time()
+            return {
+                'units': len(self.units),
+                'done': len(self._results) - len(self._failed),
+                'failed': len(self._failed),
+                'leased': len(self._leases),
+                'pending': len(self.units) - len(self._results) - len(self._leases),
+                'workers': sum(now - s.last_seen < self.lease_ttl for s in self._workers.values()),
+            }
+
+    def workers(self) -> Dict[str, WorkerStats]:
+        with self._lock:
+            return dict(self._workers)
+
+    def results(self) -> Dict[int, Any]:
+        with self._lock:
+            return dict(self._results)
+
+    def failures(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._failed)
+
+    def wait(self, report: Optional[Callable[[str], None]] = None, interval: float = 5.0,
+             timeout: Optional[float] = None) -> bool:
+        """Block until every unit is done (False on timeout), reporting progress changes."""
+        start, last = time.time(), None
+        while not self.finished():
+            if timeout is not None and time.time() - start > timeout:
+                return False
+            s = self.status()
+            line = (f"[BROKER] {s['done']}/{s['units']} done, {s['leased']} leased, "
+                    f"{s['pending']} pending, {s['failed']} failed, {s['workers']} workers")
+            if report is not None and line != last:
+                report(line)
+                last = line
+            time.sleep(interval)
+        return True
+
+# =============================================================================
+# TRANSPORT
+# =============================================================================
+
+_EXPOSED = ('info', 'lease', 'heartbeat', 'complete', 'fail', 'finished', 'status')
+
+class _ClientManager(BaseManager):
+    pass
+
+_ClientManager.register('broker', exposed=_EXPOSED)
+
+class BrokerServer:
+    """Serves one LeaseBroker over TCP from a background thread of this process."""
+
+    def __init__(self, broker: LeaseBroker, address: Address = (DEFAULT_HOST, DEFAULT_PORT),
+                 authkey: Optional[bytes] = None):
+        class _ServerManager(BaseManager):
+            pass
+        _ServerManager.register('broker', callable=lambda: broker, exposed=_EXPOSED)
+        self.authkey = server_authkey(address[0], authkey)
+        self.server = _ServerManager(address=address, authkey=self.authkey).get_server()
+        self.server.stop_event = threading.Event()     # Ends the per-client threads on close
+        self.address: Address = self.server.address
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                conn = self.server.listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            threading.Thread(target=self.server.handle_request, args=(conn,), daemon=True).start()
+
+    @property
+    def connect_address(self) -> Address:
+        """Address local workers should dial (a wildcard bind becomes loopback)."""
+        host, port = self.address
+        return ('127.0.0.1' if host in ('0.0.0.0', '') else host, port)
+
+    def close(self):
+        self._closed = True
+        self.server.stop_event.set()
+        self.server.listener.close()
+
+    def __enter__(self) -> 'BrokerServer':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def connect(address: Address, authkey: bytes = DEFAULT_AUTHKEY, retries: int = 30, delay: float = 2.0):
+    """Proxy to a remote broker (retries while the coordinator starts up)."""
+    for attempt in range(retries):
+        manager = _ClientManager(address=tuple(address), authkey=authkey)
+        try:
+            manager.connect()
+            return manager.broker()
+        except ConnectionRefusedError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(delay)
+
+def is_loopback(host: str) -> bool:
+    """True when `host` resolves to a loopback address (a wildcard bind is not)."""
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+def server_authkey(host: str, authkey: Optional[bytes] = None) -> bytes:
+    """The key to serve with; the built-in default is refused off loopback."""
+    if authkey is not None:
+        return authkey
+    if not AUTHKEY_FROM_ENV and not is_loopback(host):
+        raise ValueError(f"refusing to serve on {host or '0.0.0.0'} with the built-in authkey: "
+                         f"set BROKER_AUTHKEY or pass an authkey explicitly")
+    return DEFAULT_AUTHKEY
+
+def parse_address(text: str, default_host: str = DEFAULT_HOST) -> Address:
+    """'host:port', 'host' or ':port' -> (host, port)."""
+    host, _, port = text.rpartition(':') if ':' in text else (text, '', '')
+    return (host or default_host, int(port) if port else DEFAULT_PORT)
+
+# =============================================================================
+# WORKER LOOP
+# =============================================================================
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def run_worker(address: Address, authkey: bytes, handler: Callable[[Any], Any],
+               check: Optional[Callable[[Dict[str, Any]], None]] = None,
+               name: Optional[str] = None, poll: float = 2.0) -> int:
+    """Lease, run and return units until the coordinator has none left.
+
+    `check` sees the broker's info first and raises to refuse a run the
+    worker cannot reproduce (e.g. a different key plan). Returns the number
+    of units completed; exits quietly when the coordinator goes away.
+    """
+    broker = connect(address, authkey)
+    name = name or worker_name()
+    info = broker.info()
+    if check is not None:
+        check(info)
+    interval = max(1.0, info['lease_ttl'] / 3)
+    completed = 0
+    try:
+        while True:
+            grant = broker.lease(name)
+            if grant is None:
+                if broker.finished():
+                    break
+                time.sleep(poll)
+                continue
+            unit_id, unit = grant
+            stop = threading.Event()
+            beat = threading.Thread(target=_heartbeat, args=(broker, name, unit_id, stop, interval), daemon=True)
+            beat.start()
+            try:
+                result = handler(unit)
+            except Exception as e:
+                broker.fail(name, unit_id, repr(e))
+                continue
+            finally:
+                stop.set()
+                beat.join()
+            broker.complete(name, unit_id, result)
+            completed += 1
+    except (EOFError, ConnectionError):
+        pass
+    return completed
+
+def _heartbeat(broker, name: str, unit_id: int, stop: threading.Event, interval: float):
+    while not stop.wait(interval):
+        try:
+            if not broker.heartbeat(name, unit_id):
+                return
+        except (EOFError, ConnectionError):
+            return
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a running work broker")
+    parser.add_argument("address", type=str, help="Coordinator host:port")
+    parser.add_argument("--authkey", type=str, default=DEFAULT_AUTHKEY.decode())
+    args = parser.parse_args()
+
+    broker = connect(parse_address(args.address), args.authkey.encode(), retries=1)
+    print(f"[BROKER] {broker.info()}")
+    print(f"[BROKER] {broker.status()}")
+
+if __name__ == "__main__":
+    main()
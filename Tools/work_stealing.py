@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+WORK-STEALING SCHEDULER
+=======================
+
+Runs cost-estimated work units on a fixed set of worker processes, so a
+batch finishes when the total work is done rather than when the longest
+page is. Attacks used to hand out whole pages: a 1000-rune page with a
+large key fan-out kept one worker busy long after the others went idle.
+
+    units = [WorkUnit(i, cost, payload, label) ...]       # e.g. page x key range
+    results, stats = run_units(units, handler, workers=8, setup=make_state, context=ctx)
+    print(stats.summary())            # makespan vs. total work / workers
+
+1. Units are dealt out longest-first to the least loaded worker (LPT), so
+   every worker starts with about the same estimated cost.
+2. Each worker owns a deque of unit ids in shared memory and pops from
+   its front.
+3. An idle worker steals the back half of the deque with the most
+   estimated cost left, so the small units at the tail fill the gaps at
+   the end of the run.
+
+`setup(worker_id, context)` runs once per worker and returns the state
+passed to every `handler(state, payload)` call (a GPU context, a key
+plan, ...). Both must be importable top-level functions, and context and
+payloads must be picklable. Units are reported one by one as they finish,
+and the summed unit cost is the planned work behind the metrics ETA.
+
+Author: Wulfic
+Date: January 2026
+"""
+
+import argparse
+import math
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import get_metrics
+
+@dataclass
+class WorkUnit:
+    """One schedulable piece of work."""
+    id: int
+    cost: float                 # Estimated cost (any unit, only ratios matter)
+    payload: Any
+    label: str = ''
+
+@dataclass
+class RunStats:
+    """How well a run was balanced."""
+    workers: int
+    units: int
+    makespan: float = 0.0
+    busy: List[float] = field(default_factory=list)        # Seconds of handler time per worker
+    steals: int = 0
+    failed: Dict[int, str] = field(default_factory=dict)  # unit id -> error
+
+    @property
+    def work(self) -> float:
+        return sum(self.busy)
+
+    @property
+    def efficiency(self) -> float:
+        """Total work / (workers x makespan): 1.0 means no worker ever waited."""
+        return self.work / max(1e-9, self.workers * self.makespan)
+
+    def summary(self) -> str:
+        return (f"{self.units} units on {self.workers} workers: makespan {self.makespan:.1f}s, "
+                f"work {self.work:.1f}s (ideal {self.work / max(1, self.workers):.1f}s), "
+                f"{100 * self.efficiency:.0f}% efficient, {self.steals} steals")
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+def split_range(n: int, item_cost: float, target_cost: float) -> List[Tuple[int, int]]:
+    """Contiguous ranges of n items, each costing about target_cost."""
+    if n <= 0:
+        return []
+    count = max(1, min(n, math.ceil(n * item_cost / max(target_cost, 1e-9))))
+    step = n / count
+    bounds = [round(i * step) for i in range(count + 1)]
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def target_cost(total: float, workers: int, units_per_worker: int = 8) -> float:
+    """Unit size that leaves several units per worker to balance with."""
+    return total / max(1, workers * units_per_worker)
+
+def deal(units: Sequence[WorkUnit], workers: int) -> List[List[int]]:
+    """Longest-processing-time-first assignment: unit ids per worker, largest first."""
+    load = [0.0] * workers
+    deques: List[List[int]] = [[] for _ in range(workers)]
+    for unit in sorted(units, key=lambda u: -u.cost):
+        w = min(range(workers), key=load.__getitem__)
+        deques[w].append(unit.id)
+        load[w] += unit.cost
+    return deques
+
+# =============================================================================
+# SHARED DEQUES
+# =============================================================================
+
+class _Deques:
+    """Per-worker deques of unit ids in shared memory under one lock.
+
+    Each worker has a segment as long as the whole unit list, so a thief
+    can always copy stolen ids into its own (empty) segment.
+    """
+
+    def __init__(self, deques: List[List[int]], costs: Sequence[float]):
+        self.workers = len(deques)
+        self.capacity = len(costs)
+        self.ids = mp.RawArray('q', max(1, self.workers * self.capacity))
+        self.head = mp.RawArray('q', self.workers)
+        self.tail = mp.RawArray('q', self.workers)
+        self.left = mp.RawArray('d', self.workers)            # Estimated cost still queued
+        self.costs = mp.RawArray('d', max(1, len(costs)))
+        self.steals = mp.RawValue('q', 0)
+        self.lock = mp.Lock()
+        self.costs[:len(costs)] = list(costs)
+        for w, ids in enumerate(deques):
+            base = w * self.capacity
+            self.ids[base:base + len(ids)] = ids
+            self.tail[w] = len(ids)
+            self.left[w] = sum(costs[i] for i in ids)
+
+    def pop(self, w: int) -> Optional[int]:
+        with self.lock:
+            if self.head[w] == self.tail[w]:
+                return None
+            unit = self.ids[w * self.capacity + self.head[w]]
+            self.head[w] += 1
+            self.left[w] -= self.costs[unit]
+            return unit
+
+    def steal(self, w: int) -> bool:
+        """Move the back half of the fullest other deque to worker w's front."""
+        with self.lock:
+            victims = [v for v in range(self.workers) if v != w and self.tail[v] > self.head[v]]
+            if not victims:
+                return False
+            v = max(victims, key=lambda v: self.left[v])
+            count = self.tail[v] - self.head[v]
+            take = (count + 1) // 2
+            start = self.tail[v] - take
+            src, dst = v * self.capacity, w * self.capacity
+            stolen = list(self.ids[src + start:src + self.tail[v]])
+            self.tail[v] = start
+            moved = sum(self.costs[i] for i in stolen)
+            self.left[v] -= moved
+            self.ids[dst:dst + take] = stolen
+            self.head[w], self.tail[w] = 0, take
+            self.left[w] = moved
+            self.steals.value += 1
+            return True
+
+    def queued(self) -> int:
+        """Units not yet started (read without the lock, so approximate)."""
+        return sum(self.tail[w] - self.head[w] for w in range(self.workers))
+
+    def next(self, w: int) -> Optional[int]:
+        unit = self.pop(w)
+        while unit is None and self.steal(w):
+            unit = self.pop(w)
+        return unit
+
+def _worker_main(w: int, deques: _Deques, units: List[WorkUnit], handler: Callable[[Any, Any], Any],
+                 setup: Optional[Callable[[int, Any], Any]], context: Any, results: mp.Queue):
+    state = setup(w, context) if setup is not None else context
+    while True:
+        unit_id = deques.next(w)
+        if unit_id is None:
+            break
+        start = time.time()
+        try:
+            result, error = handler(state, units[unit_id].payload), None
+        except Exception as e:
+            result, error = None, repr(e)
+        results.put((unit_id, w, time.time() - start, result, error))
+    results.put((-1, w, 0.0, None, None))
+
+# =============================================================================
+# RUNNING
+# =============================================================================
+
+ReportFn = Callable[[int, int, WorkUnit, int, float], None]
+
+def print_progress(done: int, total: int, unit: WorkUnit, worker: int, seconds: float):
+    print(f"[UNIT] {done}/{total} {unit.label or unit.id} on worker {worker} in {seconds:.1f}s")
+
+def run_units(units: Sequence[WorkUnit], handler: Callable[[Any, Any], Any], workers: int,
+              setup: Optional[Callable[[int, Any], Any]] = None, context: Any = None,
+              report: Optional[ReportFn] = print_progress,
+              cost_unit: str = 'cost') -> Tuple[Dict[int, Any], RunStats]:
+    """Run every unit (ids must be 0..n-1) and return (unit id -> result, stats)."""
+    units = sorted(units, key=lambda u: u.id)
+    if [u.id for u in units] != list(range(len(units))):
+        raise ValueError("unit ids must be 0..n-1")
+    workers = max(1, min(workers, len(units))) if units else 1
+    stats = RunStats(workers, len(units), busy=[0.0] * workers)
+    out: Dict[int, Any] = {}
+    start = time.time()
+    metrics = get_metrics()
+    metrics.plan(sum(u.cost for u in units), cost_unit)
+
+    if workers == 1:
+        state = setup(0, context) if setup is not None else context
+        for unit in units:
+            t = time.time()
+            try:
+                out[unit.id] = handler(state, unit.payload)
+            except Exception as e:
+                out[unit.id], stats.failed[unit.id] = None, repr(e)
+            stats.busy[0] += time.time() - t
+            metrics.advance(unit.cost)
+            metrics.gauge('queue', len(units) - len(out))
+            metrics.tick()
+            if report is not None:
+                report(len(out), len(units), unit, 0, time.time() - t)
+        stats.makespan = time.time() - start
+        return out, stats
+
+    deques = _Deques(deal(units, workers), [u.cost for u in units])
+    results: mp.Queue = mp.Queue()
+    procs = [mp.Process(target=_worker_main, args=(w, deques, units, handler, setup, context, results))
+             for w in range(workers)]
+    for p in procs:
+        p.start()
+
+    finished = 0
+    while finished < workers:
+        try:
+            unit_id, w, seconds, result, error = results.get(timeout=5)
+        except queue.Empty:
+            if not any(p.is_alive() for p in procs):
+                break                       # A worker died without reporting
+            metrics.tick()
+            continue
+        if unit_id < 0:
+            finished += 1
+            continue
+        out[unit_id] = result
+        stats.busy[w] += seconds
+        if error is not None:
+            stats.failed[unit_id] = error
+        metrics.advance(units[unit_id].cost)
+        metrics.gauge('queue', deques.queued())
+        metrics.tick()
+        if report is not None:
+            report(len(out), len(units), units[unit_id], w, seconds)
+    for p in procs:
+        p.join(timeout=10)
+
+    for unit in units:
+        if unit.id not in out:
+            out[unit.id], stats.failed[unit.id] = None, "worker exited"
+    stats.makespan = time.time() - start
+    stats.steals = deques.steals.value
+    return out, stats
+
+# =============================================================================
+# DEMO
+# =============================================================================
+
+def _sleep_handler(state: Any, seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Work-stealing scheduler demo with skewed unit costs")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--units", type=int, default=64)
+    parser.add_argument("--scale", type=float, default=0.05, help="Seconds per unit of cost")
+    args = parser.parse_args()
+
+    # Page-like skew: a few units are 20x the rest, and the estimates are off by up to 2x
+    costs = [20.0 if i % 16 == 0 else 1.0 for i in range(args.units)]
+    actual = [c * (0.5 + 1.5 * ((i * 7919) % 100) / 100) for i, c in enumerate(costs)]
+    units = [WorkUnit(i, c, a * args.scale, f"unit {i}") for i, (c, a) in enumerate(zip(costs, actual))]
+    _, stats = run_units(units, _sleep_handler, args.workers, report=None)
+    print(f"[STEAL] {stats.summary()}")
+
+if __name__ == "__main__":
+    main()